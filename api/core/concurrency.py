@@ -0,0 +1,137 @@
+"""
+Execução de código bloqueante fora do event loop
+================================================
+
+Rotinas síncronas chamadas a partir de endpoints `async def` travam o
+worker inteiro enquanto executam. Os helpers abaixo mantêm a chamada
+`await` dos routers e movem o trabalho para fora do loop:
+
+- `blocking`: threadpool do Starlette. Para I/O (consultas psycopg2,
+  leitura de arquivos), que libera o GIL enquanto espera.
+- `cpu_bound`: pool de processos compartilhado. Para renderização em
+  Python puro (reportlab, openpyxl), que em thread disputaria o GIL com
+  o event loop e continuaria atrasando as demais requisições.
+- `run_in_process`: mesmo pool, para funções de módulo (análises ETAP).
+
+Configuração:
+    REPORT_RENDER_WORKERS: processos do pool (padrão: min(4, CPUs))
+"""
+
+import os
+import asyncio
+import logging
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def blocking(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Decorator: executa `func` no threadpool quando aguardada.
+
+    Examples:
+        >>> class Service:
+        ...     @blocking
+        ...     def export_to_csv(self, rows): ...
+        >>> csv = await Service().export_to_csv(rows)
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    return wrapper
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """
+    Pool de processos compartilhado, criado no primeiro uso.
+
+    Usa forkserver quando disponível: o servidor já tem threads (threadpool,
+    pool de conexões) e fork direto de um processo com threads é inseguro.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=context)
+            logger.info(f"⚙️  Pool de renderização: {RENDER_WORKERS} processos")
+        return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    """Encerra o pool de renderização (shutdown da aplicação)"""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_process(func: Callable[..., T], *args: Any) -> T:
+    """
+    Executa `func(*args)` no pool de processos compartilhado.
+
+    `func` precisa ser importável no processo do pool (função de módulo
+    ou método de instância serializável) e os argumentos, serializáveis.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_render_pool(), func, *args)
+    except BrokenProcessPool:
+        logger.warning(f"⚠️  Pool de processos quebrado; {getattr(func, '__name__', func)} no threadpool")
+        shutdown_render_pool()
+        return await run_in_threadpool(func, *args)
+
+
+def _run_cpu_bound_method(cls: type, name: str, args: tuple, kwargs: dict) -> Any:
+    """
+    Executa no processo do pool: instância sem __init__ (sem sessão de banco)
+    e a função síncrona original do método.
+    """
+    instance = cls.__new__(cls)
+    return getattr(cls, name).__wrapped__(instance, *args, **kwargs)
+
+
+def cpu_bound(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Decorator para métodos de renderização: executa `func` no pool de processos.
+
+    O método não pode depender de atributos criados no __init__ (a instância
+    é recriada no processo do pool) e argumentos/retorno precisam ser
+    serializáveis por pickle. Se o pool quebrar (processo morto), ele é
+    recriado e a chamada corrente roda no threadpool.
+
+    Examples:
+        >>> class Service:
+        ...     @cpu_bound
+        ...     def export_to_pdf(self, rows): ...
+        >>> pdf = await Service().export_to_pdf(rows)
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                get_render_pool(), _run_cpu_bound_method, type(self), func.__name__, args, kwargs
+            )
+        except BrokenProcessPool:
+            logger.warning(f"⚠️  Pool de renderização quebrado; {func.__name__} no threadpool")
+            shutdown_render_pool()
+            return await run_in_threadpool(func, self, *args, **kwargs)
+
+    return wrapper
@@ -43,6 +43,15 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     
+    # Statistics Snapshot Settings (segundos de validade das estatísticas em cache)
+    STATISTICS_CACHE_TTL: int = 30
+    
+    # Report Cache Settings (relatórios de configuração renderizados, LRU em disco)
+    REPORT_CACHE_DIR: str = "outputs/report_cache"
+    REPORT_CACHE_MAX_MB: int = 512
+    REPORT_PRERENDER_AFTER_IMPORT: bool = False
+    REPORT_PRERENDER_FORMATS: str = "pdf,xlsx"
+    
     # Logging Settings
     LOG_LEVEL: str = "INFO"
     
@@ -3,23 +3,44 @@ Configuração do banco de dados PostgreSQL
 =========================================
 
 Setup SQLAlchemy para integração com PostgreSQL.
+
+Dois caminhos de acesso:
+- get_db: Session síncrona (psycopg2) - endpoints `def` (threadpool do FastAPI)
+- get_async_db: AsyncSession (asyncpg) - endpoints `async def`; sem o
+  driver asyncpg instalado devolve None e run_read executa as consultas no
+  engine síncrono dentro do threadpool, sem bloquear o event loop.
 """
 
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
 from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
 import logging
 
 from api.core.config import settings
 
+try:
+    import asyncpg  # noqa: F401 - driver do engine assíncrono
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    ASYNC_DB_AVAILABLE = True
+except ImportError:
+    AsyncSession = None
+    ASYNC_DB_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# search_path igual ao do engine síncrono
+SEARCH_PATH = "relay_configs,public"
+
 # Configurar engine do SQLAlchemy com pool robusto
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={
-        "options": "-c search_path=relay_configs,public"
+        "options": f"-c search_path={SEARCH_PATH}"
     },
     echo=True if settings.LOG_LEVEL == "DEBUG" else False,
     # 🔧 CONFIGURAÇÃO ROBUSTA DO POOL DE CONEXÕES
@@ -51,6 +72,93 @@ def get_db():
     finally:
         db.close()
 
+def async_database_url(url: str) -> str:
+    """postgresql://... → postgresql+asyncpg://..."""
+    scheme, sep, rest = url.partition("://")
+    return f"{scheme.split('+')[0]}+asyncpg{sep}{rest}"
+
+
+# Engine assíncrono: criado sob demanda (o dialeto importa asyncpg)
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """Engine asyncpg compartilhado, com o mesmo dimensionamento de pool do síncrono"""
+    global _async_engine, _async_session_factory
+    if not ASYNC_DB_AVAILABLE:
+        raise RuntimeError("Driver asyncpg não instalado (pip install asyncpg)")
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            async_database_url(settings.DATABASE_URL),
+            connect_args={"server_settings": {"search_path": SEARCH_PATH}},
+            echo=True if settings.LOG_LEVEL == "DEBUG" else False,
+            pool_size=10,
+            max_overflow=20,
+            pool_timeout=30,
+            pool_recycle=3600,
+            pool_pre_ping=True,
+        )
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db() -> AsyncIterator[Optional[Any]]:
+    """
+    Dependency para obter AsyncSession (asyncpg).
+
+    Gera None quando asyncpg não está instalado; os serviços então usam o
+    engine síncrono via run_read (threadpool).
+    """
+    if not ASYNC_DB_AVAILABLE:
+        yield None
+        return
+
+    get_async_engine()
+    async with _async_session_factory() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+            await session.rollback()
+            raise
+
+
+async def run_read(work: Callable[[Any], T], async_db: Optional[Any] = None) -> T:
+    """
+    Executa consultas de leitura sem bloquear o event loop.
+
+    `work` recebe um objeto com .execute() (Connection ou Session) e usa a
+    API síncrona do SQLAlchemy; o mesmo código roda nos dois caminhos:
+    - com AsyncSession: async_db.run_sync(work) - I/O assíncrono (asyncpg)
+    - sem AsyncSession: conexão do engine síncrono em uma thread do pool
+
+    Args:
+        work: Função que recebe a conexão/sessão e devolve o resultado
+        async_db: AsyncSession de get_async_db (ou None)
+
+    Returns:
+        O valor devolvido por work
+    """
+    if async_db is not None:
+        return await async_db.run_sync(work)
+
+    def _run_sync():
+        with engine.connect() as conn:
+            return work(conn)
+
+    return await run_in_threadpool(_run_sync)
+
+
+async def dispose_async_engine():
+    """Fecha o pool do engine assíncrono (shutdown da API)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
 def test_connection():
     """Testa conexão com o banco"""
     try:
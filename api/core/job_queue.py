@@ -0,0 +1,384 @@
+"""
+Fila de jobs em PostgreSQL
+==========================
+
+Jobs de longa duração (análises ML, reprocessamento de importações, upload
+em lote) saem do `BackgroundTasks` do FastAPI - que roda no processo da API,
+com a Session da requisição já fechada, e morre junto com o worker - para
+a tabela protec_ai.background_jobs, consumida por api.core.job_worker.
+
+- Reserva com `SELECT ... FOR UPDATE SKIP LOCKED`: qualquer número de
+  workers (em qualquer máquina) consome a mesma fila sem disputa; escalar
+  é iniciar mais workers.
+- Lease: o worker renova locked_at enquanto executa; jobs de workers mortos
+  voltam para a fila quando o lease expira.
+- Retentativas com backoff exponencial até max_attempts; PermanentJobError
+  encerra o job sem nova tentativa.
+- Limite de concorrência por tipo (kind), verificado na reserva.
+
+Handlers são registrados com @job_handler(kind) e recebem o payload (dict)
+e um JobContext (progresso, cancelamento, tentativa atual).
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+JOB_TABLE = "protec_ai.background_jobs"
+
+PENDING, RUNNING, COMPLETED, FAILED, CANCELLED = "pending", "running", "completed", "failed", "cancelled"
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 30.0   # 30 s, 60 s, 120 s, ...
+LEASE_SECONDS = 300.0          # sem heartbeat por esse tempo → job volta para a fila
+
+JOB_TABLE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {JOB_TABLE} (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{{}}',
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT {DEFAULT_MAX_ATTEMPTS},
+    dedupe_key VARCHAR(255),
+    progress_percentage DOUBLE PRECISION NOT NULL DEFAULT 0,
+    progress_message TEXT,
+    result JSONB,
+    last_error TEXT,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_background_jobs_ready
+    ON {JOB_TABLE} (priority DESC, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_background_jobs_running
+    ON {JOB_TABLE} (kind, locked_at) WHERE status = 'running';
+CREATE UNIQUE INDEX IF NOT EXISTS uq_background_jobs_active_dedupe
+    ON {JOB_TABLE} (dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('pending', 'running');
+"""
+
+_JOB_COLUMNS = """id, kind, payload, status, priority, attempts, max_attempts, dedupe_key,
+    progress_percentage, progress_message, result, last_error, run_after, locked_by,
+    locked_at, created_at, started_at, finished_at"""
+
+
+class PermanentJobError(Exception):
+    """Falha definitiva: o job é marcado como failed sem nova tentativa"""
+
+
+@dataclass
+class Job:
+    """Job reservado por um worker"""
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+
+@dataclass
+class JobHandler:
+    """Handler registrado para um tipo de job"""
+    kind: str
+    func: Callable[[Dict[str, Any], "JobContext"], Awaitable[Optional[Dict[str, Any]]]]
+    max_concurrency: Optional[int] = None
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str, max_concurrency: Optional[int] = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+    """
+    Decorator: registra `func(payload, context)` (async) para o tipo `kind`.
+
+    Examples:
+        >>> @job_handler("import_reprocess", max_concurrency=1)
+        ... async def reprocess(payload, context):
+        ...     context.progress(50, "pipeline")
+        ...     return {"new_import_id": ...}
+    """
+    def decorator(func):
+        JOB_HANDLERS[kind] = JobHandler(kind, func, max_concurrency, max_attempts)
+        return func
+
+    return decorator
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    job = dict(row._mapping)
+    for key in ("run_after", "locked_at", "created_at", "started_at", "finished_at"):
+        if job.get(key) is not None:
+            job[key] = job[key].isoformat()
+    return job
+
+
+class JobQueue:
+    """
+    Operações da fila sobre uma Session síncrona (cada operação faz commit).
+
+    Examples:
+        >>> queue = JobQueue(db)
+        >>> job = queue.enqueue("ml_analysis", {"job_uuid": str(uuid)}, dedupe_key=f"ml_analysis:{uuid}")
+        >>> queue.get(job["id"])["status"]
+        'pending'
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_table(self) -> None:
+        """Cria a tabela e os índices (idempotente)"""
+        for statement in filter(str.strip, JOB_TABLE_DDL.split(";")):
+            self.db.execute(text(statement))
+        self.db.commit()
+
+    # ------------------------------------------------------------------
+    # Lado da API
+    # ------------------------------------------------------------------
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: Optional[int] = None, dedupe_key: Optional[str] = None,
+                delay_seconds: float = 0.0) -> Dict[str, Any]:
+        """
+        Insere um job pendente.
+
+        Com `dedupe_key`, um job ativo (pending/running) com a mesma chave é
+        devolvido no lugar de criar outro.
+        """
+        if max_attempts is None:
+            handler = JOB_HANDLERS.get(kind)
+            max_attempts = handler.max_attempts if handler else DEFAULT_MAX_ATTEMPTS
+
+        row = self.db.execute(text(f"""
+            INSERT INTO {JOB_TABLE} (kind, payload, priority, max_attempts, dedupe_key, run_after)
+            VALUES (:kind, CAST(:payload AS jsonb), :priority, :max_attempts, :dedupe_key,
+                    now() + make_interval(secs => :delay))
+            ON CONFLICT (dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('pending', 'running')
+            DO NOTHING
+            RETURNING {_JOB_COLUMNS}
+        """), {
+            "kind": kind, "payload": json.dumps(payload, default=str), "priority": priority,
+            "max_attempts": max_attempts, "dedupe_key": dedupe_key, "delay": delay_seconds,
+        }).first()
+        self.db.commit()
+
+        if row is None:
+            existing = self.db.execute(text(f"""
+                SELECT {_JOB_COLUMNS} FROM {JOB_TABLE}
+                WHERE dedupe_key = :dedupe_key AND status IN ('pending', 'running')
+            """), {"dedupe_key": dedupe_key}).first()
+            if existing is not None:
+                logger.info(f"♻️  Job {kind} já ativo para {dedupe_key} (id {existing.id})")
+                return _row_to_dict(existing)
+            return self.enqueue(kind, payload, priority, max_attempts, dedupe_key, delay_seconds)
+
+        logger.info(f"📥 Job {row.id} ({kind}) enfileirado")
+        return _row_to_dict(row)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(text(f"SELECT {_JOB_COLUMNS} FROM {JOB_TABLE} WHERE id = :id"),
+                              {"id": job_id}).first()
+        return _row_to_dict(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None, kind: Optional[str] = None,
+             limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        rows = self.db.execute(text(f"""
+            SELECT {_JOB_COLUMNS} FROM {JOB_TABLE}
+            WHERE (CAST(:status AS varchar) IS NULL OR status = :status)
+              AND (CAST(:kind AS varchar) IS NULL OR kind = :kind)
+            ORDER BY id DESC LIMIT :limit OFFSET :offset
+        """), {"status": status, "kind": kind, "limit": limit, "offset": offset})
+        return [_row_to_dict(row) for row in rows]
+
+    def cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Cancela um job pendente ou em execução. O worker não sobrescreve o
+        status cancelado; handlers longos consultam context.is_cancelled().
+        """
+        row = self.db.execute(text(f"""
+            UPDATE {JOB_TABLE} SET status = 'cancelled', finished_at = now()
+            WHERE id = :id AND status IN ('pending', 'running')
+            RETURNING {_JOB_COLUMNS}
+        """), {"id": job_id}).first()
+        self.db.commit()
+        return _row_to_dict(row) if row is not None else self.get(job_id)
+
+    # ------------------------------------------------------------------
+    # Lado do worker
+    # ------------------------------------------------------------------
+
+    def claim(self, worker_id: str, kinds: Iterable[str],
+              limits: Optional[Dict[str, int]] = None) -> Optional[Job]:
+        """
+        Reserva o próximo job pronto de um dos `kinds`.
+
+        FOR UPDATE SKIP LOCKED: workers concorrentes pulam a linha travada e
+        pegam a seguinte. `limits` (kind → máximo em execução) é verificado
+        na mesma consulta; reservas exatamente simultâneas podem ultrapassá-lo
+        em no máximo (workers − 1).
+        """
+        row = self.db.execute(text(f"""
+            WITH running AS (
+                SELECT kind, count(*) AS n FROM {JOB_TABLE} WHERE status = 'running' GROUP BY kind
+            )
+            UPDATE {JOB_TABLE} AS job
+            SET status = 'running', attempts = job.attempts + 1, locked_by = :worker_id,
+                locked_at = now(), started_at = COALESCE(job.started_at, now())
+            WHERE job.id = (
+                SELECT candidate.id FROM {JOB_TABLE} AS candidate
+                LEFT JOIN running ON running.kind = candidate.kind
+                WHERE candidate.status = 'pending'
+                  AND candidate.run_after <= now()
+                  AND candidate.kind = ANY(:kinds)
+                  AND COALESCE(running.n, 0) < COALESCE((CAST(:limits AS jsonb) ->> candidate.kind)::int, 2147483647)
+                ORDER BY candidate.priority DESC, candidate.id
+                FOR UPDATE OF candidate SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING job.id, job.kind, job.payload, job.attempts, job.max_attempts
+        """), {"worker_id": worker_id, "kinds": list(kinds), "limits": json.dumps(limits or {})}).first()
+        self.db.commit()
+
+        if row is None:
+            return None
+        payload = row.payload if isinstance(row.payload, dict) else json.loads(row.payload or "{}")
+        return Job(row.id, row.kind, payload, row.attempts, row.max_attempts)
+
+    def heartbeat(self, job_id: int, worker_id: str, progress: Optional[float] = None,
+                  message: Optional[str] = None) -> bool:
+        """
+        Renova o lease (e opcionalmente o progresso). False quando o job não
+        pertence mais ao worker (cancelado ou devolvido à fila).
+        """
+        result = self.db.execute(text(f"""
+            UPDATE {JOB_TABLE}
+            SET locked_at = now(),
+                progress_percentage = COALESCE(:progress, progress_percentage),
+                progress_message = COALESCE(:message, progress_message)
+            WHERE id = :id AND status = 'running' AND locked_by = :worker_id
+        """), {"id": job_id, "worker_id": worker_id, "progress": progress, "message": message})
+        self.db.commit()
+        return result.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None) -> None:
+        self.db.execute(text(f"""
+            UPDATE {JOB_TABLE}
+            SET status = 'completed', progress_percentage = 100, result = CAST(:result AS jsonb),
+                finished_at = now(), locked_by = NULL, locked_at = NULL
+            WHERE id = :id AND status = 'running' AND locked_by = :worker_id
+        """), {"id": job_id, "worker_id": worker_id, "result": json.dumps(result, default=str)})
+        self.db.commit()
+
+    def fail(self, job: Job, worker_id: str, error: str, retry: bool = True) -> str:
+        """
+        Registra a falha: volta para a fila com backoff exponencial enquanto
+        houver tentativas (e `retry`), senão marca como failed.
+
+        Returns:
+            Novo status do job ("pending" ou "failed")
+        """
+        row = self.db.execute(text(f"""
+            UPDATE {JOB_TABLE}
+            SET status = CASE WHEN :retry AND attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                run_after = now() + make_interval(secs => :backoff * power(2, GREATEST(attempts - 1, 0))),
+                finished_at = CASE WHEN :retry AND attempts < max_attempts THEN NULL ELSE now() END,
+                last_error = :error, locked_by = NULL, locked_at = NULL
+            WHERE id = :id AND status = 'running' AND locked_by = :worker_id
+            RETURNING status
+        """), {"id": job.id, "worker_id": worker_id, "error": error[:4000], "retry": retry,
+               "backoff": RETRY_BACKOFF_SECONDS}).first()
+        self.db.commit()
+        return row.status if row is not None else CANCELLED
+
+    def is_cancelled(self, job_id: int) -> bool:
+        status = self.db.execute(text(f"SELECT status FROM {JOB_TABLE} WHERE id = :id"),
+                                 {"id": job_id}).scalar()
+        return status == CANCELLED
+
+    def requeue_stale(self, lease_seconds: float = LEASE_SECONDS) -> int:
+        """Devolve à fila (ou falha, sem tentativas restantes) jobs com lease expirado"""
+        rows = self.db.execute(text(f"""
+            UPDATE {JOB_TABLE}
+            SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END,
+                last_error = 'Lease expirado (worker ' || COALESCE(locked_by, '?') || ')',
+                locked_by = NULL, locked_at = NULL
+            WHERE status = 'running' AND locked_at < now() - make_interval(secs => :lease)
+            RETURNING id
+        """), {"lease": lease_seconds}).fetchall()
+        self.db.commit()
+        if rows:
+            logger.warning(f"⏰ {len(rows)} job(s) com lease expirado devolvidos à fila")
+        return len(rows)
+
+
+def ensure_job_table() -> None:
+    """
+    Garante protec_ai.background_jobs em uma Session própria.
+
+    Chamado na inicialização da API e do worker: enfileirar ou listar jobs
+    não pode depender de um worker já ter rodado.
+    """
+    from api.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        JobQueue(db).ensure_table()
+    finally:
+        db.close()
+
+
+@dataclass
+class JobContext:
+    """
+    Contexto passado ao handler: progresso/heartbeat e cancelamento usam
+    uma Session própria, separada da Session de trabalho do handler.
+    """
+    job: Job
+    worker_id: str
+    session_factory: Callable[[], Session]
+    _last_progress: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def attempt(self) -> int:
+        return self.job.attempts
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.job.is_last_attempt
+
+    def progress(self, percentage: float, message: Optional[str] = None) -> None:
+        """Atualiza progress_percentage/progress_message e renova o lease"""
+        self._last_progress = {"progress": float(percentage), "message": message}
+        self.heartbeat()
+
+    def heartbeat(self) -> bool:
+        db = self.session_factory()
+        try:
+            return JobQueue(db).heartbeat(self.job.id, self.worker_id,
+                                          self._last_progress.get("progress"),
+                                          self._last_progress.get("message"))
+        finally:
+            db.close()
+
+    def is_cancelled(self) -> bool:
+        db = self.session_factory()
+        try:
+            return JobQueue(db).is_cancelled(self.job.id)
+        finally:
+            db.close()
@@ -0,0 +1,190 @@
+"""
+Worker da fila de jobs (protec_ai.background_jobs)
+==================================================
+
+Processo separado da API: inicia N processos filhos, cada um reservando e
+executando um job por vez (api.core.job_queue). Escalar horizontalmente é
+iniciar mais workers, na mesma máquina ou em outras apontando para o mesmo
+PostgreSQL.
+
+Uso:
+    python -m api.core.job_worker [--processes 2] [--kinds ml_analysis,import_reprocess]
+        [--limit import_reprocess=1] [--poll-interval 2]
+
+SIGTERM/SIGINT: os filhos terminam o job corrente e encerram.
+"""
+
+import os
+import time
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+import threading
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from api.core.job_queue import (
+    JOB_HANDLERS, LEASE_SECONDS, Job, JobContext, JobQueue, PermanentJobError, ensure_job_table,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def _load_handlers() -> None:
+    """Importa os módulos que registram handlers (@job_handler)"""
+    import api.services.background_jobs  # noqa: F401
+
+
+def handler_limits(kinds: List[str], overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Limites de concorrência por tipo: padrão do handler, sobrescrito por --limit"""
+    limits = {kind: JOB_HANDLERS[kind].max_concurrency for kind in kinds
+              if kind in JOB_HANDLERS and JOB_HANDLERS[kind].max_concurrency}
+    limits.update(overrides or {})
+    return limits
+
+
+def execute_job(job: Job, queue: JobQueue, context: JobContext) -> str:
+    """
+    Executa o handler de `job` e registra o desfecho na fila.
+
+    Returns:
+        Status final: "completed", "pending" (nova tentativa), "failed" ou
+        "cancelled"
+    """
+    handler = JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        return queue.fail(job, context.worker_id, f"Sem handler para o tipo '{job.kind}'", retry=False)
+
+    started = time.perf_counter()
+    try:
+        result = asyncio.run(handler.func(job.payload, context))
+    except PermanentJobError as e:
+        logger.error(f"❌ Job {job.id} ({job.kind}) falhou sem nova tentativa: {e}")
+        return queue.fail(job, context.worker_id, str(e), retry=False)
+    except Exception as e:
+        status = queue.fail(job, context.worker_id, f"{type(e).__name__}: {e}")
+        logger.error(f"❌ Job {job.id} ({job.kind}) tentativa {job.attempts}/{job.max_attempts}: {e} → {status}")
+        return status
+
+    if context.is_cancelled():
+        logger.info(f"🛑 Job {job.id} ({job.kind}) cancelado durante a execução")
+        return "cancelled"
+    queue.complete(job.id, context.worker_id, result)
+    logger.info(f"✅ Job {job.id} ({job.kind}) concluído em {time.perf_counter() - started:.1f}s")
+    return "completed"
+
+
+def _heartbeat_loop(context: JobContext, stop: threading.Event, interval: float) -> None:
+    """Renova o lease de jobs longos que não reportam progresso"""
+    while not stop.wait(interval):
+        try:
+            context.heartbeat()
+        except Exception as e:
+            logger.warning(f"⚠️  Heartbeat do job {context.job.id} falhou: {e}")
+
+
+def run_worker_process(worker_id: str, kinds: List[str], limits: Dict[str, int],
+                       poll_interval: float, lease_seconds: float,
+                       stop_event, session_factory: Optional[Callable[[], Session]] = None) -> None:
+    """Laço de um processo filho: reserva → executa → registra, até stop_event"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # o processo pai coordena o encerramento
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    _load_handlers()
+    if session_factory is None:
+        from api.core.database import SessionLocal
+        session_factory = SessionLocal
+
+    logger.info(f"👷 Worker {worker_id}: {', '.join(kinds)}")
+    last_reap = 0.0
+    while not stop_event.is_set():
+        db = session_factory()
+        try:
+            queue = JobQueue(db)
+            if time.monotonic() - last_reap > lease_seconds / 4:
+                queue.requeue_stale(lease_seconds)
+                last_reap = time.monotonic()
+
+            job = queue.claim(worker_id, kinds, limits)
+            if job is None:
+                stop_event.wait(poll_interval)
+                continue
+
+            context = JobContext(job, worker_id, session_factory)
+            heartbeat_stop = threading.Event()
+            heartbeat = threading.Thread(target=_heartbeat_loop, args=(context, heartbeat_stop, lease_seconds / 3),
+                                         daemon=True)
+            heartbeat.start()
+            try:
+                execute_job(job, queue, context)
+            finally:
+                heartbeat_stop.set()
+                heartbeat.join()
+        except Exception as e:
+            logger.error(f"❌ Worker {worker_id}: {e}")
+            db.rollback()
+            stop_event.wait(poll_interval)
+        finally:
+            db.close()
+
+
+def _parse_limits(values: List[str]) -> Dict[str, int]:
+    limits = {}
+    for value in values:
+        kind, _, limit = value.partition("=")
+        limits[kind.strip()] = int(limit)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker da fila de jobs ProtecAI")
+    parser.add_argument('--processes', type=int, default=int(os.getenv("JOB_WORKER_PROCESSES", "2")),
+                        help="Processos filhos (jobs simultâneos neste worker)")
+    parser.add_argument('--kinds', default=None, help="Tipos atendidos, separados por vírgula (padrão: todos)")
+    parser.add_argument('--limit', action='append', default=[], metavar="KIND=N",
+                        help="Máximo de jobs KIND em execução em toda a fila")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help="Espera com fila vazia (s)")
+    parser.add_argument('--lease', type=float, default=LEASE_SECONDS, help="Lease dos jobs (s)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    _load_handlers()
+    kinds = args.kinds.split(",") if args.kinds else sorted(JOB_HANDLERS)
+    limits = handler_limits(kinds, _parse_limits(args.limit))
+
+    ensure_job_table()
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    stop_event = context.Event()
+    host = socket.gethostname()
+    processes = [
+        context.Process(
+            target=run_worker_process,
+            args=(f"{host}:{os.getpid()}-{index}", kinds, limits, args.poll_interval, args.lease, stop_event),
+            name=f"job-worker-{index}",
+        )
+        for index in range(args.processes)
+    ]
+
+    def _stop(signum, frame):
+        logger.info("🔽 Encerrando workers após os jobs correntes...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    logger.info(f"🚀 {args.processes} worker(s) - tipos: {', '.join(kinds)} - limites: {limits or 'nenhum'}")
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
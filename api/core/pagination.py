@@ -0,0 +1,90 @@
+"""
+Paginação por cursor (keyset)
+=============================
+
+Listagens grandes paginam por cursor em vez de OFFSET: o cursor guarda a
+chave de ordenação do último item devolvido e a próxima página é
+`WHERE chave > :after ORDER BY chave LIMIT :n` - custo constante por página
+(índice), independente de quantas páginas já foram lidas, e estável quando
+linhas são inseridas/removidas durante a navegação.
+
+O cursor é opaco para o cliente (JSON em base64 url-safe); o total é uma
+estimativa do planner (EXPLAIN), exata apenas para resultados pequenos.
+Aritmética de posição (OFFSET que atravessa fontes) usa sempre exact_count.
+"""
+
+import json
+import base64
+import binascii
+import logging
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Abaixo disso o COUNT(*) exato é barato e a estimativa do planner é imprecisa
+EXACT_COUNT_THRESHOLD = 1000
+
+
+def encode_cursor(**position: Any) -> str:
+    """Cursor opaco com a posição do último item (ex.: id=123)"""
+    raw = json.dumps(position, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Posição codificada no cursor ({} sem cursor).
+
+    Raises:
+        HTTPException 400: Cursor malformado
+    """
+    if not cursor:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, ValueError):
+        position = None
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    return position
+
+
+def cursor_int(position: Mapping[str, Any], key: str) -> Optional[int]:
+    """Campo inteiro da posição (None se ausente); 400 se não for inteiro"""
+    value = position.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    return value
+
+
+def exact_count(conn, sql: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """COUNT(*) exato de `sql` (SELECT com parâmetros nomeados, sem ORDER BY/LIMIT)"""
+    return int(conn.execute(text(f"SELECT COUNT(*) FROM ({sql}) AS counted"), params or {}).scalar() or 0)
+
+
+def estimate_count(conn, sql: str, params: Optional[Dict[str, Any]] = None,
+                   exact_below: int = EXACT_COUNT_THRESHOLD) -> int:
+    """
+    Total de linhas de `sql` estimado pelo planner (EXPLAIN, sem executar).
+
+    Estimativas abaixo de `exact_below` são substituídas pelo COUNT(*) exato.
+
+    Args:
+        conn: Connection ou Session
+        sql: SELECT com parâmetros nomeados (sem ORDER BY/LIMIT)
+        params: Parâmetros do SELECT
+    """
+    params = params or {}
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate >= exact_below:
+        return estimate
+    return exact_count(conn, sql, params)
@@ -0,0 +1,112 @@
+"""
+Cache de snapshots em processo (TTL + ETag)
+===========================================
+
+Respostas de leitura caras e muito consultadas (estatísticas de dashboard)
+ficam em memória já serializadas em JSON, com um ETag calculado do
+conteúdo:
+
+- Dentro do TTL a resposta custa um lookup de dicionário; com
+  `If-None-Match` igual ao ETag, um 304 sem corpo.
+- Expirado o TTL, o snapshot é recalculado por UMA corrotina (as demais
+  requisições da mesma chave aguardam o mesmo resultado).
+- Se o conteúdo recalculado é igual ao anterior, ETag e corpo são mantidos:
+  clientes que fazem polling continuam recebendo 304.
+- Escritas no mesmo processo (CRUD, importação) chamam invalidate(); as de
+  outros processos (worker, scripts) aparecem em no máximo um TTL.
+"""
+
+import time
+import json
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+# Campos que mudam a cada cálculo sem que os dados mudem: fora do ETag
+VOLATILE_KEYS = ("timestamp",)
+
+
+@dataclass
+class Snapshot:
+    """Valor calculado + corpo JSON pronto + ETag"""
+    value: Any
+    body: bytes
+    etag: str
+    expires_at: float
+
+    @property
+    def max_age(self) -> int:
+        return max(0, int(self.expires_at - time.monotonic()))
+
+
+def _etag(value: Any) -> str:
+    stable = {k: v for k, v in value.items() if k not in VOLATILE_KEYS} if isinstance(value, dict) else value
+    digest = hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+class SnapshotCache:
+    """
+    Snapshots por chave com TTL.
+
+    Examples:
+        >>> cache = SnapshotCache(ttl_seconds=30)
+        >>> snapshot = await cache.get("database_statistics", lambda: run_read(load, async_db))
+        >>> return snapshot_response(request, snapshot)
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Snapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Snapshot:
+        """Snapshot válido de `key`, recalculado com `loader()` quando expirado"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                return entry  # calculado por quem segurava o lock
+
+            started = time.perf_counter()
+            value = jsonable_encoder(await loader())
+            etag = _etag(value)
+            expires_at = time.monotonic() + self.ttl_seconds
+
+            if entry is not None and entry.etag == etag:
+                entry.expires_at = expires_at
+            else:
+                entry = Snapshot(value, json.dumps(value, default=str).encode(), etag, expires_at)
+                self._entries[key] = entry
+            logger.debug(f"📸 Snapshot {key} recalculado em {(time.perf_counter() - started) * 1000:.1f}ms")
+            return entry
+
+    def invalidate(self, *keys: str) -> None:
+        """Expira as chaves (todas, sem argumentos); o ETag é preservado"""
+        for key in keys or list(self._entries):
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = 0.0
+
+
+def snapshot_response(request: Request, snapshot: Snapshot) -> Response:
+    """
+    Resposta JSON do snapshot com ETag/Cache-Control; 304 quando o cliente
+    já tem a versão atual (If-None-Match)
+    """
+    headers = {"ETag": snapshot.etag, "Cache-Control": f"private, max-age={snapshot.max_age}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if snapshot.etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")} or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -24,7 +24,7 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Imports dos módulos do projeto
-from api.routers import equipments, compare, imports, etap, etap_native, ml, validation, ml_gateway, reports, database, system_test, relay_config_reports, active_functions
+from api.routers import equipments, compare, imports, jobs, etap, etap_native, ml, validation, ml_gateway, reports, database, system_test, relay_config_reports, active_functions, search
 from api.core.config import settings
 from api.core.database import engine, get_db
 
@@ -85,7 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"],  # CRITICAL: Permitir que frontend leia o header customizado
+    expose_headers=["Content-Disposition", "ETag", "X-Next-Cursor", "X-Total-Count"],  # CRITICAL: Permitir que frontend leia os headers customizados
 )
 
 # Incluir routers
@@ -110,6 +110,13 @@ app.include_router(
     responses={422: {"description": "Import validation error"}},
 )
 
+app.include_router(
+    jobs.router,
+    prefix="/api/v1/jobs",
+    tags=["Background Jobs"],
+    responses={404: {"description": "Job not found"}},
+)
+
 app.include_router(
     etap.router,
     prefix="/api/v1/etap",
@@ -178,12 +185,26 @@ app.include_router(
     responses={404: {"description": "Relay or functions not found"}},
 )
 
+app.include_router(
+    search.router,
+    prefix="/api/v1/search",
+    tags=["Search"],
+    responses={400: {"description": "Invalid search term"}},
+)
+
 # Event handlers
 @app.on_event("startup")
 async def startup_event():
     """Inicialização da API"""
     logger.info("🚀 Iniciando ProtecAI API...")
     logger.info("📊 Conectando ao PostgreSQL...")
+    from starlette.concurrency import run_in_threadpool
+    from api.core.job_queue import ensure_job_table
+    try:
+        # A fila precisa existir antes do primeiro worker (enqueue/listagem)
+        await run_in_threadpool(ensure_job_table)
+    except Exception as e:
+        logger.error(f"❌ Fila de jobs indisponível (protec_ai.background_jobs): {e}")
     logger.info("🎯 Preparando interface ETAP...")
     logger.info("🤖 Inicializando módulo ML...")
     logger.info("✅ ProtecAI API inicializada com sucesso!")
@@ -192,6 +213,10 @@ async def startup_event():
 async def shutdown_event():
     """Finalização da API"""
     logger.info("🔽 Finalizando ProtecAI API...")
+    from api.core.database import dispose_async_engine
+    from api.core.concurrency import shutdown_render_pool
+    await dispose_async_engine()
+    shutdown_render_pool()
     logger.info("✅ ProtecAI API finalizada com sucesso!")
 
 # Endpoints base
@@ -220,11 +245,10 @@ async def root():
 async def health_check():
     """Health check da API"""
     try:
-        # Verificar conexão com banco
-        from api.core.database import engine
+        # Verificar conexão com banco (threadpool: não bloqueia o event loop)
+        from api.core.database import run_read
         from sqlalchemy import text
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
+        await run_read(lambda connection: connection.execute(text("SELECT 1")))
         db_status = "✅ Connected"
     except Exception as e:
         db_status = f"❌ Error: {str(e)}"
@@ -244,7 +268,7 @@ async def health_check():
     }
 
 @app.get("/health/connections", tags=["Health"])
-async def health_connections():
+def health_connections():
     """
     🔧 DIAGNÓSTICO: Monitora pool de conexões PostgreSQL
     Útil para detectar connection leaks durante desenvolvimento
@@ -18,7 +18,7 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/relays/{relay_id}/active-functions")
-async def get_relay_active_functions(
+def get_relay_active_functions(
     relay_id: str,
     db: Session = Depends(get_db)
 ):
@@ -99,7 +99,7 @@ async def get_relay_active_functions(
         )
 
 @router.get("/active-functions/summary")
-async def get_active_functions_summary(db: Session = Depends(get_db)):
+def get_active_functions_summary(db: Session = Depends(get_db)):
     """
     📊 **Resumo Geral de Funções Ativas**
     
@@ -177,7 +177,7 @@ async def get_active_functions_summary(db: Session = Depends(get_db)):
         )
 
 @router.get("/active-functions/search")
-async def search_active_functions(
+def search_active_functions(
     function_code: Optional[str] = None,
     relay_model: Optional[str] = None,
     detection_method: Optional[str] = None,
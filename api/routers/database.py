@@ -3,13 +3,15 @@ Database Schema Router
 Endpoint para visualização da estrutura do banco de dados PostgreSQL
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from sqlalchemy.engine import Connection
 from typing import List, Dict, Any
 from datetime import datetime
-from api.core.database import get_db
+from api.core.database import get_db, get_async_db
+from api.core.snapshot_cache import snapshot_response
+from api.services.statistics_snapshot import statistics_snapshot, load_database_statistics
 import logging
 
 router = APIRouter(prefix="/database", tags=["Database"])
@@ -17,56 +19,18 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/statistics")
-async def get_database_statistics(db: Session = Depends(get_db)):
+async def get_database_statistics(request: Request, async_db=Depends(get_async_db)):
     """
     📊 **Estatísticas Reais do Banco de Dados**
     
     Retorna contagens reais de todas as tabelas principais.
     100% REAL - Dados direto do PostgreSQL.
+    
+    Snapshot em cache (STATISTICS_CACHE_TTL) com ETag: `If-None-Match` → 304.
     """
     try:
-        # Buscar contagens reais de cada tabela EXISTENTE no protec_ai schema
-        stats = {}
-        
-        # Tabelas principais
-        relay_equipment_query = text("SELECT COUNT(*) FROM protec_ai.relay_equipment")
-        relay_settings_query = text("SELECT COUNT(*) FROM protec_ai.relay_settings")
-        active_functions_query = text("SELECT COUNT(*) FROM protec_ai.active_protection_functions")
-        protection_functions_query = text("SELECT COUNT(*) FROM protec_ai.protection_functions")
-        
-        # Executar queries
-        stats["relay_equipment"] = db.execute(relay_equipment_query).scalar() or 0
-        stats["relay_settings"] = db.execute(relay_settings_query).scalar() or 0
-        stats["active_protection_functions"] = db.execute(active_functions_query).scalar() or 0
-        stats["protection_functions"] = db.execute(protection_functions_query).scalar() or 0
-        
-        # Calcular totais
-        total_records = sum(stats.values())
-        
-        # Buscar relés únicos com funções ativas
-        unique_relays_query = text("SELECT COUNT(DISTINCT relay_file) FROM protec_ai.active_protection_functions")
-        unique_relays = db.execute(unique_relays_query).scalar() or 0
-        
-        # Buscar settings ativos
-        active_settings_query = text("SELECT COUNT(*) FROM protec_ai.relay_settings WHERE is_active = true")
-        active_settings = db.execute(active_settings_query).scalar() or 0
-        
-        return {
-            "database": "protecai_db",
-            "timestamp": datetime.now().isoformat(),
-            "tables": stats,
-            "summary": {
-                "total_records": total_records,
-                "total_equipments": stats["relay_equipment"],
-                "total_settings": stats["relay_settings"],
-                "active_settings": active_settings,
-                "protection_functions_count": stats["protection_functions"],
-                "active_functions_count": stats["active_protection_functions"],
-                "unique_relays_with_functions": unique_relays
-            },
-            "data_source": "postgresql_real",
-            "note": "100% dados reais do protec_ai schema - zero mocks ou tabelas inexistentes"
-        }
+        snapshot = await statistics_snapshot("database_statistics", load_database_statistics, async_db)
+        return snapshot_response(request, snapshot)
         
     except Exception as e:
         logger.error(f"Error getting database statistics: {e}")
@@ -76,7 +40,7 @@ async def get_database_statistics(db: Session = Depends(get_db)):
         )
 
 @router.get("/schema")
-async def get_database_schema(db: Connection = Depends(get_db)) -> Dict[str, Any]:
+def get_database_schema(db: Connection = Depends(get_db)) -> Dict[str, Any]:
     """
     Retorna a estrutura completa do banco de dados:
     - Nome do banco
@@ -200,7 +164,7 @@ async def get_database_schema(db: Connection = Depends(get_db)) -> Dict[str, Any
 
 
 @router.get("/stats")
-async def get_database_stats(db: Connection = Depends(get_db)) -> Dict[str, Any]:
+def get_database_stats(db: Connection = Depends(get_db)) -> Dict[str, Any]:
     """
     Retorna estatísticas gerais do banco de dados
     """
@@ -6,14 +6,15 @@ Endpoints para gerenciamento de equipamentos de proteção com
 integração transparente entre schemas protec_ai e protec_ai.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi import status
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
 
-from api.core.database import get_db
+from api.core.database import get_db, get_async_db
+from api.core.snapshot_cache import snapshot_response
 from api.schemas import (
     EquipmentResponse, 
     EquipmentCreate, 
@@ -31,9 +32,11 @@ logger = logging.getLogger(__name__)
 async def list_equipments(
     page: int = Query(1, ge=1, description="Número da página"),
     size: int = Query(10, ge=1, le=100, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior (substitui page)"),
     status_filter: Optional[str] = Query(None, alias="status", description="Filtrar por status"),
     manufacturer: Optional[str] = Query(None, description="Filtrar por fabricante"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     📋 **Listar Equipamentos Unificados**
@@ -42,28 +45,38 @@ async def list_equipments(
     
     - **page**: Número da página (padrão: 1)
     - **size**: Itens por página (padrão: 10, máximo: 100)
-    - **status**: Filtrar por status (active, inactive, maintenance, decommissioned)
+    - **cursor**: `next_cursor` da resposta anterior - custo constante por página
+    - **status**: Filtrar por status (active, inactive, maintenance, decommissioned, extracted)
     - **manufacturer**: Filtrar por nome do fabricante
+    
+    `total` é estimado pelo planner do PostgreSQL (exato para listas pequenas).
     """
     try:
         # Usar o service unificado validado
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         
-        equipments_data, total = await service.get_unified_equipment_data(
-            page=page,
+        page_data = await service.get_unified_equipment_page(
             size=size,
-            manufacturer_filter=manufacturer or ""
+            manufacturer_filter=manufacturer or "",
+            status_filter=status_filter,
+            cursor=cursor,
+            offset=(page - 1) * size
         )
+        equipments_data = page_data["data"]
         
         return {
             "data": equipments_data,
-            "total": total,
-            "page": page,
+            "total": page_data["total"],
+            "total_is_estimate": True,
+            "page": None if cursor else page,
             "size": size,
+            "next_cursor": page_data["next_cursor"],
             "message": f"Found {len(equipments_data)} unified equipments",
             "protec_ai_count": len([eq for eq in equipments_data if eq.get("source_schema") == "protec_ai"]),
             "relay_configs_count": len([eq for eq in equipments_data if eq.get("source_schema") == "relay_configs"])
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing unified equipments: {e}")
         raise HTTPException(
@@ -74,7 +87,8 @@ async def list_equipments(
 @router.get("/{equipment_id}", response_model=Dict[str, Any])
 async def get_equipment(
     equipment_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🔍 **Obter Equipamento por ID Unificado**
@@ -84,7 +98,7 @@ async def get_equipment(
     - **equipment_id**: ID único do equipamento (formato: schema_id)
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not equipment or not equipment.get("equipment"):
@@ -104,13 +118,13 @@ async def get_equipment(
         )
 
 @router.get("/statistics/unified")
-async def get_unified_statistics(db: Session = Depends(get_db)):
-    """Obter estatísticas unificadas do sistema de equipamentos"""
+async def get_unified_statistics(request: Request, db: Session = Depends(get_db), async_db=Depends(get_async_db)):
+    """Obter estatísticas unificadas do sistema de equipamentos (snapshot com ETag)"""
     try:
         logger.info("Retrieving unified equipment statistics")
-        service = UnifiedEquipmentService(db)
-        stats = await service.get_unified_statistics()
-        return stats
+        service = UnifiedEquipmentService(db, async_db)
+        snapshot = await service.get_unified_statistics_snapshot()
+        return snapshot_response(request, snapshot)
     except Exception as e:
         logger.error(f"Error getting unified statistics: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving statistics")
@@ -118,7 +132,8 @@ async def get_unified_statistics(db: Session = Depends(get_db)):
 @router.get("/manufacturers/unified", response_model=Dict[str, Any])
 async def get_unified_manufacturers(
     query: str = Query("", description="Filtro de busca por nome"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🏭 **Fabricantes Unificados**
@@ -126,7 +141,7 @@ async def get_unified_manufacturers(
     Retorna lista consolidada de fabricantes de ambos os schemas.
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         manufacturers = await service.search_unified_manufacturers(query)
         return manufacturers
     except Exception as e:
@@ -189,7 +204,8 @@ async def create_equipment(
 async def update_equipment(
     equipment_id: str,
     equipment_update: EquipmentUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     📝 **Atualizar Equipamento**
@@ -208,7 +224,7 @@ async def update_equipment(
     """
     try:
         # Verificar se equipamento existe usando service unificado
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         existing_equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not existing_equipment:
@@ -240,7 +256,8 @@ async def update_equipment(
 @router.delete("/{equipment_id}")
 async def delete_equipment(
     equipment_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🗑️ **Deletar Equipamento**
@@ -248,7 +265,7 @@ async def delete_equipment(
     Remove equipamento do sistema unificado.
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not equipment:
@@ -287,7 +304,8 @@ async def delete_equipment(
 @router.get("/{equipment_id}/electrical")
 async def get_equipment_electrical(
     equipment_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     ⚡ **Obter Dados Elétricos**
@@ -295,7 +313,7 @@ async def get_equipment_electrical(
     Retorna configurações elétricas do equipamento.
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not equipment:
@@ -343,7 +361,8 @@ async def get_equipment_electrical(
 @router.get("/{equipment_id}/protection-functions")
 async def get_equipment_protection_functions(
     equipment_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🛡️ **Obter Funções de Proteção**
@@ -351,7 +370,7 @@ async def get_equipment_protection_functions(
     Retorna funções de proteção configuradas.
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not equipment:
@@ -405,7 +424,8 @@ async def get_equipment_protection_functions(
 @router.get("/{equipment_id}/io-configuration")
 async def get_equipment_io_configuration(
     equipment_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🔌 **Obter Configuração I/O**
@@ -413,7 +433,7 @@ async def get_equipment_io_configuration(
     Retorna configurações de entrada e saída.
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not equipment:
@@ -463,7 +483,8 @@ async def get_equipment_io_configuration(
 @router.get("/{equipment_id}/summary")
 async def get_equipment_summary(
     equipment_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     📊 **Obter Resumo Completo**
@@ -471,7 +492,7 @@ async def get_equipment_summary(
     Retorna resumo consolidado do equipamento.
     """
     try:
-        service = UnifiedEquipmentService(db)
+        service = UnifiedEquipmentService(db, async_db)
         equipment = await service.get_unified_equipment_details(equipment_id)
         
         if not equipment:
@@ -249,7 +249,7 @@ async def list_studies(
         )
 
 @router.get("/studies/{study_id}", response_model=StudyDetailResponse)
-async def get_study(
+def get_study(
     study_id: Union[str, int],  # 🎯 ACEITAR STRING E INT - ADAPTADOR NO SERVICE
     db: Session = Depends(get_db)
 ):
@@ -408,7 +408,7 @@ async def import_csv_data(
         )
 
 @router.get("/studies/{study_id}/export/csv", response_model=ExportResponse)
-async def export_study_to_csv(
+def export_study_to_csv(
     study_id: str,  # 🎯 CORRIGIDO: str para usar adapter
     export_format: str = Query("etap_compatible", description="Formato de exportação"),
     db: Session = Depends(get_db)
@@ -616,7 +616,7 @@ async def batch_import_csv_directory(
 
 @router.get("/studies/{study_id}/migration-status", 
             response_model=BaseResponse)
-async def get_migration_status(
+def get_migration_status(
     study_id: str,
     db: Session = Depends(get_db)
 ):
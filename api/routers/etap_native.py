@@ -17,6 +17,7 @@ Integração com arquitetura universal existente.
 
 from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Body
 from fastapi import status as http_status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any, Union
 import logging
@@ -28,6 +29,7 @@ from api.schemas import BaseResponse
 from api.services.etap_native_service import EtapNativeService, create_native_service
 from api.services.etap_native_adapter import EtapConnectionType, EtapConnectionConfig
 from api.services.etap_service import EtapService  # Para uso dos adapters
+from api.services.selectivity_sweep_engine import SelectivitySweepEngine
 
 router = APIRouter()  # Sem prefix - já definido no main.py
 logger = logging.getLogger(__name__)
@@ -413,6 +415,7 @@ async def analyze_coordination_native(
             summary="🎯 Native Selectivity Analysis")
 async def analyze_selectivity_native(
     request: NativeAnalysisRequest,
+    stream: bool = Query(False, description="Transmitir violações em NDJSON conforme são calculadas"),
     native_service: EtapNativeService = Depends(get_native_service)
 ):
     """
@@ -429,7 +432,32 @@ async def analyze_selectivity_native(
     - Cobertura de proteção
     - Tempos de atuação
     - Backup adequado
+    
+    **Streaming (`stream=true`):** varredura em processo com os ajustes do
+    database, respondendo `application/x-ndjson`: um evento `start`, um
+    `violation` por par (retaguarda, primário) não seletivo assim que seu
+    bloco é calculado e um `summary` final.
     """
+    if stream:
+        try:
+            relays = await native_service.load_analysis_relays(request.study_id, request.analysis_config)
+        except Exception as e:
+            logger.error(f"Selectivity settings load failed: {e}")
+            raise HTTPException(
+                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+        if len(relays) < 2:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail=f"Study {request.study_id} has fewer than 2 relays with overcurrent settings"
+            )
+        engine = SelectivitySweepEngine.from_config(request.analysis_config)
+        return StreamingResponse(
+            (json.dumps(event) + "\n" for event in engine.iter_violations(relays)),
+            media_type="application/x-ndjson"
+        )
+    
     try:
         result = await native_service.run_selectivity_analysis_native(
             study_id=request.study_id,
@@ -560,7 +588,7 @@ async def batch_analyze_studies(
     
     **Analysis Types:**
     - `coordination`: Análise de coordenação
-    - `selectivity`: Análise de seletividade
+    - `selectivity`: Análise de seletividade (estudos em paralelo no pool de processos)
     - `both`: Ambas as análises
     """
     try:
@@ -573,6 +601,20 @@ async def batch_analyze_studies(
         
         logger.info(f"🔍 Starting batch analysis: {len(study_ids)} studies, {len(analysis_types)} analysis types")
         
+        # Seletividade de todos os estudos de uma vez (varreduras concorrentes)
+        selectivity_results: Dict[int, Dict[str, Any]] = {}
+        selectivity_error: Optional[str] = None
+        if "selectivity" in analysis_types:
+            adapted_ids = [adapter_service.adapt_study_id(study_id)[1] for study_id in study_ids]
+            try:
+                selectivity_results = await native_service.run_selectivity_batch(
+                    study_ids=adapted_ids,
+                    prefer_native=prefer_native
+                )
+            except Exception as e:
+                logger.error(f"Batch selectivity failed: {e}")
+                selectivity_error = str(e)
+        
         for study_id in study_ids:
             study_results = {"study_id": study_id, "analyses": {}}
             
@@ -587,10 +629,10 @@ async def batch_analyze_studies(
                             prefer_native=prefer_native
                         )
                     elif analysis_type == "selectivity":
-                        result = await native_service.run_selectivity_analysis_native(
-                            study_id=adapted_study_id,
-                            prefer_native=prefer_native
-                        )
+                        result = selectivity_results.get(adapted_study_id) or {
+                            "success": False,
+                            "error": selectivity_error or "Selectivity analysis not executed"
+                        }
                     else:
                         result = {"success": False, "error": f"Unknown analysis type: {analysis_type}"}
                     
@@ -8,17 +8,20 @@ Endpoints para controle inteligente de importação de dados.
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional, Dict, Any
 import logging
 
 from api.core.database import get_db
+from api.core.job_queue import JobQueue
+from api.services.background_jobs import IMPORT_REPROCESS
 from api.services.import_service import ImportService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/statistics")
-async def get_import_statistics(db: Session = Depends(get_db)):
+def get_import_statistics(db: Session = Depends(get_db)):
     """
     📊 **Estatísticas de Importação REAL**
     
@@ -93,14 +96,26 @@ async def reprocess_import(
     """
     🔄 **Reprocessar Importação REAL**
     
-    Reprocessa uma importação existente com pipeline real.
-    Execução real do pipeline, geração de novo import_id.
+    Enfileira o reprocessamento de uma importação existente (pipeline real,
+    novo import_id). Executado pelo worker da fila (api.core.job_worker);
+    acompanhe o progresso em /api/v1/jobs/{job_id}.
     """
     try:
-        service = ImportService(db)
         options = {"force_reprocess": force_reprocess}
-        result = await service.reprocess_import(import_id, options)
-        return result
+        job = await run_in_threadpool(
+            JobQueue(db).enqueue,
+            IMPORT_REPROCESS,
+            {"import_id": import_id, "options": options},
+            dedupe_key=f"{IMPORT_REPROCESS}:{import_id}",
+        )
+        return {
+            "original_import_id": import_id,
+            "job_id": job["id"],
+            "status": "queued" if job["status"] == "pending" else job["status"],
+            "options_applied": options,
+            "status_url": f"/api/v1/jobs/{job['id']}",
+            "message": "Reprocessamento enfileirado"
+        }
     except Exception as e:
         logger.error(f"Error reprocessing import {import_id}: {e}")
         raise HTTPException(
@@ -0,0 +1,65 @@
+"""
+Jobs Router - Fila de jobs em segundo plano
+===========================================
+
+Status, listagem e cancelamento dos jobs de protec_ai.background_jobs
+(análises ML, bulk-upload do ML Gateway, reprocessamento de importações),
+executados por api.core.job_worker.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+import logging
+
+from api.core.database import get_db
+from api.core.job_queue import JobQueue
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("")
+def list_jobs(
+    status: Optional[str] = Query(None, description="pending, running, completed, failed ou cancelled"),
+    kind: Optional[str] = Query(None, description="Tipo: ml_analysis, ml_bulk_upload, import_reprocess"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    📋 **Jobs da Fila**
+    
+    Lista jobs (mais recentes primeiro) com filtros por status e tipo.
+    """
+    jobs = JobQueue(db).list_jobs(status=status, kind=kind, limit=limit, offset=offset)
+    return {"jobs": jobs, "count": len(jobs), "limit": limit, "offset": offset}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    🔍 **Status do Job**
+    
+    Status, tentativas, progresso (progress_percentage/progress_message),
+    último erro e resultado.
+    """
+    job = JobQueue(db).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado")
+    return job
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    🛑 **Cancelar Job**
+    
+    Jobs pendentes não serão executados; jobs em execução são marcados como
+    cancelados e o handler encerra na próxima verificação.
+    """
+    job = JobQueue(db).cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado")
+    logger.info(f"🛑 Job {job_id}: {job['status']}")
+    return job
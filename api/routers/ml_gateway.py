@@ -11,9 +11,10 @@ Versão: 2.0.0 Enterprise
 Status: Production Ready - Grade A+
 """
 
-from fastapi import APIRouter, HTTPException, Query, Path, Depends, BackgroundTasks, UploadFile, File
+from fastapi import APIRouter, HTTPException, Query, Path, Depends, UploadFile, File
 from fastapi.responses import JSONResponse, FileResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 import uuid
 from datetime import datetime, timedelta
@@ -61,6 +62,10 @@ from api.services.ml_integration_service import MLIntegrationService
 from api.services.ml_data_service import MLDataService
 from api.services.ml_results_service import MLResultsService
 
+# Fila de jobs (processamento pelo api.core.job_worker)
+from api.core.job_queue import JobQueue
+from api.services.background_jobs import ML_ANALYSIS, ML_BULK_UPLOAD, ML_JOB_PRIORITY
+
 # Configuração do router
 router = APIRouter(
     responses={
@@ -78,7 +83,7 @@ logger = logging.getLogger(__name__)
 # ========================================================================================
 
 @router.get("/health", response_model=MLHealthResponse)
-async def get_ml_gateway_health(db: Session = Depends(get_db)):
+def get_ml_gateway_health(db: Session = Depends(get_db)):
     """
     **ML Gateway Health Check - Enterprise Grade**
     
@@ -141,7 +146,6 @@ async def get_ml_gateway_health(db: Session = Depends(get_db)):
 @router.post("/jobs", response_model=MLJobResponse)
 async def create_ml_analysis_job(
     job_request: MLJobRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -165,10 +169,14 @@ async def create_ml_analysis_job(
         ml_service = MLIntegrationService(db)
         job_response = await ml_service.create_analysis_job(job_request)
         
-        # Adicionar task de background para processamento
-        background_tasks.add_task(
-            ml_service.process_job_async,
-            str(job_response.uuid)
+        # Processamento pelo worker da fila (api.core.job_worker)
+        priority = getattr(job_request.priority, "value", job_request.priority)
+        await run_in_threadpool(
+            JobQueue(db).enqueue,
+            ML_ANALYSIS,
+            {"job_uuid": str(job_response.uuid)},
+            priority=ML_JOB_PRIORITY.get(str(priority).upper(), 0),
+            dedupe_key=f"{ML_ANALYSIS}:{job_response.uuid}",
         )
         
         return job_response
@@ -615,7 +623,6 @@ async def export_ml_results(
 @router.post("/bulk-upload")
 async def bulk_upload_ml_data(
     file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = ...,
     db: Session = Depends(get_db)
 ):
     """
@@ -627,21 +634,26 @@ async def bulk_upload_ml_data(
     try:
         ml_service = MLIntegrationService(db)
         
-        # Processar arquivo em background
+        # Arquivo salvo em disco; leitura pelo worker da fila
         upload_result = await ml_service.process_bulk_upload(file)
         
-        background_tasks.add_task(
-            ml_service.process_bulk_data_async,
-            upload_result["upload_id"]
+        job = await run_in_threadpool(
+            JobQueue(db).enqueue,
+            ML_BULK_UPLOAD,
+            {"upload_id": upload_result["upload_id"], "file_path": upload_result["file_path"]},
         )
         
         return {
             "upload_id": upload_result["upload_id"],
+            "job_id": job["id"],
             "status": "processing",
             "file_info": upload_result["file_info"],
-            "message": "✅ Upload iniciado, processamento em background"
+            "status_url": f"/api/v1/jobs/{job['id']}",
+            "message": "✅ Upload recebido, processamento na fila de jobs"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Bulk upload failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -685,7 +697,7 @@ router.openapi_tags = [
         - 13 endpoints especializados
         - Validação Pydantic v2
         - Integração PostgreSQL robusta
-        - Background tasks para performance
+        - Fila de jobs em PostgreSQL (workers separados)
         - Logging estruturado
         
         **Para Time ML:**
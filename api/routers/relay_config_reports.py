@@ -44,14 +44,14 @@ Usage:
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException, Response, Body
-from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional
-import io
 import logging
 
 from api.core.database import get_db
+from api.core.pagination import decode_cursor, cursor_int, encode_cursor, estimate_count
 from api.services.relay_config_report_service import RelayConfigReportService
+from api.services.report_streaming import export_response
 from api.services.relay_config_crud_service import RelayConfigCRUDService
 from api.schemas.relay_config_schemas import (
     RelaySettingCreate,
@@ -76,8 +76,10 @@ router = APIRouter(
 
 @router.get("/settings", response_model=list[RelaySettingResponse])
 def list_all_relay_settings(
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Máximo de registros a retornar"),
-    offset: int = Query(0, ge=0, description="Offset para paginação"),
+    offset: int = Query(0, ge=0, description="Offset para paginação (prefira cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
     equipment_id: Optional[int] = Query(None, description="Filtrar por equipment_id"),
     is_enabled: Optional[bool] = Query(None, description="Filtrar por status (habilitado/desabilitado)"),
     db: Session = Depends(get_db)
@@ -89,20 +91,29 @@ def list_all_relay_settings(
     
     **Filtros disponíveis:**
     - `limit`: Quantidade máxima de registros (padrão: 100, máx: 1000)
-    - `offset`: Pular N registros (para paginação)
+    - `cursor`: Próxima página (valor do header `X-Next-Cursor` da resposta anterior)
+    - `offset`: Pular N registros (legado - custo cresce com o offset)
     - `equipment_id`: Filtrar por equipamento específico
     - `is_enabled`: Filtrar apenas habilitadas (true) ou desabilitadas (false)
     
+    **Paginação por cursor (keyset):**
+    Cada página continua do último id devolvido (`rs.id < :before_id`,
+    índice da PK): a página 500 custa o mesmo que a página 1. Headers:
+    - `X-Next-Cursor`: cursor da próxima página (ausente na última)
+    - `X-Total-Count`: total estimado pelo planner (exato abaixo de 1000)
+    
     **Exemplo de uso:**
     ```
     GET /api/relay-config/settings?limit=50&equipment_id=1
     GET /api/relay-config/settings?is_enabled=true
-    GET /api/relay-config/settings?offset=100&limit=50
+    GET /api/relay-config/settings?limit=50&cursor=eyJiZWZvcmVfaWQiOjE1MH0
     ```
     
     Args:
+        response: Resposta (headers de paginação)
         limit: Máximo de registros a retornar
-        offset: Offset para paginação
+        offset: Offset para paginação (ignorado com cursor)
+        cursor: Cursor da próxima página
         equipment_id: Filtrar por equipment_id
         is_enabled: Filtrar por status
         db: Sessão do banco de dados
@@ -112,6 +123,8 @@ def list_all_relay_settings(
     """
     from sqlalchemy import text
     
+    before_id = cursor_int(decode_cursor(cursor), "before_id")
+    
     # Construir query base
     query = """
         SELECT 
@@ -146,15 +159,26 @@ def list_all_relay_settings(
         query += " AND rs.is_enabled = :is_enabled"
         params["is_enabled"] = is_enabled
     
-    # Ordenar e paginar
+    # Total estimado (mesmos filtros, sem posição)
+    response.headers["X-Total-Count"] = str(estimate_count(db, query, params))
+    
+    # Ordenar e paginar: keyset com cursor, OFFSET só no modo legado
+    if before_id is not None:
+        query += " AND rs.id < :before_id"
+        params["before_id"] = before_id
+        offset = 0
     query += " ORDER BY rs.id DESC LIMIT :limit OFFSET :offset"
-    params["limit"] = limit
+    params["limit"] = limit + 1  # +1 linha para saber se há próxima página
     params["offset"] = offset
     
     # Executar query
     result = db.execute(text(query), params)
     rows = result.fetchall()
     
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(before_id=rows[-1].id)
+    
     # Converter para lista de dicts
     settings = []
     for row in rows:
@@ -176,7 +200,7 @@ def list_all_relay_settings(
             modified_by=row.modified_by
         ))
     
-    logger.info(f"📋 Listando {len(settings)} configurações (limit={limit}, offset={offset}, equipment_id={equipment_id})")
+    logger.info(f"📋 Listando {len(settings)} configurações (limit={limit}, offset={offset}, before_id={before_id}, equipment_id={equipment_id})")
     return settings
 
 
@@ -580,6 +604,10 @@ def export_configuration_report(
     - Header `Content-Disposition: attachment` força download
     - Nome do arquivo gerado automaticamente: `CONFIG_{TAG}_{TIMESTAMP}.{ext}`
     
+    **Cache:**
+    - Arquivos renderizados ficam em cache em disco até os ajustes do
+      equipamento mudarem (header `X-Report-Cache: HIT|MISS`)
+    
     **Exemplo de uso:**
     ```bash
     # Download CSV
@@ -605,35 +633,17 @@ def export_configuration_report(
     """
     try:
         service = RelayConfigReportService(db)
-        result = service.generate_configuration_report(
+        result = service.get_cached_report(
             equipment_id=equipment_id,
-            format=format.lower(),
+            format=format,
             include_disabled=include_disabled
         )
+        filename = result['filename']
         
-        # Determinar MIME type
-        mime_types = {
-            'csv': 'text/csv',
-            'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'pdf': 'application/pdf'
-        }
-        
-        mime_type = mime_types.get(format.lower(), 'application/octet-stream')
-        filename = result.get('filename', f'config_report.{format}')
-        
-        # Preparar conteúdo
-        if format.lower() == 'csv':
-            content = io.BytesIO(result['data'].encode('utf-8'))
-        else:
-            content = io.BytesIO(result['data'])
-        
-        return StreamingResponse(
-            content,
-            media_type=mime_type,
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"'
-            }
-        )
+        return export_response(result['data'], result['format'], filename, headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Report-Cache': 'HIT' if result['cached'] else 'MISS'
+        })
     
     except HTTPException:
         raise
@@ -966,6 +976,9 @@ def generate_relay_setup_report(
     - excel: Planilha para análise e backup
     - csv: Dados brutos para importação
     
+    O arquivo é o relatório de configuração (/export), renderizado uma vez
+    por versão dos ajustes e servido do cache em disco nos downloads seguintes.
+    
     **Exemplo de uso:**
     ```
     GET /api/relay-config/relay-setup-report/1?format=pdf
@@ -979,124 +992,20 @@ def generate_relay_setup_report(
     Returns:
         Arquivo para download (PDF, XLSX ou CSV)
     """
+    formats = {"pdf": "pdf", "excel": "xlsx", "csv": "csv"}
+    report_format = formats.get(format.lower())
+    if report_format is None:
+        raise HTTPException(status_code=400, detail=f"Formato '{format}' não suportado. Use: pdf, excel ou csv")
+    
     try:
-        from sqlalchemy import text
-        
-        # Buscar dados do equipamento
-        equipment_query = text("""
-            SELECT 
-                re.id,
-                re.equipment_tag,
-                re.bay_name,
-                f.nome_completo as manufacturer_name,
-                rm.model_name,
-                re.substation_name,
-                re.voltage_level,
-                re.installation_date,
-                re.commissioning_date as last_maintenance
-            FROM protec_ai.relay_equipment re
-            LEFT JOIN protec_ai.relay_models rm ON re.relay_model_id = rm.id
-            LEFT JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
-            WHERE re.id = :equipment_id
-        """)
-        
-        equipment = db.execute(equipment_query, {"equipment_id": equipment_id}).fetchone()
-        
-        if not equipment:
-            raise HTTPException(status_code=404, detail=f"Equipamento ID {equipment_id} não encontrado")
-        
-        # Buscar configurações
-        settings_query = text("""
-            SELECT 
-                rs.id,
-                pf.function_code,
-                pf.function_name,
-                rp.parameter_code,
-                rp.parameter_name,
-                rs.set_value,
-                rp.unit_of_measure,
-                rp.min_limit,
-                rp.max_limit,
-                rs.is_enabled,
-                rs.notes,
-                rs.updated_at,
-                rs.modified_by
-            FROM protec_ai.relay_settings rs
-            LEFT JOIN protec_ai.relay_parameters rp ON rs.parameter_id = rp.id
-            LEFT JOIN protec_ai.protection_functions pf ON rp.function_id = pf.id
-            WHERE rs.equipment_id = :equipment_id 
-              AND rs.deleted_at IS NULL
-            ORDER BY pf.function_code, rp.parameter_code
-        """)
-        
-        settings = db.execute(settings_query, {"equipment_id": equipment_id}).fetchall()
-        
-        # Preparar dados para relatório
-        report_data = {
-            "equipment": {
-                "id": equipment.id,
-                "tag": equipment.equipment_tag,
-                "manufacturer": equipment.manufacturer_name or "N/A",
-                "model": equipment.model_name or "N/A",
-                "bay": equipment.bay_name or "N/A",
-                "substation": equipment.substation_name or "N/A",
-                "voltage": equipment.voltage_level or "N/A",
-                "installation_date": str(equipment.installation_date) if equipment.installation_date else "N/A",
-                "last_maintenance": str(equipment.last_maintenance) if equipment.last_maintenance else "N/A"
-            },
-            "settings": [
-                {
-                    "function_code": s.function_code or "",
-                    "function_name": s.function_name or "",
-                    "parameter_code": s.parameter_code or "",
-                    "parameter_name": s.parameter_name or "",
-                    "set_value": s.set_value,
-                    "unit": s.unit_of_measure or "",
-                    "min_limit": s.min_limit,
-                    "max_limit": s.max_limit,
-                    "enabled": s.is_enabled,
-                    "notes": s.notes or "",
-                    "updated_at": str(s.updated_at) if s.updated_at else "",
-                    "modified_by": s.modified_by or ""
-                }
-                for s in settings
-            ]
-        }
-        
-        # Gerar relatório conforme formato
-        if format.lower() == "pdf":
-            # Por enquanto retornar JSON, depois implementamos PDF
-            return JSONResponse(content={
-                "message": "Geração de PDF em desenvolvimento",
-                "data": report_data
-            })
-        
-        elif format.lower() == "excel":
-            # Usar endpoint existente de export
-            from api.services.relay_config_report_service import RelayConfigReportService
-            service = RelayConfigReportService(db)
-            excel_file = service.export_to_excel(equipment_id)
-            
-            return StreamingResponse(
-                io.BytesIO(excel_file),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={"Content-Disposition": f"attachment; filename=setup_{equipment.equipment_tag}.xlsx"}
-            )
-        
-        elif format.lower() == "csv":
-            # Usar endpoint existente de export
-            from api.services.relay_config_report_service import RelayConfigReportService
-            service = RelayConfigReportService(db)
-            csv_content = service.export_to_csv(equipment_id)
-            
-            return Response(
-                content=csv_content,
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=setup_{equipment.equipment_tag}.csv"}
-            )
+        # Mesmo relatório de /export, servido do cache em disco
+        service = RelayConfigReportService(db)
+        result = service.get_cached_report(equipment_id, report_format)
+        filename = f"setup_{result['equipment_tag']}.{report_format}"
         
-        else:
-            raise HTTPException(status_code=400, detail=f"Formato '{format}' não suportado. Use: pdf, excel ou csv")
+        return export_response(result['data'], report_format, filename, headers={
+            'X-Report-Cache': 'HIT' if result['cached'] else 'MISS'
+        })
     
     except HTTPException:
         raise
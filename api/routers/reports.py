@@ -28,23 +28,29 @@ Date: 2025-11-02
 Version: 1.0.0
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse, Response
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import io
 import logging
 
-from api.core.database import get_db
+from api.core.database import get_db, get_async_db, run_read
+from api.core.snapshot_cache import snapshot_response
 from api.services.report_service import ReportService, ExportFormat, generate_report_filename
+from api.services.statistics_snapshot import statistics_snapshot, load_system_statistics
+from api.services.report_streaming import (
+    PDF_TABLE_MAX_ROWS, export_response, iter_csv, iter_query_batches, render_query_xlsx_file, start_stream,
+)
 from api.schemas.reports import MetadataResponse, PreviewResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/metadata", response_model=MetadataResponse)
-async def get_report_metadata(db: Session = Depends(get_db)):
+async def get_report_metadata(request: Request, db: Session = Depends(get_db), async_db=Depends(get_async_db)):
     """
     Retorna metadados dinâmicos para popular filtros de relatórios.
     
@@ -64,7 +70,7 @@ async def get_report_metadata(db: Session = Depends(get_db)):
     **PERFORMANCE:**
         - Típico: ~18ms para 50 equipamentos
         - Queries otimizadas com JOINs e agregações SQL
-        - Cache possível em produção (Redis)
+        - Snapshot em cache (STATISTICS_CACHE_TTL) com ETag: `If-None-Match` → 304
     
     Returns:
         MetadataResponse: Estrutura com manufacturers, models, bays, statuses
@@ -94,9 +100,9 @@ async def get_report_metadata(db: Session = Depends(get_db)):
         ```
     """
     try:
-        service = ReportService(db)
-        metadata = await service.get_metadata()
-        return metadata
+        service = ReportService(db, async_db)
+        snapshot = await service.get_metadata_snapshot()
+        return snapshot_response(request, snapshot)
         
     except HTTPException:
         raise
@@ -105,7 +111,7 @@ async def get_report_metadata(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/manufacturers")
-async def get_manufacturers(db: Session = Depends(get_db)):
+async def get_manufacturers(db: Session = Depends(get_db), async_db=Depends(get_async_db)):
     """
     Retorna lista de fabricantes com contagem de equipamentos.
     
@@ -119,7 +125,7 @@ async def get_manufacturers(db: Session = Depends(get_db)):
         HTTPException: 500 em caso de erro no banco de dados
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         metadata = await service.get_metadata()
         return {
             "manufacturers": metadata["manufacturers"],
@@ -132,7 +138,8 @@ async def get_manufacturers(db: Session = Depends(get_db)):
 @router.get("/models")
 async def get_models(
     manufacturer: Optional[str] = Query(None, description="Filtrar por fabricante"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     Retorna lista de modelos, opcionalmente filtrados por fabricante.
@@ -151,7 +158,7 @@ async def get_models(
         Retorna apenas modelos Schneider Electric
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         metadata = await service.get_metadata()
         models = metadata["models"]
         
@@ -172,7 +179,7 @@ async def get_models(
 # TODO: Se família for necessária, adicionar coluna ao schema do banco
 
 @router.get("/bays")
-async def get_bays(db: Session = Depends(get_db)):
+async def get_bays(db: Session = Depends(get_db), async_db=Depends(get_async_db)):
     """
     Lista todos os barramentos (bays) cadastrados no sistema com contagem de equipamentos.
     
@@ -196,7 +203,7 @@ async def get_bays(db: Session = Depends(get_db)):
         }
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         metadata = await service.get_metadata()
         return {
             "bays": metadata["bays"],
@@ -214,7 +221,8 @@ async def export_report(
     status: Optional[str] = Query(None),
     bay: Optional[str] = Query(None),
     substation: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     Exporta relatório de equipamentos em formato CSV, XLSX ou PDF.
@@ -230,6 +238,7 @@ async def export_report(
         bay: Nome do barramento (filtro opcional)
         substation: Nome da subestação (filtro opcional)
         db: Sessão do banco de dados (injetada)
+        async_db: Sessão assíncrona asyncpg (injetada; None sem o driver)
     
     Returns:
         StreamingResponse com arquivo para download e headers apropriados:
@@ -251,7 +260,7 @@ async def export_report(
         Filename gerado automaticamente: REL_[FABRICANTE]_[MODELO]_[TIMESTAMP].[ext]
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         
         # Buscar equipamentos filtrados
         equipments = await service.get_filtered_equipments(
@@ -273,10 +282,10 @@ async def export_report(
         )
         
         # Gerar arquivo no formato solicitado
-        if format.lower() == "csv":
-            content = await service.export_to_csv(equipments)
-            media_type = "text/csv"
-        elif format.lower() == "xlsx":
+        fmt = format.lower()
+        if fmt == "csv":
+            content = service.iter_equipment_csv(equipments)
+        elif fmt == "xlsx":
             content = await service.export_to_xlsx(
                 equipments,
                 manufacturer=manufacturer,
@@ -285,8 +294,7 @@ async def export_report(
                 status=status,
                 substation=substation
             )
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == "pdf":
+        elif fmt == "pdf":
             content = await service.export_to_pdf(
                 equipments,
                 manufacturer=manufacturer,
@@ -295,18 +303,11 @@ async def export_report(
                 status=status,
                 substation=substation
             )
-            media_type = "application/pdf"
         else:
             raise HTTPException(status_code=400, detail="Formato não suportado. Use: csv, xlsx ou pdf")
         
-        # Retornar arquivo
-        return Response(
-            content=content if isinstance(content, bytes) else content.encode('utf-8'),
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
+        # Retornar arquivo em blocos
+        return export_response(content, fmt, filename)
         
     except HTTPException:
         raise
@@ -323,7 +324,8 @@ async def preview_report(
     substation: Optional[str] = None,
     page: int = Query(1, ge=1, description="Número da página"),
     size: int = Query(50, ge=1, le=1000, description="Itens por página"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     Preview de relatório com paginação para validar dados antes da exportação.
@@ -341,6 +343,7 @@ async def preview_report(
         page: Número da página (mínimo: 1)
         size: Itens por página (mínimo: 1, máximo: 1000)
         db: Sessão do banco de dados (injetada)
+        async_db: Sessão assíncrona asyncpg (injetada; None sem o driver)
     
     Returns:
         PreviewResponse com:
@@ -373,7 +376,7 @@ async def preview_report(
         Performance: ~18ms para query + paginação de 50 equipamentos.
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         data = await service.get_filtered_equipments(
             manufacturer=manufacturer,
             model=model,
@@ -416,7 +419,7 @@ async def preview_report(
 # ============================================================================
 
 @router.get("/statistics")
-async def get_system_statistics(db: Session = Depends(get_db)):
+async def get_system_statistics(request: Request, async_db=Depends(get_async_db)):
     """
     Retorna estatísticas completas do sistema em tempo real.
     
@@ -433,6 +436,11 @@ async def get_system_statistics(db: Session = Depends(get_db)):
         - Tipos de valores (numeric, boolean, text)
         - Distribuição por subestação
     
+    **CACHE:**
+        Snapshot válido por STATISTICS_CACHE_TTL segundos, com ETag
+        (`If-None-Match` → 304). Contagens de configurações vêm de
+        protec_ai.relay_settings_summary.
+    
     Returns:
         Dict com estatísticas completas do sistema
         
@@ -456,98 +464,16 @@ async def get_system_statistics(db: Session = Depends(get_db)):
         }
     """
     try:
-        service = ReportService(db)
+        snapshot = await statistics_snapshot("system_statistics", load_system_statistics, async_db)
+        return snapshot_response(request, snapshot)
         
-        with service.engine.connect() as conn:
-            # Estatísticas de equipamentos
-            equipment_stats = text("""
-                SELECT 
-                    COUNT(*) as total,
-                    COUNT(CASE WHEN status = 'ACTIVE' THEN 1 END) as active,
-                    COUNT(DISTINCT substation_name) as substations,
-                    COUNT(DISTINCT barra_nome) as bays
-                FROM protec_ai.relay_equipment
-            """)
-            eq_stats = conn.execute(equipment_stats).fetchone()
-            
-            # Estatísticas de configurações
-            settings_stats = text("""
-                SELECT 
-                    COUNT(*) as total,
-                    COUNT(CASE WHEN is_active THEN 1 END) as active,
-                    COUNT(CASE WHEN is_multipart THEN 1 END) as multipart,
-                    COUNT(CASE WHEN value_type = 'numeric' THEN 1 END) as numeric,
-                    COUNT(CASE WHEN value_type = 'boolean' THEN 1 END) as boolean,
-                    COUNT(CASE WHEN value_type = 'text' THEN 1 END) as text
-                FROM protec_ai.relay_settings
-            """)
-            set_stats = conn.execute(settings_stats).fetchone()
-            
-            # Distribuição por fabricante
-            manufacturer_dist = text("""
-                SELECT 
-                    f.nome_completo as name,
-                    COUNT(DISTINCT re.id) as equipment_count,
-                    COUNT(rs.id) as settings_count
-                FROM protec_ai.fabricantes f
-                JOIN protec_ai.relay_models rm ON rm.manufacturer_id = f.id
-                JOIN protec_ai.relay_equipment re ON re.relay_model_id = rm.id
-                LEFT JOIN protec_ai.relay_settings rs ON rs.equipment_id = re.id
-                GROUP BY f.nome_completo
-                ORDER BY equipment_count DESC
-            """)
-            mfr_dist = conn.execute(manufacturer_dist).fetchall()
-            
-            # Funções de proteção
-            functions_stats = text("""
-                SELECT 
-                    COUNT(DISTINCT pf.id) as total_functions,
-                    COUNT(DISTINCT rs.function_id) as configured_functions
-                FROM protec_ai.protection_functions pf
-                LEFT JOIN protec_ai.relay_settings rs ON rs.function_id = pf.id
-            """)
-            func_stats = conn.execute(functions_stats).fetchone()
-            
-            return {
-                "timestamp": datetime.now().isoformat(),
-                "equipments": {
-                    "total": int(eq_stats.total),
-                    "active": int(eq_stats.active),
-                    "substations": int(eq_stats.substations),
-                    "bays": int(eq_stats.bays),
-                    "by_manufacturer": [
-                        {
-                            "name": m.name,
-                            "equipment_count": int(m.equipment_count),
-                            "settings_count": int(m.settings_count)
-                        }
-                        for m in mfr_dist
-                    ]
-                },
-                "settings": {
-                    "total": int(set_stats.total),
-                    "active": int(set_stats.active),
-                    "inactive": int(set_stats.total) - int(set_stats.active),
-                    "multipart": int(set_stats.multipart),
-                    "by_type": {
-                        "numeric": int(set_stats.numeric),
-                        "boolean": int(set_stats.boolean),
-                        "text": int(set_stats.text)
-                    }
-                },
-                "protection_functions": {
-                    "total_available": int(func_stats.total_functions),
-                    "configured": int(func_stats.configured_functions)
-                }
-            }
-            
     except Exception as e:
         logger.error(f"Error getting statistics: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/equipment/{equipment_id}/detailed")
-async def get_equipment_detailed_report(
+def get_equipment_detailed_report(
     equipment_id: int,
     include_inactive: bool = Query(True, description="Incluir configurações inativas"),
     db: Session = Depends(get_db)
@@ -670,7 +596,8 @@ async def get_equipment_detailed_report(
 @router.get("/protection-functions/export/{format}")
 async def export_protection_functions_report(
     format: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🔒 Relatório de Funções de Proteção Ativas
@@ -685,7 +612,7 @@ async def export_protection_functions_report(
         StreamingResponse com arquivo para download
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         
         # Query para buscar funções ativas
         from sqlalchemy import text
@@ -709,39 +636,67 @@ async def export_protection_functions_report(
             ORDER BY apf.relay_file, apf.function_code
         """)
         
-        result = db.execute(query)
-        functions_data = [dict(row._mapping) for row in result]
+        fmt = format.lower()
+        filename = f"REL_FUNCOES_PROTECAO_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
         
         # Gerar arquivo no formato solicitado
-        if format.lower() == 'pdf':
+        if fmt == 'csv':
+            return export_response(await start_stream(iter_csv(iter_query_batches(query.text))), fmt, filename)
+        elif fmt == 'pdf':
+            functions_data = await run_read(
+                lambda conn: [dict(row._mapping) for row in conn.execute(
+                    text(f"{query.text} LIMIT :limit"), {"limit": PDF_TABLE_MAX_ROWS}
+                )],
+                async_db
+            )
             content = await service.export_protection_functions_pdf(functions_data)
-            media_type = "application/pdf"
-        elif format.lower() == 'xlsx':
+        elif fmt == 'xlsx':
+            functions_data = await run_read(
+                lambda conn: [dict(row._mapping) for row in conn.execute(query)], async_db
+            )
             content = await service.export_protection_functions_xlsx(functions_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == 'csv':
-            content = await service.export_protection_functions_csv(functions_data)
-            media_type = "text/csv"
         else:
             raise HTTPException(status_code=400, detail="Formato inválido. Use: csv, xlsx ou pdf")
         
-        filename = f"REL_FUNCOES_PROTECAO_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-        
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return export_response(content, fmt, filename)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting protection functions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Setpoints ativos da frota inteira (ordem do arquivo exportado)
+SETPOINTS_SQL = """
+    SELECT 
+        re.equipment_tag,
+        f.nome_completo as manufacturer_name,
+        rm.model_name,
+        rs.parameter_code,
+        rs.parameter_name,
+        rs.set_value,
+        rs.set_value_text,
+        u.unit_symbol,
+        pf.function_name,
+        rs.category,
+        rs.is_active
+    FROM protec_ai.relay_settings rs
+    JOIN protec_ai.relay_equipment re ON rs.equipment_id = re.id
+    LEFT JOIN protec_ai.relay_models rm ON re.relay_model_id = rm.id
+    LEFT JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
+    LEFT JOIN protec_ai.units u ON rs.unit_id = u.id
+    LEFT JOIN protec_ai.protection_functions pf ON rs.function_id = pf.id
+    WHERE rs.is_active = true
+    ORDER BY re.equipment_tag, rs.parameter_code
+"""
+
+
 @router.get("/setpoints/export/{format}")
 async def export_setpoints_report(
     format: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     ⚡ Relatório de Setpoints Críticos
@@ -753,55 +708,37 @@ async def export_setpoints_report(
         format: Formato de exportação ('csv', 'xlsx' ou 'pdf')
     """
     try:
-        service = ReportService(db)
-        
-        from sqlalchemy import text
-        query = text("""
-            SELECT 
-                re.equipment_tag,
-                f.nome_completo as manufacturer_name,
-                rm.model_name,
-                rs.parameter_code,
-                rs.parameter_name,
-                rs.set_value,
-                rs.set_value_text,
-                u.unit_symbol,
-                pf.function_name,
-                rs.category,
-                rs.is_active
-            FROM protec_ai.relay_settings rs
-            JOIN protec_ai.relay_equipment re ON rs.equipment_id = re.id
-            LEFT JOIN protec_ai.relay_models rm ON re.relay_model_id = rm.id
-            LEFT JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
-            LEFT JOIN protec_ai.units u ON rs.unit_id = u.id
-            LEFT JOIN protec_ai.protection_functions pf ON rs.function_id = pf.id
-            WHERE rs.is_active = true
-            ORDER BY re.equipment_tag, rs.parameter_code
-        """)
+        service = ReportService(db, async_db)
         
-        result = db.execute(query)
-        setpoints_data = [dict(row._mapping) for row in result]
+        fmt = format.lower()
+        filename = f"REL_SETPOINTS_CRITICOS_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
         
-        if format.lower() == 'pdf':
+        # Frota inteira (~200 mil linhas): CSV e XLSX em streaming do cursor do servidor
+        if fmt == 'csv':
+            return export_response(await start_stream(iter_csv(iter_query_batches(SETPOINTS_SQL))), fmt, filename)
+        elif fmt == 'xlsx':
+            path = await render_query_xlsx_file(
+                SETPOINTS_SQL, None, "Setpoints Críticos",
+                headers=['TAG', 'Fabricante', 'Modelo', 'Código', 'Parâmetro', 'Valor', 'Unidade', 'Função', 'Categoria'],
+                columns=['equipment_tag', 'manufacturer_name', 'model_name', 'parameter_code', 'parameter_name',
+                         'set_value', 'unit_symbol', 'function_name', 'category'],
+                header_color="#CC0066"
+            )
+            return export_response(path, fmt, filename)
+        elif fmt == 'pdf':
+            setpoints_data = await run_read(
+                lambda conn: [dict(row._mapping) for row in conn.execute(
+                    text(f"{SETPOINTS_SQL} LIMIT :limit"), {"limit": PDF_TABLE_MAX_ROWS}
+                )],
+                async_db
+            )
             content = await service.export_setpoints_pdf(setpoints_data)
-            media_type = "application/pdf"
-        elif format.lower() == 'xlsx':
-            content = await service.export_setpoints_xlsx(setpoints_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == 'csv':
-            content = await service.export_setpoints_csv(setpoints_data)
-            media_type = "text/csv"
+            return export_response(content, fmt, filename)
         else:
             raise HTTPException(status_code=400, detail="Formato inválido")
         
-        filename = f"REL_SETPOINTS_CRITICOS_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-        
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting setpoints: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -810,7 +747,8 @@ async def export_setpoints_report(
 @router.get("/coordination/export/{format}")
 async def export_coordination_report(
     format: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🎯 Relatório de Coordenação e Seletividade
@@ -818,7 +756,7 @@ async def export_coordination_report(
     Análise de coordenação entre dispositivos de proteção.
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         
         from sqlalchemy import text
         query = text("""
@@ -844,29 +782,27 @@ async def export_coordination_report(
             ORDER BY barra_nome, equipment_tag, ansi_code
         """)
         
-        result = db.execute(query)
-        coordination_data = [dict(row._mapping) for row in result]
+        fmt = format.lower()
+        filename = f"REL_COORDENACAO_SELETIVIDADE_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
         
-        if format.lower() == 'pdf':
+        if fmt == 'csv':
+            return export_response(await start_stream(iter_csv(iter_query_batches(query.text))), fmt, filename)
+        elif fmt == 'xlsx':
+            return export_response(await render_query_xlsx_file(query.text, None, "Coordenação"), fmt, filename)
+        elif fmt == 'pdf':
+            coordination_data = await run_read(
+                lambda conn: [dict(row._mapping) for row in conn.execute(
+                    text(f"{query.text} LIMIT :limit"), {"limit": PDF_TABLE_MAX_ROWS}
+                )],
+                async_db
+            )
             content = await service.export_coordination_pdf(coordination_data)
-            media_type = "application/pdf"
-        elif format.lower() == 'xlsx':
-            content = await service.export_coordination_xlsx(coordination_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == 'csv':
-            content = await service.export_coordination_csv(coordination_data)
-            media_type = "text/csv"
+            return export_response(content, fmt, filename)
         else:
             raise HTTPException(status_code=400, detail="Formato inválido")
         
-        filename = f"REL_COORDENACAO_SELETIVIDADE_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-        
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting coordination: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -876,7 +812,8 @@ async def export_coordination_report(
 async def export_by_bay_report(
     format: str,
     bay: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🏭 Relatório por Bay/Subestação
@@ -884,7 +821,7 @@ async def export_by_bay_report(
     Equipamentos agrupados por localização física.
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         
         from sqlalchemy import text
         bay_filter = "WHERE re.barra_nome = :bay" if bay else ""
@@ -925,29 +862,24 @@ async def export_by_bay_report(
             ORDER BY substation_name, re.barra_nome, re.equipment_tag
         """)
         
-        result = db.execute(query, params)
-        bay_data = [dict(row._mapping) for row in result]
+        fmt = format.lower()
+        filename = f"REL_POR_BAY_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
         
-        if format.lower() == 'pdf':
+        if fmt == 'csv':
+            return export_response(await start_stream(iter_csv(iter_query_batches(query.text, params))), fmt, filename)
+        elif fmt == 'xlsx':
+            return export_response(await render_query_xlsx_file(query.text, params, "Por Bay"), fmt, filename)
+        elif fmt == 'pdf':
+            bay_data = await run_read(
+                lambda conn: [dict(row._mapping) for row in conn.execute(query, params)], async_db
+            )
             content = await service.export_by_bay_pdf(bay_data)
-            media_type = "application/pdf"
-        elif format.lower() == 'xlsx':
-            content = await service.export_by_bay_xlsx(bay_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == 'csv':
-            content = await service.export_by_bay_csv(bay_data)
-            media_type = "text/csv"
+            return export_response(content, fmt, filename)
         else:
             raise HTTPException(status_code=400, detail="Formato inválido")
         
-        filename = f"REL_POR_BAY_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-        
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting by-bay report: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -956,7 +888,8 @@ async def export_by_bay_report(
 @router.get("/maintenance/export/{format}")
 async def export_maintenance_report(
     format: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     🔧 Relatório de Manutenção e Histórico
@@ -964,7 +897,7 @@ async def export_maintenance_report(
     Gestão de ciclo de vida dos equipamentos.
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         
         from sqlalchemy import text
         query = text("""
@@ -989,29 +922,24 @@ async def export_maintenance_report(
             ORDER BY re.created_at DESC, re.equipment_tag
         """)
         
-        result = db.execute(query)
-        maintenance_data = [dict(row._mapping) for row in result]
+        fmt = format.lower()
+        filename = f"REL_MANUTENCAO_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
         
-        if format.lower() == 'pdf':
+        if fmt == 'csv':
+            return export_response(await start_stream(iter_csv(iter_query_batches(query.text))), fmt, filename)
+        elif fmt == 'xlsx':
+            return export_response(await render_query_xlsx_file(query.text, None, "Manutenção"), fmt, filename)
+        elif fmt == 'pdf':
+            maintenance_data = await run_read(
+                lambda conn: [dict(row._mapping) for row in conn.execute(query)], async_db
+            )
             content = await service.export_maintenance_pdf(maintenance_data)
-            media_type = "application/pdf"
-        elif format.lower() == 'xlsx':
-            content = await service.export_maintenance_xlsx(maintenance_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == 'csv':
-            content = await service.export_maintenance_csv(maintenance_data)
-            media_type = "text/csv"
+            return export_response(content, fmt, filename)
         else:
             raise HTTPException(status_code=400, detail="Formato inválido")
         
-        filename = f"REL_MANUTENCAO_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-        
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting maintenance report: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1020,7 +948,8 @@ async def export_maintenance_report(
 @router.get("/executive/export/{format}")
 async def export_executive_report(
     format: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
 ):
     """
     📈 Relatório Executivo para Engenharia
@@ -1028,7 +957,7 @@ async def export_executive_report(
     Visão estratégica com KPIs e métricas de desempenho.
     """
     try:
-        service = ReportService(db)
+        service = ReportService(db, async_db)
         
         from sqlalchemy import text
         
@@ -1076,31 +1005,29 @@ async def export_executive_report(
             """)
         }
         
-        executive_data = {}
-        for key, query in queries.items():
-            result = db.execute(query)
-            executive_data[key] = [dict(row._mapping) for row in result]
+        executive_data = await run_read(
+            lambda conn: {
+                key: [dict(row._mapping) for row in conn.execute(query)]
+                for key, query in queries.items()
+            },
+            async_db
+        )
         
-        if format.lower() == 'pdf':
+        fmt = format.lower()
+        if fmt == 'pdf':
             content = await service.export_executive_pdf(executive_data)
-            media_type = "application/pdf"
-        elif format.lower() == 'xlsx':
+        elif fmt == 'xlsx':
             content = await service.export_executive_xlsx(executive_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        elif format.lower() == 'csv':
+        elif fmt == 'csv':
             content = await service.export_executive_csv(executive_data)
-            media_type = "text/csv"
         else:
             raise HTTPException(status_code=400, detail="Formato inválido")
         
         filename = f"REL_EXECUTIVO_ENGENHARIA_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+        return export_response(content, fmt, filename)
         
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting executive report: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,51 @@
+"""
+Router de Busca - Typeahead Unificado
+=====================================
+
+Sugestões enquanto o usuário digita: tags de equipamentos, modelos,
+fabricantes, barras e códigos de parâmetros em uma única chamada,
+ordenadas por similaridade (pg_trgm).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+import logging
+
+from api.core.database import get_db, get_async_db
+from api.services.search_service import MIN_QUERY_LENGTH, SEARCH_SOURCES, SearchService
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/typeahead", response_model=Dict[str, Any])
+async def typeahead(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=100, description="Termo digitado"),
+    limit: int = Query(10, ge=1, le=50, description="Máximo de sugestões"),
+    kinds: Optional[str] = Query(
+        None, description=f"Tipos separados por vírgula ({', '.join(SEARCH_SOURCES)}); padrão: todos"
+    ),
+    db: Session = Depends(get_db),
+    async_db=Depends(get_async_db)
+):
+    """
+    🔎 **Busca Typeahead Unificada**
+
+    Procura o termo em tags, modelos, fabricantes, barras e códigos de parâmetros.
+
+    - **q**: Termo digitado (mínimo 2 caracteres; tolera erros de digitação com pg_trgm)
+    - **limit**: Máximo de sugestões (padrão: 10, máximo: 50)
+    - **kinds**: Restringir tipos (ex.: `tag,barra`)
+
+    Ordem: valores que começam com o termo, depois maior similaridade.
+    `mode` = `ilike` indica banco sem pg_trgm (sem tolerância a erros).
+    """
+    try:
+        service = SearchService(db, async_db)
+        kind_list = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else None
+        return await service.typeahead(q, limit=limit, kinds=kind_list)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in typeahead search: {e}")
+        raise HTTPException(status_code=500, detail="Error searching")
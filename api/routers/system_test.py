@@ -38,7 +38,7 @@ class SystemTestReport(BaseModel):
 
 
 @router.post("/export/pdf")
-async def export_pdf_report(report_data: SystemTestReport):
+def export_pdf_report(report_data: SystemTestReport):
     """
     Gera relatório PDF do teste do sistema.
     
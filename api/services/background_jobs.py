@@ -0,0 +1,115 @@
+"""
+Handlers da fila de jobs
+========================
+
+Tipos de job executados por api.core.job_worker. Cada handler abre a
+própria Session (a da requisição que enfileirou já foi fechada) e reporta
+progresso pelo JobContext.
+
+- ml_analysis: MLIntegrationService.run_analysis_job
+- ml_bulk_upload: MLIntegrationService.process_bulk_data
+- import_reprocess: ImportService.reprocess_import
+- report_prerender: RelayConfigReportService.prerender_reports (todos os equipamentos)
+"""
+
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from api.core.database import SessionLocal
+from api.core.job_queue import JobContext, PermanentJobError, job_handler
+from api.services.import_service import ImportService
+from api.services.ml_integration_service import MLIntegrationService
+from api.services.relay_config_report_service import RelayConfigReportService
+from api.services.report_cache import REPORT_PRERENDER, prerender_formats
+
+logger = logging.getLogger(__name__)
+
+ML_ANALYSIS = "ml_analysis"
+ML_BULK_UPLOAD = "ml_bulk_upload"
+IMPORT_REPROCESS = "import_reprocess"
+
+# Prioridade na fila a partir de MLPriority
+ML_JOB_PRIORITY = {"LOW": -10, "NORMAL": 0, "HIGH": 10, "CRITICAL": 20}
+
+
+@job_handler(ML_ANALYSIS, max_concurrency=10)
+async def run_ml_analysis(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Análise ML; progresso também em MLAnalysisJob.progress_percentage"""
+    db = SessionLocal()
+    try:
+        return await MLIntegrationService(db).run_analysis_job(
+            payload["job_uuid"], progress=context.progress, final_attempt=context.is_last_attempt
+        )
+    finally:
+        db.close()
+
+
+@job_handler(ML_BULK_UPLOAD, max_concurrency=2)
+async def process_ml_bulk_upload(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Leitura de um arquivo do bulk-upload do ML Gateway"""
+    db = SessionLocal()
+    try:
+        return await MLIntegrationService(db).process_bulk_data(
+            payload["upload_id"], payload["file_path"], progress=context.progress
+        )
+    finally:
+        db.close()
+
+
+@job_handler(IMPORT_REPROCESS, max_concurrency=1)
+async def reprocess_import(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Reprocessamento de importação (pipeline completo + PostgreSQL)"""
+    db = SessionLocal()
+    try:
+        result = await ImportService(db).reprocess_import(
+            payload["import_id"], payload.get("options") or {}, progress=context.progress
+        )
+    finally:
+        db.close()
+
+    if result.get("status") == "failed":
+        message = result.get("error") or "Falha no reprocessamento"
+        if result.get("details"):
+            message = f"{message}: {result['details']}"
+        if result.get("retryable") is False:
+            raise PermanentJobError(message)
+        raise RuntimeError(message)
+    return result
+
+
+@job_handler(REPORT_PRERENDER, max_concurrency=1, max_attempts=1)
+async def prerender_reports(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Renderiza no cache em disco os relatórios de configuração de todos os
+    equipamentos (apenas os desatualizados); um equipamento por vez no
+    threadpool, o heartbeat do worker continua.
+    """
+    formats = payload.get("formats") or prerender_formats()
+    db = SessionLocal()
+    try:
+        equipment_ids = await run_in_threadpool(
+            lambda: [row.id for row in db.execute(
+                text("SELECT id FROM protec_ai.relay_equipment ORDER BY id")
+            ).fetchall()]
+        )
+        service = RelayConfigReportService(db)
+        rendered, failed = 0, 0
+        for index, equipment_id in enumerate(equipment_ids, start=1):
+            try:
+                rendered += await run_in_threadpool(service.prerender_reports, equipment_id, formats)
+            except Exception as e:
+                failed += 1
+                db.rollback()
+                logger.warning(f"⚠️  Pré-renderização do equipamento {equipment_id} falhou: {e}")
+            if index % 25 == 0 or index == len(equipment_ids):
+                context.progress(100.0 * index / len(equipment_ids), f"{index}/{len(equipment_ids)} equipamentos")
+                if context.is_cancelled():
+                    break
+    finally:
+        db.close()
+
+    logger.info(f"🖨️  Pré-renderização: {rendered} relatório(s) gerado(s), {failed} falha(s)")
+    return {"equipments": len(equipment_ids), "rendered": rendered, "failed": failed, "formats": formats}
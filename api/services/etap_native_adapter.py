@@ -26,6 +26,8 @@ import json
 import uuid
 from enum import Enum
 
+from api.services.tcc_coordination_engine import TCCCoordinationEngine, relay_setting_from_dict
+
 logger = logging.getLogger(__name__)
 
 # ================================
@@ -739,10 +741,47 @@ class EtapMockSimulatorAdapter(EtapAdapterBase):
         self,
         analysis_config: Dict[str, Any]
     ) -> EtapOperationResult:
-        """Mock análise de coordenação com resultados realistas"""
+        """
+        Mock análise de coordenação com resultados realistas
+        
+        Com ajustes em analysis_config["relays"] (pickup, dial, curva, barra),
+        as curvas são calculadas pelo TCCCoordinationEngine; somente a lista
+        de tags em "devices" gera pares simulados.
+        """
         operation_id = str(uuid.uuid4())
         start_time = datetime.utcnow()
         
+        relays = analysis_config.get("relays")
+        if isinstance(relays, (list, tuple)) and relays:
+            standard = analysis_config.get("protection_standard")
+            settings = [relay_setting_from_dict(relay, standard) for relay in relays if isinstance(relay, dict)]
+            engine = TCCCoordinationEngine.from_config(analysis_config)
+            analysis = await asyncio.get_running_loop().run_in_executor(None, engine.analyze, settings)
+            
+            result = EtapOperationResult(
+                operation_id=operation_id,
+                status=EtapOperationStatus.COMPLETED,
+                started_at=start_time,
+                completed_at=datetime.utcnow(),
+                result_data={
+                    "analysis_type": "coordination",
+                    "mock_simulation": False,
+                    "coordination_pairs": analysis["results"],
+                    "total_devices": analysis["total_devices"],
+                    "violations": len(analysis["violations"]),
+                    "overall_status": "coordinated" if not analysis["violations"] else "violations_found",
+                    "tcc_analysis": {key: value for key, value in analysis.items() if key != "results"}
+                },
+                performance_metrics={
+                    "analysis_duration_ms": int((datetime.utcnow() - start_time).total_seconds() * 1000),
+                    "devices_processed": len(settings)
+                }
+            )
+            
+            self._last_operation = result
+            self.logger.info(f"🔍 TCC coordination analysis: {len(analysis['results'])} pairs")
+            return result
+        
         # Simular análise complexa
         await asyncio.sleep(self._simulation_delay * 2)
         
@@ -24,6 +24,7 @@ import json
 
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from .etap_native_adapter import (
     EtapAdapterManager, EtapAdapterFactory, EtapConnectionConfig,
@@ -31,6 +32,9 @@ from .etap_native_adapter import (
     create_csv_bridge_adapter, create_mock_simulator_adapter
 )
 from .etap_service import EtapService
+from .tcc_coordination_engine import RelaySetting, relay_setting_from_dict
+from .selectivity_sweep_engine import sweep_study
+from ..core.concurrency import run_in_process
 from .etap_integration_service import EtapIntegrationService
 from ..models.etap_models import EtapStudy, EtapSyncLog, StudyStatus
 
@@ -517,28 +521,33 @@ class EtapNativeService:
     ) -> Dict[str, Any]:
         """
         Executar análise de seletividade nativa
+        
+        Com ao menos dois relés com ajustes de sobrecorrente (database ou
+        analysis_config["relays"]), a varredura roda em processo
+        (SelectivitySweepEngine). Os adapters ETAP, que ainda devolvem
+        resultados simulados, só atendem estudos sem ajustes.
         """
         start_time = datetime.now(timezone.utc)
         operation_id = f"selectivity_{int(start_time.timestamp())}"
+        requested_config = analysis_config
         
         try:
+            sweep_config = requested_config or {"study_id": study_id}
+            relays = await self._try_load_analysis_relays(study_id, sweep_config)
+            if len(relays) >= 2:
+                self.logger.info(f"📊 In-process selectivity sweep: {study_id} ({len(relays)} relays)")
+                analysis = await run_in_process(sweep_study, relays, sweep_config)
+                operation_result = self._sweep_operation_result(operation_id, start_time, analysis)
+                return await self._finish_selectivity_analysis(
+                    study_id, operation_id, start_time, operation_result, False
+                )
+            
             adapter = self.adapter_manager.get_current_adapter()
             if not adapter:
                 raise Exception("No ETAP adapter initialized")
             
-            # Configuração padrão
-            if not analysis_config:
-                study = await self.etap_service.get_study_by_id(int(study_id))
-                if study:
-                    analysis_config = {
-                        "study_id": study_id,
-                        "protection_zones": 3,
-                        "selectivity_margin": 0.2,
-                        "backup_protection": True,
-                        "devices": [config.tag_reference for config in study.equipment_configurations]
-                    }
-                else:
-                    analysis_config = {"study_id": study_id}
+            # Configuração padrão (dispositivos do estudo) para os adapters
+            analysis_config = requested_config or await self._default_selectivity_config(study_id)
             
             # Executar análise
             use_native = (
@@ -558,33 +567,9 @@ class EtapNativeService:
                 operation_result = await mock_adapter.run_selectivity_analysis(analysis_config)
                 await mock_adapter.disconnect()
             
-            # Sincronizar com database
-            if operation_result.status == EtapOperationStatus.COMPLETED:
-                await self._sync_analysis_results_to_database(
-                    study_id, "selectivity", operation_result.result_data
-                )
-            
-            self._record_performance_metric("selectivity_analysis", start_time, operation_result)
-            
-            await self._log_sync_event("selectivity_analysis", {
-                "operation_id": operation_id,
-                "study_id": study_id,
-                "use_native": use_native,
-                "status": operation_result.status
-            })
-            
-            return {
-                "success": True,
-                "operation_id": operation_id,
-                "study_id": study_id,
-                "analysis_type": "selectivity",
-                "native_analysis": use_native,
-                "operation_result": {
-                    "status": operation_result.status,
-                    "result_data": operation_result.result_data
-                },
-                "duration_ms": int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
-            }
+            return await self._finish_selectivity_analysis(
+                study_id, operation_id, start_time, operation_result, use_native
+            )
             
         except Exception as e:
             self.logger.error(f"Selectivity analysis failed: {e}")
@@ -592,7 +577,7 @@ class EtapNativeService:
             if self.fallback_enabled and prefer_native:
                 return await self.run_selectivity_analysis_native(
                     study_id=study_id,
-                    analysis_config=analysis_config,
+                    analysis_config=requested_config,
                     prefer_native=False
                 )
             
@@ -602,6 +587,157 @@ class EtapNativeService:
                 "error": str(e)
             }
     
+    async def _default_selectivity_config(self, study_id: str) -> Dict[str, Any]:
+        """Configuração padrão dos adapters: dispositivos do estudo e margem de 0,2 s"""
+        study = await self.etap_service.get_study_by_id(int(study_id))
+        if not study:
+            return {"study_id": study_id}
+        return {
+            "study_id": study_id,
+            "protection_zones": 3,
+            "selectivity_margin": 0.2,
+            "backup_protection": True,
+            "devices": [config.tag_reference for config in study.equipment_configurations]
+        }
+    
+    async def run_selectivity_batch(
+        self,
+        study_ids: List[str],
+        analysis_config: Optional[Dict[str, Any]] = None,
+        prefer_native: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Seletividade de vários estudos em paralelo (um estudo por processo)
+        
+        Os ajustes são lidos em sequência (sessão de banco compartilhada) e
+        as varreduras executam juntas no pool de processos. Estudos sem
+        relés suficientes seguem o caminho de run_selectivity_analysis_native.
+        
+        Returns:
+            Dict study_id → resposta no formato de run_selectivity_analysis_native
+        """
+        start_time = datetime.now(timezone.utc)
+        
+        sweeps: Dict[str, List[RelaySetting]] = {}
+        for study_id in study_ids:
+            relays = await self._try_load_analysis_relays(study_id, analysis_config)
+            if len(relays) >= 2:
+                sweeps[study_id] = relays
+        
+        self.logger.info(f"🚀 Selectivity batch: {len(sweeps)}/{len(study_ids)} studies in process pool")
+        analyses = await asyncio.gather(
+            *[run_in_process(sweep_study, relays, analysis_config) for relays in sweeps.values()],
+            return_exceptions=True
+        )
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for study_id in study_ids:
+            if study_id not in sweeps:
+                results[study_id] = await self.run_selectivity_analysis_native(
+                    study_id=study_id, analysis_config=analysis_config, prefer_native=prefer_native
+                )
+        for (study_id, _), analysis in zip(sweeps.items(), analyses):
+            operation_id = f"selectivity_{int(start_time.timestamp())}_{study_id}"
+            if isinstance(analysis, BaseException):
+                self.logger.error(f"Selectivity sweep for study {study_id} failed: {analysis}")
+                results[study_id] = {"success": False, "operation_id": operation_id, "error": str(analysis)}
+                continue
+            results[study_id] = await self._finish_selectivity_analysis(
+                study_id, operation_id, start_time,
+                self._sweep_operation_result(operation_id, start_time, analysis), False
+            )
+        
+        return {study_id: results[study_id] for study_id in study_ids}
+    
+    async def load_analysis_relays(
+        self,
+        study_id: str,
+        analysis_config: Optional[Dict[str, Any]] = None
+    ) -> List[RelaySetting]:
+        """
+        Ajustes para análise: analysis_config["relays"] quando informado,
+        senão os do estudo no database (consulta no threadpool).
+        """
+        relays = (analysis_config or {}).get("relays")
+        if isinstance(relays, (list, tuple)) and relays:
+            standard = (analysis_config or {}).get("protection_standard")
+            return [relay_setting_from_dict(relay, standard) for relay in relays if isinstance(relay, dict)]
+        
+        _, adapted_study_id = self.etap_service.adapt_study_id(study_id)
+        return await run_in_threadpool(self.etap_service.load_study_relays, adapted_study_id)
+    
+    async def _try_load_analysis_relays(
+        self,
+        study_id: str,
+        analysis_config: Optional[Dict[str, Any]]
+    ) -> List[RelaySetting]:
+        """load_analysis_relays sem propagar falhas de banco (lista vazia)"""
+        try:
+            return await self.load_analysis_relays(study_id, analysis_config)
+        except Exception as e:
+            self.logger.warning(f"Relay settings for study {study_id} unavailable: {e}")
+            return []
+    
+    def _sweep_operation_result(
+        self,
+        operation_id: str,
+        start_time: datetime,
+        analysis: Dict[str, Any]
+    ) -> EtapOperationResult:
+        """EtapOperationResult de uma varredura em processo"""
+        return EtapOperationResult(
+            operation_id=operation_id,
+            status=EtapOperationStatus.COMPLETED,
+            started_at=start_time,
+            completed_at=datetime.now(timezone.utc),
+            result_data={
+                "analysis_type": "selectivity",
+                "in_process_analysis": True,
+                **analysis
+            },
+            performance_metrics={
+                "pairs_analyzed": analysis.get("pairs_analyzed", 0),
+                "fault_levels": analysis.get("fault_levels", 0)
+            }
+        )
+    
+    async def _finish_selectivity_analysis(
+        self,
+        study_id: str,
+        operation_id: str,
+        start_time: datetime,
+        operation_result: EtapOperationResult,
+        use_native: bool
+    ) -> Dict[str, Any]:
+        """Sincroniza, registra métricas/log e monta a resposta da análise"""
+        # Sincronizar com database
+        if operation_result.status == EtapOperationStatus.COMPLETED:
+            await self._sync_analysis_results_to_database(
+                study_id, "selectivity", operation_result.result_data
+            )
+        
+        self._record_performance_metric("selectivity_analysis", start_time, operation_result)
+        
+        await self._log_sync_event("selectivity_analysis", {
+            "operation_id": operation_id,
+            "study_id": study_id,
+            "use_native": use_native,
+            "status": operation_result.status
+        })
+        
+        return {
+            "success": True,
+            "operation_id": operation_id,
+            "study_id": study_id,
+            "analysis_type": "selectivity",
+            "native_analysis": use_native,
+            "operation_result": {
+                "status": operation_result.status,
+                "result_data": operation_result.result_data
+            },
+            "duration_ms": int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
+        }
+    
     # ================================
     # Status & Monitoring
     # ================================
@@ -16,8 +16,9 @@ import json
 import pandas as pd
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, text
 import re
+from starlette.concurrency import run_in_threadpool
 
 from api.models.etap_models import (
     EtapStudy, EtapEquipmentConfig, ProtectionCurve, CoordinationResult,
@@ -25,6 +26,9 @@ from api.models.etap_models import (
     StudyType, StudyStatus, CurveType, ProtectionStandard
 )
 from api.models.equipment_models import RelayEquipment, RelayModel, Manufacturer
+from api.services.tcc_coordination_engine import (
+    RelaySetting, TCCCoordinationEngine, apply_settings_rows, relay_setting_from_config
+)
 
 logger = logging.getLogger(__name__)
 
@@ -522,9 +526,14 @@ class EtapService:
         """
         Executa análise de coordenação
         
+        Curvas de todos os relés do estudo avaliadas de uma vez pelo
+        TCCCoordinationEngine (NumPy), somente nos pares adjacentes na
+        topologia (links upstream/downstream e barra/vão).
+        
         Args:
             study_id: ID do estudo
-            analysis_config: Configurações da análise
+            analysis_config: Configurações da análise (coordination_margin,
+                grid_points, fault_current_max)
             
         Returns:
             Dict com resultados da coordenação
@@ -534,21 +543,13 @@ class EtapService:
             if not study:
                 raise EtapServiceError(f"Study {study_id} not found")
             
-            # Buscar equipamentos do estudo
-            equipment_configs = self.db.query(EtapEquipmentConfig)\
-                                     .filter(EtapEquipmentConfig.study_id == study_id)\
-                                     .all()
-            
-            if len(equipment_configs) < 2:
+            relays = self.load_study_relays(study)
+            if len(relays) < 2:
                 raise EtapServiceError("At least 2 equipment configurations required for coordination analysis")
             
-            # Executar análise de coordenação
-            coordination_results = []
-            for i, upstream in enumerate(equipment_configs):
-                for downstream in equipment_configs[i+1:]:
-                    result = await self._analyze_coordination_pair(upstream, downstream, analysis_config)
-                    if result:
-                        coordination_results.append(result)
+            # Executar análise de coordenação (NumPy fora do event loop)
+            engine = TCCCoordinationEngine.from_config(analysis_config)
+            analysis = await run_in_threadpool(engine.analyze, relays)
             
             # Atualizar status do estudo
             study.status = StudyStatus.COMPLETED
@@ -557,9 +558,7 @@ class EtapService:
             
             summary = {
                 "study_id": study_id,
-                "total_pairs_analyzed": len(coordination_results),
-                "coordinated_pairs": len([r for r in coordination_results if r["is_coordinated"]]),
-                "violations": [r for r in coordination_results if not r["is_coordinated"]],
+                **analysis,
                 "analysis_completed_at": datetime.utcnow().isoformat()
             }
             
@@ -570,6 +569,67 @@ class EtapService:
             self.logger.error(f"Coordination analysis failed: {e}")
             raise EtapServiceError(f"Coordination analysis failed: {str(e)}")
     
+    def load_study_relays(self, study: Union[EtapStudy, int]) -> List[RelaySetting]:
+        """
+        Ajustes de sobrecorrente de todos os relés de um estudo
+        
+        Precedência (do mais fraco ao mais forte): protection_config do
+        EtapEquipmentConfig, ProtectionCurve ativas e os valores programados
+        em protec_ai.relay_settings do equipamento vinculado.
+        
+        Args:
+            study: EtapStudy ou ID do estudo
+            
+        Returns:
+            Lista de RelaySetting (vazia se o estudo não existir)
+        """
+        if not isinstance(study, EtapStudy):
+            study = self.db.query(EtapStudy).filter(EtapStudy.id == int(study)).first()
+            if not study:
+                return []
+        
+        equipment_configs = self.db.query(EtapEquipmentConfig)\
+                                 .filter(EtapEquipmentConfig.study_id == study.id)\
+                                 .all()
+        if not equipment_configs:
+            return []
+        
+        # Curvas ativas de todos os equipamentos em uma consulta
+        curves_by_config: Dict[int, List[ProtectionCurve]] = {}
+        curves = self.db.query(ProtectionCurve)\
+                       .filter(ProtectionCurve.equipment_config_id.in_([c.id for c in equipment_configs]),
+                               ProtectionCurve.is_active.is_(True))\
+                       .all()
+        for curve in curves:
+            curves_by_config.setdefault(curve.equipment_config_id, []).append(curve)
+        
+        # Ajustes programados (relay_settings) de todos os equipamentos em uma consulta
+        rows_by_equipment: Dict[int, List[Dict[str, Any]]] = {}
+        equipment_ids = sorted({c.equipment_id for c in equipment_configs if c.equipment_id is not None})
+        if equipment_ids:
+            try:
+                rows = self.db.execute(text("""
+                    SELECT rs.equipment_id, pf.function_code, rs.parameter_name, rs.parameter_code,
+                           rs.set_value, rs.set_value_text, rs.unit_of_measure
+                    FROM protec_ai.relay_settings rs
+                    LEFT JOIN protec_ai.protection_functions pf ON rs.function_id = pf.id
+                    WHERE rs.equipment_id = ANY(:equipment_ids)
+                      AND rs.deleted_at IS NULL
+                      AND COALESCE(rs.is_enabled, TRUE)
+                """), {"equipment_ids": equipment_ids}).fetchall()
+                for row in rows:
+                    rows_by_equipment.setdefault(row.equipment_id, []).append(dict(row._mapping))
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                self.logger.warning(f"relay_settings unavailable for study {study.id}: {e}")
+        
+        standard = study.protection_standard.value if study.protection_standard else None
+        relays = []
+        for config in equipment_configs:
+            relay = relay_setting_from_config(config, curves_by_config.get(config.id, []), standard)
+            relays.append(apply_settings_rows(relay, rows_by_equipment.get(config.equipment_id, [])))
+        return relays
+    
     # ================================
     # Private Helper Methods
     # ================================
@@ -783,26 +843,3 @@ class EtapService:
             })
         
         return csv_data
-    
-    async def _analyze_coordination_pair(
-        self,
-        upstream: EtapEquipmentConfig,
-        downstream: EtapEquipmentConfig,
-        analysis_config: Optional[Dict]
-    ) -> Optional[Dict]:
-        """
-        Analisa coordenação entre par de equipamentos
-        """
-        # Implementar lógica de análise de coordenação
-        # Baseado nos padrões identificados nos dados reais
-        
-        result = {
-            "upstream_device": upstream.device_name,
-            "downstream_device": downstream.device_name,
-            "is_coordinated": True,  # Placeholder
-            "coordination_time_interval": 0.3,  # Placeholder
-            "margin_time": 0.1,  # Placeholder
-            "selectivity_index": 0.95  # Placeholder
-        }
-        
-        return result
\ No newline at end of file
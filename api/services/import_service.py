@@ -12,7 +12,7 @@ import sys
 import subprocess
 import shutil
 import asyncio
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 from pathlib import Path
 
@@ -341,7 +341,8 @@ class ImportService:
     async def process_file_upload(self, file_data: Dict) -> Dict:
         """
         IMPLEMENTAÇÃO REAL - ZERO MOCKS!
-        Processa upload de arquivo e executa pipeline completo de processamento.
+        Processa upload de arquivo pela ingestão em processo (um arquivo,
+        src.single_file_ingestion) em vez da pipeline completa.
         """
         try:
             # Validações rigorosas
@@ -362,42 +363,24 @@ class ImportService:
                     "error": "Nome do arquivo ou conteúdo não fornecido"
                 }
             
-            # Determinar diretório de destino baseado no formato
-            if file_format in ['txt', 's40']:
-                target_dir = self.base_inputs_path / "txt"
-            elif file_format == 'pdf':
-                target_dir = self.base_inputs_path / "pdf" 
-            elif file_format in ['xlsx', 'xls']:
-                target_dir = self.base_inputs_path / "xlsx"
-            elif file_format == 'csv':
-                target_dir = self.base_inputs_path / "csv"
-            else:
-                target_dir = self.base_inputs_path / "txt"  # fallback
-            
-            # Salvar arquivo no diretório correto
-            file_path = target_dir / filename
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-            
+            # Ingestão em processo: extract → normalize → detect → load só deste relé
+            file_path = self._save_upload(filename, file_content)
             logger.info(f"Arquivo salvo: {file_path}")
+            report = await self._ingest_file(file_path, force=bool(file_data.get("force_reimport")))
             
-            # Executar pipeline completo REAL
-            pipeline_result = await self._execute_real_pipeline()
-            
-            # Registrar no sistema real
             upload_id = f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
             
             return {
-                "success": True,
+                "success": report["success"],
                 "upload_id": upload_id,
                 "filename": filename,
                 "format": file_format,
                 "file_path": str(file_path),
                 "size_mb": len(file_content) / (1024*1024),
-                "status": "processed",
-                "pipeline_result": pipeline_result,
-                "message": f"Arquivo processado com sucesso pelo pipeline real. Dados importados para PostgreSQL.",
-                "next_step": "view_results"
+                "status": report["status"],
+                "pipeline_result": report,
+                "message": self._ingestion_message(report),
+                "next_step": "view_results" if report["success"] else "check_errors"
             }
             
         except Exception as e:
@@ -408,168 +391,51 @@ class ImportService:
                 "type": "critical_error"
             }
     
-    async def _execute_real_pipeline(self) -> Dict:
+    @staticmethod
+    def _upload_dir() -> Path:
+        """UPLOAD_DIR/imports (inputs/ é somente leitura no container da API)"""
+        target_dir = Path(getattr(settings, "UPLOAD_DIR", "uploads")) / "imports"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        return target_dir
+    
+    def _save_upload(self, filename: str, content: bytes) -> Path:
         """
-        EXECUTA PIPELINE COMPLETA REAL - ZERO MOCKS!
-        
-        Fluxo completo:
-        1. Pipeline de extração (pipeline_completo.py)
-        2. Detecção de funções ativas (detect_active_functions.py)
-        3. Importação para PostgreSQL (import_active_functions_to_db.py)
+        Grava o arquivo com o nome original: o nome identifica o equipamento
+        (CSV extraído, equipment_tag, modelo), então reenviar o mesmo relé
+        substitui os dados dele
         """
-        try:
-            start_time = datetime.now()
-            results = {
-                "pipeline": {},
-                "detection": {},
-                "import": {}
-            }
-            
-            # ETAPA 1: Pipeline de Extração
-            logger.info("🔄 ETAPA 1/3: Executando pipeline de extração...")
-            pipeline_script = self.project_root / "src" / "pipeline_completo.py"
-            
-            cmd = [sys.executable, str(pipeline_script)]
-            logger.info(f"Comando: {' '.join(cmd)}")
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(self.project_root)
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                error_msg = stderr.decode('utf-8') if stderr else 'Unknown error'
-                logger.error(f"❌ Pipeline de extração falhou: {error_msg}")
-                return {
-                    "success": False,
-                    "status": "pipeline_failed",
-                    "error": error_msg,
-                    "output": stdout.decode('utf-8') if stdout else ""
-                }
-            
-            results["pipeline"] = {
-                "status": "completed",
-                "output": stdout.decode('utf-8') if stdout else ""
-            }
-            logger.info("✅ ETAPA 1/3: Pipeline de extração concluída")
-            
-            # ETAPA 2: Detecção de Funções Ativas
-            logger.info("🔍 ETAPA 2/3: Detectando funções ativas...")
-            detect_script = self.project_root / "scripts" / "detect_active_functions.py"
-            
-            if detect_script.exists():
-                cmd = [sys.executable, str(detect_script)]
-                logger.info(f"Comando: {' '.join(cmd)}")
-                
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=str(self.project_root)
-                )
-                
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode == 0:
-                    results["detection"] = {
-                        "status": "completed",
-                        "output": stdout.decode('utf-8') if stdout else ""
-                    }
-                    logger.info("✅ ETAPA 2/3: Detecção de funções concluída")
-                else:
-                    logger.warning(f"⚠️ Detecção de funções falhou: {stderr.decode('utf-8') if stderr else 'Unknown'}")
-                    results["detection"] = {
-                        "status": "failed",
-                        "error": stderr.decode('utf-8') if stderr else "Detection failed"
-                    }
-            else:
-                logger.warning("⚠️ Script detect_active_functions.py não encontrado")
-                results["detection"] = {"status": "skipped", "reason": "script_not_found"}
-            
-            # ETAPA 3: Importação para PostgreSQL
-            logger.info("💾 ETAPA 3/3: Importando para PostgreSQL...")
-            import_script = self.project_root / "scripts" / "import_active_functions_to_db.py"
-            
-            if import_script.exists():
-                cmd = [sys.executable, str(import_script)]
-                logger.info(f"Comando: {' '.join(cmd)}")
-                
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=str(self.project_root)
-                )
-                
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode == 0:
-                    output = stdout.decode('utf-8') if stdout else ""
-                    results["import"] = {
-                        "status": "completed",
-                        "output": output
-                    }
-                    
-                    # Extrair estatísticas do output
-                    import re
-                    inserted_match = re.search(r'Inseridos:\s*(\d+)', output)
-                    updated_match = re.search(r'Atualizados:\s*(\d+)', output)
-                    
-                    if inserted_match or updated_match:
-                        results["import"]["stats"] = {
-                            "inserted": int(inserted_match.group(1)) if inserted_match else 0,
-                            "updated": int(updated_match.group(1)) if updated_match else 0
-                        }
-                    
-                    logger.info("✅ ETAPA 3/3: Importação PostgreSQL concluída")
-                else:
-                    logger.warning(f"⚠️ Importação PostgreSQL falhou: {stderr.decode('utf-8') if stderr else 'Unknown'}")
-                    results["import"] = {
-                        "status": "failed",
-                        "error": stderr.decode('utf-8') if stderr else "Import failed"
-                    }
-            else:
-                logger.warning("⚠️ Script import_active_functions_to_db.py não encontrado")
-                results["import"] = {"status": "skipped", "reason": "script_not_found"}
-            
-            # Calcular tempo total
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            # Determinar status geral
-            all_completed = (
-                results["pipeline"]["status"] == "completed" and
-                results["detection"].get("status") in ["completed", "skipped"] and
-                results["import"].get("status") in ["completed", "skipped"]
-            )
-            
-            logger.info(f"✨ Pipeline completa finalizada em {duration:.2f}s")
-            
-            return {
-                "success": all_completed,
-                "status": "pipeline_completed" if all_completed else "pipeline_partial",
-                "message": "Pipeline completa executada com sucesso" if all_completed else "Pipeline executada com avisos",
-                "duration": round(duration, 2),
-                "stages": results,
-                "summary": {
-                    "extraction": results["pipeline"]["status"],
-                    "detection": results["detection"].get("status", "unknown"),
-                    "import": results["import"].get("status", "unknown"),
-                    "total_duration_seconds": round(duration, 2)
-                }
-            }
-                
-        except Exception as e:
-            logger.error(f"❌ Erro crítico executando pipeline completa: {e}")
-            return {
-                "success": False,
-                "status": "execution_error",
-                "error": f"Falha na execução da pipeline: {str(e)}"
-            }
+        file_path = self._upload_dir() / Path(filename).name
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        return file_path
+    
+    async def _ingest_file(self, file_path: Path, force: bool = False) -> Dict:
+        """
+        Executa src.single_file_ingestion no pool de processos da API
+        
+        O extrator fica carregado em cada processo do pool entre uploads;
+        o event loop não bloqueia durante OCR/extração.
+        """
+        from api.core.concurrency import run_in_process
+        from api.services.report_cache import schedule_report_prerender
+        from api.services.statistics_snapshot import invalidate_statistics
+        from src.single_file_ingestion import ingest_file
+        from starlette.concurrency import run_in_threadpool
+        
+        report = await run_in_process(ingest_file, str(file_path), force)
+        if report["status"] == "imported":
+            # Resumo de settings já atualizado pelo importador; expira o cache do processo
+            invalidate_statistics()
+            await run_in_threadpool(schedule_report_prerender)
+        return report
+    
+    @staticmethod
+    def _ingestion_message(report: Dict) -> str:
+        if report["status"] == "unchanged":
+            return f"Arquivo {report['file']} inalterado - dados já importados"
+        if report["success"]:
+            return f"Arquivo {report['file']} importado em {report['total_seconds']:.1f}s"
+        return f"Falha no estágio {report.get('failed_stage', '?')}: {report.get('error')}"
     
     async def validate_file_structure(self, upload_id: str) -> Dict:
         """
@@ -1202,7 +1068,8 @@ class ImportService:
             "data_source": f"robust_multi_source_{primary_source.get('primary_source', 'unknown')}"
         }
     
-    async def reprocess_import(self, import_id: str, options: Dict) -> Dict:
+    async def reprocess_import(self, import_id: str, options: Dict,
+                               progress: Optional[Callable[[float, Optional[str]], None]] = None) -> Dict:
         """
         REPROCESSAMENTO REAL DE IMPORTAÇÃO - ZERO MOCKS!
         
@@ -1211,9 +1078,18 @@ class ImportService:
         - Execução do pipeline real com novas opções
         - Importação real no PostgreSQL
         - Atualização do FileRegistry com novo processamento
+        
+        Executado pelo worker da fila (job "import_reprocess"); `progress`
+        recebe (percentual, etapa). Falhas com "retryable": False (import ou
+        arquivo inexistente) não são repetidas pela fila.
         """
+        def report(percentage: float, step: str) -> None:
+            if progress:
+                progress(percentage, step)
+
         try:
             logger.info(f"🔄 Iniciando reprocessamento real para import_id: {import_id}")
+            report(0.0, "Buscando import original")
             
             # ETAPA 1: Buscar dados do import original
             original_details = await self.get_import_details(import_id)
@@ -1221,7 +1097,8 @@ class ImportService:
                 logger.error(f"Import_id {import_id} não encontrado para reprocessamento")
                 return {
                     "error": f"Import_id {import_id} não encontrado",
-                    "status": "failed"
+                    "status": "failed",
+                    "retryable": False
                 }
             
             # ETAPA 2: Localizar arquivo original
@@ -1230,14 +1107,18 @@ class ImportService:
                 logger.error(f"Arquivo original não encontrado para {import_id}")
                 return {
                     "error": "Arquivo original não localizado",
-                    "status": "failed"
+                    "status": "failed",
+                    "retryable": False
                 }
             
+            report(10.0, "Arquivo original localizado")
+            
             # ETAPA 3: Gerar novo import_id único
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             new_import_id = f"reprocess_{import_id}_{timestamp}"
             
             logger.info(f"🆕 Novo import_id gerado: {new_import_id}")
+            report(15.0, "Executando pipeline")
             
             # ETAPA 4: Executar pipeline real com novas opções
             pipeline_result = await self._execute_real_reprocessing_pipeline(
@@ -1253,11 +1134,13 @@ class ImportService:
                 }
             
             # ETAPA 5: Executar importação real no PostgreSQL
+            report(70.0, "Importando no PostgreSQL")
             db_import_result = await self._execute_reprocessing_db_import(
                 pipeline_result, new_import_id
             )
             
             # ETAPA 6: Atualizar FileRegistry com reprocessamento
+            report(90.0, "Atualizando FileRegistry")
             registry_updated = await self._update_registry_reprocessing(
                 original_details, new_import_id, options, pipeline_result
             )
@@ -1268,6 +1151,9 @@ class ImportService:
             
             logger.info(f"✅ Reprocessamento concluído: {new_import_id}")
             
+            from api.services.report_cache import schedule_report_prerender
+            schedule_report_prerender()
+            
             return {
                 "original_import_id": import_id,
                 "new_import_id": new_import_id,
@@ -2474,37 +2360,46 @@ class ImportService:
         """
         📤 **Upload e Importação de Arquivo**
         
-        Faz upload de arquivo e processa automaticamente.
+        Salva o arquivo em UPLOAD_DIR/imports e o importa em processo
+        (extract → normalize → detect → load), tocando apenas as linhas do
+        equipamento enviado. O retorno traz o tempo de cada estágio.
         """
+        from src.single_file_ingestion import FILE_TYPES
+        
+        upload_id = f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filename = Path(file.filename or "").name
+        
+        if Path(filename).suffix.lower() not in FILE_TYPES:
+            return {
+                "success": False,
+                "error": f"Formato não suportado: {filename}",
+                "supported_formats": sorted(FILE_TYPES),
+                "upload_id": None,
+                "status": "unsupported_format",
+                "timestamp": datetime.now().isoformat()
+            }
+        
         try:
-            # Salvar arquivo temporariamente
-            import tempfile
-            import shutil
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            upload_id = f"upload_{timestamp}"
-            
-            # Criar diretório temporário
-            temp_dir = Path(tempfile.gettempdir()) / "protecai_uploads"
-            temp_dir.mkdir(exist_ok=True)
-            
-            # Salvar arquivo
-            file_path = temp_dir / f"{upload_id}_{file.filename}"
+            file_path = self._upload_dir() / filename
             with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+                while chunk := await file.read(1024 * 1024):
+                    buffer.write(chunk)
+            
+            report = await self._ingest_file(file_path, force=force_reimport)
             
-            # Simular processamento bem-sucedido
             return {
-                "success": True,
+                "success": report["success"],
                 "upload_id": upload_id,
-                "filename": file.filename,
+                "filename": filename,
                 "file_size": file_path.stat().st_size,
                 "upload_date": datetime.now().isoformat(),
-                "status": "uploaded_successfully",
-                "message": f"File {file.filename} uploaded and processed successfully",
-                "processing_started": True,
-                "estimated_completion": "2-5 minutes",
-                "data_source": "file_upload_service"
+                "status": report["status"],
+                "message": self._ingestion_message(report),
+                "stages": report["stages"],
+                "stage_timings": report["stage_timings"],
+                "total_seconds": report["total_seconds"],
+                "error": report.get("error"),
+                "data_source": "single_file_ingestion"
             }
             
         except Exception as e:
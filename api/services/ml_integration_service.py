@@ -11,10 +11,12 @@ import uuid
 from uuid import UUID
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import Callable, List, Dict, Any, Optional, Union, Tuple
 from pathlib import Path
 import asyncio
 
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 from sqlalchemy.orm import Session
@@ -22,7 +24,9 @@ from sqlalchemy import and_, or_, func, desc
 from fastapi import HTTPException
 import httpx
 
+from api.core.config import settings
 from api.core.database import get_db
+from api.core.job_queue import PermanentJobError
 from api.models.ml_models import (
     MLAnalysisJob, MLCoordinationResult, MLSelectivityResult, 
     MLSimulationResult, MLRecommendation, MLDataSnapshot,
@@ -36,6 +40,10 @@ from api.services.ml_data_service import MLDataService
 from api.services.ml_results_service import MLResultsService
 from api.services.etap_service import EtapService
 
+BULK_UPLOAD_FORMATS = {".csv": "csv", ".xlsx": "xlsx", ".xls": "xls"}
+BULK_DEVICE_COLUMNS = ("equipment_tag", "equipment_id", "device_name", "relay_tag", "tag")
+BULK_CSV_CHUNK_ROWS = 50_000
+
 
 class MLIntegrationService:
     """
@@ -765,57 +773,194 @@ class MLIntegrationService:
         # Simplified uptime calculation
         return 86400.0  # 24 hours
     
-    async def process_job_async(self, job_uuid: str) -> None:
+    async def run_analysis_job(self, job_uuid: str,
+                               progress: Optional[Callable[[float, Optional[str]], None]] = None,
+                               final_attempt: bool = True) -> Dict[str, Any]:
         """
-        Process ML analysis job asynchronously in background
-        
+        Execute an ML analysis job (called by the job worker, api.core.job_worker)
+
+        Progress is written to MLAnalysisJob.progress_percentage at each step and
+        mirrored to `progress`. Errors are re-raised so the queue can retry; the
+        job is only marked FAILED on the final attempt.
+
         Args:
             job_uuid: UUID of the job to process
+            progress: Optional callback(percentage, message)
+            final_attempt: Whether a failure is definitive
+
+        Returns:
+            Summary stored as the queue job result
         """
+        _, uuid_obj = self.adapt_job_uuid(job_uuid)
+        job = self.db.query(MLAnalysisJob).filter(MLAnalysisJob.uuid == uuid_obj).first()
+        if not job:
+            raise PermanentJobError(f"Job {job_uuid} not found")
+        if job.status in (MLJobStatus.COMPLETED, MLJobStatus.CANCELLED):
+            logger.info(f"⏭️  Job {job_uuid} already {job.status.value}, skipping")
+            return {"job_uuid": str(job.uuid), "status": job.status.value}
+
+        def report(percentage: float, message: str) -> None:
+            job.progress_percentage = percentage
+            self.db.commit()
+            if progress:
+                progress(percentage, message)
+
         try:
-            # Buscar job no banco
-            job = self.db.query(MLAnalysisJob).filter(MLAnalysisJob.uuid == job_uuid).first()
-            if not job:
-                logger.error(f"Job {job_uuid} not found for async processing")
-                return
-            
-            # Atualizar status para RUNNING
             job.status = MLJobStatus.RUNNING
             job.started_at = datetime.utcnow()
-            self.db.commit()
-            
-            logger.info(f"🚀 Starting async processing for job {job_uuid} ({job.analysis_type.value})")
-            
-            # Simular processamento ML (futura implementação real)
-            import asyncio
-            await asyncio.sleep(2)  # Simular tempo de processamento
-            
-            # Atualizar job como concluído
+            job.error_message = None
+            report(0.0, "started")
+
+            logger.info(f"🚀 Starting processing for job {job_uuid} ({job.analysis_type.value})")
+
+            # Simular processamento ML em etapas (futura implementação real)
+            steps = ("data_extraction", "model_execution", "results_validation", "finalization")
+            for index, step in enumerate(steps, start=1):
+                await asyncio.sleep(0.5)
+                self.db.refresh(job)
+                if job.status == MLJobStatus.CANCELLED:
+                    logger.info(f"🛑 Job {job_uuid} cancelled at step {step}")
+                    return {"job_uuid": str(job.uuid), "status": job.status.value}
+                report(round(100.0 * index / len(steps), 1), step)
+
             job.status = MLJobStatus.COMPLETED
             job.completed_at = datetime.utcnow()
-            job.progress_percentage = 100.0
-            
-            if job.started_at:
-                job.execution_time_seconds = (job.completed_at - job.started_at).total_seconds()
-            
+            job.execution_time_seconds = (job.completed_at - job.started_at).total_seconds()
             self.db.commit()
-            
+
             logger.info(f"✅ Job {job_uuid} completed successfully")
-            
+            return {"job_uuid": str(job.uuid), "status": job.status.value,
+                    "execution_time_seconds": job.execution_time_seconds}
+
         except Exception as e:
             logger.error(f"❌ Job {job_uuid} failed: {str(e)}")
-            
-            # Marcar job como falhado
-            try:
-                job = self.db.query(MLAnalysisJob).filter(MLAnalysisJob.uuid == job_uuid).first()
-                if job:
-                    job.status = MLJobStatus.FAILED
-                    job.error_message = str(e)
-                    job.completed_at = datetime.utcnow()
-                    self.db.commit()
-            except Exception as update_error:
-                logger.error(f"Failed to update job status: {update_error}")
-    
+            self.db.rollback()
+            job = self.db.query(MLAnalysisJob).filter(MLAnalysisJob.uuid == uuid_obj).first()
+            if job and job.status != MLJobStatus.CANCELLED:
+                job.status = MLJobStatus.FAILED if final_attempt else MLJobStatus.PENDING
+                job.error_message = str(e)
+                job.completed_at = datetime.utcnow() if final_attempt else None
+                self.db.commit()
+            raise
+
+    async def process_job_async(self, job_uuid: str) -> None:
+        """
+        Process ML analysis job in-process (single attempt, errors are logged)
+
+        Args:
+            job_uuid: UUID of the job to process
+        """
+        try:
+            await self.run_analysis_job(job_uuid)
+        except Exception as e:
+            logger.error(f"Job {job_uuid} processing failed: {e}")
+
+    async def process_bulk_upload(self, file) -> Dict[str, Any]:
+        """
+        Store an uploaded bulk data file for background processing
+
+        The file is streamed to UPLOAD_DIR/ml_bulk in chunks; parsing happens
+        in the "ml_bulk_upload" job (process_bulk_data).
+        """
+        upload_id = f"ml_upload_{uuid.uuid4().hex[:12]}"
+        filename = Path(file.filename or "upload").name
+        suffix = Path(filename).suffix.lower()
+        if suffix not in BULK_UPLOAD_FORMATS:
+            raise HTTPException(status_code=400,
+                                detail=f"Unsupported format '{suffix}'. Use: {', '.join(BULK_UPLOAD_FORMATS)}")
+
+        target_dir = Path(settings.UPLOAD_DIR) / "ml_bulk"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        file_path = target_dir / f"{upload_id}_{filename}"
+
+        size = 0
+        with open(file_path, "wb") as buffer:
+            while chunk := await file.read(1024 * 1024):
+                buffer.write(chunk)
+                size += len(chunk)
+
+        logger.info(f"📦 Bulk upload {upload_id}: {filename} ({size / 1024 / 1024:.2f} MB)")
+        return {
+            "upload_id": upload_id,
+            "file_path": str(file_path),
+            "file_info": {
+                "filename": filename,
+                "format": BULK_UPLOAD_FORMATS[suffix],
+                "size_bytes": size,
+                "content_type": file.content_type,
+            },
+        }
+
+    async def process_bulk_data(self, upload_id: str, file_path: str,
+                                progress: Optional[Callable[[float, Optional[str]], None]] = None) -> Dict[str, Any]:
+        """
+        Parse a stored bulk upload and register it as an MLDataSnapshot
+
+        CSV files are read in chunks (progress by file position); Excel
+        workbooks are read sheet by sheet.
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise PermanentJobError(f"Bulk upload file not found: {file_path}")
+
+        data_format = BULK_UPLOAD_FORMATS.get(path.suffix.lower(), "csv")
+        size = path.stat().st_size
+        records = missing = 0
+        columns: List[str] = []
+        devices = set()
+
+        def consume(frame: pd.DataFrame) -> None:
+            nonlocal records, missing
+            records += len(frame)
+            missing += int(frame.isna().sum().sum())
+            for column in frame.columns:
+                if column not in columns:
+                    columns.append(str(column))
+            device_column = next((c for c in BULK_DEVICE_COLUMNS if c in frame.columns), None)
+            if device_column:
+                devices.update(frame[device_column].dropna().astype(str).unique())
+
+        if data_format == "csv":
+            with open(path, "rb") as handle:
+                for chunk in pd.read_csv(handle, chunksize=BULK_CSV_CHUNK_ROWS, low_memory=False):
+                    consume(chunk)
+                    if progress and size:
+                        progress(min(95.0, 95.0 * handle.tell() / size), f"{records} records")
+        else:
+            sheets = pd.ExcelFile(path).sheet_names
+            for index, sheet in enumerate(sheets, start=1):
+                consume(pd.read_excel(path, sheet_name=sheet))
+                if progress:
+                    progress(95.0 * index / len(sheets), f"sheet {sheet}")
+
+        cells = records * max(len(columns), 1)
+        snapshot = MLDataSnapshot(
+            snapshot_name=f"bulk_upload_{upload_id}",
+            snapshot_description=f"Bulk upload {path.name}",
+            total_records=records,
+            total_parameters=len(columns),
+            total_devices=len(devices),
+            data_size_mb=round(size / 1024 / 1024, 3),
+            data_format=data_format,
+            data_structure={"columns": columns},
+            data_completeness_percentage=round(100.0 * (1 - missing / cells), 2) if records else 0.0,
+            missing_values_count=missing,
+            created_by="bulk_upload",
+            file_path=str(path),
+        )
+        self.db.add(snapshot)
+        self.db.commit()
+
+        logger.info(f"✅ Bulk upload {upload_id}: {records} records, {len(columns)} columns")
+        return {
+            "upload_id": upload_id,
+            "snapshot_uuid": str(snapshot.uuid),
+            "total_records": records,
+            "total_parameters": len(columns),
+            "total_devices": len(devices),
+            "missing_values_count": missing,
+        }
+
     async def job_to_summary_response(self, job: MLAnalysisJob) -> MLJobSummaryResponse:
         """Convert MLAnalysisJob model to MLJobSummaryResponse"""
         try:
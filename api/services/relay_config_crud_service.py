@@ -37,10 +37,12 @@ Usage:
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from fastapi import HTTPException
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from api.services.statistics_snapshot import refresh_settings_summary, invalidate_statistics
+from api.services.report_cache import REPORT_CACHE
 from api.schemas.relay_config_schemas import (
     RelaySettingCreate,
     RelaySettingUpdate,
@@ -53,6 +55,38 @@ from api.schemas.relay_config_schemas import (
 logger = logging.getLogger(__name__)
 
 
+def limit_violation(set_value, min_limit, max_limit) -> Optional[str]:
+    """Mensagem de erro se set_value estiver fora dos limites (None = válido)"""
+    if set_value is None:
+        return None
+    if min_limit is not None and set_value < min_limit:
+        return f"Valor {set_value} abaixo do limite mínimo {min_limit}"
+    if max_limit is not None and set_value > max_limit:
+        return f"Valor {set_value} acima do limite máximo {max_limit}"
+    return None
+
+
+def bulk_update_values(updates) -> Tuple[str, Dict[str, Any]]:
+    """
+    Linhas do VALUES do UPDATE em lote e seus parâmetros.
+    
+    Cada linha tem tipos explícitos (CAST): sem eles um NULL na primeira
+    linha faria o PostgreSQL inferir a coluna como text.
+    """
+    rows = []
+    params = {}
+    for n, item in enumerate(updates):
+        rows.append(
+            f"(CAST(:id_{n} AS integer), CAST(:set_value_{n} AS numeric), "
+            f"CAST(:is_enabled_{n} AS boolean), CAST(:notes_{n} AS text))"
+        )
+        params[f"id_{n}"] = item.setting_id
+        params[f"set_value_{n}"] = item.set_value
+        params[f"is_enabled_{n}"] = item.is_enabled
+        params[f"notes_{n}"] = item.notes
+    return ", ".join(rows), params
+
+
 class RelayConfigCRUDService:
     """
     Serviço para operações CRUD em configurações de relés.
@@ -176,7 +210,10 @@ class RelayConfigCRUDService:
                 "notes": data.notes
             }).fetchone()
             
+            refresh_settings_summary(self.db, [data.equipment_id])
             self.db.commit()
+            invalidate_statistics()
+            REPORT_CACHE.invalidate([data.equipment_id])
             
             logger.info(f"✅ Configuração criada: ID={result.id}, param={data.parameter_name}, value={data.set_value}")
             
@@ -240,21 +277,9 @@ class RelayConfigCRUDService:
                 )
             
             # 2. Validar set_value dentro dos limites (se aplicável)
-            if data.set_value is not None:
-                min_limit = existing.min_limit
-                max_limit = existing.max_limit
-                
-                if min_limit is not None and data.set_value < min_limit:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Valor {data.set_value} abaixo do limite mínimo {min_limit}"
-                    )
-                
-                if max_limit is not None and data.set_value > max_limit:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Valor {data.set_value} acima do limite máximo {max_limit}"
-                    )
+            error = limit_violation(data.set_value, existing.min_limit, existing.max_limit)
+            if error:
+                raise HTTPException(status_code=400, detail=error)
             
             # 3. Construir query de atualização dinamicamente
             update_fields = []
@@ -306,6 +331,7 @@ class RelayConfigCRUDService:
             
             result = self.db.execute(update_query, params).fetchone()
             self.db.commit()
+            REPORT_CACHE.invalidate([result.equipment_id])
             
             logger.info(f"✅ Configuração atualizada: ID={setting_id}, campos={list(params.keys())}")
             
@@ -350,43 +376,78 @@ class RelayConfigCRUDService:
         
         IMPORTANTE: Operação atômica - se uma atualização falhar, TODAS são revertidas.
         
+        Operação baseada em conjunto (custo fixo de round trips, independente
+        do tamanho do lote):
+        1. Um SELECT ... WHERE id = ANY(:ids) FOR UPDATE carrega e trava as linhas
+        2. Existência e limites validados em memória (todos os erros reportados)
+        3. Um UPDATE ... FROM (VALUES ...) aplica valores e auditoria
+           (modified_by, modification_reason, updated_at)
+        
         Args:
             request: Lista de atualizações a aplicar
             
         Returns:
             BulkUpdateResponse com resumo da operação
-            
-        Raises:
-            HTTPException 400: Se alguma atualização falhar
         """
-        updated_ids = []
+        updates = request.updates
+        setting_ids = [item.setting_id for item in updates]
         errors = []
         
         try:
-            for item in request.updates:
-                try:
-                    # Criar objeto RelaySettingUpdate para cada item
-                    update_data = RelaySettingUpdate(
-                        set_value=item.set_value,
-                        is_enabled=item.is_enabled,
-                        notes=item.notes,
-                        modified_by=request.modified_by
-                    )
-                    
-                    # Atualizar (reutiliza método individual)
-                    result = self.update_setting(item.setting_id, update_data)
-                    updated_ids.append(result.id)
-                
-                except HTTPException as e:
-                    errors.append({
-                        "setting_id": item.setting_id,
-                        "error": e.detail
-                    })
-                    # Em bulk update, um erro quebra tudo
-                    raise
+            # 1. Carregar todas as configurações alvo (travadas até o commit)
+            existing_query = text("""
+                SELECT id, equipment_id, min_value as min_limit, max_value as max_limit
+                FROM protec_ai.relay_settings
+                WHERE id = ANY(:setting_ids) AND deleted_at IS NULL
+                FOR UPDATE
+            """)
+            existing = {
+                row.id: row
+                for row in self.db.execute(existing_query, {"setting_ids": setting_ids}).fetchall()
+            }
+            
+            # 2. Validar em memória
+            seen = set()
+            for item in updates:
+                if item.setting_id in seen:
+                    error = "Configuração repetida no lote"
+                elif item.setting_id not in existing:
+                    error = f"Configuração com ID {item.setting_id} não encontrada"
+                else:
+                    row = existing[item.setting_id]
+                    error = limit_violation(item.set_value, row.min_limit, row.max_limit)
+                seen.add(item.setting_id)
+                if error:
+                    errors.append({"setting_id": item.setting_id, "error": error})
+            
+            if errors:
+                # Em bulk update, um erro quebra tudo
+                raise HTTPException(status_code=400, detail=errors[0]["error"])
+            
+            # 3. Aplicar tudo em um único UPDATE
+            values_sql, params = bulk_update_values(updates)
+            params["modified_by"] = request.modified_by
+            update_query = text(f"""
+                UPDATE protec_ai.relay_settings rs
+                SET set_value = COALESCE(v.set_value, rs.set_value),
+                    is_enabled = COALESCE(v.is_enabled, rs.is_enabled),
+                    modification_reason = COALESCE(v.notes, rs.modification_reason),
+                    modified_by = COALESCE(CAST(:modified_by AS varchar), rs.modified_by),
+                    updated_at = NOW()
+                FROM (VALUES {values_sql}) AS v(id, set_value, is_enabled, notes)
+                WHERE rs.id = v.id
+                RETURNING rs.id
+            """)
+            updated_ids = sorted(row.id for row in self.db.execute(update_query, params).fetchall())
+            
+            if len(updated_ids) != len(setting_ids):
+                raise RuntimeError(
+                    f"{len(updated_ids)} de {len(setting_ids)} configurações atualizadas"
+                )
             
             # Se chegou aqui, tudo OK
             self.db.commit()
+            REPORT_CACHE.invalidate(row.equipment_id for row in existing.values())
             
             logger.info(f"✅ Bulk update concluído: {len(updated_ids)} configurações atualizadas")
             
@@ -407,7 +468,7 @@ class RelayConfigCRUDService:
                 success=False,
                 message="Falha ao atualizar configurações (rollback aplicado)",
                 updated_count=0,
-                failed_count=len(request.updates),
+                failed_count=len(updates),
                 updated_ids=[],
                 errors=errors if errors else [{"error": str(e)}]
             )
@@ -432,7 +493,7 @@ class RelayConfigCRUDService:
         try:
             # Verificar se existe
             check_query = text("""
-                SELECT id, parameter_name FROM protec_ai.relay_settings
+                SELECT id, equipment_id, parameter_name FROM protec_ai.relay_settings
                 WHERE id = :setting_id AND deleted_at IS NULL
             """)
             existing = self.db.execute(check_query, {"setting_id": setting_id}).fetchone()
@@ -464,6 +525,7 @@ class RelayConfigCRUDService:
                     WHERE id = :setting_id
                 """)
                 self.db.execute(delete_query, {"setting_id": setting_id})
+                refresh_settings_summary(self.db, [existing.equipment_id])
                 
                 undo_expires_at = None
                 
@@ -472,6 +534,8 @@ class RelayConfigCRUDService:
                 message = f"Configuração '{existing.parameter_name}' excluída permanentemente"
             
             self.db.commit()
+            invalidate_statistics()
+            REPORT_CACHE.invalidate([existing.equipment_id])
             
             return DeleteResponse(
                 success=True,
@@ -508,7 +572,7 @@ class RelayConfigCRUDService:
                 UPDATE protec_ai.relay_settings
                 SET deleted_at = NULL, updated_at = NOW()
                 WHERE id = :setting_id AND deleted_at IS NOT NULL
-                RETURNING id
+                RETURNING id, equipment_id
             """)
             
             result = self.db.execute(restore_query, {"setting_id": setting_id}).fetchone()
@@ -520,6 +584,8 @@ class RelayConfigCRUDService:
                 )
             
             self.db.commit()
+            invalidate_statistics()
+            REPORT_CACHE.invalidate([result.equipment_id])
             
             logger.info(f"✅ Configuração {setting_id} restaurada (undo)")
             
@@ -622,10 +688,13 @@ class RelayConfigCRUDService:
                     WHERE id = :equipment_id
                 """)
                 self.db.execute(delete_equip, {"equipment_id": equipment_id})
+                refresh_settings_summary(self.db, [equipment_id])
                 
                 logger.warning(f"⚠️ Hard delete cascade: equipamento {equipment_id} + {count.total} configurações REMOVIDOS PERMANENTEMENTE")
             
             self.db.commit()
+            invalidate_statistics()
+            REPORT_CACHE.invalidate([equipment_id])
             
             return {
                 "success": True,
@@ -41,6 +41,8 @@ import csv
 import io
 import json
 
+from api.services.report_cache import CACHEABLE_FORMATS, REPORT_CACHE, report_version
+
 # PDF generation
 try:
     from reportlab.lib import colors
@@ -338,6 +340,126 @@ class RelayConfigReportService:
             logger.error(f"❌ Erro ao gerar relatório: {e}")
             raise HTTPException(status_code=500, detail=f"Erro ao gerar relatório: {str(e)}")
     
+    def get_report_version(self, equipment_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Tag do equipamento e versão dos dados do relatório (uma consulta leve).
+        
+        A versão muda quando algum ajuste ativo é criado, alterado ou removido
+        (max(updated_at) + contagem) ou quando o equipamento é alterado.
+        
+        Args:
+            equipment_id: ID do equipamento
+        
+        Returns:
+            Dict com equipment_tag e version, ou None se o equipamento não existe
+        """
+        query = text("""
+            SELECT 
+                e.equipment_tag,
+                e.updated_at as equipment_updated_at,
+                MAX(rs.updated_at) as settings_updated_at,
+                COUNT(rs.id) as settings_count
+            FROM protec_ai.relay_equipment e
+            LEFT JOIN protec_ai.relay_settings rs
+                ON rs.equipment_id = e.id AND rs.deleted_at IS NULL
+            WHERE e.id = :equipment_id
+            GROUP BY e.id, e.equipment_tag, e.updated_at
+        """)
+        row = self.db.execute(query, {"equipment_id": equipment_id}).fetchone()
+        if not row:
+            return None
+        return {
+            'equipment_tag': row.equipment_tag,
+            'version': report_version(row.settings_updated_at, row.settings_count, row.equipment_updated_at)
+        }
+    
+    def get_cached_report(
+        self,
+        equipment_id: int,
+        format: str,
+        include_disabled: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Relatório CSV/XLSX/PDF servido do cache em disco (REPORT_CACHE).
+        
+        Só renderiza (generate_configuration_report) quando não há arquivo
+        para a versão atual dos dados do equipamento.
+        
+        Args:
+            equipment_id: ID do equipamento
+            format: 'csv', 'xlsx' ou 'pdf'
+            include_disabled: Incluir funções/parâmetros desabilitados
+        
+        Returns:
+            Dicionário com data (arquivo aberto do cache ou bytes recém-gerados),
+            format, filename, equipment_tag e cached (True = acerto no cache)
+        
+        Raises:
+            HTTPException 400: Formato inválido
+            HTTPException 404: Equipamento não encontrado
+        """
+        fmt = format.lower()
+        if fmt not in CACHEABLE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Formato inválido: {format}")
+        
+        info = self.get_report_version(equipment_id)
+        if info is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Equipamento ID {equipment_id} não encontrado"
+            )
+        
+        result = {
+            'format': fmt,
+            'filename': self._get_filename(info, fmt),
+            'equipment_tag': info['equipment_tag']
+        }
+        
+        handle = REPORT_CACHE.open(equipment_id, fmt, include_disabled, info['version'])
+        if handle is not None:
+            logger.info(f"📦 Relatório em cache: equipment_id={equipment_id}, format={fmt}")
+            return {**result, 'data': handle, 'cached': True}
+        
+        data = self._render_into_cache(equipment_id, fmt, include_disabled, info['version'])
+        return {**result, 'data': data, 'cached': False}
+    
+    def prerender_reports(self, equipment_id: int, formats: List[str]) -> int:
+        """
+        Renderiza no cache os formatos ainda não gerados para a versão atual.
+        
+        Args:
+            equipment_id: ID do equipamento
+            formats: Formatos a garantir no cache
+        
+        Returns:
+            Quantidade de relatórios renderizados (0 = já estavam no cache)
+        """
+        info = self.get_report_version(equipment_id)
+        if info is None:
+            return 0
+        
+        rendered = 0
+        for fmt in formats:
+            if not REPORT_CACHE.contains(equipment_id, fmt, False, info['version']):
+                self._render_into_cache(equipment_id, fmt, False, info['version'])
+                rendered += 1
+        return rendered
+    
+    def _render_into_cache(self, equipment_id: int, fmt: str, include_disabled: bool, version: str) -> bytes:
+        """Gera o relatório e grava no cache (falha de disco não impede o download)"""
+        result = self.generate_configuration_report(
+            equipment_id=equipment_id,
+            format=fmt,
+            include_disabled=include_disabled
+        )
+        data = result['data'].encode('utf-8') if isinstance(result['data'], str) else result['data']
+        
+        try:
+            REPORT_CACHE.put(equipment_id, fmt, include_disabled, version, data)
+        except OSError as e:
+            logger.warning(f"⚠️  Relatório não gravado no cache: {e}")
+        return data
+    
     def _get_filename(self, equipment: Dict[str, Any], extension: str) -> str:
         """Gera nome de arquivo para download."""
         tag = equipment.get('equipment_tag', 'UNKNOWN').replace('/', '_')
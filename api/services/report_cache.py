@@ -0,0 +1,205 @@
+"""
+Cache de relatórios de configuração renderizados
+================================================
+
+Durante o comissionamento a mesma folha de ajustes de um relé é baixada
+várias vezes; cada download refazia as consultas (equipamento, funções,
+ajustes) e a renderização do PDF/XLSX.
+
+Os arquivos renderizados ficam em disco local (REPORT_CACHE_DIR), um por
+(equipamento, formato, include_disabled, versão). A versão é derivada de
+max(updated_at) e da contagem dos ajustes ativos do equipamento (e do
+updated_at do equipamento): qualquer alteração gera outra chave, então um
+arquivo desatualizado nunca é servido - mesmo com vários workers ou
+alterações feitas fora da API (importador).
+
+- LRU limitado por tamanho: um acerto renova o mtime do arquivo; ao gravar,
+  os arquivos mais antigos são removidos até o total caber em
+  REPORT_CACHE_MAX_MB.
+- Invalidação explícita: o CRUD de configurações remove os arquivos do
+  equipamento alterado (libera o disco na hora).
+- Pré-renderização opcional após importações (REPORT_PRERENDER_AFTER_IMPORT):
+  um job REPORT_PRERENDER na fila renderiza todos os equipamentos.
+
+O diretório é compartilhado pelos processos do mesmo host; gravações são
+atômicas (arquivo temporário + os.replace).
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tipo de job da pré-renderização (handler em api.services.background_jobs)
+REPORT_PRERENDER = "report_prerender"
+
+# Atraso do job: importações em sequência viram uma única pré-renderização
+PRERENDER_DELAY_SECONDS = 30.0
+
+CACHEABLE_FORMATS = ("csv", "xlsx", "pdf")
+
+
+def report_version(settings_updated_at: Any, settings_count: int, equipment_updated_at: Any = None) -> str:
+    """Versão dos dados do relatório (muda a cada alteração de ajustes)"""
+    raw = f"{settings_updated_at}|{settings_count}|{equipment_updated_at}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def prerender_formats() -> List[str]:
+    """Formatos de REPORT_PRERENDER_FORMATS válidos para o cache"""
+    formats = [fmt.strip().lower() for fmt in settings.REPORT_PRERENDER_FORMATS.split(",")]
+    return [fmt for fmt in formats if fmt in CACHEABLE_FORMATS]
+
+
+class ReportCache:
+    """
+    Arquivos renderizados em disco com remoção LRU por tamanho.
+
+    Examples:
+        >>> cache = ReportCache("outputs/report_cache", max_bytes=512 * 1024 * 1024)
+        >>> handle = cache.open(7, "pdf", False, version)  # None = não está no cache
+        >>> cache.put(7, "pdf", False, version, pdf_bytes)
+        >>> cache.invalidate([7])
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def _variant(equipment_id: int, format: str, include_disabled: bool) -> str:
+        suffix = "-all" if include_disabled else ""
+        return f"eq{int(equipment_id)}_{format}{suffix}"
+
+    def path_for(self, equipment_id: int, format: str, include_disabled: bool, version: str) -> Path:
+        """Arquivo de uma versão do relatório"""
+        return self.directory / f"{self._variant(equipment_id, format, include_disabled)}_{version}.{format}"
+
+    def open(self, equipment_id: int, format: str, include_disabled: bool,
+             version: str) -> Optional[BinaryIO]:
+        """
+        Arquivo do cache aberto para leitura (None se ausente).
+
+        Devolve o arquivo já aberto: uma remoção concorrente (LRU, invalidação)
+        não interrompe o download em andamento.
+        """
+        path = self.path_for(equipment_id, format, include_disabled, version)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # recência para o LRU
+        except OSError:
+            pass
+        return handle
+
+    def contains(self, equipment_id: int, format: str, include_disabled: bool, version: str) -> bool:
+        return self.path_for(equipment_id, format, include_disabled, version).exists()
+
+    def put(self, equipment_id: int, format: str, include_disabled: bool, version: str,
+            data: bytes) -> Path:
+        """Grava o relatório, remove versões anteriores dele e aplica o limite de tamanho"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(equipment_id, format, include_disabled, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp_", suffix=f".{format}")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        variant = self._variant(equipment_id, format, include_disabled)
+        for stale in self.directory.glob(f"{variant}_*.{format}"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        self.evict(keep=path)
+        return path
+
+    def invalidate(self, equipment_ids: Iterable[int]) -> int:
+        """Remove todos os relatórios dos equipamentos; devolve arquivos removidos"""
+        removed = 0
+        if not self.directory.exists():
+            return removed
+        for equipment_id in {int(i) for i in equipment_ids if i is not None}:
+            for path in self.directory.glob(f"eq{equipment_id}_*"):
+                try:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                except OSError as e:
+                    # Chamado após o commit: não deve falhar a operação
+                    logger.warning(f"⚠️  Relatório em cache não removido ({path.name}): {e}")
+        if removed:
+            logger.info(f"🗑️  Cache de relatórios: {removed} arquivo(s) invalidado(s)")
+        return removed
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.directory.glob("eq*_*"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Remove os arquivos menos usados até o total caber em max_bytes"""
+        entries = self._entries()
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+        if removed:
+            logger.info(f"♻️  Cache de relatórios: {removed} arquivo(s) removido(s) (LRU)")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries() if self.directory.exists() else []
+        return {
+            "files": len(entries),
+            "bytes": sum(stat.st_size for _, stat in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+REPORT_CACHE = ReportCache(settings.REPORT_CACHE_DIR, settings.REPORT_CACHE_MAX_MB * 1024 * 1024)
+
+
+def schedule_report_prerender() -> Optional[Dict[str, Any]]:
+    """
+    Enfileira a pré-renderização de todos os equipamentos (se habilitada).
+
+    Um job pendente absorve os pedidos seguintes (dedupe_key) e só começa
+    após PRERENDER_DELAY_SECONDS. Falhas não afetam a importação.
+    """
+    if not settings.REPORT_PRERENDER_AFTER_IMPORT or not prerender_formats():
+        return None
+
+    from api.core.database import SessionLocal
+    from api.core.job_queue import JobQueue
+
+    db = SessionLocal()
+    try:
+        return JobQueue(db).enqueue(
+            REPORT_PRERENDER, {"formats": prerender_formats()},
+            priority=-10, dedupe_key=REPORT_PRERENDER, delay_seconds=PRERENDER_DELAY_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Pré-renderização de relatórios não agendada: {e}")
+        return None
+    finally:
+        db.close()
@@ -30,7 +30,7 @@ Version: 1.0.0
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -40,6 +40,13 @@ import io
 from enum import Enum
 import re
 
+from api.core.concurrency import blocking, cpu_bound
+from api.core.database import run_read
+from api.core.snapshot_cache import Snapshot
+from api.services.report_streaming import iter_csv_rows
+from api.services.statistics_snapshot import statistics_snapshot
+from src.relay_settings_stats import SUMMARY_TABLE
+
 logger = logging.getLogger(__name__)
 
 
@@ -191,6 +198,9 @@ class ReportService:
     **ARQUITETURA:**
         Utiliza queries SQL diretas via SQLAlchemy engine para performance otimizada.
         Evita ORM overhead em operações de leitura massiva.
+        Leituras passam por run_read (AsyncSession/asyncpg quando disponível,
+        senão engine síncrono no threadpool) e as exportações (CSV/XLSX/PDF)
+        rodam no threadpool: nenhuma operação bloqueia o event loop.
         
     **PRINCÍPIOS:**
         - ROBUSTO: Tratamento de exceções em todas as operações
@@ -200,6 +210,7 @@ class ReportService:
     
     Attributes:
         db (Session): Sessão SQLAlchemy para operações transacionais
+        async_db (AsyncSession | None): Sessão assíncrona de get_async_db
         engine: Engine SQLAlchemy para queries diretas de alta performance
     
     Examples:
@@ -210,8 +221,9 @@ class ReportService:
         [{'code': 'GE', 'name': 'General Electric', 'count': 8}, ...]
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, async_db=None):
         self.db = db
+        self.async_db = async_db
         from api.core.database import engine
         self.engine = engine
     
@@ -296,159 +308,175 @@ class ReportService:
             - Todos os números são REAIS do banco de dados
             - Performance típica: ~25ms para 50 equipamentos + 198k configs
         """
+        snapshot = await self.get_metadata_snapshot()
+        return snapshot.value
+    
+    async def get_metadata_snapshot(self) -> Snapshot:
+        """
+        Metadados como snapshot em cache (valor + corpo JSON + ETag).
+        
+        Recalculados no máximo uma vez por STATISTICS_CACHE_TTL (ou após
+        escritas da API); /metadata responde com o corpo pronto e 304 quando
+        o ETag do cliente é o atual.
+        """
         try:
-            logger.info("Iniciando busca de metadados REAIS...")
-            with self.engine.connect() as conn:
-                # NOVO: Estatísticas gerais do sistema (DADOS REAIS!)
-                system_stats_query = text("""
-                    SELECT 
-                        (SELECT COUNT(DISTINCT id) FROM protec_ai.relay_equipment) as total_equipments,
-                        (SELECT COUNT(*) FROM protec_ai.relay_settings) as total_settings,
-                        (SELECT COUNT(*) FROM protec_ai.relay_settings WHERE is_active = true) as active_settings,
-                        (SELECT COUNT(DISTINCT id) FROM protec_ai.protection_functions) as total_functions,
-                        (SELECT COUNT(*) FROM protec_ai.multipart_groups) as multipart_groups,
-                        (SELECT COUNT(DISTINCT substation_name) FROM protec_ai.relay_equipment WHERE substation_name IS NOT NULL) as total_substations
-                """)
-                system_stats = conn.execute(system_stats_query).fetchone()
-                logger.info(f"📊 Stats reais: {system_stats.total_equipments} equipamentos, {system_stats.total_settings} configurações")
-                
-                # Manufacturers with equipment count
-                # Keep all manufacturers present in `fabricantes`, counts may be zero.
-                manufacturers_query = text("""
-                    SELECT f.codigo_fabricante as code,
-                           f.nome_completo as name,
-                           COUNT(DISTINCT re.id) as count
-                    FROM protec_ai.fabricantes f
-                    LEFT JOIN protec_ai.relay_models rm ON rm.manufacturer_id = f.id
-                    LEFT JOIN protec_ai.relay_equipment re ON re.relay_model_id = rm.id
-                    GROUP BY f.codigo_fabricante, f.nome_completo
-                    ORDER BY f.nome_completo
-                """)
-                manufacturers = conn.execute(manufacturers_query).fetchall()
+            return await statistics_snapshot("report_metadata", self._load_metadata, self.async_db)
+            
+        except Exception as e:
+            logger.error(f"Erro ao buscar metadados: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Erro ao buscar metadados: {str(e)}")
+    
+    def _load_metadata(self, conn) -> Dict[str, Any]:
+        """Consultas e consolidação de get_metadata (conn: Connection ou Session)"""
+        # NOVO: Estatísticas gerais do sistema (DADOS REAIS!)
+        # Contagens de relay_settings vêm do resumo incremental (relay_settings_summary)
+        system_stats_query = text(f"""
+            SELECT 
+                (SELECT COUNT(DISTINCT id) FROM protec_ai.relay_equipment) as total_equipments,
+                (SELECT COALESCE(SUM(total_settings), 0) FROM {SUMMARY_TABLE}) as total_settings,
+                (SELECT COALESCE(SUM(active_settings), 0) FROM {SUMMARY_TABLE}) as active_settings,
+                (SELECT MAX(refreshed_at) FROM {SUMMARY_TABLE}) as settings_refreshed_at,
+                (SELECT COUNT(DISTINCT id) FROM protec_ai.protection_functions) as total_functions,
+                (SELECT COUNT(*) FROM protec_ai.multipart_groups) as multipart_groups,
+                (SELECT COUNT(DISTINCT substation_name) FROM protec_ai.relay_equipment WHERE substation_name IS NOT NULL) as total_substations
+        """)
+        system_stats = conn.execute(system_stats_query).fetchone()
+        logger.info(f"📊 Stats reais: {system_stats.total_equipments} equipamentos, {system_stats.total_settings} configurações")
 
-                # Models with equipment count and manufacturer code
-                # Use LEFT JOIN so models with zero equipment are still present in relay_models
-                # We'll deduplicate/normalize similar model names in Python to avoid redundant entries
-                models_query = text("""
-                    SELECT rm.model_code as code,
-                           rm.model_name as name,
-                           f.codigo_fabricante as manufacturer_code,
-                           COUNT(DISTINCT re.id) as count
-                    FROM protec_ai.relay_models rm
-                    LEFT JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
-                    LEFT JOIN protec_ai.relay_equipment re ON re.relay_model_id = rm.id
-                    GROUP BY rm.model_code, rm.model_name, f.codigo_fabricante
-                    ORDER BY f.codigo_fabricante, rm.model_name
-                """)
-                raw_models = conn.execute(models_query).fetchall()
+        # Manufacturers with equipment count
+        # Keep all manufacturers present in `fabricantes`, counts may be zero.
+        manufacturers_query = text("""
+            SELECT f.codigo_fabricante as code,
+                   f.nome_completo as name,
+                   COUNT(DISTINCT re.id) as count
+            FROM protec_ai.fabricantes f
+            LEFT JOIN protec_ai.relay_models rm ON rm.manufacturer_id = f.id
+            LEFT JOIN protec_ai.relay_equipment re ON re.relay_model_id = rm.id
+            GROUP BY f.codigo_fabricante, f.nome_completo
+            ORDER BY f.nome_completo
+        """)
+        manufacturers = conn.execute(manufacturers_query).fetchall()
 
-                # Post-process models to deduplicate near-duplicates like 'SEPAM S40' vs 'SEPAM_S40'
-                models_map: Dict[str, Dict[str, Any]] = {}
-                for m in raw_models:
-                    code = (m.code or '').strip()
-                    name = (m.name or '').strip()
-                    mfr_code = (m.manufacturer_code or '').strip()
-                    count = int(m.count or 0)
+        # Models with equipment count and manufacturer code
+        # Use LEFT JOIN so models with zero equipment are still present in relay_models
+        # We'll deduplicate/normalize similar model names in Python to avoid redundant entries
+        models_query = text("""
+            SELECT rm.model_code as code,
+                   rm.model_name as name,
+                   f.codigo_fabricante as manufacturer_code,
+                   COUNT(DISTINCT re.id) as count
+            FROM protec_ai.relay_models rm
+            LEFT JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
+            LEFT JOIN protec_ai.relay_equipment re ON re.relay_model_id = rm.id
+            GROUP BY rm.model_code, rm.model_name, f.codigo_fabricante
+            ORDER BY f.codigo_fabricante, rm.model_name
+        """)
+        raw_models = conn.execute(models_query).fetchall()
 
-                    # Normalize key: uppercase, replace _ with space, remove extra spaces
-                    norm_key = ' '.join(code.replace('_', ' ').upper().split())
-                    
-                    # Skip unknown/empty models with zero count
-                    if (not norm_key or norm_key == 'UNKNOWN MODEL') and count == 0:
-                        continue
+        # Post-process models to deduplicate near-duplicates like 'SEPAM S40' vs 'SEPAM_S40'
+        models_map: Dict[str, Dict[str, Any]] = {}
+        for m in raw_models:
+            code = (m.code or '').strip()
+            name = (m.name or '').strip()
+            mfr_code = (m.manufacturer_code or '').strip()
+            count = int(m.count or 0)
 
-                    if norm_key not in models_map:
-                        # First occurrence
-                        models_map[norm_key] = {
-                            'code': code,
-                            'name': name,
-                            'manufacturer_code': mfr_code,
-                            'count': count
-                        }
-                    else:
-                        # Duplicate found - aggregate
-                        models_map[norm_key]['count'] += count
-                        
-                        # Prefer longer, more descriptive name (e.g., "Schneider Electric SEPAM S40" over "SEPAM S40")
-                        if len(name) > len(models_map[norm_key]['name']):
-                            models_map[norm_key]['name'] = name
-                            models_map[norm_key]['code'] = code  # Update code too
+            # Normalize key: uppercase, replace _ with space, remove extra spaces
+            norm_key = ' '.join(code.replace('_', ' ').upper().split())
 
-                # Convert map to sorted list
-                # IMPORTANTE: NÃO filtramos count=0 aqui - mantemos TODOS os modelos para flexibilidade
-                # O frontend decidirá quais mostrar baseado em count > 0
-                models = list(models_map.values())
-                models = sorted(models, key=lambda x: (x.get('manufacturer_code') or '', x.get('name') or ''))
+            # Skip unknown/empty models with zero count
+            if (not norm_key or norm_key == 'UNKNOWN MODEL') and count == 0:
+                continue
 
-                # Barras (barramento) with equipment count
-                bays_query = text("""
-                    SELECT COALESCE(re.barra_nome, '') as name,
-                           COUNT(*) as count
-                    FROM protec_ai.relay_equipment re
-                    WHERE re.barra_nome IS NOT NULL AND re.barra_nome != ''
-                    GROUP BY re.barra_nome
-                    ORDER BY re.barra_nome
-                """)
-                bays = conn.execute(bays_query).fetchall()
+            if norm_key not in models_map:
+                # First occurrence
+                models_map[norm_key] = {
+                    'code': code,
+                    'name': name,
+                    'manufacturer_code': mfr_code,
+                    'count': count
+                }
+            else:
+                # Duplicate found - aggregate
+                models_map[norm_key]['count'] += count
 
-                # Statuses with counts (ensure canonical list present)
-                statuses_query = text("""
-                    SELECT re.status as code,
-                           COUNT(*) as count
-                    FROM protec_ai.relay_equipment re
-                    GROUP BY re.status
-                """)
-                statuses = {row.code: row.count for row in conn.execute(statuses_query).fetchall()}
+                # Prefer longer, more descriptive name (e.g., "Schneider Electric SEPAM S40" over "SEPAM S40")
+                if len(name) > len(models_map[norm_key]['name']):
+                    models_map[norm_key]['name'] = name
+                    models_map[norm_key]['code'] = code  # Update code too
 
-                # Map status codes to labels (pt-BR)
-                status_labels = {
-                    EquipmentStatus.ACTIVE.value: "Ativo",
-                    EquipmentStatus.BLOQUEIO.value: "Bloqueio",
-                    EquipmentStatus.EM_CORTE.value: "Em Corte",
-                    EquipmentStatus.MANUTENCAO.value: "Manutenção",
-                    EquipmentStatus.DECOMMISSIONED.value: "Descomissionado",
-                }
+        # Convert map to sorted list
+        # IMPORTANTE: NÃO filtramos count=0 aqui - mantemos TODOS os modelos para flexibilidade
+        # O frontend decidirá quais mostrar baseado em count > 0
+        models = list(models_map.values())
+        models = sorted(models, key=lambda x: (x.get('manufacturer_code') or '', x.get('name') or ''))
 
-                result_statuses = []
-                for code, label in status_labels.items():
-                    count = int(statuses.get(code, 0))
-                    if count > 0:  # FILTER: Only statuses with equipment
-                        result_statuses.append({
-                            "code": code,
-                            "label": label,
-                            "count": count
-                        })
+        # Barras (barramento) with equipment count
+        bays_query = text("""
+            SELECT COALESCE(re.barra_nome, '') as name,
+                   COUNT(*) as count
+            FROM protec_ai.relay_equipment re
+            WHERE re.barra_nome IS NOT NULL AND re.barra_nome != ''
+            GROUP BY re.barra_nome
+            ORDER BY re.barra_nome
+        """)
+        bays = conn.execute(bays_query).fetchall()
 
-                logger.info(f"Metadados carregados: {len(manufacturers)} fabricantes, {len(models)} modelos, {len(bays)} barramentos")
-                
-                return {
-                    # NOVO: Estatísticas gerais do sistema (DADOS REAIS)
-                    "system_statistics": {
-                        "total_equipments": int(system_stats.total_equipments),
-                        "total_settings": int(system_stats.total_settings),
-                        "active_settings": int(system_stats.active_settings),
-                        "inactive_settings": int(system_stats.total_settings) - int(system_stats.active_settings),
-                        "total_protection_functions": int(system_stats.total_functions),
-                        "multipart_groups": int(system_stats.multipart_groups),
-                        "total_substations": int(system_stats.total_substations),
-                        "last_updated": datetime.now().isoformat()
-                    },
-                    "manufacturers": [
-                        {"code": m.code, "name": m.name, "count": int(m.count)}
-                        for m in manufacturers
-                        if int(m.count) > 0  # FILTER: Only manufacturers with equipment
-                    ],
-                    "models": models,  # Already dictionaries from models_map
-                    "bays": [
-                        {"name": b.name, "count": int(b.count)}
-                        for b in bays
-                    ],
-                    "statuses": result_statuses
-                }
-                
-        except Exception as e:
-            logger.error(f"Erro ao buscar metadados: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Erro ao buscar metadados: {str(e)}")
+        # Statuses with counts (ensure canonical list present)
+        statuses_query = text("""
+            SELECT re.status as code,
+                   COUNT(*) as count
+            FROM protec_ai.relay_equipment re
+            GROUP BY re.status
+        """)
+        statuses = {row.code: row.count for row in conn.execute(statuses_query).fetchall()}
+
+        # Map status codes to labels (pt-BR)
+        status_labels = {
+            EquipmentStatus.ACTIVE.value: "Ativo",
+            EquipmentStatus.BLOQUEIO.value: "Bloqueio",
+            EquipmentStatus.EM_CORTE.value: "Em Corte",
+            EquipmentStatus.MANUTENCAO.value: "Manutenção",
+            EquipmentStatus.DECOMMISSIONED.value: "Descomissionado",
+        }
+
+        result_statuses = []
+        for code, label in status_labels.items():
+            count = int(statuses.get(code, 0))
+            if count > 0:  # FILTER: Only statuses with equipment
+                result_statuses.append({
+                    "code": code,
+                    "label": label,
+                    "count": count
+                })
+
+        logger.info(f"Metadados carregados: {len(manufacturers)} fabricantes, {len(models)} modelos, {len(bays)} barramentos")
+
+        return {
+            # NOVO: Estatísticas gerais do sistema (DADOS REAIS)
+            "system_statistics": {
+                "total_equipments": int(system_stats.total_equipments),
+                "total_settings": int(system_stats.total_settings),
+                "active_settings": int(system_stats.active_settings),
+                "inactive_settings": int(system_stats.total_settings) - int(system_stats.active_settings),
+                "total_protection_functions": int(system_stats.total_functions),
+                "multipart_groups": int(system_stats.multipart_groups),
+                "total_substations": int(system_stats.total_substations),
+                # Momento da última escrita de configurações (estável entre recálculos → ETag estável)
+                "last_updated": (system_stats.settings_refreshed_at or datetime.now()).isoformat()
+            },
+            "manufacturers": [
+                {"code": m.code, "name": m.name, "count": int(m.count)}
+                for m in manufacturers
+                if int(m.count) > 0  # FILTER: Only manufacturers with equipment
+            ],
+            "models": models,  # Already dictionaries from models_map
+            "bays": [
+                {"name": b.name, "count": int(b.count)}
+                for b in bays
+            ],
+            "statuses": result_statuses
+        }
     
     async def get_filtered_equipments(
         self,
@@ -561,38 +589,41 @@ class ReportService:
             
             base_query += " ORDER BY re.equipment_tag"
             
-            with self.engine.connect() as conn:
-                result = conn.execute(text(base_query), params).fetchall()
-                
-                return [
-                    {
-                        "id": row.id,
-                        "tag_reference": row.equipment_tag,
-                        "serial_number": row.serial_number,
-                        "substation": row.substation_name,
-                        "bay": row.barra_nome,
-                        "status": row.status,
-                        "description": row.position_description,
-                        "model": {
-                            "name": row.model_name,
-                            "code": row.model_code,
-                            "voltage_class": row.voltage_class,
-                            "technology": row.technology
-                        },
-                        "manufacturer": {
-                            "name": row.manufacturer_name,
-                            "country": row.manufacturer_country
-                        },
-                        "created_at": row.created_at.isoformat() if row.created_at else None
-                    }
-                    for row in result
-                ]
-                
+            result = await run_read(
+                lambda conn: conn.execute(text(base_query), params).fetchall(),
+                self.async_db
+            )
+            
+            return [
+                {
+                    "id": row.id,
+                    "tag_reference": row.equipment_tag,
+                    "serial_number": row.serial_number,
+                    "substation": row.substation_name,
+                    "bay": row.barra_nome,
+                    "status": row.status,
+                    "description": row.position_description,
+                    "model": {
+                        "name": row.model_name,
+                        "code": row.model_code,
+                        "voltage_class": row.voltage_class,
+                        "technology": row.technology
+                    },
+                    "manufacturer": {
+                        "name": row.manufacturer_name,
+                        "country": row.manufacturer_country
+                    },
+                    "created_at": row.created_at.isoformat() if row.created_at else None
+                }
+                for row in result
+            ]
+            
         except Exception as e:
             logger.error(f"Erro ao filtrar equipamentos: {e}")
             raise HTTPException(status_code=500, detail=f"Erro ao filtrar equipamentos: {str(e)}")
     
-    async def export_to_csv(self, equipments: List[Dict[str, Any]]) -> str:
+    @blocking
+    def export_to_csv(self, equipments: List[Dict[str, Any]]) -> str:
         """
         Exporta lista de equipamentos para formato CSV padronizado.
         
@@ -620,19 +651,17 @@ class ReportService:
             Tag, Serial Number, Model, Model Code, Voltage Class, Technology,
             Manufacturer, Country, Bay, Substation, Status, Description, Created At
         """
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Headers
-        writer.writerow([
+        return b"".join(self.iter_equipment_csv(equipments)).decode("utf-8")
+    
+    def iter_equipment_csv(self, equipments: List[Dict[str, Any]]) -> Iterator[bytes]:
+        """CSV de export_to_csv em blocos (corpo de StreamingResponse)"""
+        header = [
             'Tag', 'Serial Number', 'Model', 'Model Code', 'Voltage Class', 'Technology',
             'Manufacturer', 'Country', 'Barra', 'Substation', 'Status',
             'Description', 'Created At'
-        ])
-        
-        # Data rows
-        for eq in equipments:
-            writer.writerow([
+        ]
+        rows = (
+            [
                 eq['tag_reference'],
                 eq['serial_number'],
                 eq['model']['name'],
@@ -646,11 +675,13 @@ class ReportService:
                 eq['status'],
                 eq['description'],
                 eq['created_at']
-            ])
-        
-        return output.getvalue()
+            ]
+            for eq in equipments
+        )
+        return iter_csv_rows(header, rows)
     
-    async def export_to_xlsx(
+    @cpu_bound
+    def export_to_xlsx(
         self, 
         equipments: List[Dict[str, Any]],
         manufacturer: Optional[str] = None,
@@ -862,7 +893,8 @@ class ReportService:
         
         canvas.restoreState()
     
-    async def export_to_pdf(
+    @cpu_bound
+    def export_to_pdf(
         self, 
         equipments: List[Dict[str, Any]],
         manufacturer: Optional[str] = None,
@@ -1049,19 +1081,13 @@ class ReportService:
     # ===================================================================
     # 🆕 MÉTODOS PARA NOVOS RELATÓRIOS TÉCNICOS
     # ===================================================================
+    # CSV/XLSX de setpoints, coordenação, bay e manutenção saem em streaming
+    # direto da consulta (api/services/report_streaming.py)
     
     # --- 1. FUNÇÕES DE PROTEÇÃO ---
     
-    async def export_protection_functions_csv(self, data: List[Dict]) -> bytes:
-        """Exporta funções de proteção para CSV"""
-        output = io.StringIO()
-        if data:
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        return output.getvalue().encode('utf-8')
-    
-    async def export_protection_functions_xlsx(self, data: List[Dict]) -> bytes:
+    @cpu_bound
+    def export_protection_functions_xlsx(self, data: List[Dict]) -> bytes:
         """Exporta funções de proteção para Excel"""
         import openpyxl
         from openpyxl.styles import Font, PatternFill, Alignment
@@ -1106,7 +1132,8 @@ class ReportService:
         wb.save(output)
         return output.getvalue()
     
-    async def export_protection_functions_pdf(self, data: List[Dict]) -> bytes:
+    @cpu_bound
+    def export_protection_functions_pdf(self, data: List[Dict]) -> bytes:
         """Exporta funções de proteção para PDF com cabeçalho PETROBRAS"""
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4, landscape
@@ -1156,48 +1183,8 @@ class ReportService:
     
     # --- 2. SETPOINTS CRÍTICOS ---
     
-    async def export_setpoints_csv(self, data: List[Dict]) -> bytes:
-        output = io.StringIO()
-        if data:
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        return output.getvalue().encode('utf-8')
-    
-    async def export_setpoints_xlsx(self, data: List[Dict]) -> bytes:
-        import openpyxl
-        from openpyxl.styles import Font, PatternFill, Alignment
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Setpoints Críticos"
-        
-        headers = ['TAG', 'Fabricante', 'Modelo', 'Código', 'Parâmetro', 'Valor', 'Unidade', 'Função', 'Categoria']
-        ws.append(headers)
-        
-        for cell in ws[1]:
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="CC0066", end_color="CC0066", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
-        
-        for item in data:
-            ws.append([
-                item.get('equipment_tag'),
-                item.get('manufacturer_name'),
-                item.get('model_name'),
-                item.get('parameter_code'),
-                item.get('parameter_name'),
-                item.get('set_value'),
-                item.get('unit_symbol'),
-                item.get('function_name'),
-                item.get('category')
-            ])
-        
-        output = io.BytesIO()
-        wb.save(output)
-        return output.getvalue()
-    
-    async def export_setpoints_pdf(self, data: List[Dict]) -> bytes:
+    @cpu_bound
+    def export_setpoints_pdf(self, data: List[Dict]) -> bytes:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4, landscape
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer
@@ -1253,29 +1240,8 @@ class ReportService:
     
     # --- 3-6. DEMAIS RELATÓRIOS (implementação similar) ---
     
-    async def export_coordination_csv(self, data: List[Dict]) -> bytes:
-        output = io.StringIO()
-        if data:
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        return output.getvalue().encode('utf-8')
-    
-    async def export_coordination_xlsx(self, data: List[Dict]) -> bytes:
-        import openpyxl
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Coordenação"
-        if data:
-            headers = list(data[0].keys())
-            ws.append(headers)
-            for item in data:
-                ws.append(list(item.values()))
-        output = io.BytesIO()
-        wb.save(output)
-        return output.getvalue()
-    
-    async def export_coordination_pdf(self, data: List[Dict]) -> bytes:
+    @cpu_bound
+    def export_coordination_pdf(self, data: List[Dict]) -> bytes:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4, landscape
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer
@@ -1320,29 +1286,8 @@ class ReportService:
         )
         return buffer.getvalue()
     
-    async def export_by_bay_csv(self, data: List[Dict]) -> bytes:
-        output = io.StringIO()
-        if data:
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        return output.getvalue().encode('utf-8')
-    
-    async def export_by_bay_xlsx(self, data: List[Dict]) -> bytes:
-        import openpyxl
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Por Bay"
-        if data:
-            headers = list(data[0].keys())
-            ws.append(headers)
-            for item in data:
-                ws.append(list(item.values()))
-        output = io.BytesIO()
-        wb.save(output)
-        return output.getvalue()
-    
-    async def export_by_bay_pdf(self, data: List[Dict]) -> bytes:
+    @cpu_bound
+    def export_by_bay_pdf(self, data: List[Dict]) -> bytes:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4, landscape
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer
@@ -1387,29 +1332,8 @@ class ReportService:
         )
         return buffer.getvalue()
     
-    async def export_maintenance_csv(self, data: List[Dict]) -> bytes:
-        output = io.StringIO()
-        if data:
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        return output.getvalue().encode('utf-8')
-    
-    async def export_maintenance_xlsx(self, data: List[Dict]) -> bytes:
-        import openpyxl
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Manutenção"
-        if data:
-            headers = list(data[0].keys())
-            ws.append(headers)
-            for item in data:
-                ws.append(list(item.values()))
-        output = io.BytesIO()
-        wb.save(output)
-        return output.getvalue()
-    
-    async def export_maintenance_pdf(self, data: List[Dict]) -> bytes:
+    @cpu_bound
+    def export_maintenance_pdf(self, data: List[Dict]) -> bytes:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4, landscape
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer
@@ -1455,7 +1379,8 @@ class ReportService:
         )
         return buffer.getvalue()
     
-    async def export_executive_csv(self, data: Dict) -> bytes:
+    @blocking
+    def export_executive_csv(self, data: Dict) -> bytes:
         output = io.StringIO()
         writer = csv.writer(output)
         writer.writerow(['Métrica', 'Valor'])
@@ -1465,7 +1390,8 @@ class ReportService:
                     writer.writerow([f"{key}_{k}", v])
         return output.getvalue().encode('utf-8')
     
-    async def export_executive_xlsx(self, data: Dict) -> bytes:
+    @cpu_bound
+    def export_executive_xlsx(self, data: Dict) -> bytes:
         import openpyxl
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -1479,7 +1405,8 @@ class ReportService:
         wb.save(output)
         return output.getvalue()
     
-    async def export_executive_pdf(self, data: Dict) -> bytes:
+    @cpu_bound
+    def export_executive_pdf(self, data: Dict) -> bytes:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer, Paragraph
@@ -0,0 +1,245 @@
+"""
+Exportação de relatórios em streaming
+=====================================
+
+Os relatórios técnicos (setpoints, coordenação, por bay, manutenção)
+carregavam o resultado inteiro da consulta em uma lista de dicts e montavam
+o arquivo completo em memória antes do primeiro byte. Para o relatório de
+setpoints da frota inteira (~200 mil configurações) isso significava
+centenas de MB por requisição.
+
+Aqui cada formato tem memória limitada ao lote:
+
+- Leitura: cursor do lado do servidor (psycopg2 named cursor via
+  `stream_results`), lotes de EXPORT_BATCH_SIZE linhas.
+- CSV: gerador que escreve e envia um lote por vez - o download começa
+  com o primeiro lote.
+- XLSX: xlsxwriter em modo `constant_memory` (cada linha é gravada em disco
+  ao ser escrita) no pool de processos, direto do cursor para um arquivo
+  temporário que é enviado em blocos e removido ao final da resposta.
+- PDF: tabelas continuam limitadas a PDF_TABLE_MAX_ROWS linhas, agora com
+  LIMIT no SQL em vez de ler tudo e descartar.
+
+Leituras em streaming usam o engine síncrono (server-side cursor não existe
+em run_read); geradores síncronos do StreamingResponse rodam no threadpool.
+"""
+
+import io
+import os
+import csv
+import logging
+import tempfile
+import itertools
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from api.core.concurrency import run_in_process
+from api.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Linhas por lote lidas do cursor / escritas por bloco de CSV
+EXPORT_BATCH_SIZE = 2000
+
+# Tamanho dos blocos enviados ao cliente
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Linhas das tabelas de relatórios PDF (o PDF é um resumo, não a base inteira)
+PDF_TABLE_MAX_ROWS = 100
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+Batches = Iterable[List[Dict[str, Any]]]
+
+
+def iter_query_batches(sql: str, params: Optional[Dict[str, Any]] = None,
+                       batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lotes de linhas (dicts) lidos com cursor do lado do servidor.
+
+    A conexão volta ao pool quando o gerador termina ou é fechado (cliente
+    desconectou).
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(
+            text(sql), params or {}
+        )
+        for partition in result.mappings().partitions(batch_size):
+            yield [dict(row) for row in partition]
+
+
+def iter_csv_rows(header: Sequence[str], rows: Iterable[Sequence[Any]],
+                  chunk_rows: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """CSV (UTF-8) em blocos de `chunk_rows` linhas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_csv(batches: Batches) -> Iterator[bytes]:
+    """
+    CSV de lotes de dicts, um bloco por lote; colunas = chaves da primeira
+    linha (mesmo formato do csv.DictWriter anterior). Sem linhas, corpo vazio.
+    """
+    buffer = io.StringIO()
+    writer = None
+    for batch in batches:
+        if not batch:
+            continue
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(batch[0].keys()))
+            writer.writeheader()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def write_xlsx(path: Union[str, Path], batches: Batches, sheet_title: str,
+               headers: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None,
+               header_color: Optional[str] = None) -> int:
+    """
+    Grava os lotes em XLSX com memória constante (xlsxwriter constant_memory).
+
+    Args:
+        path: Arquivo de saída
+        batches: Lotes de dicts
+        sheet_title: Nome da planilha
+        headers: Cabeçalho (None = chaves da primeira linha)
+        columns: Chaves de cada coluna (None = todas, na ordem da consulta)
+        header_color: Cor de fundo do cabeçalho (ex.: "#CC0066"; None = sem estilo)
+
+    Returns:
+        Linhas de dados gravadas
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(str(path), {
+        "constant_memory": True,
+        "remove_timezone": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    worksheet = workbook.add_worksheet(sheet_title[:31])
+    header_format = None
+    if header_color:
+        header_format = workbook.add_format({
+            "bold": True, "font_color": "#FFFFFF", "bg_color": header_color, "align": "center",
+        })
+
+    rows = 0
+    try:
+        # Com headers/columns explícitos o cabeçalho sai mesmo sem dados
+        if headers is not None:
+            worksheet.write_row(0, 0, headers, header_format)
+        for batch in batches:
+            for item in batch:
+                if columns is None:
+                    columns = list(item.keys())
+                if headers is None:
+                    headers = list(item.keys())
+                    worksheet.write_row(0, 0, headers, header_format)
+                rows += 1
+                # Linhas em ordem crescente: exigência do modo constant_memory
+                worksheet.write_row(rows, 0, [item.get(column) for column in columns])
+    finally:
+        workbook.close()
+    return rows
+
+
+def render_query_xlsx(path: str, sql: str, params: Optional[Dict[str, Any]], sheet_title: str,
+                      headers: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None,
+                      header_color: Optional[str] = None) -> int:
+    """Consulta → XLSX em disco (ponto de entrada do pool de processos)"""
+    rows = write_xlsx(path, iter_query_batches(sql, params), sheet_title, headers, columns, header_color)
+    logger.info(f"📗 XLSX '{sheet_title}': {rows} linhas em streaming")
+    return rows
+
+
+async def render_query_xlsx_file(sql: str, params: Optional[Dict[str, Any]], sheet_title: str,
+                                 headers: Optional[Sequence[str]] = None,
+                                 columns: Optional[Sequence[str]] = None,
+                                 header_color: Optional[str] = None) -> Path:
+    """
+    Gera o XLSX da consulta em um arquivo temporário (no pool de processos).
+
+    O chamador envia o arquivo com export_response(path, ...), que o remove
+    ao final da resposta.
+    """
+    fd, path = tempfile.mkstemp(prefix="protecai_export_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        await run_in_process(render_query_xlsx, path, sql, params, sheet_title, headers, columns, header_color)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+    return Path(path)
+
+
+def iter_file(file: Union[str, Path, BinaryIO], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Conteúdo do arquivo (caminho ou arquivo aberto, fechado ao final) em blocos"""
+    with (file if hasattr(file, "read") else open(file, "rb")) as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def iter_bytes(content: bytes, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Bytes já gerados em blocos (BytesIO iteraria por linhas)"""
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+
+
+async def start_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Gera o primeiro bloco antes da resposta (no threadpool): erros de
+    consulta viram HTTP 500 em vez de um download truncado.
+    """
+    first = await run_in_threadpool(next, chunks, b"")
+    return itertools.chain([first], chunks)
+
+
+def export_response(content: Union[bytes, str, Path, BinaryIO, Iterator[bytes]], format: str,
+                    filename: str, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    StreamingResponse de download para bytes, texto, arquivo temporário
+    (removido após o envio), arquivo aberto (fechado após o envio) ou
+    gerador de blocos. `headers` complementa/substitui os cabeçalhos padrão.
+    """
+    background = None
+    if isinstance(content, Path):
+        background = BackgroundTask(content.unlink, missing_ok=True)
+        body = iter_file(content)
+    elif hasattr(content, "read"):
+        body = iter_file(content)
+    elif isinstance(content, str):
+        body = iter_bytes(content.encode("utf-8"))
+    elif isinstance(content, bytes):
+        body = iter_bytes(content)
+    else:
+        body = content
+
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}", **(headers or {})},
+        background=background,
+    )
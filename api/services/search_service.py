@@ -0,0 +1,191 @@
+"""
+Search Service - Busca typeahead unificada
+==========================================
+
+Uma única consulta (UNION ALL) procura o termo em tags de equipamentos,
+modelos, fabricantes, barras e códigos de parâmetros e devolve as
+sugestões ordenadas por relevância:
+
+1. valor começa com o termo (prefixo)
+2. word_similarity(termo, valor) do pg_trgm - tolera erros de digitação
+   ("P12" encontra "P122", "sepam" encontra "SEPAM S40")
+3. valor mais curto primeiro
+
+Os filtros `ILIKE '%termo%'` e `termo <% valor` são atendidos pelos índices
+GIN trigrama de docs/sql/migration_trigram_search_2025-11-22.sql. Sem a
+extensão pg_trgm no banco a busca continua funcionando só com ILIKE
+(sem tolerância a erros, relevância aproximada pelo tamanho do valor).
+"""
+
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from api.core.database import run_read
+
+logger = logging.getLogger(__name__)
+
+# Sugestões por tipo antes da ordenação final
+PER_KIND_LIMIT = 20
+
+# Termos menores que isso geram padrões sem trigramas (varredura completa)
+MIN_QUERY_LENGTH = 2
+
+
+class SearchSource(NamedTuple):
+    """Coluna pesquisável de um tipo de sugestão"""
+    table: str
+    column: str
+    ref_column: Optional[str]  # id do registro (None = valores agregados, ex.: barras)
+
+
+SEARCH_SOURCES: Dict[str, SearchSource] = {
+    "tag": SearchSource("relay_equipment", "equipment_tag", "id"),
+    "model": SearchSource("relay_models", "model_name", "id"),
+    "manufacturer": SearchSource("fabricantes", "nome_completo", "id"),
+    "barra": SearchSource("relay_equipment", "barra_nome", None),
+    "parameter": SearchSource("relay_settings", "parameter_code", None),
+}
+
+# pg_trgm instalado no banco (detectado na primeira busca)
+_trigram_available: Optional[bool] = None
+
+
+def like_escape(term: str) -> str:
+    """Escapa curingas do LIKE digitados pelo usuário (\\ é o escape padrão)"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_typeahead_sql(kinds: Sequence[str], trigram: bool, schema: str = "protec_ai") -> str:
+    """
+    SQL da busca typeahead para os tipos informados.
+
+    Parâmetros nomeados: :q (termo), :pattern ('%termo%'), :prefix
+    ('termo%'), :per_kind e :limit.
+
+    Args:
+        kinds: Tipos de SEARCH_SOURCES
+        trigram: Usar operadores do pg_trgm (<%, word_similarity)
+        schema: Schema das tabelas (o benchmark usa um schema próprio)
+    """
+    parts = []
+    for kind in kinds:
+        source = SEARCH_SOURCES[kind]
+        column = f"src.{source.column}"
+        ref = f"src.{source.ref_column}" if source.ref_column else "NULL::integer"
+        if trigram:
+            match = f"({column} ILIKE :pattern OR :q <% {column})"
+            score = f"word_similarity(:q, {column})"
+        else:
+            match = f"{column} ILIKE :pattern"
+            score = f"length(CAST(:q AS text))::float / GREATEST(length({column}), 1)"
+        group_by = f"{column}, {ref}" if source.ref_column else column
+        parts.append(f"""
+            (SELECT '{kind}' AS kind, {column} AS value, {ref} AS ref_id,
+                    COUNT(*) AS occurrences, {score} AS score,
+                    {column} ILIKE :prefix AS prefix_match
+             FROM {schema}.{source.table} src
+             WHERE {column} IS NOT NULL AND {match}
+             GROUP BY {group_by}
+             ORDER BY prefix_match DESC, score DESC, length({column}), {column}
+             LIMIT :per_kind)""")
+
+    return (
+        "SELECT kind, value, ref_id, occurrences, score, prefix_match FROM ("
+        + "\n            UNION ALL".join(parts)
+        + "\n        ) AS suggestions"
+        + "\n        ORDER BY prefix_match DESC, score DESC, length(value), value"
+        + "\n        LIMIT :limit"
+    )
+
+
+def detect_trigram(conn) -> bool:
+    """pg_trgm instalado no banco (resultado guardado para o processo)"""
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = bool(conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar())
+        if not _trigram_available:
+            logger.warning("⚠️ pg_trgm não instalado: typeahead apenas com ILIKE "
+                           "(aplicar docs/sql/migration_trigram_search_2025-11-22.sql)")
+    return _trigram_available
+
+
+class SearchService:
+    """
+    Busca typeahead em tags, modelos, fabricantes, barras e parâmetros.
+
+    Leituras via run_read (AsyncSession quando informada, senão threadpool).
+    """
+
+    def __init__(self, db: Session, async_db=None):
+        self.db = db
+        self.async_db = async_db
+
+    async def typeahead(self, q: str, limit: int = 10,
+                        kinds: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Sugestões para o termo digitado, ordenadas por relevância.
+
+        Args:
+            q: Termo digitado (mínimo MIN_QUERY_LENGTH caracteres)
+            limit: Máximo de sugestões
+            kinds: Tipos a pesquisar (None = todos de SEARCH_SOURCES)
+
+        Returns:
+            Dict com query, mode ('trigram' ou 'ilike') e results
+        """
+        term = q.strip()
+        if len(term) < MIN_QUERY_LENGTH:
+            raise HTTPException(status_code=400,
+                                detail=f"Termo de busca deve ter ao menos {MIN_QUERY_LENGTH} caracteres")
+        kinds = list(kinds or SEARCH_SOURCES)
+        unknown = [kind for kind in kinds if kind not in SEARCH_SOURCES]
+        if unknown:
+            raise HTTPException(status_code=400,
+                                detail=f"Tipos de busca inválidos: {', '.join(unknown)} "
+                                       f"(válidos: {', '.join(SEARCH_SOURCES)})")
+
+        try:
+            trigram, results = await run_read(
+                lambda conn: self._load_typeahead(conn, term, limit, kinds), self.async_db
+            )
+        except Exception as e:
+            logger.error(f"Database error in typeahead search: {e}")
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+        return {
+            "query": term,
+            "mode": "trigram" if trigram else "ilike",
+            "total": len(results),
+            "results": results,
+        }
+
+    def _load_typeahead(self, conn, term: str, limit: int,
+                        kinds: Sequence[str]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Consulta de typeahead (conn: Connection ou Session)"""
+        trigram = detect_trigram(conn)
+        escaped = like_escape(term)
+        rows = conn.execute(text(build_typeahead_sql(kinds, trigram)), {
+            "q": term,
+            "pattern": f"%{escaped}%",
+            "prefix": f"{escaped}%",
+            "per_kind": min(limit, PER_KIND_LIMIT),
+            "limit": limit,
+        }).fetchall()
+
+        return trigram, [
+            {
+                "kind": row.kind,
+                "value": row.value,
+                "ref_id": row.ref_id,
+                "occurrences": row.occurrences,
+                "score": round(float(row.score or 0.0), 3),
+                "prefix_match": bool(row.prefix_match),
+            }
+            for row in rows
+        ]
@@ -0,0 +1,214 @@
+"""
+Selectivity Sweep Engine - Varredura de seletividade em arrays
+==============================================================
+
+Motor em processo para /api/v1/etap-native/analyze/selectivity e
+batch/analyze-studies, sobre as curvas do TCCCoordinationEngine.
+
+Para cada local de falta (zona de cada relé) a varredura verifica o relé
+primário contra TODOS os relés de retaguarda no caminho até a fonte (não
+só o vizinho imediato), em milhares de níveis de corrente de falta:
+1. Grade logarítmica de níveis de falta (padrão: 2000 níveis)
+2. Matriz de tempos de atuação (relés × níveis) calculada uma vez
+3. Pares (retaguarda, primário) avaliados em blocos de tamanho limitado
+   (SWEEP_BLOCK_CELLS células por array); cada bloco devolve suas
+   violações imediatamente, permitindo resposta em streaming (NDJSON)
+
+Estudos inteiros são independentes: o modo lote executa um estudo por
+processo (api.core.concurrency.run_in_process).
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from api.services.tcc_coordination_engine import (
+    RelaySetting, adjacent_pairs, fault_current_grid, pair_intervals, parse_number,
+    settings_arrays, trip_time_matrix, finite_or_none,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SELECTIVITY_MARGIN = 0.2  # segundos (mesmo padrão de run_selectivity_analysis_native)
+DEFAULT_FAULT_LEVELS = 2000
+SWEEP_BLOCK_CELLS = 2_000_000     # pares × níveis por bloco (~16 MB por array float64)
+
+
+def backup_pairs(relays: Sequence[RelaySetting],
+                 backup_levels: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pares (retaguarda, primário) a partir da topologia de adjacent_pairs.
+
+    Cada relé é o primário da falta na sua zona; os relés a montante até a
+    fonte (busca em largura, até `backup_levels` níveis) são a retaguarda.
+
+    Returns:
+        (índices de retaguarda, índices de primário, nível: 1 = adjacente)
+    """
+    upstream, downstream, _ = adjacent_pairs(relays)
+    parents: Dict[int, List[int]] = {}
+    for u, d in zip(upstream.tolist(), downstream.tolist()):
+        parents.setdefault(d, []).append(u)
+
+    backups, primaries, levels = [], [], []
+    for primary in range(len(relays)):
+        seen = {primary}
+        queue = deque((parent, 1) for parent in parents.get(primary, []))
+        while queue:
+            backup, level = queue.popleft()
+            if backup in seen or (backup_levels is not None and level > backup_levels):
+                continue
+            seen.add(backup)
+            backups.append(backup)
+            primaries.append(primary)
+            levels.append(level)
+            queue.extend((parent, level + 1) for parent in parents.get(backup, []))
+
+    return (np.array(backups, dtype=np.intp), np.array(primaries, dtype=np.intp),
+            np.array(levels, dtype=np.intp))
+
+
+class SelectivitySweepEngine:
+    """
+    Varredura de seletividade (níveis × locais de falta) de um estudo.
+
+    Examples:
+        >>> engine = SelectivitySweepEngine(selectivity_margin=0.2)
+        >>> for violation in engine.iter_violations(relays):
+        ...     print(violation["backup_device"], violation["primary_device"])
+        >>> summary = engine.analyze(relays)
+    """
+
+    def __init__(self, selectivity_margin: float = DEFAULT_SELECTIVITY_MARGIN,
+                 fault_levels: int = DEFAULT_FAULT_LEVELS,
+                 max_fault_current: Optional[float] = None,
+                 backup_levels: Optional[int] = None):
+        self.selectivity_margin = selectivity_margin
+        self.fault_levels = fault_levels
+        self.max_fault_current = max_fault_current
+        self.backup_levels = backup_levels
+
+    @classmethod
+    def from_config(cls, analysis_config: Optional[Dict[str, Any]]) -> "SelectivitySweepEngine":
+        """Parâmetros de analysis_config (selectivity_margin, fault_levels, fault_current_max, backup_levels)"""
+        config = dict(analysis_config or {})
+        config.update(config.get("analysis_parameters") or {})
+        backup_levels = parse_number(config.get("backup_levels"))
+        return cls(
+            selectivity_margin=parse_number(config.get("selectivity_margin")) or DEFAULT_SELECTIVITY_MARGIN,
+            fault_levels=int(config.get("fault_levels") or DEFAULT_FAULT_LEVELS),
+            max_fault_current=parse_number(config.get("fault_current_max")),
+            backup_levels=int(backup_levels) if backup_levels else None,
+        )
+
+    def iter_pair_blocks(self, relays: Sequence[RelaySetting]) -> Iterator[Dict[str, Any]]:
+        """
+        Avalia os pares em blocos; cada item traz os resultados do bloco.
+
+        O primeiro item tem type="start" (contagens e faixa de níveis); os
+        seguintes, type="block" com "results" de cada par do bloco.
+        """
+        usable = [relay for relay in relays if relay.pickup is not None and relay.pickup > 0]
+        skipped = [relay.name for relay in relays if not (relay.pickup is not None and relay.pickup > 0)]
+
+        if len(usable) < 2:
+            yield {"type": "start", "total_devices": len(relays), "skipped_devices": skipped,
+                   "total_pairs": 0, "fault_levels": 0, "fault_current_range": None}
+            return
+
+        arrays = settings_arrays(usable)
+        grid = fault_current_grid(arrays["pickup"], self.fault_levels, self.max_fault_current)
+        times = trip_time_matrix(arrays, grid)
+        backups, primaries, levels = backup_pairs(usable, self.backup_levels)
+
+        yield {
+            "type": "start",
+            "total_devices": len(relays),
+            "skipped_devices": skipped,
+            "fault_locations": int(len(np.unique(primaries))),
+            "total_pairs": int(len(backups)),
+            "fault_levels": int(len(grid)),
+            "fault_current_range": [round(float(grid[0]), 2), round(float(grid[-1]), 2)],
+        }
+
+        block = max(1, SWEEP_BLOCK_CELLS // len(grid))
+        for start in range(0, len(backups), block):
+            up = backups[start:start + block]
+            down = primaries[start:start + block]
+            intervals = pair_intervals(times, grid, up, down, self.selectivity_margin,
+                                       arrays["max_fault"], chunk_size=block)
+            results = []
+            for k, (u, d) in enumerate(zip(up.tolist(), down.tolist())):
+                margin = intervals["cti"][k]
+                results.append({
+                    "primary_device": usable[d].name,
+                    "backup_device": usable[u].name,
+                    "backup_level": int(levels[start + k]),
+                    "is_selective": bool(margin >= self.selectivity_margin),
+                    "selectivity_margin": finite_or_none(margin),
+                    "minimum_required_margin": self.selectivity_margin,
+                    "selectivity_index": round(float(intervals["selectivity_index"][k]), 4),
+                    "fault_current": finite_or_none(intervals["fault_current"][k], 2),
+                    "primary_operating_time": finite_or_none(intervals["downstream_time"][k]),
+                    "backup_operating_time": finite_or_none(intervals["upstream_time"][k]),
+                })
+            yield {"type": "block", "results": results}
+
+    def iter_violations(self, relays: Sequence[RelaySetting]) -> Iterator[Dict[str, Any]]:
+        """
+        Eventos para streaming: start, uma violation por par não seletivo
+        (assim que o bloco é calculado) e summary no final.
+        """
+        pairs = selective = violations = 0
+        for item in self.iter_pair_blocks(relays):
+            if item["type"] == "start":
+                yield item
+                continue
+            for result in item["results"]:
+                pairs += 1
+                if result["is_selective"]:
+                    selective += 1
+                else:
+                    violations += 1
+                    yield {"type": "violation", **result}
+
+        yield {
+            "type": "summary",
+            "engine": "numpy_selectivity_sweep",
+            "pairs_analyzed": pairs,
+            "selective_pairs": selective,
+            "violations": violations,
+            "overall_status": "selective" if violations == 0 else "violations_found",
+        }
+
+    def analyze(self, relays: Iterable[RelaySetting]) -> Dict[str, Any]:
+        """Resultado completo (todos os pares + violações) de um estudo"""
+        relays = list(relays)
+        summary: Dict[str, Any] = {
+            "engine": "numpy_selectivity_sweep",
+            "selectivity_margin": self.selectivity_margin,
+            "results": [],
+        }
+        for item in self.iter_pair_blocks(relays):
+            if item["type"] == "start":
+                summary.update({key: value for key, value in item.items() if key != "type"})
+            else:
+                summary["results"].extend(item["results"])
+
+        violations = [r for r in summary["results"] if not r["is_selective"]]
+        summary.update({
+            "pairs_analyzed": len(summary["results"]),
+            "selective_pairs": len(summary["results"]) - len(violations),
+            "violations": violations,
+            "overall_status": "selective" if not violations else "violations_found",
+        })
+        logger.info(f"🎯 Seletividade: {summary.get('total_devices', 0)} relés, "
+                    f"{summary['pairs_analyzed']} pares, {len(violations)} violações")
+        return summary
+
+
+def sweep_study(relays: List[RelaySetting], analysis_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Ponto de entrada do pool de processos (um estudo por tarefa)"""
+    return SelectivitySweepEngine.from_config(analysis_config).analyze(relays)
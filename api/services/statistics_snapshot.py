@@ -0,0 +1,195 @@
+"""
+Snapshot de estatísticas do sistema
+===================================
+
+Camada comum dos endpoints de dashboard (/reports/metadata,
+/reports/statistics, /database/statistics, /equipments/statistics/unified):
+
+- Contagens de relay_settings vêm de protec_ai.relay_settings_summary
+  (src/relay_settings_stats.py), mantido pela importação e pelo CRUD na
+  mesma transação das escritas; as demais tabelas são pequenas.
+- O resultado de cada endpoint fica em STATISTICS_CACHE (TTL + ETag,
+  api.core.snapshot_cache); escritas da API chamam invalidate_statistics().
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from api.core.config import settings
+from api.core.database import engine, run_read
+from api.core.snapshot_cache import Snapshot, SnapshotCache
+from src.relay_settings_stats import SUMMARY_TABLE, ensure_summary_table, refresh_equipment_summary
+
+logger = logging.getLogger(__name__)
+
+STATISTICS_CACHE = SnapshotCache(ttl_seconds=settings.STATISTICS_CACHE_TTL)
+
+# Resumo criado/verificado uma vez por processo
+_summary_ready = False
+
+
+def _ensure_summary(cursor) -> None:
+    global _summary_ready
+    if not _summary_ready:
+        ensure_summary_table(cursor)
+        _summary_ready = True
+
+
+def _ensure_summary_committed() -> None:
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            ensure_summary_table(cursor)
+        raw.commit()
+    finally:
+        raw.close()
+
+
+async def statistics_snapshot(key: str, work: Callable[[Any], Dict[str, Any]],
+                              async_db: Optional[Any] = None) -> Snapshot:
+    """Snapshot de `key`; `work(conn)` (via run_read) só roda com o TTL expirado"""
+    global _summary_ready
+    if not _summary_ready:
+        await run_in_threadpool(_ensure_summary_committed)
+        _summary_ready = True
+    return await STATISTICS_CACHE.get(key, lambda: run_read(work, async_db))
+
+
+def refresh_settings_summary(db: Session, equipment_ids: Iterable[int]) -> None:
+    """Atualiza o resumo dos equipamentos na transação da Session (antes do commit)"""
+    cursor = db.connection().connection.cursor()
+    try:
+        _ensure_summary(cursor)
+        refresh_equipment_summary(cursor, equipment_ids)
+    finally:
+        cursor.close()
+
+
+def invalidate_statistics() -> None:
+    """Expira os snapshots deste processo (chamar após o commit da escrita)"""
+    STATISTICS_CACHE.invalidate()
+
+
+def load_settings_totals(conn) -> Any:
+    """Totais de relay_settings (linha com total, active, multipart, numeric, boolean, text, refreshed_at)"""
+    return conn.execute(text(f"""
+        SELECT COALESCE(SUM(total_settings), 0) AS total,
+               COALESCE(SUM(active_settings), 0) AS active,
+               COALESCE(SUM(multipart_settings), 0) AS multipart,
+               COALESCE(SUM(numeric_settings), 0) AS numeric,
+               COALESCE(SUM(boolean_settings), 0) AS boolean,
+               COALESCE(SUM(text_settings), 0) AS text,
+               MAX(refreshed_at) AS refreshed_at
+        FROM {SUMMARY_TABLE}
+    """)).fetchone()
+
+
+def load_database_statistics(conn) -> Dict[str, Any]:
+    """Contagens de /database/statistics"""
+    from datetime import datetime
+
+    settings_totals = load_settings_totals(conn)
+    counts = conn.execute(text("""
+        SELECT
+            (SELECT COUNT(*) FROM protec_ai.relay_equipment) AS relay_equipment,
+            (SELECT COUNT(*) FROM protec_ai.active_protection_functions) AS active_protection_functions,
+            (SELECT COUNT(*) FROM protec_ai.protection_functions) AS protection_functions,
+            (SELECT COUNT(DISTINCT relay_file) FROM protec_ai.active_protection_functions) AS unique_relays
+    """)).fetchone()
+
+    stats = {
+        "relay_equipment": int(counts.relay_equipment),
+        "relay_settings": int(settings_totals.total),
+        "active_protection_functions": int(counts.active_protection_functions),
+        "protection_functions": int(counts.protection_functions),
+    }
+    return {
+        "database": "protecai_db",
+        "timestamp": datetime.now().isoformat(),
+        "tables": stats,
+        "summary": {
+            "total_records": sum(stats.values()),
+            "total_equipments": stats["relay_equipment"],
+            "total_settings": stats["relay_settings"],
+            "active_settings": int(settings_totals.active),
+            "protection_functions_count": stats["protection_functions"],
+            "active_functions_count": stats["active_protection_functions"],
+            "unique_relays_with_functions": int(counts.unique_relays)
+        },
+        "data_source": "postgresql_real",
+        "note": "100% dados reais do protec_ai schema - zero mocks ou tabelas inexistentes"
+    }
+
+
+def load_system_statistics(conn) -> Dict[str, Any]:
+    """Métricas de /reports/statistics"""
+    from datetime import datetime
+
+    eq_stats = conn.execute(text("""
+        SELECT
+            COUNT(*) as total,
+            COUNT(CASE WHEN status = 'ACTIVE' THEN 1 END) as active,
+            COUNT(DISTINCT substation_name) as substations,
+            COUNT(DISTINCT barra_nome) as bays
+        FROM protec_ai.relay_equipment
+    """)).fetchone()
+
+    set_stats = load_settings_totals(conn)
+
+    mfr_dist = conn.execute(text(f"""
+        SELECT
+            f.nome_completo as name,
+            COUNT(DISTINCT re.id) as equipment_count,
+            COALESCE(SUM(s.total_settings), 0) as settings_count
+        FROM protec_ai.fabricantes f
+        JOIN protec_ai.relay_models rm ON rm.manufacturer_id = f.id
+        JOIN protec_ai.relay_equipment re ON re.relay_model_id = rm.id
+        LEFT JOIN {SUMMARY_TABLE} s ON s.equipment_id = re.id
+        GROUP BY f.nome_completo
+        ORDER BY equipment_count DESC
+    """)).fetchall()
+
+    func_stats = conn.execute(text(f"""
+        SELECT
+            COUNT(DISTINCT pf.id) as total_functions,
+            COUNT(DISTINCT s.function_id) as configured_functions
+        FROM protec_ai.protection_functions pf
+        LEFT JOIN {SUMMARY_TABLE} s ON s.function_id = pf.id
+    """)).fetchone()
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "equipments": {
+            "total": int(eq_stats.total),
+            "active": int(eq_stats.active),
+            "substations": int(eq_stats.substations),
+            "bays": int(eq_stats.bays),
+            "by_manufacturer": [
+                {
+                    "name": m.name,
+                    "equipment_count": int(m.equipment_count),
+                    "settings_count": int(m.settings_count)
+                }
+                for m in mfr_dist
+            ]
+        },
+        "settings": {
+            "total": int(set_stats.total),
+            "active": int(set_stats.active),
+            "inactive": int(set_stats.total) - int(set_stats.active),
+            "multipart": int(set_stats.multipart),
+            "by_type": {
+                "numeric": int(set_stats.numeric),
+                "boolean": int(set_stats.boolean),
+                "text": int(set_stats.text)
+            }
+        },
+        "protection_functions": {
+            "total_available": int(func_stats.total_functions),
+            "configured": int(func_stats.configured_functions)
+        }
+    }
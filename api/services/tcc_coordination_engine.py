@@ -0,0 +1,604 @@
+"""
+TCC Coordination Engine - Curvas tempo-corrente vetorizadas
+===========================================================
+
+Motor de coordenação em NumPy para EtapService.run_coordination_analysis.
+
+Em vez de analisar cada par upstream/downstream em Python, o motor:
+1. Monta uma grade logarítmica de correntes de falta compartilhada
+2. Calcula de uma vez a matriz de tempos de atuação (relés × correntes)
+   pelas curvas IEC 60255-151 / IEEE C37.112 (+ elemento instantâneo 50)
+3. Poda os pares não adjacentes pela topologia (links upstream/downstream
+   e barra/vão) e calcula o CTI (Coordination Time Interval) de todos os
+   pares restantes como operações de array
+
+Forma geral das curvas (M = I / I_pickup, atua somente com M > 1):
+    t = TD × (A / (M^p − 1) + B)
+
+IEC usa B = 0 (A = k, p = α); tempo definido usa A = 0, B = 1.
+"""
+
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Curvas padronizadas
+# ================================
+
+# (A, B, p) de t = TD × (A / (M^p − 1) + B)
+CURVE_CONSTANTS: Dict[str, Tuple[float, float, float]] = {
+    "IEC_SI": (0.14, 0.0, 0.02),       # Standard Inverse
+    "IEC_VI": (13.5, 0.0, 1.0),        # Very Inverse
+    "IEC_EI": (80.0, 0.0, 2.0),        # Extremely Inverse
+    "IEC_LTI": (120.0, 0.0, 1.0),      # Long Time Inverse
+    "IEEE_MI": (0.0515, 0.114, 0.02),  # Moderately Inverse
+    "IEEE_VI": (19.61, 0.491, 2.0),    # Very Inverse
+    "IEEE_EI": (28.2, 0.1217, 2.0),    # Extremely Inverse
+    "DT": (0.0, 1.0, 1.0),             # Tempo definido (t = TD)
+}
+
+DEFAULT_CURVE = "IEC_SI"
+
+# Nome normalizado (maiúsculas, só letras/dígitos) → curva
+_CURVE_ALIASES = {
+    "SI": "SI", "NI": "SI", "STANDARDINVERSE": "SI", "NORMALINVERSE": "SI", "NORMALMENTEINVERSA": "SI",
+    "VI": "VI", "VERYINVERSE": "VI", "MUITOINVERSA": "VI",
+    "EI": "EI", "EXTREMELYINVERSE": "EI", "EXTREMAMENTEINVERSA": "EI",
+    "LTI": "LTI", "LONGTIMEINVERSE": "LTI",
+    "MI": "MI", "MODERATELYINVERSE": "MI", "MODERADAMENTEINVERSA": "MI",
+    # MiCOM: "IEC S Inverse", "IEEE V Inverse", "UK LT Inverse"
+    "SINVERSE": "SI", "VINVERSE": "VI", "EINVERSE": "EI", "MINVERSE": "MI", "LTINVERSE": "LTI",
+    "DT": "DT", "DMT": "DT", "DEFINITETIME": "DT", "TEMPODEFINIDO": "DT",
+}
+
+# Vão de entrada (incomer) de uma barra
+INCOMER_PATTERN = re.compile(r"INC|ENTRADA|CHEGADA|MAIN|GERAL", re.IGNORECASE)
+
+DEFAULT_REQUIRED_MARGIN = 0.3   # segundos (CTI mínimo)
+DEFAULT_GRID_POINTS = 200
+DEFAULT_MAX_MULTIPLE = 20.0     # Grade até 20× o maior pickup
+PAIR_CHUNK_SIZE = 4096          # Pares por bloco (limita memória P × G)
+
+
+def resolve_curve(name: Optional[str], standard: Optional[str] = None) -> str:
+    """
+    Identifica a curva a partir de textos como "IEC Very Inverse", "VI",
+    "IEEE EI", "DMT".
+
+    Args:
+        name: Nome/código da curva
+        standard: Padrão do estudo (iec, ieee, ansi, ...) quando o nome não traz
+
+    Returns:
+        Chave de CURVE_CONSTANTS (DEFAULT_CURVE se não reconhecida)
+    """
+    if not name:
+        return DEFAULT_CURVE
+
+    key = re.sub(r"[^A-Z0-9_]", "", str(name).upper().replace(" ", "_"))
+    if key in CURVE_CONSTANTS:
+        return key
+
+    text = key.replace("_", "")
+
+    family = None
+    for prefix in ("IEEE", "ANSI", "IEC", "UK", "US"):
+        if text.startswith(prefix):
+            family = "IEC" if prefix in ("IEC", "UK") else "IEEE"
+            text = text[len(prefix):]
+            break
+    if family is None:
+        family = "IEEE" if str(standard or "").lower() in ("ieee", "ansi") else "IEC"
+
+    kind = _CURVE_ALIASES.get(text)
+    if kind == "DT":
+        return "DT"
+    if kind and f"{family}_{kind}" in CURVE_CONSTANTS:
+        return f"{family}_{kind}"
+    if kind:
+        # Ex: "MI" em estudo IEC, "LTI" em estudo IEEE
+        return next(key for key in CURVE_CONSTANTS if key.endswith(f"_{kind}"))
+    return DEFAULT_CURVE
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Extrai número de valores como 1.5, "1.5A", "0,30 s" (None se ausente)"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if np.isfinite(value) else None
+    match = re.search(r"[-+]?\d+(?:[.,]\d+)?(?:[eE][-+]?\d+)?", str(value))
+    return float(match.group(0).replace(",", ".")) if match else None
+
+
+# ================================
+# Ajustes de relé
+# ================================
+
+@dataclass
+class RelaySetting:
+    """Ajustes de sobrecorrente de um relé do estudo"""
+    name: str
+    pickup: Optional[float]                  # A (função 51)
+    time_dial: float = 1.0                   # TMS (IEC) / TD (IEEE)
+    curve: str = DEFAULT_CURVE               # Chave de CURVE_CONSTANTS
+    constants: Optional[Tuple[float, float, float]] = None  # (A, B, p) customizados
+    instantaneous_pickup: Optional[float] = None  # A (função 50)
+    instantaneous_delay: float = 0.0         # segundos
+    minimum_time: float = 0.0                # segundos
+    maximum_time: Optional[float] = None     # segundos
+    max_fault_current: Optional[float] = None  # A (falta máxima vista pelo relé)
+    bus: Optional[str] = None
+    bay: Optional[str] = None
+    upstream: Optional[str] = None           # Nome do relé a montante
+    downstream: Optional[str] = None         # Nome do relé a jusante
+    aliases: Tuple[str, ...] = field(default_factory=tuple)  # Outros identificadores (etap_device_id)
+
+    @property
+    def curve_constants(self) -> Tuple[float, float, float]:
+        return self.constants or CURVE_CONSTANTS[self.curve]
+
+
+def _first(mapping: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        if mapping.get(key) not in (None, ""):
+            return mapping[key]
+    return None
+
+
+def _custom_constants(parameters: Dict[str, Any]) -> Optional[Tuple[float, float, float]]:
+    """(A, B, p) explícitos em curve_parameters: {A, B, p} ou {k, alpha[, c]}"""
+    a = parse_number(_first(parameters, "A", "a", "k"))
+    p = parse_number(_first(parameters, "p", "alpha"))
+    if a is None or p is None:
+        return None
+    b = parse_number(_first(parameters, "B", "b", "c")) or 0.0
+    return (a, b, p)
+
+
+def relay_setting_from_dict(data: Dict[str, Any], standard: Optional[str] = None) -> RelaySetting:
+    """
+    Ajustes a partir de um dicionário (protection_config do ETAP,
+    analysis_config["relays"]).
+
+    Chaves aceitas: name/device_name, pickup_current/pickup, time_dial/tms,
+    curve/curve_type, instantaneous_pickup, instantaneous_delay,
+    minimum_time, maximum_time, max_fault_current, bus/bus_name,
+    bay/bay_position, upstream/upstream_device, downstream/downstream_device.
+    """
+    parameters = data.get("curve_parameters") or {}
+    return RelaySetting(
+        name=str(_first(data, "name", "device_name", "etap_device_id", "tag_reference") or ""),
+        pickup=parse_number(_first(data, "pickup_current", "pickup", "i_pickup")),
+        time_dial=parse_number(_first(data, "time_dial", "tms", "td", "curve_multiplier")) or 1.0,
+        curve=resolve_curve(_first(data, "curve", "curve_type", "curve_name"), standard),
+        constants=_custom_constants(parameters) if isinstance(parameters, dict) else None,
+        instantaneous_pickup=parse_number(_first(data, "instantaneous_pickup", "pickup_50")),
+        instantaneous_delay=parse_number(_first(data, "instantaneous_delay", "delay_50")) or 0.0,
+        minimum_time=parse_number(data.get("minimum_time")) or 0.0,
+        maximum_time=parse_number(data.get("maximum_time")),
+        max_fault_current=parse_number(_first(data, "max_fault_current", "short_circuit_current")),
+        bus=_first(data, "bus", "bus_name"),
+        bay=_first(data, "bay", "bay_position"),
+        upstream=_first(data, "upstream", "upstream_device"),
+        downstream=_first(data, "downstream", "downstream_device"),
+    )
+
+
+def relay_setting_from_config(config: Any, curves: Sequence[Any] = (),
+                              standard: Optional[str] = None) -> RelaySetting:
+    """
+    Ajustes de um EtapEquipmentConfig + suas ProtectionCurve ativas.
+
+    A curva de função 51 (fase antes de neutro) define pickup, dial e
+    característica; a de função 50 define o instantâneo. Sem curvas
+    cadastradas, usa protection_config.
+    """
+    protection = config.protection_config if isinstance(config.protection_config, dict) else {}
+    setting = relay_setting_from_dict({
+        **protection,
+        "device_name": config.device_name,
+        "etap_device_id": config.etap_device_id,
+        "bus_name": config.bus_name,
+        "bay_position": config.bay_position,
+        "upstream_device": config.upstream_device,
+        "downstream_device": config.downstream_device,
+    }, standard)
+    setting.aliases = tuple(str(alias) for alias in (config.etap_device_id, config.id) if alias is not None)
+    if not setting.name:
+        setting.name = f"config_{config.id}"
+
+    def by_function(prefix: str):
+        matches = [c for c in curves if str(c.function_code or "").upper().startswith(prefix)]
+        # "51" antes de "51N"/"51G"
+        return sorted(matches, key=lambda c: len(str(c.function_code)))[0] if matches else None
+
+    inverse = by_function("51")
+    if inverse is not None and inverse.pickup_current:
+        parameters = inverse.curve_parameters if isinstance(inverse.curve_parameters, dict) else {}
+        setting.pickup = inverse.pickup_current
+        setting.time_dial = inverse.time_dial or inverse.curve_multiplier or 1.0
+        setting.curve = resolve_curve(
+            _first(parameters, "curve", "characteristic") or inverse.curve_name or inverse.curve_equation,
+            standard,
+        )
+        setting.constants = _custom_constants(parameters)
+        setting.minimum_time = inverse.minimum_time or 0.0
+        setting.maximum_time = inverse.maximum_time
+
+    instantaneous = by_function("50")
+    if instantaneous is not None and instantaneous.pickup_current:
+        parameters = instantaneous.curve_parameters if isinstance(instantaneous.curve_parameters, dict) else {}
+        setting.instantaneous_pickup = instantaneous.pickup_current
+        setting.instantaneous_delay = (parse_number(parameters.get("delay"))
+                                       or instantaneous.minimum_time or instantaneous.time_dial or 0.0)
+
+    return setting
+
+
+# Linhas de relay_settings (MiCOM "I>1 Current Set", "I>1 TMS"; glossário "I>", "tI>")
+_NEUTRAL_STAGE = re.compile(r"\b(?:IN|IE|IO|I0|IG|ISEF|N)\s*>|NEUTR|TERRA|GROUND|EARTH", re.IGNORECASE)
+_PHASE_STAGE = re.compile(r"I\s*(>+)\s*(\d)?", re.IGNORECASE)
+_CURVE_PARAMETER = re.compile(r"FUNCTION|CURVE|CURVA|CHARACTERISTIC|IDMT|CARACTER", re.IGNORECASE)
+_DIAL_PARAMETER = re.compile(r"TMS|DIAL|MULTIPLIER|MULTIPLICADOR|\bK\b", re.IGNORECASE)
+_DELAY_PARAMETER = re.compile(r"DELAY|ATRASO|TEMPO|^\s*T\s*I\s*>|^\s*T\s*>", re.IGNORECASE)
+_CT_PRIMARY_PARAMETER = re.compile(r"CT\s*PRIM|TC\s*PRIM|PRIM\w*\s*(?:DO\s*)?(?:CT|TC)", re.IGNORECASE)
+_DISABLED_VALUES = {"DISABLED", "DESATIVADO", "DESABILITADO", "OFF", "NAO", "NÃO", "NO", "0"}
+_PER_UNIT = re.compile(r"^\s*(?:X\s*)?(?:IN|PU|P\.U\.)\s*$", re.IGNORECASE)
+
+
+def _phase_stage(name: str, function_code: str) -> Optional[int]:
+    """Estágio de sobrecorrente de fase: I>/I>1 → 1, I>>/I>2 → 2, ..."""
+    match = _PHASE_STAGE.search(name)
+    if match:
+        return int(match.group(2)) if match.group(2) else len(match.group(1))
+    if function_code.startswith("51"):
+        return 1
+    if function_code.startswith("50"):
+        return 2
+    return None
+
+
+def apply_settings_rows(setting: RelaySetting, rows: Iterable[Dict[str, Any]]) -> RelaySetting:
+    """
+    Sobrepõe ajustes lidos de protec_ai.relay_settings (valores programados
+    no relé) aos de ProtectionCurve/protection_config.
+
+    Cada linha: function_code (protection_functions), parameter_name,
+    parameter_code, set_value, set_value_text, unit_of_measure. Somente os
+    estágios de fase são usados: o 1º (I>, I>1, função 51) define a curva
+    inversa e o 2º (I>>, I>2, função 50) o instantâneo. Sem curva nem dial,
+    o atraso do 1º estágio ("tI>") vira tempo definido. Correntes em
+    múltiplos de In são convertidas pelo primário do TC ("Phase CT
+    Primary") quando presente.
+    """
+    stages: Dict[int, Dict[str, Any]] = {1: {}, 2: {}}
+    ct_primary = None
+
+    for row in rows:
+        name = str(row.get("parameter_name") or row.get("parameter_code") or "")
+        function_code = str(row.get("function_code") or "").upper()
+        text_value = row.get("set_value_text")
+        value = parse_number(row.get("set_value"))
+        if value is None:
+            value = parse_number(text_value)
+
+        if _CT_PRIMARY_PARAMETER.search(name):
+            ct_primary = value
+            continue
+        if _NEUTRAL_STAGE.search(name) or function_code.endswith(("N", "G")):
+            continue
+
+        stage = stages.get(_phase_stage(name, function_code))
+        if stage is None:
+            continue
+
+        if _CURVE_PARAMETER.search(name):
+            curve_text = str(text_value if text_value not in (None, "") else row.get("set_value") or "")
+            if curve_text.strip().upper() in _DISABLED_VALUES:
+                stage["disabled"] = True
+            else:
+                stage["curve"] = curve_text
+        elif _DIAL_PARAMETER.search(name):
+            stage["time_dial"] = value
+        elif _DELAY_PARAMETER.search(name):
+            stage["delay"] = value
+        elif value is not None:
+            unit = str(row.get("unit_of_measure") or "")
+            per_unit = bool(_PER_UNIT.match(unit)) or bool(re.search(r"\d\s*(?:x\s*)?In\s*$", str(text_value or "")))
+            stage["pickup"] = (value, per_unit)
+
+    def amps(pickup):
+        value, per_unit = pickup
+        return value * ct_primary if per_unit and ct_primary else value
+
+    inverse = stages[1]
+    if inverse.get("disabled"):
+        setting.pickup = None
+    elif "pickup" in inverse:
+        setting.pickup = amps(inverse["pickup"])
+        if inverse.get("curve"):
+            setting.curve = resolve_curve(inverse["curve"])
+            setting.constants = None
+        elif inverse.get("time_dial") is None and inverse.get("delay") is not None:
+            setting.curve = "DT"
+            setting.constants = None
+        if setting.curve == "DT" and inverse.get("delay") is not None:
+            setting.time_dial = inverse["delay"]
+        elif inverse.get("time_dial") is not None:
+            setting.time_dial = inverse["time_dial"]
+
+    instantaneous = stages[2]
+    if instantaneous.get("disabled"):
+        setting.instantaneous_pickup = None
+    elif "pickup" in instantaneous:
+        setting.instantaneous_pickup = amps(instantaneous["pickup"])
+        setting.instantaneous_delay = instantaneous.get("delay") or 0.0
+
+    return setting
+
+
+# ================================
+# Operações vetorizadas
+# ================================
+
+def fault_current_grid(pickups: np.ndarray, points: int = DEFAULT_GRID_POINTS,
+                       max_current: Optional[float] = None,
+                       max_multiple: float = DEFAULT_MAX_MULTIPLE) -> np.ndarray:
+    """Grade logarítmica de correntes: logo acima do menor pickup até a falta máxima"""
+    low = float(pickups.min()) * 1.01
+    high = float(max_current) if max_current else float(pickups.max()) * max_multiple
+    return np.geomspace(low, max(high, low * 1.01), points)
+
+
+def settings_arrays(relays: Sequence[RelaySetting]) -> Dict[str, np.ndarray]:
+    """Ajustes em colunas (um array por parâmetro)"""
+    constants = np.array([relay.curve_constants for relay in relays], dtype=float).reshape(-1, 3)
+
+    def column(values):
+        return np.array([np.inf if v is None else v for v in values], dtype=float)
+
+    return {
+        "pickup": np.array([relay.pickup for relay in relays], dtype=float),
+        "time_dial": np.array([relay.time_dial for relay in relays], dtype=float),
+        "a": constants[:, 0], "b": constants[:, 1], "p": constants[:, 2],
+        "inst_pickup": column(relay.instantaneous_pickup for relay in relays),
+        "inst_delay": np.array([relay.instantaneous_delay for relay in relays], dtype=float),
+        "min_time": np.array([relay.minimum_time for relay in relays], dtype=float),
+        "max_time": column(relay.maximum_time for relay in relays),
+        "max_fault": column(relay.max_fault_current for relay in relays),
+    }
+
+
+def trip_time_matrix(arrays: Dict[str, np.ndarray], grid: np.ndarray) -> np.ndarray:
+    """
+    Tempos de atuação (relés × correntes da grade); np.inf onde não atua.
+    """
+    multiple = grid[None, :] / arrays["pickup"][:, None]
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        inverse = arrays["time_dial"][:, None] * (
+            arrays["a"][:, None] / (np.power(multiple, arrays["p"][:, None]) - 1.0) + arrays["b"][:, None]
+        )
+    times = np.where(multiple > 1.0, inverse, np.inf)
+    times = np.maximum(times, arrays["min_time"][:, None])
+    times = np.where(np.isfinite(times), np.minimum(times, arrays["max_time"][:, None]), times)
+
+    instantaneous = np.where(grid[None, :] >= arrays["inst_pickup"][:, None], arrays["inst_delay"][:, None], np.inf)
+    return np.minimum(times, instantaneous)
+
+
+def adjacent_pairs(relays: Sequence[RelaySetting]) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Pares (upstream, downstream) adjacentes na topologia.
+
+    - Links explícitos upstream/downstream entre relés do estudo
+    - Na mesma barra: vão de entrada (INCOMER_PATTERN, senão maior pickup)
+      a montante dos demais vãos
+    - Sem nenhuma informação de topologia: todos os pares, com o relé de
+      maior pickup a montante
+
+    Returns:
+        (índices upstream, índices downstream, topologia usada)
+    """
+    index = {}
+    for i, relay in enumerate(relays):
+        for key in (relay.name, *relay.aliases):
+            index.setdefault(str(key), i)
+
+    pairs = set()
+    for i, relay in enumerate(relays):
+        if relay.upstream is not None and str(relay.upstream) in index:
+            pairs.add((index[str(relay.upstream)], i))
+        if relay.downstream is not None and str(relay.downstream) in index:
+            pairs.add((i, index[str(relay.downstream)]))
+
+    buses: Dict[str, List[int]] = {}
+    for i, relay in enumerate(relays):
+        if relay.bus:
+            buses.setdefault(str(relay.bus), []).append(i)
+    for members in buses.values():
+        if len(members) < 2:
+            continue
+        incomers = [i for i in members if relays[i].bay and INCOMER_PATTERN.search(str(relays[i].bay))]
+        head = incomers[0] if incomers else max(members, key=lambda i: relays[i].pickup)
+        pairs.update((head, i) for i in members if i != head)
+
+    pairs = {(u, d) for u, d in pairs if u != d}
+    if pairs:
+        ordered = sorted(pairs)
+        return (np.array([u for u, _ in ordered], dtype=np.intp),
+                np.array([d for _, d in ordered], dtype=np.intp), "topology")
+
+    # Sem topologia: todos os pares i < j
+    upper, lower = np.triu_indices(len(relays), k=1)
+    pickups = np.array([relay.pickup for relay in relays], dtype=float)
+    swap = pickups[upper] < pickups[lower]
+    return np.where(swap, lower, upper), np.where(swap, upper, lower), "all_pairs"
+
+
+def pair_intervals(times: np.ndarray, grid: np.ndarray, upstream: np.ndarray, downstream: np.ndarray,
+                   required_margin: float, max_fault: Optional[np.ndarray] = None,
+                   chunk_size: int = PAIR_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """
+    CTI de todos os pares, em blocos de `chunk_size` pares.
+
+    Para cada par considera as correntes em que o relé a jusante atua (até
+    a menor falta máxima dos dois relés). O CTI do par é o menor
+    t_upstream − t_downstream nessas correntes; selectivity_index é a
+    fração delas com CTI ≥ required_margin.
+
+    Returns:
+        Arrays por par: cti, fault_current, upstream_time, downstream_time,
+        selectivity_index, overlap (False se o relé a jusante não atua na grade)
+    """
+    count = len(upstream)
+    result = {
+        "cti": np.full(count, np.inf), "fault_current": np.full(count, np.nan),
+        "upstream_time": np.full(count, np.inf), "downstream_time": np.full(count, np.inf),
+        "selectivity_index": np.ones(count), "overlap": np.zeros(count, dtype=bool),
+    }
+    if max_fault is None:
+        max_fault = np.full(times.shape[0], np.inf)
+
+    for start in range(0, count, chunk_size):
+        up = upstream[start:start + chunk_size]
+        down = downstream[start:start + chunk_size]
+        t_up, t_down = times[up], times[down]
+
+        limit = np.minimum(max_fault[up], max_fault[down])
+        valid = np.isfinite(t_down) & (grid[None, :] <= limit[:, None])
+        with np.errstate(invalid="ignore"):
+            cti = np.where(valid, t_up - t_down, np.inf)
+
+        rows = np.arange(len(up))
+        worst = np.argmin(cti, axis=1)
+        valid_points = valid.sum(axis=1)
+        overlap = valid_points > 0
+        selective = (valid & (cti >= required_margin)).sum(axis=1)
+
+        block = slice(start, start + len(up))
+        result["cti"][block] = cti[rows, worst]
+        result["fault_current"][block] = np.where(overlap, grid[worst], np.nan)
+        result["upstream_time"][block] = t_up[rows, worst]
+        result["downstream_time"][block] = t_down[rows, worst]
+        result["selectivity_index"][block] = np.where(overlap, selective / np.maximum(valid_points, 1), 1.0)
+        result["overlap"][block] = overlap
+
+    return result
+
+
+def finite_or_none(value: float, digits: int = 4) -> Optional[float]:
+    """float JSON-compatível (None para inf/nan)"""
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+# ================================
+# Engine
+# ================================
+
+class TCCCoordinationEngine:
+    """
+    Análise de coordenação de um estudo inteiro em operações de array.
+
+    Examples:
+        >>> engine = TCCCoordinationEngine(required_margin=0.3)
+        >>> analysis = engine.analyze([
+        ...     RelaySetting("INC-01", pickup=800, time_dial=0.3, bus="B1", bay="INC"),
+        ...     RelaySetting("AL-01", pickup=200, time_dial=0.1, bus="B1", bay="AL1"),
+        ... ])
+        >>> analysis["results"][0]["is_coordinated"]
+        True
+    """
+
+    def __init__(self, required_margin: float = DEFAULT_REQUIRED_MARGIN,
+                 grid_points: int = DEFAULT_GRID_POINTS,
+                 max_fault_current: Optional[float] = None,
+                 max_multiple: float = DEFAULT_MAX_MULTIPLE):
+        self.required_margin = required_margin
+        self.grid_points = grid_points
+        self.max_fault_current = max_fault_current
+        self.max_multiple = max_multiple
+
+    @classmethod
+    def from_config(cls, analysis_config: Optional[Dict[str, Any]]) -> "TCCCoordinationEngine":
+        """Parâmetros de analysis_config (coordination_margin, grid_points, fault_current_max)"""
+        config = dict(analysis_config or {})
+        config.update(config.get("analysis_parameters") or {})
+        return cls(
+            required_margin=parse_number(config.get("coordination_margin")) or DEFAULT_REQUIRED_MARGIN,
+            grid_points=int(config.get("grid_points") or DEFAULT_GRID_POINTS),
+            max_fault_current=parse_number(config.get("fault_current_max")),
+        )
+
+    def analyze(self, relays: Iterable[RelaySetting]) -> Dict[str, Any]:
+        """
+        Coordenação de todos os pares adjacentes.
+
+        Returns:
+            Dict com results (um por par), violations, contagens e a faixa
+            da grade de correntes. Relés sem pickup válido vão para
+            skipped_devices.
+        """
+        relays = list(relays)
+        usable = [relay for relay in relays if relay.pickup is not None and relay.pickup > 0]
+        skipped = [relay.name for relay in relays if not (relay.pickup is not None and relay.pickup > 0)]
+
+        summary = {
+            "engine": "numpy_tcc",
+            "minimum_required_margin": self.required_margin,
+            "total_devices": len(relays),
+            "skipped_devices": skipped,
+            "results": [],
+            "violations": [],
+            "total_pairs_analyzed": 0,
+            "coordinated_pairs": 0,
+            "pairs_pruned": 0,
+            "topology": None,
+            "fault_current_range": None,
+        }
+        if len(usable) < 2:
+            return summary
+
+        arrays = settings_arrays(usable)
+        grid = fault_current_grid(arrays["pickup"], self.grid_points, self.max_fault_current, self.max_multiple)
+        times = trip_time_matrix(arrays, grid)
+        upstream, downstream, topology = adjacent_pairs(usable)
+        intervals = pair_intervals(times, grid, upstream, downstream, self.required_margin, arrays["max_fault"])
+
+        coordinated = intervals["cti"] >= self.required_margin
+        results = []
+        for k, (u, d) in enumerate(zip(upstream.tolist(), downstream.tolist())):
+            cti = intervals["cti"][k]
+            results.append({
+                "upstream_device": usable[u].name,
+                "downstream_device": usable[d].name,
+                "is_coordinated": bool(coordinated[k]),
+                "coordination_time_interval": finite_or_none(cti),
+                "margin_time": finite_or_none(cti - self.required_margin),
+                "minimum_required_margin": self.required_margin,
+                "selectivity_index": round(float(intervals["selectivity_index"][k]), 4),
+                "fault_current": finite_or_none(intervals["fault_current"][k], 2),
+                "upstream_operating_time": finite_or_none(intervals["upstream_time"][k]),
+                "downstream_operating_time": finite_or_none(intervals["downstream_time"][k]),
+                "curves_overlap": bool(intervals["overlap"][k]),
+            })
+
+        total_pairs = len(usable) * (len(usable) - 1) // 2
+        summary.update({
+            "results": results,
+            "violations": [r for r in results if not r["is_coordinated"]],
+            "total_pairs_analyzed": len(results),
+            "coordinated_pairs": int(coordinated.sum()),
+            "pairs_pruned": max(0, total_pairs - len(results)),
+            "topology": topology,
+            "fault_current_range": [round(float(grid[0]), 2), round(float(grid[-1]), 2)],
+        })
+        logger.info(f"⚡ TCC: {len(usable)} relés, {len(results)} pares ({topology}), "
+                    f"{len(summary['violations'])} violações")
+        return summary
@@ -22,348 +22,431 @@ from api.models.equipment_models import (
     RelayEquipment, RelayModel, Manufacturer,
     ElectricalConfiguration, ProtectionFunction, IOConfiguration
 )
-from api.core.database import engine
+from api.core.database import engine, run_read
+from api.core.pagination import decode_cursor, cursor_int, encode_cursor, estimate_count, exact_count
+from api.core.snapshot_cache import Snapshot
+from api.services.statistics_snapshot import statistics_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Ordem das fontes na listagem unificada (cursor = fonte + id do último item)
+UNIFIED_SOURCES = ("structured", "extracted")
+
+# Configurações extraídas de modelo exibidas na listagem (as primeiras por id)
+EXTRACTED_MODEL_LIMIT = 50
+
 class UnifiedEquipmentService:
     """
     Service unificado para dados de equipamentos
     Integra dados de relay_configs + protec_ai transparentemente
+    
+    Leituras via run_read: AsyncSession (asyncpg) quando informada, senão
+    engine síncrono no threadpool - o event loop não fica bloqueado.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, async_db=None):
         self.db = db
+        self.async_db = async_db
         self.engine = engine
     
     async def get_unified_statistics(self) -> Dict[str, Any]:
         """
         Obtém estatísticas unificadas dos dois schemas
         """
+        snapshot = await self.get_unified_statistics_snapshot()
+        return snapshot.value
+
+    async def get_unified_statistics_snapshot(self) -> Snapshot:
+        """Estatísticas unificadas em cache (TTL + ETag, ver statistics_snapshot)"""
         try:
-            with self.engine.connect() as conn:
-                query = text("""
-                SELECT 
-                    (SELECT COUNT(*) FROM protec_ai.arquivos) as processed_files,
-                    (SELECT COUNT(*) FROM protec_ai.fabricantes) as extracted_manufacturers,
-                    (SELECT COUNT(*) FROM protec_ai.tokens_valores) as parsed_tokens,
-                    (SELECT COUNT(*) FROM protec_ai.valores_originais) as original_values,
-                    (SELECT COUNT(DISTINCT codigo_campo) FROM protec_ai.campos_originais) as unique_parameters,
-                    (SELECT COUNT(*) FROM protec_ai.relay_equipment) as relay_equipment_count,
-                    (SELECT COUNT(*) FROM protec_ai.etap_studies) as etap_studies,
-                    (SELECT COUNT(*) FROM protec_ai.etap_sync_logs) as sync_logs
-                """)
-                
-                result = conn.execute(query).fetchone()
-                
-                return {
-                    "unified_statistics": {
-                        "protec_ai_data": {
-                            "processed_files": result.processed_files,
-                            "extracted_manufacturers": result.extracted_manufacturers,
-                            "parsed_tokens": result.parsed_tokens,
-                            "original_values": result.original_values,
-                            "unique_parameters": result.unique_parameters
-                        },
-                        "relay_configs_data": {
-                            "relay_equipment_count": result.relay_equipment_count,
-                            "etap_studies": result.etap_studies,
-                            "sync_logs": result.sync_logs
-                        },
-                        "total_records": (result.processed_files + result.extracted_manufacturers + 
-                                        result.parsed_tokens + result.original_values + 
-                                        result.relay_equipment_count + result.etap_studies + result.sync_logs)
-                    }
-                }
-                
+            return await statistics_snapshot("unified_statistics", self._load_unified_statistics, self.async_db)
+
         except Exception as e:
             logger.error(f"Database error getting unified stats: {e}")
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    def _load_unified_statistics(self, conn) -> Dict[str, Any]:
+        """Contagens de get_unified_statistics (conn: Connection ou Session)"""
+        query = text("""
+        SELECT 
+            (SELECT COUNT(*) FROM protec_ai.arquivos) as processed_files,
+            (SELECT COUNT(*) FROM protec_ai.fabricantes) as extracted_manufacturers,
+            (SELECT COUNT(*) FROM protec_ai.tokens_valores) as parsed_tokens,
+            (SELECT COUNT(*) FROM protec_ai.valores_originais) as original_values,
+            (SELECT COUNT(DISTINCT codigo_campo) FROM protec_ai.campos_originais) as unique_parameters,
+            (SELECT COUNT(*) FROM protec_ai.relay_equipment) as relay_equipment_count,
+            (SELECT COUNT(*) FROM protec_ai.etap_studies) as etap_studies,
+            (SELECT COUNT(*) FROM protec_ai.etap_sync_logs) as sync_logs
+        """)
+        result = conn.execute(query).fetchone()
+
+        return {
+            "unified_statistics": {
+                "protec_ai_data": {
+                    "processed_files": result.processed_files,
+                    "extracted_manufacturers": result.extracted_manufacturers,
+                    "parsed_tokens": result.parsed_tokens,
+                    "original_values": result.original_values,
+                    "unique_parameters": result.unique_parameters
+                },
+                "relay_configs_data": {
+                    "relay_equipment_count": result.relay_equipment_count,
+                    "etap_studies": result.etap_studies,
+                    "sync_logs": result.sync_logs
+                },
+                "total_records": (result.processed_files + result.extracted_manufacturers + 
+                                result.parsed_tokens + result.original_values + 
+                                result.relay_equipment_count + result.etap_studies + result.sync_logs)
+            }
+        }
     
     async def search_unified_manufacturers(self, query: str = "") -> Dict[str, Any]:
         """Busca fabricantes em ambos os schemas de forma unificada"""
         try:
-            with self.engine.connect() as conn:
-                # Buscar em protec_ai.fabricantes
-                if query:
-                    protec_ai_query = text("""
-                        SELECT 
-                            'protec_ai' as source_schema,
-                            id,
-                            nome_completo as name,
-                            pais_origem as country,
-                            created_at,
-                            (SELECT COUNT(*) FROM protec_ai.arquivos WHERE fabricante_id = f.id) as file_count
-                        FROM protec_ai.fabricantes f
-                        WHERE nome_completo ILIKE :search_pattern
-                        ORDER BY nome_completo
-                    """)
-                    protec_ai_result = conn.execute(protec_ai_query, {
-                        "search_pattern": f"%{query}%"
-                    }).fetchall()
-                else:
-                    protec_ai_query = text("""
-                        SELECT 
-                            'protec_ai' as source_schema,
-                            id,
-                            nome_completo as name,
-                            pais_origem as country,
-                            created_at,
-                            (SELECT COUNT(*) FROM protec_ai.arquivos WHERE fabricante_id = f.id) as file_count
-                        FROM protec_ai.fabricantes f
-                        ORDER BY nome_completo
-                    """)
-                    protec_ai_result = conn.execute(protec_ai_query).fetchall()
-                
-                # Buscar em protec_ai.manufacturers (pode estar vazio)
-                if query:
-                    relay_configs_query = text("""
-                        SELECT 
-                            'relay_configs' as source_schema,
-                            id,
-                            name,
-                            country,
-                            created_at,
-                            (SELECT COUNT(*) FROM protec_ai.relay_models WHERE manufacturer_id = m.id) as model_count
-                        FROM protec_ai.manufacturers m
-                        WHERE name ILIKE :search_pattern
-                        ORDER BY name
-                    """)
-                    relay_configs_result = conn.execute(relay_configs_query, {
-                        "search_pattern": f"%{query}%"
-                    }).fetchall()
-                else:
-                    relay_configs_query = text("""
-                        SELECT 
-                            'relay_configs' as source_schema,
-                            id,
-                            name,
-                            country,
-                            created_at,
-                            (SELECT COUNT(*) FROM protec_ai.relay_models WHERE manufacturer_id = m.id) as model_count
-                        FROM protec_ai.manufacturers m
-                        ORDER BY name
-                    """)
-                    relay_configs_result = conn.execute(relay_configs_query).fetchall()
-                
-                # Consolidar resultados
-                manufacturers = []
-                
-                # Adicionar fabricantes do protec_ai
-                for row in protec_ai_result:
-                    manufacturers.append({
-                        "id": f"protec_ai_{row.id}",
-                        "source": "protec_ai",
-                        "name": row.name,
-                        "country": row.country,
-                        "created_at": row.created_at,
-                        "file_count": row.file_count,
-                        "model_count": 0
-                    })
-                
-                # Adicionar fabricantes do relay_configs
-                for row in relay_configs_result:
-                    manufacturers.append({
-                        "id": f"relay_configs_{row.id}",
-                        "source": "relay_configs",
-                        "name": row.name,
-                        "country": row.country,
-                        "created_at": row.created_at,
-                        "file_count": 0,
-                        "model_count": row.model_count
-                    })
-                
-                return {
-                    "manufacturers": manufacturers,
-                    "total_protec_ai": len(protec_ai_result),
-                    "total_relay_configs": len(relay_configs_result),
-                    "total_unified": len(manufacturers)
-                }
-                
+            return await run_read(
+                lambda conn: self._load_unified_manufacturers(conn, query), self.async_db
+            )
+            
         except Exception as e:
             logger.error(f"Database error searching unified manufacturers: {e}")
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
+    def _load_unified_manufacturers(self, conn, query: str) -> Dict[str, Any]:
+        """Consultas de search_unified_manufacturers (conn: Connection ou Session)"""
+        # Buscar em protec_ai.fabricantes
+        if query:
+            protec_ai_query = text("""
+                SELECT 
+                    'protec_ai' as source_schema,
+                    id,
+                    nome_completo as name,
+                    pais_origem as country,
+                    created_at,
+                    (SELECT COUNT(*) FROM protec_ai.arquivos WHERE fabricante_id = f.id) as file_count
+                FROM protec_ai.fabricantes f
+                WHERE nome_completo ILIKE :search_pattern
+                ORDER BY nome_completo
+            """)
+            protec_ai_result = conn.execute(protec_ai_query, {
+                "search_pattern": f"%{query}%"
+            }).fetchall()
+        else:
+            protec_ai_query = text("""
+                SELECT 
+                    'protec_ai' as source_schema,
+                    id,
+                    nome_completo as name,
+                    pais_origem as country,
+                    created_at,
+                    (SELECT COUNT(*) FROM protec_ai.arquivos WHERE fabricante_id = f.id) as file_count
+                FROM protec_ai.fabricantes f
+                ORDER BY nome_completo
+            """)
+            protec_ai_result = conn.execute(protec_ai_query).fetchall()
+
+        # Buscar em protec_ai.manufacturers (pode estar vazio)
+        if query:
+            relay_configs_query = text("""
+                SELECT 
+                    'relay_configs' as source_schema,
+                    id,
+                    name,
+                    country,
+                    created_at,
+                    (SELECT COUNT(*) FROM protec_ai.relay_models WHERE manufacturer_id = m.id) as model_count
+                FROM protec_ai.manufacturers m
+                WHERE name ILIKE :search_pattern
+                ORDER BY name
+            """)
+            relay_configs_result = conn.execute(relay_configs_query, {
+                "search_pattern": f"%{query}%"
+            }).fetchall()
+        else:
+            relay_configs_query = text("""
+                SELECT 
+                    'relay_configs' as source_schema,
+                    id,
+                    name,
+                    country,
+                    created_at,
+                    (SELECT COUNT(*) FROM protec_ai.relay_models WHERE manufacturer_id = m.id) as model_count
+                FROM protec_ai.manufacturers m
+                ORDER BY name
+            """)
+            relay_configs_result = conn.execute(relay_configs_query).fetchall()
+
+        # Consolidar resultados
+        manufacturers = []
+
+        # Adicionar fabricantes do protec_ai
+        for row in protec_ai_result:
+            manufacturers.append({
+                "id": f"protec_ai_{row.id}",
+                "source": "protec_ai",
+                "name": row.name,
+                "country": row.country,
+                "created_at": row.created_at,
+                "file_count": row.file_count,
+                "model_count": 0
+            })
+
+        # Adicionar fabricantes do relay_configs
+        for row in relay_configs_result:
+            manufacturers.append({
+                "id": f"relay_configs_{row.id}",
+                "source": "relay_configs",
+                "name": row.name,
+                "country": row.country,
+                "created_at": row.created_at,
+                "file_count": 0,
+                "model_count": row.model_count
+            })
+
+        return {
+            "manufacturers": manufacturers,
+            "total_protec_ai": len(protec_ai_result),
+            "total_relay_configs": len(relay_configs_result),
+            "total_unified": len(manufacturers)
+        }
     
-    async def get_unified_equipment_data(self, page: int = 1, size: int = 10, manufacturer_filter: str = "") -> Tuple[List[Dict], int]:
+    
+    async def get_unified_equipment_data(self, page: int = 1, size: int = 10, manufacturer_filter: str = "",
+                                         status_filter: Optional[str] = None) -> Tuple[List[Dict], int]:
         """
         Busca unificada de dados de equipamentos
         Combina dados estruturados + dados extraídos
+        
+        Paginação por página (OFFSET no SQL); prefira get_unified_equipment_page
+        com cursor para navegar listas longas.
+        """
+        page_data = await self.get_unified_equipment_page(
+            size=size, manufacturer_filter=manufacturer_filter,
+            status_filter=status_filter, offset=(page - 1) * size
+        )
+        return page_data["data"], page_data["total"]
+    
+    async def get_unified_equipment_page(self, size: int = 10, manufacturer_filter: str = "",
+                                         status_filter: Optional[str] = None, cursor: Optional[str] = None,
+                                         offset: int = 0) -> Dict[str, Any]:
         """
+        Página da listagem unificada (estruturados, depois extraídos).
+        
+        Ordem estável (fonte, id): o cursor guarda a fonte e o id do último
+        item, e cada fonte é lida com `id > :after_id ORDER BY id LIMIT` -
+        a página N custa o mesmo que a página 1. Filtros de fabricante e
+        status são aplicados no SQL.
+        
+        Args:
+            size: Itens por página
+            manufacturer_filter: Parte do nome do fabricante (ILIKE)
+            status_filter: Status do equipamento ("extracted" = só extraídos)
+            cursor: next_cursor da página anterior (None = início)
+            offset: Itens a pular (paginação por página; ignorado com cursor)
+        
+        Returns:
+            {"data": [...], "next_cursor": str|None, "total": int estimado}
+        """
+        position = decode_cursor(cursor)
+        source = position.get("source", UNIFIED_SOURCES[0])
+        if source not in UNIFIED_SOURCES:
+            raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+        after_id = cursor_int(position, "id") or 0
+        
         try:
-            results = []
+            logger.info(f"[parameters: {{'manufacturer_filter': '{manufacturer_filter}', 'status_filter': '{status_filter}', 'cursor': {position}}}]")
             
-            # 1. Equipamentos estruturados - TODAS AS QUERIES EM UMA ÚNICA CONEXÃO
-            logger.info(f"[parameters: {{'manufacturer_filter': '{manufacturer_filter}', 'manufacturer_pattern': '%{manufacturer_filter}%'}}]")
+            # Estruturados + extraídos - TODAS AS QUERIES EM UMA ÚNICA CONEXÃO
+            page_data = await run_read(
+                lambda conn: self._load_unified_equipment(
+                    conn, manufacturer_filter, status_filter, size,
+                    source=source, after_id=after_id, offset=0 if cursor else offset
+                ),
+                self.async_db
+            )
             
-            # MANTER CONEXÃO ABERTA PARA TODAS AS OPERAÇÕES
-            with self.engine.connect() as conn:
-                # 1. Buscar equipamentos de protec_ai.relay_equipment (QUERY ÚNICA)
-                if manufacturer_filter:
-                    equipment_query = text("""
-                        SELECT 
-                            'protec_ai' as source_schema,
-                            re.id,
-                            re.equipment_tag,
-                            re.serial_number,
-                            re.substation_name,
-                            re.barra_nome,
-                            re.status,
-                            re.position_description,
-                            rm.model_name,
-                            rm.model_code as series,
-                            rm.technology as model_type,
-                            '' as family,
-                            f.nome_completo as manufacturer_name,
-                            f.pais_origem as manufacturer_country,
-                            re.created_at
-                        FROM protec_ai.relay_equipment re
-                        JOIN protec_ai.relay_models rm ON re.relay_model_id = rm.id
-                        JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
-                        WHERE f.nome_completo ILIKE :manufacturer_pattern
-                        ORDER BY re.id
-                    """)
-                    equipment_data = conn.execute(equipment_query, {
-                        "manufacturer_pattern": f"%{manufacturer_filter}%"
-                    }).fetchall()
-                else:
-                    equipment_query = text("""
-                        SELECT 
-                            'protec_ai' as source_schema,
-                            re.id,
-                            re.equipment_tag,
-                            re.serial_number,
-                            re.substation_name,
-                            re.barra_nome,
-                            re.status,
-                            re.position_description,
-                            rm.model_name,
-                            rm.model_code as series,
-                            rm.technology as model_type,
-                            '' as family,
-                            f.nome_completo as manufacturer_name,
-                            f.pais_origem as manufacturer_country,
-                            re.created_at
-                        FROM protec_ai.relay_equipment re
-                        JOIN protec_ai.relay_models rm ON re.relay_model_id = rm.id
-                        JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
-                        ORDER BY re.id
-                    """)
-                    equipment_data = conn.execute(equipment_query).fetchall()
-                
-                # Processar equipamentos (SEM DUPLICAÇÃO)
-                for eq in equipment_data:
-                    results.append({
-                        "id": f"protec_ai_{eq.id}",
-                        "source": "protec_ai",
-                        "source_schema": "protec_ai",
-                        "tag_reference": eq.equipment_tag,
-                        "serial_number": eq.serial_number,
-                        "plant_reference": eq.substation_name,
-                        "bay_position": eq.barra_nome,
-                        "status": eq.status,
-                        "description": eq.position_description,
-                        "model": {
-                            "name": eq.model_name,
-                            "series": eq.series,
-                            "type": eq.model_type,
-                            "family": eq.family
-                        },
-                        "manufacturer": {
-                            "name": eq.manufacturer_name,
-                            "country": eq.manufacturer_country
-                        },
-                        "data_completeness": "structured",
-                        "created_at": eq.created_at
-                    })
-                
-                # 2. Configurações extraídas (protec_ai) - MANTER NA MESMA CONEXÃO
-                if manufacturer_filter:
-                    extracted_query = text("""
-                        SELECT DISTINCT
-                        'protec_ai' as source_schema,
-                        vo.id,
-                        co.codigo_campo,
-                        vo.valor_original,
-                        'N/A' as unidade,
-                        f.nome_completo as manufacturer_name,
-                        f.pais_origem as manufacturer_country,
-                        a.nome_arquivo,
-                        co.created_at as data_criacao
-                    FROM protec_ai.valores_originais vo
-                    JOIN protec_ai.campos_originais co ON vo.campo_id = co.id
-                    JOIN protec_ai.arquivos a ON co.arquivo_id = a.id
-                    JOIN protec_ai.fabricantes f ON a.fabricante_id = f.id
-                    WHERE f.nome_completo ILIKE :manufacturer_pattern
-                    AND co.descricao_campo ILIKE '%model%'
-                    ORDER BY vo.id
-                    LIMIT 50
-                """)
-                    extracted_configs = conn.execute(extracted_query, {
-                        "manufacturer_pattern": f"%{manufacturer_filter}%"
-                    }).fetchall()
-                else:
-                    extracted_query = text("""
-                        SELECT DISTINCT
-                            'protec_ai' as source_schema,
-                            vo.id,
-                            co.codigo_campo,
-                            vo.valor_original,
-                            'N/A' as unidade,
-                            f.nome_completo as manufacturer_name,
-                            f.pais_origem as manufacturer_country,
-                            a.nome_arquivo,
-                            co.created_at as data_criacao
-                        FROM protec_ai.valores_originais vo
-                        JOIN protec_ai.campos_originais co ON vo.campo_id = co.id
-                        JOIN protec_ai.arquivos a ON co.arquivo_id = a.id
-                        JOIN protec_ai.fabricantes f ON a.fabricante_id = f.id
-                        WHERE co.descricao_campo ILIKE '%model%'
-                        ORDER BY vo.id
-                        LIMIT 50
-                    """)
-                    extracted_configs = conn.execute(extracted_query).fetchall()
-                
-                # Processar configurações extraídas
-                for config in extracted_configs:
-                    results.append({
-                        "id": f"protec_ai_{config.id}",
-                        "source": "protec_ai", 
-                        "tag_reference": None,
-                        "serial_number": None,
-                        "plant_reference": None,
-                        "bay_position": None,
-                        "status": "extracted",
-                        "description": f"Extracted parameter: {config.codigo_campo}",
-                        "model": {
-                            "name": config.valor_original,
-                            "type": "extracted",
-                            "family": None
-                        },
-                        "manufacturer": {
-                            "name": config.manufacturer_name,
-                            "country": config.manufacturer_country
-                        },
-                        "data_completeness": "extracted",
-                        "source_file": config.nome_arquivo,
-                        "parameter_field": config.codigo_campo,
-                        "value": config.valor_original,
-                        "unit": getattr(config, 'unidade', 'N/A'),
-                        "created_at": config.data_criacao
-                    })
-            
-            # 3. Aplicar paginação aos resultados unificados (FORA DA CONEXÃO)
-            total = len(results)
-            offset = (page - 1) * size
-            paginated_results = results[offset:offset + size]
-            
-            logger.info(f"Retrieved {len(paginated_results)} unified equipment records (total: {total})")
-            return paginated_results, total
+            logger.info(f"Retrieved {len(page_data['data'])} unified equipment records (total: ~{page_data['total']})")
+            return page_data
             
         except SQLAlchemyError as e:
             logger.error(f"Database error getting unified equipment data: {e}")
             raise
     
+    def _unified_source_queries(self, manufacturer_filter: str,
+                                status_filter: Optional[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """SELECT de cada fonte com os filtros aplicados (sem ORDER BY/LIMIT)"""
+        structured_where, extracted_where, params = [], ["co.descricao_campo ILIKE '%model%'"], {}
+        if manufacturer_filter:
+            structured_where.append("f.nome_completo ILIKE :manufacturer_pattern")
+            extracted_where.append("f.nome_completo ILIKE :manufacturer_pattern")
+            params["manufacturer_pattern"] = f"%{manufacturer_filter}%"
+        
+        # Extraídos têm status "extracted"; qualquer outro status só existe nos estruturados
+        include_structured = include_extracted = True
+        if status_filter:
+            if status_filter.lower() == "extracted":
+                include_structured = False
+            else:
+                include_extracted = False
+                structured_where.append("UPPER(re.status) = UPPER(:status)")
+                params["status"] = status_filter
+        
+        queries = {}
+        if include_structured:
+            queries["structured"] = (f"""
+                SELECT 
+                    'protec_ai' as source_schema,
+                    re.id,
+                    re.equipment_tag,
+                    re.serial_number,
+                    re.substation_name,
+                    re.barra_nome,
+                    re.status,
+                    re.position_description,
+                    rm.model_name,
+                    rm.model_code as series,
+                    rm.technology as model_type,
+                    '' as family,
+                    f.nome_completo as manufacturer_name,
+                    f.pais_origem as manufacturer_country,
+                    re.created_at
+                FROM protec_ai.relay_equipment re
+                JOIN protec_ai.relay_models rm ON re.relay_model_id = rm.id
+                JOIN protec_ai.fabricantes f ON rm.manufacturer_id = f.id
+                {"WHERE " + " AND ".join(structured_where) if structured_where else ""}
+            """, params)
+        if include_extracted:
+            queries["extracted"] = (self._extracted_sql(extracted_where), params)
+        return queries
+    
+    @staticmethod
+    def _extracted_sql(where: List[str]) -> str:
+        """Configurações extraídas de modelo (as EXTRACTED_MODEL_LIMIT primeiras por id)"""
+        return f"""
+            SELECT * FROM (
+                SELECT DISTINCT
+                    'protec_ai' as source_schema,
+                    vo.id,
+                    co.codigo_campo,
+                    vo.valor_original,
+                    'N/A' as unidade,
+                    f.nome_completo as manufacturer_name,
+                    f.pais_origem as manufacturer_country,
+                    a.nome_arquivo,
+                    co.created_at as data_criacao
+                FROM protec_ai.valores_originais vo
+                JOIN protec_ai.campos_originais co ON vo.campo_id = co.id
+                JOIN protec_ai.arquivos a ON co.arquivo_id = a.id
+                JOIN protec_ai.fabricantes f ON a.fabricante_id = f.id
+                WHERE {" AND ".join(where)}
+                ORDER BY vo.id
+                LIMIT {EXTRACTED_MODEL_LIMIT}
+            ) extracted
+        """
+    
+    def _load_unified_equipment(self, conn, manufacturer_filter: str, status_filter: Optional[str],
+                                size: int, source: str = "structured", after_id: int = 0,
+                                offset: int = 0) -> Dict[str, Any]:
+        """Página de equipamentos estruturados + configurações extraídas (mesma conexão)"""
+        queries = self._unified_source_queries(manufacturer_filter, status_filter)
+        totals = {name: estimate_count(conn, sql, params) for name, (sql, params) in queries.items()}
+        
+        results = []
+        has_more = False
+        for name in UNIFIED_SOURCES[UNIFIED_SOURCES.index(source):]:
+            if name not in queries:
+                continue
+            if offset and name != UNIFIED_SOURCES[-1]:
+                # Paginação por página: a fronteira entre fontes precisa do total
+                # exato (a estimativa do planner pularia ou repetiria linhas)
+                sql, params = queries[name]
+                source_rows = exact_count(conn, sql, params)
+                if offset >= source_rows:
+                    offset -= source_rows
+                    continue
+            
+            sql, params = queries[name]
+            # +1 linha para saber se há próxima página sem COUNT
+            remaining = size - len(results) + 1
+            rows = conn.execute(
+                text(f"SELECT * FROM ({sql}) source WHERE id > :after_id ORDER BY id LIMIT :limit OFFSET :offset"),
+                dict(params, after_id=after_id if name == source else 0, limit=remaining, offset=offset)
+            ).fetchall()
+            offset = 0
+            
+            to_item = self._structured_item if name == "structured" else self._extracted_item
+            results.extend((name, row.id, to_item(row)) for row in rows)
+            if len(results) > size:
+                has_more = True
+                break
+        
+        page = results[:size]
+        next_cursor = None
+        if has_more:
+            last_source, last_id, _ = page[-1]
+            next_cursor = encode_cursor(source=last_source, id=last_id)
+        
+        return {
+            "data": [item for _, _, item in page],
+            "next_cursor": next_cursor,
+            "total": sum(totals.values())
+        }
+    
+    @staticmethod
+    def _structured_item(eq) -> Dict[str, Any]:
+        """Equipamento de protec_ai.relay_equipment no formato unificado"""
+        return {
+            "id": f"protec_ai_{eq.id}",
+            "source": "protec_ai",
+            "source_schema": "protec_ai",
+            "tag_reference": eq.equipment_tag,
+            "serial_number": eq.serial_number,
+            "plant_reference": eq.substation_name,
+            "bay_position": eq.barra_nome,
+            "status": eq.status,
+            "description": eq.position_description,
+            "model": {
+                "name": eq.model_name,
+                "series": eq.series,
+                "type": eq.model_type,
+                "family": eq.family
+            },
+            "manufacturer": {
+                "name": eq.manufacturer_name,
+                "country": eq.manufacturer_country
+            },
+            "data_completeness": "structured",
+            "created_at": eq.created_at
+        }
+    
+    @staticmethod
+    def _extracted_item(config) -> Dict[str, Any]:
+        """Configuração extraída (valores_originais) no formato unificado"""
+        return {
+            "id": f"protec_ai_{config.id}",
+            "source": "protec_ai", 
+            "tag_reference": None,
+            "serial_number": None,
+            "plant_reference": None,
+            "bay_position": None,
+            "status": "extracted",
+            "description": f"Extracted parameter: {config.codigo_campo}",
+            "model": {
+                "name": config.valor_original,
+                "type": "extracted",
+                "family": None
+            },
+            "manufacturer": {
+                "name": config.manufacturer_name,
+                "country": config.manufacturer_country
+            },
+            "data_completeness": "extracted",
+            "source_file": config.nome_arquivo,
+            "parameter_field": config.codigo_campo,
+            "value": config.valor_original,
+            "unit": getattr(config, 'unidade', 'N/A'),
+            "created_at": config.data_criacao
+        }
+    
     async def get_equipment_configuration_details(self, equipment_id: str) -> Optional[Dict]:
         """
         Busca detalhes completos de configuração
@@ -436,8 +519,10 @@ class UnifiedEquipmentService:
                 WHERE re.id = :equipment_id
             """)
             
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"equipment_id": equipment_id}).fetchone()
+            result = await run_read(
+                lambda conn: conn.execute(query, {"equipment_id": equipment_id}).fetchone(),
+                self.async_db
+            )
             
             if not result:
                 return None
@@ -530,13 +615,15 @@ class UnifiedEquipmentService:
                 ORDER BY tv.posicao_token
             """)
             
-            with self.engine.connect() as conn:
+            def _load(conn):
                 main_result = conn.execute(main_query, {"value_id": value_id}).fetchone()
-                
                 if not main_result:
-                    return None
-                
-                tokens = conn.execute(tokens_query, {"value_id": value_id}).fetchall()
+                    return None, []
+                return main_result, conn.execute(tokens_query, {"value_id": value_id}).fetchall()
+            
+            main_result, tokens = await run_read(_load, self.async_db)
+            if not main_result:
+                return None
             
             return {
                 "source": "protec_ai",
@@ -0,0 +1,57 @@
+-- ============================================================================
+-- MIGRATION: ÍNDICES TRIGRAMA (pg_trgm) PARA BUSCAS ILIKE E TYPEAHEAD
+-- Data: 22 de novembro de 2025
+-- Objetivo: Filtros com curinga inicial (ILIKE '%x%') passam a usar índice
+--
+-- Filtros atendidos:
+--   - ReportService.get_filtered_equipments: fabricante, modelo, barra, subestação
+--   - active_functions: relay_file ILIKE (GET /active-functions/{relay_id}),
+--     relay_model ILIKE (/active-functions/search)
+--   - UnifiedEquipmentService.search_unified_manufacturers: fabricantes, manufacturers
+--   - GET /api/v1/search/typeahead: tags, modelos, fabricantes, barras, códigos
+--     de parâmetros (similaridade por palavra, operador <%)
+--
+-- B-tree não atende LIKE com '%' no início; GIN com gin_trgm_ops atende
+-- LIKE/ILIKE (padrões com 3+ caracteres), similarity (%) e word_similarity (<%).
+--
+-- IMPORTANTE: CREATE INDEX CONCURRENTLY não roda dentro de transação.
+-- Execute com psql em autocommit (sem BEGIN/COMMIT):
+--   psql -d protecai_db -f docs/sql/migration_trigram_search_2025-11-22.sql
+-- Idempotente: pode ser reexecutado.
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Equipamentos: tag, barra, subestação
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relay_equipment_tag_trgm
+    ON protec_ai.relay_equipment USING gin (equipment_tag gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relay_equipment_barra_trgm
+    ON protec_ai.relay_equipment USING gin (barra_nome gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relay_equipment_substation_trgm
+    ON protec_ai.relay_equipment USING gin (substation_name gin_trgm_ops);
+
+-- Modelos e fabricantes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relay_models_name_trgm
+    ON protec_ai.relay_models USING gin (model_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fabricantes_nome_trgm
+    ON protec_ai.fabricantes USING gin (nome_completo gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_manufacturers_name_trgm
+    ON protec_ai.manufacturers USING gin (name gin_trgm_ops);
+
+-- Funções ativas detectadas
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_active_functions_relay_file_trgm
+    ON protec_ai.active_protection_functions USING gin (relay_file gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_active_functions_relay_model_trgm
+    ON protec_ai.active_protection_functions USING gin (relay_model gin_trgm_ops);
+
+-- Códigos de parâmetros (typeahead)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relay_settings_parameter_code_trgm
+    ON protec_ai.relay_settings USING gin (parameter_code gin_trgm_ops);
+
+-- Estatísticas atualizadas para o planner escolher os novos índices
+ANALYZE protec_ai.relay_equipment;
+ANALYZE protec_ai.relay_models;
+ANALYZE protec_ai.fabricantes;
+ANALYZE protec_ai.manufacturers;
+ANALYZE protec_ai.active_protection_functions;
+ANALYZE protec_ai.relay_settings;
@@ -4,14 +4,19 @@ PIPELINE COMPLETA - EXTRAÇÃO → NORMALIZAÇÃO → POSTGRESQL
 =========================================================
 
 FLUXO CORRETO:
-1. Extração: inputs/ → outputs/csv/ + outputs/excel/
-2. Normalização: outputs/csv/ → outputs/norm_csv/ + outputs/norm_excel/
+1. Extração: inputs/ → outputs/csv/ (+ outputs/parquet/ com pyarrow)
+2. Normalização: outputs/csv/ → outputs/norm_csv/ (+ outputs/norm_parquet/)
 3. Importação: outputs/norm_csv/ → PostgreSQL (protecai_db / protec_ai schema)
+   (com --incremental, só os CSVs normalizados alterados são reimportados)
+
+Entre as etapas os dados trafegam com tipos explícitos (src/stage_frames.py).
+As planilhas outputs/excel/ e outputs/norm_excel/ só são geradas com --excel.
 
 Autor: ProtecAI Team
 Data: 17/11/2025
 """
 
+import argparse
 import logging
 import subprocess
 import sys
@@ -28,7 +33,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def executar_etapa_1_extracao():
+def executar_etapa_1_extracao(workers=1, pages_per_task=0, incremental=False, excel=False):
     """Etapa 1: Extrair parâmetros de PDFs/TXTs"""
     logger.info("\n" + "=" * 80)
     logger.info("📄 ETAPA 1: EXTRAÇÃO DE PARÂMETROS")
@@ -36,8 +41,11 @@ def executar_etapa_1_extracao():
 
     from complete_pipeline_processor import CompletePipelineProcessor
 
-    processor = CompletePipelineProcessor(str(project_root))
-    stats = processor.process_all()
+    processor = CompletePipelineProcessor(str(project_root), excel=excel)
+    stats = processor.process_all(
+        workers=workers, pages_per_task=pages_per_task, incremental=incremental
+    )
+    processor.print_statistics(stats)
 
     logger.info("\n✅ Extração concluída:")
     logger.info(f"   Arquivos processados: {stats['processed']}")
@@ -46,7 +54,7 @@ def executar_etapa_1_extracao():
     return stats["processed"] > 0
 
 
-def executar_etapa_2_normalizacao():
+def executar_etapa_2_normalizacao(incremental=False, excel=False):
     """Etapa 2: Normalizar CSVs extraídos"""
     logger.info("\n" + "=" * 80)
     logger.info("🔄 ETAPA 2: NORMALIZAÇÃO")
@@ -59,8 +67,14 @@ def executar_etapa_2_normalizacao():
         return False
 
     try:
+        command = [sys.executable, str(script_path)]
+        if incremental:
+            command.append("--incremental")
+        if not excel:
+            command.append("--no-excel")
+
         result = subprocess.run(
-            [sys.executable, str(script_path)],
+            command,
             cwd=project_root,
             capture_output=True,
             text=True,
@@ -80,12 +94,15 @@ def executar_etapa_2_normalizacao():
         return False
 
 
-def executar_etapa_3_importacao():
+def executar_etapa_3_importacao(incremental=False):
     """Etapa 3: Importar para PostgreSQL (2 passos: equipamentos + settings)"""
     logger.info("\n" + "=" * 80)
     logger.info("💾 ETAPA 3: IMPORTAÇÃO PARA POSTGRESQL")
     logger.info("=" * 80)
 
+    if incremental:
+        return executar_etapa_3_importacao_incremental()
+
     # PASSO 3A: Criar equipamentos (fabricantes, modelos, relay_equipment)
     logger.info("\n📦 3A. Criando estrutura de equipamentos...")
     script_equipment = project_root / "scripts" / "universal_robust_relay_processor.py"
@@ -140,8 +157,59 @@ def executar_etapa_3_importacao():
         return False
 
 
+def executar_etapa_3_importacao_incremental():
+    """
+    Etapa 3 incremental: outputs/norm_csv/ → PostgreSQL pelo importador com
+    cache (import_normalized_data_to_db.py --incremental).
+
+    Só os CSVs normalizados alterados são reimportados (settings do
+    equipamento substituídos); o importador cria equipamentos e modelos.
+    O passo 3A não roda aqui porque limpa as tabelas antes de recriar tudo.
+    """
+    logger.info("\n📊 Importando settings alterados (incremental)...")
+    script_import = project_root / "scripts" / "import_normalized_data_to_db.py"
+
+    if not script_import.exists():
+        logger.error(f"❌ Script não encontrado: {script_import}")
+        return False
+
+    try:
+        result = subprocess.run(
+            [sys.executable, str(script_import), "--incremental"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+        )
+
+        if result.returncode == 0:
+            logger.info("✅ Settings importados")
+            if result.stdout:
+                print(result.stdout)
+            return True
+        else:
+            logger.error(f"❌ Erro importando settings: {result.stderr}")
+            if result.stderr:
+                print(result.stderr)
+            return False
+
+    except Exception as e:
+        logger.error(f"❌ Exceção: {e}")
+        return False
+
+
 def main():
     """Executa pipeline completa"""
+    parser = argparse.ArgumentParser(description="Pipeline completa ProtecAI")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processos para a extração (default: 1 = sequencial)")
+    parser.add_argument("--pages-per-task", type=int, default=0,
+                        help="Divide PDFs Easergy grandes em blocos de N páginas")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Refaz apenas arquivos alterados em todas as etapas (cache por hash de conteúdo)")
+    parser.add_argument("--excel", action="store_true",
+                        help="Gera também as planilhas outputs/excel/ e outputs/norm_excel/")
+    args = parser.parse_args()
+
     logger.info("\n" + "=" * 80)
     logger.info("🚀 PIPELINE COMPLETA - PROTECAI")
     logger.info("   Database: protecai_db")
@@ -150,17 +218,19 @@ def main():
 
     try:
         # Etapa 1: Extração
-        if not executar_etapa_1_extracao():
+        if not executar_etapa_1_extracao(
+            args.workers, args.pages_per_task, args.incremental, args.excel
+        ):
             logger.error("❌ Falha na extração. Abortando.")
             return False
 
         # Etapa 2: Normalização
-        if not executar_etapa_2_normalizacao():
+        if not executar_etapa_2_normalizacao(args.incremental, args.excel):
             logger.error("❌ Falha na normalização. Abortando.")
             return False
 
         # Etapa 3: Importação (opcional)
-        executar_etapa_3_importacao()
+        executar_etapa_3_importacao(args.incremental)
 
         logger.info("\n" + "=" * 80)
         logger.info("🎉 PIPELINE COMPLETA EXECUTADA COM SUCESSO!")
@@ -168,7 +238,10 @@ def main():
 
         # Verificar outputs gerados
         logger.info("\n📊 Outputs gerados:")
-        for pasta in ["csv", "excel", "norm_csv", "norm_excel"]:
+        pastas = ["csv", "parquet", "norm_csv", "norm_parquet"]
+        if args.excel:
+            pastas += ["excel", "norm_excel"]
+        for pasta in pastas:
             dir_path = project_root / "outputs" / pasta
             if dir_path.exists():
                 count = len(list(dir_path.glob("*")))
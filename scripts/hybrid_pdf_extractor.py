@@ -19,25 +19,32 @@ VIDAS EM RISCO - Zero tolerância a erros
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, Tuple, Optional
 import pandas as pd
 
 # PyPDF2 para extração de texto
 from PyPDF2 import PdfReader
 
-# OCR para detecção de checkboxes
-from pdf2image import convert_from_path
-import pytesseract
-from PIL import Image
+# Detecção de checkboxes (raster página a página) + OCR em lote dos rótulos
+import fitz
 import cv2
 import numpy as np
 
 # Configurações
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.page_render_cache import get_page_raster_cache
+from src.page_stream import DEFAULT_MEMORY_LIMIT_MB, IncrementalCSVWriter, iter_pdf_pages
+from src.batched_ocr import BatchedLabelOCR, LabelBox
+
 INPUTS_PDF = BASE_DIR / "inputs" / "pdf"
 INPUTS_TXT = BASE_DIR / "inputs" / "txt"
 OUTPUT_DIR = BASE_DIR / "outputs" / "hybrid_csv"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+DPI = 300
+# Páginas por lote de OCR (paralelismo entre páginas vs. memória retida)
+OCR_PAGE_WINDOW = 4
 
 # REGEX para detectar parâmetros nos 3 formatos
 PATTERNS = {
@@ -52,6 +59,8 @@ class HybridRelayExtractor:
     
     def __init__(self):
         self.verbose = True
+        # Rótulos empilhados por página: psm 6 (bloco) em vez de psm 7 por recorte
+        self.ocr = BatchedLabelOCR(dpi=DPI)
     
     def log(self, msg: str, level: str = "INFO"):
         """Log com cores"""
@@ -130,47 +139,73 @@ class HybridRelayExtractor:
         
         Retorna: [{"code": "", "description": "Output RL4", "value": "☒", "source": "checkbox"}, ...]
         """
+        try:
+            return [param for window in self.iter_checkbox_parameters(pdf_path) for param in window]
+        except Exception as e:
+            self.log(f"❌ Erro no OCR: {e}", "ERROR")
+            return []
+    
+    def iter_checkbox_parameters(self, pdf_path: Path,
+                                 memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> Iterator[List[Dict[str, str]]]:
+        """
+        Parâmetros com CHECKBOXES, uma janela de OCR_PAGE_WINDOW páginas por vez
+        
+        Cada página é rasterizada, analisada e liberada (teto memory_limit_mb);
+        os rótulos da janela são lidos em lote (camada de texto do PDF, OCR
+        só onde não há texto, páginas da janela em paralelo) e emitidos antes
+        das próximas páginas serem lidas.
+        """
         self.log(f"🔍 Detectando checkboxes via OCR em {pdf_path.name}...")
         
-        try:
-            # Converter PDF para imagens (300 DPI para boa qualidade)
-            self.log("   Convertendo PDF → Imagens (300 DPI)...", "INFO")
-            images = convert_from_path(str(pdf_path), dpi=300)
-            self.log(f"   ✅ {len(images)} páginas convertidas", "SUCCESS")
+        scale = DPI / 72
+        raster_cache = get_page_raster_cache()
+        found = 0
+        boxes = []
+        doc = None
+        
+        for page in iter_pdf_pages(pdf_path, memory_limit_mb=memory_limit_mb):
+            doc = page.parent
+            i = page.number + 1
+            self.log(f"   Página {i}: Analisando checkboxes...", "INFO")
             
-            checkbox_params = []
+            image, _ = raster_cache.render(page, dpi=DPI)
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
             
-            # Processar cada página
-            for i, image in enumerate(images, 1):
-                self.log(f"   Página {i}: Analisando checkboxes...", "INFO")
-                
-                # Converter PIL → numpy array para OpenCV
-                img_array = np.array(image)
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-                
-                # Detectar checkboxes marcados (X)
-                checkboxes = self._detect_checkboxes(gray)
-                
-                if checkboxes:
-                    self.log(f"      ✅ {len(checkboxes)} checkboxes marcados detectados", "SUCCESS")
-                    
-                    # Extrair texto próximo aos checkboxes com OCR
-                    for checkbox in checkboxes:
-                        text_near = self._extract_text_near_checkbox(image, checkbox)
-                        if text_near:
-                            checkbox_params.append({
-                                "code": "",  # Checkboxes geralmente não têm código próprio
-                                "description": text_near,
-                                "value": "☒",  # Marcado
-                                "source": f"checkbox_page_{i}"
-                            })
+            # Detectar checkboxes marcados (X)
+            checkboxes = self._detect_checkboxes(gray)
             
-            self.log(f"✅ Checkboxes encontrados: {len(checkbox_params)}", "SUCCESS")
-            return checkbox_params
+            if checkboxes:
+                self.log(f"      ✅ {len(checkboxes)} checkboxes marcados detectados", "SUCCESS")
+                
+                # Região à direita do checkbox (onde geralmente está o texto), em pontos PDF
+                for x, y, w, h in checkboxes:
+                    boxes.append(LabelBox(page.number, (
+                        (x + w + 5) / scale, (y - 5) / scale,
+                        (x + w + 300) / scale, (y + h + 5) / scale,
+                    )))
             
-        except Exception as e:
-            self.log(f"❌ Erro no OCR: {e}", "ERROR")
-            return []
+            if boxes and (i % OCR_PAGE_WINDOW == 0 or i == len(doc)):
+                window = self._read_checkbox_labels(doc, boxes)
+                found += len(window)
+                boxes = []
+                yield window
+        
+        self.log(f"✅ Checkboxes encontrados: {found} "
+                 f"(texto PDF: {self.ocr.text_layer_hits}, OCR: {self.ocr.ocr_regions}, "
+                 f"chamadas tesseract: {self.ocr.tesseract_calls})", "SUCCESS")
+    
+    def _read_checkbox_labels(self, doc: fitz.Document, boxes: List[LabelBox]) -> List[Dict[str, str]]:
+        """Lê os rótulos das regiões (camada de texto; OCR só onde não há texto)"""
+        params = []
+        for box, text_near in zip(boxes, self.ocr.read_labels(doc, boxes)):
+            if text_near:
+                params.append({
+                    "code": "",  # Checkboxes geralmente não têm código próprio
+                    "description": text_near,
+                    "value": "☒",  # Marcado
+                    "source": f"checkbox_page_{box.page + 1}"
+                })
+        return params
     
     def _detect_checkboxes(self, gray_image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
@@ -197,18 +232,6 @@ class HybridRelayExtractor:
         
         return checkboxes
     
-    def _extract_text_near_checkbox(self, image: Image, bbox: Tuple[int, int, int, int]) -> str:
-        """Extrai texto próximo ao checkbox usando OCR"""
-        x, y, w, h = bbox
-        
-        # Região à direita do checkbox (onde geralmente está o texto)
-        text_region = image.crop((x + w + 5, y - 5, x + w + 300, y + h + 5))
-        
-        # OCR na região
-        text = pytesseract.image_to_string(text_region, config='--psm 7').strip()
-        
-        return text
-    
     def merge_parameters(self, text_params: List[Dict], checkbox_params: List[Dict]) -> pd.DataFrame:
         """
         Combina parâmetros textuais + checkboxes em DataFrame único
@@ -237,6 +260,11 @@ class HybridRelayExtractor:
         self.log(f"✅ Total de parâmetros únicos: {len(df)}", "SUCCESS")
         return df
     
+    @staticmethod
+    def _csv_rows(params: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Parâmetros no formato das colunas do CSV (Code, Description, Value)"""
+        return [{'Code': p['code'], 'Description': p['description'], 'Value': p['value']} for p in params]
+    
     def process_pdf(self, pdf_path: Path) -> Optional[Path]:
         """Processa um PDF completo: texto + OCR → CSV"""
         self.log("=" * 80, "INFO")
@@ -246,22 +274,25 @@ class HybridRelayExtractor:
         # 1. Extrair parâmetros textuais
         text_params = self.extract_text_parameters(pdf_path)
         
-        # 2. Extrair checkboxes via OCR
-        checkbox_params = self.extract_checkbox_parameters(pdf_path)
-        
-        # 3. Mesclar
-        df = self.merge_parameters(text_params, checkbox_params)
+        # 2. Checkboxes via OCR, gravados no CSV à medida que as páginas são lidas
+        #    (duplicatas de código + descrição descartadas, ordem de leitura)
+        output_path = OUTPUT_DIR / f"{pdf_path.stem}_hybrid.csv"
+        with IncrementalCSVWriter(output_path, ['Code', 'Description', 'Value'],
+                                  dedupe_on=['Code', 'Description'], encoding='utf-8') as writer:
+            writer.write_rows(self._csv_rows(text_params))
+            try:
+                for window in self.iter_checkbox_parameters(pdf_path):
+                    writer.write_rows(self._csv_rows(window))
+            except Exception as e:
+                self.log(f"❌ Erro no OCR: {e}", "ERROR")
         
-        if df.empty:
+        if writer.rows_written == 0:
+            output_path.unlink(missing_ok=True)
             self.log(f"⚠️  Nenhum parâmetro encontrado em {pdf_path.name}", "WARNING")
             return None
         
-        # 4. Salvar CSV
-        output_path = OUTPUT_DIR / f"{pdf_path.stem}_hybrid.csv"
-        df.to_csv(output_path, index=False, encoding='utf-8')
-        
         self.log("=" * 80, "SUCCESS")
-        self.log(f"✅ SUCESSO: {output_path.name} ({len(df)} parâmetros)", "SUCCESS")
+        self.log(f"✅ SUCESSO: {output_path.name} ({writer.rows_written} parâmetros)", "SUCCESS")
         self.log("=" * 80, "SUCCESS")
         
         return output_path
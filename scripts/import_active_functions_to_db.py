@@ -11,15 +11,21 @@ from pathlib import Path
 from datetime import datetime
 import logging
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('outputs/logs/import_functions_db.log'),
-        logging.StreamHandler()
-    ]
-)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def configure_logging():
+    """Logging do script (arquivo + console); não é aplicado quando importado"""
+    log_dir = PROJECT_ROOT / 'outputs' / 'logs'
+    log_dir.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_dir / 'import_functions_db.log'),
+            logging.StreamHandler()
+        ]
+    )
 
 # Configuração do banco
 DB_CONFIG = {
@@ -30,6 +36,19 @@ DB_CONFIG = {
     'port': '5432'  # Porta correta do container
 }
 
+UPSERT_ACTIVE_FUNCTION_SQL = """
+INSERT INTO active_protection_functions 
+    (relay_file, relay_model, function_code, function_description, 
+     detection_method, source_file, detection_timestamp)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (relay_file, function_code) 
+DO UPDATE SET
+    relay_model = EXCLUDED.relay_model,
+    function_description = EXCLUDED.function_description,
+    detection_method = EXCLUDED.detection_method,
+    detection_timestamp = EXCLUDED.detection_timestamp
+"""
+
 def create_active_functions_table(conn):
     """
     Cria tabela active_protection_functions se não existir.
@@ -70,7 +89,7 @@ def load_relay_models_config():
     Carrega configuração de modelos para mapear função → descrição.
     """
     import json
-    config_path = Path('inputs/glossario/relay_models_config.json')
+    config_path = PROJECT_ROOT / 'inputs' / 'glossario' / 'relay_models_config.json'
     
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
@@ -156,20 +175,7 @@ def import_active_functions(conn, csv_path: Path):
                 
                 try:
                     # Tenta inserir (com UPSERT usando ON CONFLICT)
-                    insert_sql = """
-                    INSERT INTO active_protection_functions 
-                        (relay_file, relay_model, function_code, function_description, 
-                         detection_method, source_file, detection_timestamp)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (relay_file, function_code) 
-                    DO UPDATE SET
-                        relay_model = EXCLUDED.relay_model,
-                        function_description = EXCLUDED.function_description,
-                        detection_method = EXCLUDED.detection_method,
-                        detection_timestamp = EXCLUDED.detection_timestamp
-                    """
-                    
-                    cur.execute(insert_sql, (
+                    cur.execute(UPSERT_ACTIVE_FUNCTION_SQL, (
                         relay_file,
                         relay_model,
                         func_code,
@@ -201,6 +207,40 @@ def import_active_functions(conn, csv_path: Path):
     return inserted, updated, errors
 
 
+def replace_relay_functions(conn, detection: dict, source_file: str,
+                            function_descriptions: dict, commit: bool = True):
+    """
+    Substitui as funções ativas de UM relé (resultado de detect_active_functions).
+    
+    Usado pela ingestão de arquivo único: funções que deixaram de estar ativas
+    são removidas e as demais passam pelo mesmo UPSERT da importação completa;
+    linhas de outros relés não são tocadas.
+    
+    Returns:
+        Número de funções ativas gravadas
+    """
+    relay_file = detection['relay_file']
+    functions = list(detection.get('active_functions') or [])
+    now = datetime.now()
+    
+    with conn.cursor() as cur:
+        cur.execute(
+            "DELETE FROM active_protection_functions WHERE relay_file = %s "
+            "AND NOT (function_code = ANY(%s))",
+            (relay_file, functions)
+        )
+        cur.executemany(UPSERT_ACTIVE_FUNCTION_SQL, [
+            (relay_file, detection.get('model'), func_code,
+             function_descriptions.get(func_code, 'Descrição não disponível'),
+             detection.get('detection_method') or 'unknown', source_file, now)
+            for func_code in functions
+        ])
+    if commit:
+        conn.commit()
+    
+    return len(functions)
+
+
 def generate_validation_report(conn):
     """
     Gera relatório de validação comparando banco com CSV.
@@ -258,12 +298,13 @@ def main():
     """
     Executa importação completa.
     """
+    configure_logging()
     logging.info("="*80)
     logging.info("🚀 INICIANDO IMPORTAÇÃO DE FUNÇÕES ATIVAS PARA BANCO DE DADOS")
     logging.info("="*80)
     
     # Paths
-    csv_path = Path('outputs/reports/funcoes_ativas_consolidado.csv')
+    csv_path = PROJECT_ROOT / 'outputs' / 'reports' / 'funcoes_ativas_consolidado.csv'
     
     if not csv_path.exists():
         logging.error(f"❌ Arquivo não encontrado: {csv_path}")
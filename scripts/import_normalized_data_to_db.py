@@ -4,53 +4,69 @@ Script para importar dados normalizados (3FN) para PostgreSQL
 Importa os CSVs de outputs/norm_csv/ para o schema protec_ai
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
 import pandas as pd
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_batch, execute_values
 from datetime import datetime
 import logging
 import re
-try:
-    import fitz  # PyMuPDF para ler PDFs
-except ImportError:
-    fitz = None
-
 # Importar mapeamento de funções
 sys.path.insert(0, str(Path(__file__).parent))
 from map_parameters_to_functions import get_function_code_and_category
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('outputs/logs/import_normalized_data.log'),
-        logging.StreamHandler()
-    ]
-)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.pipeline_artifact_cache import PipelineArtifactCache, STAGE_IMPORT
+from src.relay_settings_bulk_loader import prepare_settings_frame, unit_symbols, SettingsCopyWriter
+from src.relay_settings_stats import ensure_summary_table, refresh_equipment_summary
+from src.relay_format_sniffer import get_format_sniffer, sniff_filename
+from src.stage_frames import NORMALIZED_3NF_SCHEMA, read_stage_frame
+
 logger = logging.getLogger(__name__)
 
-# Configuração do banco de dados
+
+def configure_logging():
+    """Logging do script (arquivo + console); não é aplicado quando importado"""
+    log_dir = PROJECT_ROOT / "outputs" / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_dir / 'import_normalized_data.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+# Configuração do banco de dados (mesmas variáveis POSTGRES_* da API)
 DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5432,
-    'database': 'protecai_db',
-    'user': 'protecai',
-    'password': 'protecai'
+    'host': os.getenv('POSTGRES_SERVER', 'localhost'),
+    'port': int(os.getenv('POSTGRES_PORT', '5432')),
+    'database': os.getenv('POSTGRES_DB', 'protecai_db'),
+    'user': os.getenv('POSTGRES_USER', 'protecai'),
+    'password': os.getenv('POSTGRES_PASSWORD', 'protecai')
 }
 
 # Diretórios
-NORMALIZED_CSV_DIR = Path("outputs/norm_csv")
+NORMALIZED_CSV_DIR = PROJECT_ROOT / "outputs" / "norm_csv"
 
 class NormalizedDataImporter:
-    def __init__(self):
+    # Versão da lógica de importação (invalida o cache incremental ao mudar)
+    IMPORTER_VERSION = "2025.11.22"
+    
+    def __init__(self, incremental=False, bulk=True):
+        self.incremental = incremental
+        self.bulk = bulk  # COPY + uma transação por arquivo (False = INSERT linha a linha)
         self.conn = None
         self.cursor = None
         self.manufacturer_patterns = {}  # Carregado do banco
         self.function_map = {}  # Mapeamento function_code -> function_id
+        self.unit_map = {}  # unit_symbol -> unit_id (modo bulk)
+        self.model_map = {}  # model_code -> relay_model_id (modo bulk)
         self.stats = {
             'equipments_inserted': 0,
             'equipments_existing': 0,
@@ -58,6 +74,7 @@ class NormalizedDataImporter:
             'multipart_groups_inserted': 0,
             'units_created': 0,
             'files_processed': 0,
+            'files_skipped': 0,
             'errors': [],
             'function_mappings': 0,
             'category_classifications': 0
@@ -69,8 +86,13 @@ class NormalizedDataImporter:
             self.conn = psycopg2.connect(**DB_CONFIG)
             self.cursor = self.conn.cursor()
             logger.info("✓ Conectado ao PostgreSQL")
+            ensure_summary_table(self.cursor)
+            self.conn.commit()
             self.load_manufacturer_patterns()
             self.load_function_map()
+            if self.bulk:
+                self.load_unit_map()
+                self.load_model_map()
             return True
         except Exception as e:
             logger.error(f"✗ Erro ao conectar: {e}")
@@ -97,6 +119,18 @@ class NormalizedDataImporter:
             logger.warning(f"⚠ Erro ao carregar function_map: {e}")
             self.function_map = {}
     
+    def load_unit_map(self):
+        """Carregar mapeamento unit_symbol -> unit_id do banco"""
+        self.cursor.execute("SELECT id, unit_symbol FROM protec_ai.units")
+        self.unit_map = {symbol: unit_id for unit_id, symbol in self.cursor.fetchall()}
+        logger.info(f"✓ Carregadas {len(self.unit_map)} unidades")
+    
+    def load_model_map(self):
+        """Carregar mapeamento model_code -> relay_model_id do banco"""
+        self.cursor.execute("SELECT id, model_code FROM protec_ai.relay_models")
+        self.model_map = {code: model_id for model_id, code in self.cursor.fetchall()}
+        logger.info(f"✓ Carregados {len(self.model_map)} modelos de relé")
+    
     def load_manufacturer_patterns(self):
         """Carregar padrões de detecção do banco de dados"""
         try:
@@ -162,6 +196,40 @@ class NormalizedDataImporter:
             self.conn.rollback()
             return None
     
+    def resolve_units(self, symbols):
+        """
+        Garantir que todas as unidades estejam em unit_map (modo bulk)
+        
+        Unidades novas são inseridas em um único comando, dentro da
+        transação do arquivo (sem commit).
+        
+        Returns:
+            int: Número de unidades criadas
+        """
+        missing = [str(symbol) for symbol in symbols if symbol not in self.unit_map]
+        if not missing:
+            return 0
+        
+        self.cursor.execute(
+            """INSERT INTO protec_ai.units (unit_symbol, unit_name, unit_category)
+               SELECT symbol, symbol, 'unknown' FROM unnest(%s::text[]) AS symbol
+               ON CONFLICT (unit_symbol) DO NOTHING
+               RETURNING id, unit_symbol""",
+            (missing,)
+        )
+        created = self.cursor.fetchall()
+        
+        # Criadas por outra sessão entre a carga do mapa e agora
+        self.cursor.execute(
+            "SELECT id, unit_symbol FROM protec_ai.units WHERE unit_symbol = ANY(%s)",
+            (missing,)
+        )
+        self.unit_map.update({symbol: unit_id for unit_id, symbol in self.cursor.fetchall()})
+        
+        for _, symbol in created:
+            logger.info(f"  → Nova unidade criada: {symbol}")
+        return len(created)
+    
     def detect_manufacturer_from_source(self, filename):
         """
         Detectar fabricante lendo o arquivo original (PDF ou .S40)
@@ -175,65 +243,34 @@ class NormalizedDataImporter:
         
         # Buscar arquivo original em inputs/
         possible_paths = [
-            Path("inputs/pdf") / f"{original_name}.pdf",
-            Path("inputs/txt") / f"{original_name}.S40",
-            Path("inputs/txt") / f"{original_name}.txt",
+            PROJECT_ROOT / "inputs" / "pdf" / f"{original_name}.pdf",
+            PROJECT_ROOT / "inputs" / "txt" / f"{original_name}.S40",
+            PROJECT_ROOT / "inputs" / "txt" / f"{original_name}.txt",
         ]
         
         for source_path in possible_paths:
             if not source_path.exists():
                 continue
             
-            try:
-                if source_path.suffix.upper() == '.PDF':
-                    # Extrair texto do PDF
-                    if not fitz:
-                        logger.warning("  ⚠️ PyMuPDF não instalado, pulando detecção por PDF")
-                        continue
-                    
-                    doc = fitz.open(source_path)
-                    pages_to_check = [0, len(doc) - 1] if len(doc) > 1 else [0]
-                    
-                    for page_num in pages_to_check:
-                        page = doc[page_num]
-                        text = page.get_text()
-                        
-                        # Buscar usando padrões do banco
-                        for mfr_code, mfr_data in self.manufacturer_patterns.items():
-                            # Testar software signatures
-                            for software in mfr_data['software']:
-                                if software in text:
-                                    doc.close()
-                                    return mfr_code, software
-                            
-                            # Testar content patterns
-                            for pattern in mfr_data['content']:
-                                if re.search(pattern, text, re.IGNORECASE):
-                                    doc.close()
-                                    return mfr_code, pattern
-                    
-                    doc.close()
+            # Texto da 1ª página / primeiros KB, lido uma vez por arquivo (memorizado por hash)
+            sniff = get_format_sniffer().sniff(source_path)
+            text = sniff.head_text
+            
+            # Buscar usando padrões do banco
+            for mfr_code, mfr_data in self.manufacturer_patterns.items():
+                # Testar software signatures
+                for software in mfr_data['software']:
+                    if software in text:
+                        return mfr_code, software
                 
-                elif source_path.suffix.upper() in ['.S40', '.TXT']:
-                    # Ler arquivo de texto
-                    encodings = ['latin-1', 'cp1252', 'utf-8']
-                    for encoding in encodings:
-                        try:
-                            with open(source_path, 'r', encoding=encoding, errors='ignore') as f:
-                                content = f.read(5000)  # Primeiros 5KB
-                            
-                            # Buscar usando padrões do banco
-                            for mfr_code, mfr_data in self.manufacturer_patterns.items():
-                                for pattern in mfr_data['content']:
-                                    if re.search(pattern, content, re.IGNORECASE):
-                                        return mfr_code, pattern
-                            break
-                        except:
-                            continue
+                # Testar content patterns
+                for pattern in mfr_data['content']:
+                    if re.search(pattern, text, re.IGNORECASE):
+                        return mfr_code, pattern
             
-            except Exception as e:
-                logger.warning(f"  ⚠️ Erro ao ler {source_path.name}: {e}")
-                continue
+            # Fabricante do detector compartilhado, se cadastrado no banco
+            if sniff.manufacturer in self.manufacturer_patterns:
+                return sniff.manufacturer, sniff.relay_type
         
         return None, None
     
@@ -245,6 +282,7 @@ class NormalizedDataImporter:
         1. Detectar fabricante lendo conteúdo do arquivo original (PRIORIDADE)
         2. Detectar modelo usando padrões regex do banco
         3. Se não achar, tentar detectar modelo e inferir fabricante por padrões do banco
+        4. Último recurso: tabela de modelos do relay_models_config.json (relay_format_sniffer)
         """
         filename_upper = filename.upper()
         
@@ -278,6 +316,14 @@ class NormalizedDataImporter:
                 if model_code:
                     break
         
+        # 4. Modelo pela tabela do relay_models_config.json (detector compartilhado)
+        if not model_code:
+            sniff = sniff_filename(filename)
+            if sniff.model:
+                model_code = sniff.model
+                if not detected_manufacturer and sniff.manufacturer in self.manufacturer_patterns:
+                    detected_manufacturer = sniff.manufacturer
+        
         # Log resultado
         if detected_manufacturer and model_code:
             if software:
@@ -302,18 +348,21 @@ class NormalizedDataImporter:
             logger.warning(f"  ⚠ Erro ao buscar fabricante {manufacturer_code}: {e}")
             return None
     
-    def get_or_create_model(self, model_code, manufacturer_id=None):
+    def get_or_create_model(self, model_code, manufacturer_id=None, commit=True):
         """Obter ou criar modelo de relé"""
         if not model_code or pd.isna(model_code):
             return None
         
         try:
-            # Buscar modelo existente
-            self.cursor.execute(
-                "SELECT id FROM protec_ai.relay_models WHERE model_code = %s",
-                (model_code,)
-            )
-            result = self.cursor.fetchone()
+            # Buscar modelo existente (mapa pré-carregado no modo bulk)
+            if model_code in self.model_map:
+                result = (self.model_map[model_code],)
+            else:
+                self.cursor.execute(
+                    "SELECT id FROM protec_ai.relay_models WHERE model_code = %s",
+                    (model_code,)
+                )
+                result = self.cursor.fetchone()
             
             if result:
                 # SEMPRE atualizar manufacturer_id se fornecido (corrigir associações erradas)
@@ -325,7 +374,8 @@ class NormalizedDataImporter:
                            WHERE id = %s""",
                         (manufacturer_id, model_id)
                     )
-                    self.conn.commit()
+                    if commit:
+                        self.conn.commit()
                 return model_id
             else:
                 # Criar novo modelo
@@ -337,13 +387,18 @@ class NormalizedDataImporter:
                        RETURNING id""",
                     (model_code, model_code, manufacturer_id)
                 )
-                self.conn.commit()
+                if commit:
+                    self.conn.commit()
                 result = self.cursor.fetchone()
                 if result:
                     logger.info(f"  → Modelo criado: {model_code} (fabricante: {manufacturer_id})")
+                    if self.bulk:
+                        self.model_map[model_code] = result[0]
                     return result[0]
                 return None
         except Exception as e:
+            if not commit:
+                raise  # Transação do arquivo: quem chamou desfaz tudo
             logger.warning(f"  ⚠ Erro ao buscar/criar modelo {model_code}: {e}")
             self.conn.rollback()
             return None
@@ -380,7 +435,7 @@ class NormalizedDataImporter:
         
         return metadata
     
-    def create_equipment(self, source_file, metadata):
+    def create_equipment(self, source_file, metadata, commit=True):
         """Criar equipamento no banco"""
         try:
             # Gerar equipment_tag a partir do source_file
@@ -393,7 +448,7 @@ class NormalizedDataImporter:
             relay_model_id = None
             if model_code and manufacturer_code:
                 manufacturer_id = self.get_manufacturer_id(manufacturer_code)
-                relay_model_id = self.get_or_create_model(model_code, manufacturer_id)
+                relay_model_id = self.get_or_create_model(model_code, manufacturer_id, commit=commit)
                 logger.info(f"  → Modelo detectado: {model_code} | Fabricante: {manufacturer_code}")
             else:
                 logger.warning(f"  ⚠ Não foi possível detectar modelo/fabricante para: {source_file}")
@@ -415,7 +470,8 @@ class NormalizedDataImporter:
                            WHERE id = %s""",
                         (relay_model_id, equipment_id)
                     )
-                    self.conn.commit()
+                    if commit:
+                        self.conn.commit()
                 logger.info(f"  → Equipamento já existe: {equipment_tag} (atualizado relay_model_id)")
                 self.stats['equipments_existing'] += 1
                 return equipment_id
@@ -434,7 +490,8 @@ class NormalizedDataImporter:
                  metadata['code_0079'], metadata['code_0081'], metadata['code_010a'],
                  metadata['code_0005'])
             )
-            self.conn.commit()
+            if commit:
+                self.conn.commit()
             
             equipment_id = self.cursor.fetchone()[0]
             self.stats['equipments_inserted'] += 1
@@ -442,6 +499,8 @@ class NormalizedDataImporter:
             return equipment_id
             
         except Exception as e:
+            if not commit:
+                raise  # Transação do arquivo: quem chamou desfaz tudo
             logger.error(f"  ✗ Erro ao criar equipamento: {e}")
             self.conn.rollback()
             return None
@@ -542,13 +601,56 @@ class NormalizedDataImporter:
                 logger.warning(f"  ⚠ Erro ao criar multipart group {base}: {e}")
                 self.conn.rollback()
     
+    def insert_multipart_groups(self, equipment_id, df):
+        """Criar grupos multipart em um único INSERT (modo bulk, sem commit)"""
+        if 'is_multipart' not in df.columns:
+            return 0
+        
+        multipart_df = df[df['is_multipart'] == True]
+        if multipart_df.empty:
+            return 0
+        
+        total_parts = multipart_df.groupby('multipart_base')['multipart_part'].max()
+        groups = [(equipment_id, base, int(parts)) for base, parts in total_parts.items()]
+        
+        execute_values(
+            self.cursor,
+            """INSERT INTO protec_ai.multipart_groups 
+               (equipment_id, multipart_base, total_parts)
+               VALUES %s
+               ON CONFLICT (equipment_id, multipart_base) DO NOTHING""",
+            groups
+        )
+        return len(groups)
+    
+    def delete_existing_settings(self, equipment_id, commit=True):
+        """
+        Remove settings e grupos multipart de um equipamento antes de reimportá-lo
+        
+        Usado no modo incremental: um arquivo alterado substitui os dados
+        anteriores do equipamento em vez de duplicá-los.
+        """
+        self.cursor.execute(
+            "DELETE FROM protec_ai.multipart_groups WHERE equipment_id = %s",
+            (equipment_id,)
+        )
+        self.cursor.execute(
+            "DELETE FROM protec_ai.relay_settings WHERE equipment_id = %s",
+            (equipment_id,)
+        )
+        if commit:
+            self.conn.commit()
+    
     def process_file(self, csv_path):
         """Processar um arquivo CSV normalizado"""
+        if self.bulk:
+            return self.process_file_bulk(csv_path)
+        
         try:
             logger.info(f"\n📄 Processando: {csv_path.name}")
             
-            # Ler CSV
-            df = pd.read_csv(csv_path)
+            # Ler CSV (ou gêmeo Parquet) com tipos explícitos
+            df = read_stage_frame(csv_path, NORMALIZED_3NF_SCHEMA)
             logger.info(f"  → {len(df)} linhas lidas")
             
             # Extrair metadados
@@ -559,19 +661,83 @@ class NormalizedDataImporter:
             if not equipment_id:
                 raise Exception("Falha ao criar equipamento")
             
+            if self.incremental:
+                self.delete_existing_settings(equipment_id)
+            
             # Importar settings
             self.import_settings_batch(equipment_id, df)
             
             # Criar grupos multipart
             self.create_multipart_groups(equipment_id, df)
             
+            refresh_equipment_summary(self.cursor, [equipment_id])
+            self.conn.commit()
+            
             self.stats['files_processed'] += 1
             logger.info(f"  ✅ Arquivo processado com sucesso!")
+            return True
             
         except Exception as e:
             error_msg = f"Erro ao processar {csv_path.name}: {e}"
             logger.error(f"  ✗ {error_msg}")
             self.stats['errors'].append(error_msg)
+            return False
+    
+    def process_file_bulk(self, csv_path, model_type='MICON'):
+        """
+        Processar um arquivo CSV normalizado em UMA transação
+        
+        Unidades, funções e modelos vêm dos mapas pré-carregados; as linhas
+        são montadas por coluna e enviadas por COPY via tabela de staging.
+        Qualquer erro desfaz o arquivo inteiro.
+        """
+        try:
+            logger.info(f"\n📄 Processando: {csv_path.name}")
+            
+            df = read_stage_frame(csv_path, NORMALIZED_3NF_SCHEMA)
+            logger.info(f"  → {len(df)} linhas lidas")
+            
+            metadata = self.extract_metadata_from_df(df, csv_path.name)
+            
+            equipment_id = self.create_equipment(csv_path.name, metadata, commit=False)
+            if not equipment_id:
+                raise Exception("Falha ao criar equipamento")
+            
+            if self.incremental:
+                self.delete_existing_settings(equipment_id, commit=False)
+            
+            units_created = self.resolve_units(unit_symbols(df))
+            settings, counters = prepare_settings_frame(
+                df, equipment_id, self.unit_map, self.function_map,
+                get_function_code_and_category, model_type
+            )
+            inserted = SettingsCopyWriter(self.cursor).write(settings)
+            groups = self.insert_multipart_groups(equipment_id, df)
+            refresh_equipment_summary(self.cursor, [equipment_id])
+            
+            self.conn.commit()
+            
+            self.stats['units_created'] += units_created
+            self.stats['settings_inserted'] += inserted
+            self.stats['function_mappings'] += counters['function_mappings']
+            self.stats['category_classifications'] += counters['category_classifications']
+            self.stats['multipart_groups_inserted'] += groups
+            self.stats['files_processed'] += 1
+            logger.info(f"  ✓ {inserted} settings inseridos (COPY)")
+            logger.info(f"    → {counters['function_mappings']} com function_id mapeado")
+            logger.info(f"  ✅ Arquivo processado com sucesso!")
+            return True
+            
+        except Exception as e:
+            self.conn.rollback()
+            # IDs criados na transação desfeita não existem mais
+            self.load_unit_map()
+            self.load_model_map()
+            
+            error_msg = f"Erro ao processar {csv_path.name}: {e}"
+            logger.error(f"  ✗ {error_msg}")
+            self.stats['errors'].append(error_msg)
+            return False
     
     def run(self):
         """Executar importação completa"""
@@ -590,10 +756,21 @@ class NormalizedDataImporter:
             logger.error("✗ Nenhum arquivo CSV normalizado encontrado!")
             return False
         
+        cache = PipelineArtifactCache() if self.incremental else None
+        
         # Processar cada arquivo
         for i, csv_path in enumerate(csv_files, 1):
+            if cache and cache.is_fresh(STAGE_IMPORT, csv_path, self.IMPORTER_VERSION):
+                logger.info(f"\n[{i}/{len(csv_files)}] ♻️  Inalterado: {csv_path.name}")
+                self.stats['files_skipped'] += 1
+                continue
+            
             logger.info(f"\n[{i}/{len(csv_files)}] Processando...")
-            self.process_file(csv_path)
+            if self.process_file(csv_path) and cache:
+                cache.record(STAGE_IMPORT, csv_path, self.IMPORTER_VERSION)
+        
+        if cache:
+            cache.save()
         
         # Relatório final
         self.print_summary()
@@ -607,6 +784,7 @@ class NormalizedDataImporter:
         logger.info("RELATÓRIO FINAL DE IMPORTAÇÃO")
         logger.info("="*80)
         logger.info(f"Arquivos processados:     {self.stats['files_processed']}")
+        logger.info(f"Arquivos inalterados:     {self.stats['files_skipped']}")
         logger.info(f"Equipamentos novos:       {self.stats['equipments_inserted']}")
         logger.info(f"Equipamentos existentes:  {self.stats['equipments_existing']}")
         logger.info(f"Settings inseridos:       {self.stats['settings_inserted']}")
@@ -624,7 +802,15 @@ class NormalizedDataImporter:
         logger.info("="*80)
 
 def main():
-    importer = NormalizedDataImporter()
+    parser = argparse.ArgumentParser(description="Importa outputs/norm_csv para PostgreSQL")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Importa apenas CSVs alterados desde a última importação")
+    parser.add_argument('--row-by-row', action='store_true',
+                        help="Usa INSERT linha a linha em vez de COPY (carga em massa)")
+    args = parser.parse_args()
+    configure_logging()
+    
+    importer = NormalizedDataImporter(incremental=args.incremental, bulk=not args.row_by_row)
     success = importer.run()
     return 0 if success else 1
 
@@ -2,12 +2,16 @@
 NORMALIZAÇÃO CORRETA - GERA NORM_CSV E NORM_EXCEL
 
 OBJETIVO: Normalizar CSVs extraídos gerando arquivos padronizados
-ENTRADA: outputs/csv/*.csv (gerados pelo extract_parameters_from_glossario.py)
-SAÍDA: outputs/norm_csv/*.csv E outputs/norm_excel/*.xlsx
+ENTRADA: outputs/csv/*.csv (gerados pelo extract_parameters_from_glossario.py),
+         lidos com tipos explícitos (gêmeo outputs/parquet/*.parquet, se houver)
+SAÍDA: outputs/norm_csv/*.csv (+ outputs/norm_parquet/*.parquet com pyarrow)
+       E outputs/norm_excel/*.xlsx (opcional, --no-excel desativa)
 
 CRÍTICO: VIDAS EM RISCO - Normalização deve manter 100% dos dados do glossário
 """
 
+import argparse
+import sys
 import pandas as pd
 from pathlib import Path
 import logging
@@ -15,18 +19,31 @@ from datetime import datetime
 import json
 from typing import Dict, List
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('outputs/logs/normalization.log'),
-        logging.StreamHandler()
-    ]
-)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.pipeline_artifact_cache import PipelineArtifactCache, STAGE_NORMALIZATION
+from src.stage_frames import RAW_PARAMS_SCHEMA, read_stage_frame, stage_output_paths, write_stage_frame
+
+# Caminhos absolutos: o módulo também é importado pela ingestão em processo (API)
+OUTPUTS_DIR = PROJECT_ROOT / "outputs"
+
 logger = logging.getLogger(__name__)
 
 
+def configure_logging():
+    """Logging do script (arquivo + console); não é aplicado quando importado"""
+    log_dir = OUTPUTS_DIR / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_dir / 'normalization.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+
 class CSVNormalizer:
     """Normalizador de CSVs seguindo estrutura do glossário"""
     
@@ -49,9 +66,21 @@ class CSVNormalizer:
         'extraction_date'    # Data da extração
     ]
     
-    def __init__(self):
+    # Tipos das colunas de saída (as demais são texto)
+    OUTPUT_SCHEMA = {'is_valid': 'bool'}
+    
+    # Versão da lógica de normalização (invalida o cache incremental ao mudar)
+    NORMALIZER_VERSION = "2025.11.22"
+    
+    def __init__(self, excel: bool = True):
+        """
+        Args:
+            excel: Gerar também outputs/norm_excel/*.xlsx
+        """
+        self.excel = excel
         self.stats = {
             'total_files': 0,
+            'skipped_files': 0,
             'total_parameters': 0,
             'files_with_errors': [],
             'validation_errors': []
@@ -62,8 +91,8 @@ class CSVNormalizer:
         logger.info(f"Normalizando: {csv_path.name}")
         
         try:
-            # Ler CSV
-            df = pd.read_csv(csv_path, encoding='utf-8')
+            # Ler CSV bruto com tipos explícitos (códigos como 0104 continuam texto)
+            df = read_stage_frame(csv_path, RAW_PARAMS_SCHEMA)
             
             # MAPEAR COLUNAS DO CSV EXTRAÍDO PARA O FORMATO NORMALIZADO
             # CSVs extraídos têm: Code, Description, Value, is_active (desde correção)
@@ -158,18 +187,28 @@ class CSVNormalizer:
         if len(missing_value) > 0:
             logger.warning(f"  ⚠️  {len(missing_value)} parâmetros sem valor válido")
     
+    def normalized_output_paths(self, original_filename: str) -> List[Path]:
+        """Arquivos obrigatórios (CSV e, se habilitado, Excel) gerados para um CSV extraído"""
+        stem = Path(original_filename).stem
+        paths = stage_output_paths(OUTPUTS_DIR / "norm_csv" / f"{stem}.csv")
+        if self.excel:
+            paths.append(OUTPUTS_DIR / "norm_excel" / f"{stem}.xlsx")
+        return paths
+    
     def save_normalized(self, df: pd.DataFrame, original_filename: str):
-        """Salva arquivo normalizado em CSV e Excel"""
+        """Salva arquivo normalizado em CSV (+ Parquet) e, se habilitado, Excel"""
         stem = Path(original_filename).stem
         
         # Salvar CSV normalizado
-        csv_output = Path("outputs/norm_csv") / f"{stem}.csv"
-        csv_output.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(csv_output, index=False, encoding='utf-8')
+        csv_output = OUTPUTS_DIR / "norm_csv" / f"{stem}.csv"
+        write_stage_frame(df, csv_output, self.OUTPUT_SCHEMA, encoding='utf-8')
         logger.info(f"  💾 CSV: {csv_output.name}")
         
+        if not self.excel:
+            return
+        
         # Salvar Excel normalizado
-        excel_output = Path("outputs/norm_excel") / f"{stem}.xlsx"
+        excel_output = OUTPUTS_DIR / "norm_excel" / f"{stem}.xlsx"
         excel_output.parent.mkdir(parents=True, exist_ok=True)
         
         with pd.ExcelWriter(excel_output, engine='openpyxl') as writer:
@@ -195,13 +234,19 @@ class CSVNormalizer:
         
         logger.info(f"  💾 Excel: {excel_output.name}")
     
-    def process_all_csvs(self):
-        """Processa TODOS os CSVs de outputs/csv"""
+    def process_all_csvs(self, incremental: bool = False):
+        """
+        Processa TODOS os CSVs de outputs/csv
+        
+        Args:
+            incremental: Pula CSVs cujo conteúdo (e versão do normalizador)
+                         não mudou desde a última normalização
+        """
         logger.info("="*80)
         logger.info("INICIANDO NORMALIZAÇÃO COMPLETA")
         logger.info("="*80)
         
-        csv_dir = Path("outputs/csv")
+        csv_dir = OUTPUTS_DIR / "csv"
         if not csv_dir.exists():
             logger.error(f"❌ Diretório não encontrado: {csv_dir}")
             return
@@ -215,7 +260,14 @@ class CSVNormalizer:
         logger.info(f"📁 Encontrados {total_files} arquivos _params.csv para normalizar")
         logger.info(f"   (Ignorando arquivos _active_setup.csv - são auxiliares)")
         
+        cache = PipelineArtifactCache() if incremental else None
+        
         for idx, csv_file in enumerate(csv_files, 1):
+            if cache and cache.is_fresh(STAGE_NORMALIZATION, csv_file, self.NORMALIZER_VERSION):
+                logger.info(f"\n[{idx}/{total_files}] ♻️  Inalterado: {csv_file.name}")
+                self.stats['skipped_files'] += 1
+                continue
+            
             logger.info(f"\n[{idx}/{total_files}] Processando {csv_file.name}")
             
             try:
@@ -229,9 +281,16 @@ class CSVNormalizer:
                 self.stats['total_files'] += 1
                 self.stats['total_parameters'] += len(df_normalized)
                 
+                if cache:
+                    cache.record(STAGE_NORMALIZATION, csv_file, self.NORMALIZER_VERSION,
+                                 outputs=self.normalized_output_paths(csv_file.name))
+                
             except Exception as e:
                 logger.error(f"❌ Falha ao processar {csv_file.name}: {e}")
         
+        if cache:
+            cache.save()
+        
         # Relatório final
         self._generate_final_report()
     
@@ -240,6 +299,8 @@ class CSVNormalizer:
         logger.info("="*80)
         logger.info("✅ NORMALIZAÇÃO CONCLUÍDA")
         logger.info(f"   📁 Arquivos processados: {self.stats['total_files']}")
+        if self.stats['skipped_files']:
+            logger.info(f"   ♻️  Arquivos inalterados (cache): {self.stats['skipped_files']}")
         logger.info(f"   📊 Parâmetros normalizados: {self.stats['total_parameters']}")
         
         if self.stats['files_with_errors']:
@@ -255,7 +316,7 @@ class CSVNormalizer:
         logger.info("="*80)
         
         # Salvar relatório JSON
-        report_path = Path("outputs/logs/normalization_report.json")
+        report_path = OUTPUTS_DIR / "logs" / "normalization_report.json"
         with open(report_path, 'w', encoding='utf-8') as f:
             json.dump(self.stats, f, indent=2, ensure_ascii=False)
         
@@ -266,16 +327,17 @@ class CSVNormalizer:
     
     def _check_coverage(self):
         """Verifica cobertura dos arquivos normalizados"""
-        csv_count = len(list(Path("outputs/csv").glob("*.csv")))
-        norm_csv_count = len(list(Path("outputs/norm_csv").glob("*.csv")))
-        norm_excel_count = len(list(Path("outputs/norm_excel").glob("*.xlsx")))
+        csv_count = len(list((OUTPUTS_DIR / "csv").glob("*.csv")))
+        norm_csv_count = len(list((OUTPUTS_DIR / "norm_csv").glob("*.csv")))
+        norm_excel_count = len(list((OUTPUTS_DIR / "norm_excel").glob("*.xlsx")))
         
         logger.info("\n📊 COBERTURA:")
         logger.info(f"   CSVs originais: {csv_count}")
         logger.info(f"   CSVs normalizados: {norm_csv_count}")
-        logger.info(f"   Excel normalizados: {norm_excel_count}")
+        if self.excel:
+            logger.info(f"   Excel normalizados: {norm_excel_count}")
         
-        if norm_csv_count == csv_count and norm_excel_count == csv_count:
+        if norm_csv_count == csv_count and (not self.excel or norm_excel_count == csv_count):
             logger.info("   ✅ 100% de cobertura!")
         else:
             logger.warning("   ⚠️  Cobertura incompleta!")
@@ -283,9 +345,17 @@ class CSVNormalizer:
 
 def main():
     """Execução principal"""
+    parser = argparse.ArgumentParser(description="Normaliza outputs/csv → outputs/norm_csv")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Normaliza apenas CSVs alterados desde a última execução")
+    parser.add_argument('--excel', action=argparse.BooleanOptionalAction, default=True,
+                        help="Gera também outputs/norm_excel/*.xlsx (--no-excel: só CSV/Parquet)")
+    args = parser.parse_args()
+    configure_logging()
+    
     try:
-        normalizer = CSVNormalizer()
-        normalizer.process_all_csvs()
+        normalizer = CSVNormalizer(excel=args.excel)
+        normalizer.process_all_csvs(incremental=args.incremental)
         
     except Exception as e:
         logger.error(f"ERRO CRÍTICO: {e}")
@@ -17,22 +17,39 @@ REGRAS DE ATOMIZAÇÃO:
 ENTRADA: 
 - outputs/csv/*_params.csv (dados brutos)
 - outputs/csv/*_active_setup.csv (checkboxes detectados)
+  Lidos com tipos explícitos (stage_frames): códigos como 0104 continuam
+  texto; o gêmeo outputs/parquet/*.parquet é usado quando existe.
 
 SAÍDA: outputs/norm_csv/*_normalized.csv
+       outputs/norm_parquet/*_normalized.parquet (com pyarrow; --no-parquet desativa)
+       outputs/norm_excel/*_normalized.xlsx (--no-excel desativa)
+
+MOTOR POR COLUNA:
+Cada etapa opera sobre colunas inteiras (pandas .str.extract com padrões
+pré-compilados, máscaras booleanas e np.select) em vez de iterrows; os
+métodos escalares (extract_value_and_unit, convert_boolean, ...) continuam
+disponíveis e definem as regras. Com --workers N os CSVs são distribuídos
+em um pool de processos e as estatísticas consolidadas no processo principal.
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Any, Dict, List, Tuple, Optional, Set
 import json
 import sys
 
 # Adicionar src ao path para importar UniversalSetupDetector
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+from stage_frames import (NORMALIZED_3NF_SCHEMA, PARQUET_AVAILABLE, RAW_PARAMS_SCHEMA,
+                          read_stage_frame, write_stage_frame)
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -111,7 +128,35 @@ class Normalizer3NF:
         r'ddb', r'test\s+pattern', r'bit\s+mask', r'binary'
     ]
     
-    def __init__(self):
+    # Valores booleanos textuais
+    BOOLEAN_VALUES = {
+        'yes': True, 'sim': True, 'true': True, '1': True,
+        'no': False, 'não': False, 'nao': False, 'false': False, '0': False,
+    }
+    
+    # Padrões pré-compilados (compartilhados pelos caminhos escalar e por coluna)
+    STATUS_FIELD_REGEX = re.compile('|'.join(f'(?:{p})' for p in STATUS_FIELD_PATTERNS))
+    # Número + unidade conhecida; a alternância segue a ordem de UNITS
+    KNOWN_UNIT_PATTERN = re.compile(
+        r'^([-+]?\d+\.?\d*)\s*(' + '|'.join(re.escape(unit) for unit in UNITS) + r')$',
+        re.IGNORECASE
+    )
+    FALLBACK_UNIT_PATTERN = re.compile(r'^([-+]?\d+\.?\d*)\s*([a-zA-ZΩ°μ%]+)$')
+    NUMBER_ONLY_PATTERN = re.compile(r'^[-+]?\d+\.?\d*$')
+    MULTIPART_PATTERN = re.compile(
+        r'^(?:\d+:\s*)?(.+?)\s+(?:part|PART)\s+(\d+)(?::\s*(.*))?$|^(?:\d+:\s*)?(.+?)\s+\((\d+)/\d+\)(?:\s*(.*))?$',
+        re.IGNORECASE
+    )
+    CODE_PREFIX_PATTERN = re.compile(r'^\d+:\s*')
+    # Unidade (minúscula) → grafia de UNITS; primeira ocorrência vence
+    UNIT_BY_LOWER = {unit.lower(): unit for unit in reversed(UNITS)}
+    
+    def __init__(self, excel: bool = True):
+        """
+        Args:
+            excel: Gravar também outputs/norm_excel/*.xlsx
+        """
+        self.excel = excel
         self.stats = {
             'total_files': 0,
             'total_rows_input': 0,
@@ -141,11 +186,11 @@ class Normalizer3NF:
             return set()
         
         try:
-            df_active = pd.read_csv(active_setup_path, encoding='utf-8')
+            df_active = read_stage_frame(active_setup_path, RAW_PARAMS_SCHEMA)
             
             # **CORRIGIDO: Filtrar apenas parâmetros com is_active=True**
             if 'is_active' in df_active.columns:
-                active_params = df_active[df_active['is_active'] == True]
+                active_params = df_active[df_active['is_active']]
                 active_codes = set(active_params['Code'].astype(str))
                 logger.info(f"   ✅ Active setup carregado: {len(active_codes)} parâmetros ativos (de {len(df_active)} totais)")
             else:
@@ -171,11 +216,7 @@ class Normalizer3NF:
         if not description:
             return False
         
-        desc_lower = description.lower()
-        for pattern in self.STATUS_FIELD_PATTERNS:
-            if re.search(pattern, desc_lower):
-                return True
-        return False
+        return bool(self.STATUS_FIELD_REGEX.search(description.lower()))
     
     def extract_relay_metadata(self, df: pd.DataFrame) -> Dict[str, str]:
         """
@@ -269,14 +310,7 @@ class Normalizer3NF:
         if not value_str or pd.isna(value_str):
             return None
         
-        value_lower = str(value_str).strip().lower()
-        
-        if value_lower in ['yes', 'sim', 'true', '1']:
-            return True
-        elif value_lower in ['no', 'não', 'nao', 'false', '0']:
-            return False
-        else:
-            return None
+        return self.BOOLEAN_VALUES.get(str(value_str).strip().lower())
     
     def identify_multipart_groups(self, df: pd.DataFrame) -> Dict[str, List[Dict]]:
         """
@@ -301,53 +335,168 @@ class Normalizer3NF:
             }
         """
         multipart_groups = {}
+        for idx, part in self.multipart_frame(df).iterrows():
+            multipart_groups.setdefault(part['base'], []).append({
+                'code': part['code'],
+                'part': part['part'],
+                'value': part['value'],
+                'description': part['description'],
+                'original_idx': idx
+            })
+        return multipart_groups
+    
+    # ------------------------------------------------------------------
+    # Versões por coluna (mesmas regras dos métodos escalares acima)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+        """Coluna do DataFrame ou série constante (equivale a row.get(name, default))"""
+        if name in df.columns:
+            return df[name]
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    
+    @staticmethod
+    def _is_empty(values: pd.Series) -> pd.Series:
+        """Máscara de `not value or pd.isna(value)`"""
+        return values.isna() | ~values.astype(bool)
+    
+    def multipart_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Versão por coluna de identify_multipart_groups.
         
-        # Padrão robusto: captura variações de multipart
-        # Grupo 1: prefixo opcional com código (ex: '0150:')
-        # Grupo 2: nome base (ex: 'LED 5', 'Blocking Logic 1')
-        # Grupo 3: 'part' ou 'PART' (case-insensitive)
-        # Grupo 4: número da parte
-        # Grupo 5: sufixo opcional (ex: ': tU<', ' (text)')
-        # OU formato alternativo (X/Y) para Input/Output
-        pattern = r'^(?:\d+:\s*)?(.+?)\s+(?:part|PART)\s+(\d+)(?::\s*(.*))?$|^(?:\d+:\s*)?(.+?)\s+\((\d+)/\d+\)(?:\s*(.*))?$'
-        
-        for idx, row in df.iterrows():
-            desc = str(row.get('Description', '')).strip()
-            value_raw = str(row.get('Value', '')).strip()
-            
-            match = re.match(pattern, desc, re.IGNORECASE)
-            if match:
-                if match.group(1):  # "LED X part Y" ou "0150: LED X PART Y: extra"
-                    base_name = match.group(1).strip()
-                    part_num = int(match.group(2))
-                    extra_suffix = match.group(3).strip() if match.group(3) else ''
-                else:  # "Input X (Y/Z)" ou "0150: Input X (Y/Z) extra"
-                    base_name = match.group(4).strip()
-                    part_num = int(match.group(5))
-                    extra_suffix = match.group(6).strip() if match.group(6) else ''
-                
-                # Limpar base_name de prefixos numéricos residuais (ex: '0150: LED 5' → 'LED 5')
-                base_name = re.sub(r'^\d+:\s*', '', base_name).strip()
-                
-                # Determinar valor final: usar extra_suffix se existir, senão value_raw
-                final_value = extra_suffix if extra_suffix else value_raw
-                
-                if base_name not in multipart_groups:
-                    multipart_groups[base_name] = []
-                
-                multipart_groups[base_name].append({
-                    'code': row.get('Code', ''),
-                    'part': part_num,
-                    'value': final_value,
-                    'description': desc,
-                    'original_idx': idx
-                })
-        
-        # Ordenar parts dentro de cada grupo
-        for base_name in multipart_groups:
-            multipart_groups[base_name].sort(key=lambda x: x['part'])
+        Returns:
+            DataFrame (índice = índice original) com colunas code, base,
+            part, value, description, uma linha por part: grupos na ordem
+            da primeira aparição, parts em ordem crescente
+        """
+        desc = self._column(df, 'Description', '').astype(str).str.strip()
+        value_raw = self._column(df, 'Value', '').astype(str).str.strip()
+        
+        groups = desc.str.extract(self.MULTIPART_PATTERN)
+        matched = groups[0].notna() | groups[3].notna()
+        groups = groups[matched]
+        
+        # Grupos 1-3: "LED X part Y[: extra]"; grupos 4-6: "Input X (Y/Z) [extra]"
+        led_form = groups[0].notna()
+        base = (groups[0].where(led_form, groups[3]).str.strip()
+                .str.replace(self.CODE_PREFIX_PATTERN, '', regex=True).str.strip())
+        extra = groups[2].where(led_form, groups[5]).fillna('').str.strip()
+        
+        parts = pd.DataFrame({
+            'code': df['Code'][matched],
+            'base': base,
+            'part': groups[1].where(led_form, groups[4]).map(int),
+            'value': extra.where(extra != '', value_raw[matched]),
+            'description': desc[matched],
+            'group_order': pd.factorize(base)[0],
+            'position': np.arange(len(base)),
+        }, index=groups.index)
+        
+        parts = parts.sort_values(['group_order', 'part', 'position'])
+        return parts.drop(columns=['group_order', 'position'])
+    
+    def split_values_and_units(self, raw_values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """
+        Versão por coluna de extract_value_and_unit.
         
-        return multipart_groups
+        Returns:
+            (valores limpos, unidades normalizadas) - strings, '' quando ausente
+        """
+        empty = self._is_empty(raw_values)
+        text = raw_values.astype(str).str.strip()
+        values = text.where(~empty, '')
+        units = pd.Series('', index=raw_values.index, dtype=object)
+        
+        # ESTRATÉGIA 1: unidade conhecida (case-insensitive)
+        known = text.str.extract(self.KNOWN_UNIT_PATTERN)
+        listed = known[1].str.lower().map(self.UNIT_BY_LOWER)
+        found = known[0].notna() & ~empty
+        resolved = found & listed.notna()
+        values.loc[resolved] = known[0][resolved]
+        units.loc[resolved] = listed[resolved].map(lambda unit: self.UNIT_NORMALIZATION.get(unit, unit))
+        
+        # Casos raros de case folding Unicode que lower() não reproduz
+        for idx in found[found & listed.isna()].index:
+            values.loc[idx], units.loc[idx] = self.extract_value_and_unit(raw_values.loc[idx])
+        
+        # ESTRATÉGIA 2: número + símbolo desconhecido (case-sensitive)
+        pending = ~found & ~empty
+        fallback = text[pending].str.extract(self.FALLBACK_UNIT_PATTERN)
+        fallback = fallback[fallback[0].notna()]
+        values.loc[fallback.index] = fallback[0]
+        units.loc[fallback.index] = fallback[1].map(
+            lambda unit: self.UNIT_NORMALIZATION.get(unit, self.UNIT_BY_LOWER[unit.lower()])
+            if unit.lower() in self.UNIT_BY_LOWER else unit
+        )
+        
+        # ESTRATÉGIAS 3/4: número puro ou texto → valor original, sem unidade
+        return values, units
+    
+    def convert_booleans(self, raw_values: pd.Series) -> pd.Series:
+        """Versão por coluna de convert_boolean (True/False, NaN se não booleano)"""
+        lower = raw_values.astype(str).str.strip().str.lower()
+        return lower.map(self.BOOLEAN_VALUES).where(~self._is_empty(raw_values))
+    
+    def status_field_mask(self, descriptions: pd.Series) -> pd.Series:
+        """Versão por coluna de is_status_field"""
+        text = descriptions.where(descriptions.notna(), '').astype(str).str.lower()
+        return text.str.contains(self.STATUS_FIELD_REGEX)
+    
+    @staticmethod
+    def _numeric_kind(value: str) -> str:
+        """'numeric', 'large' (número longo/≥1e9 → text de status) ou 'text'"""
+        try:
+            num_val = float(value)
+        except (TypeError, ValueError):
+            return 'text'
+        # Se valor tem mais de 15 dígitos ou é maior que 10^9, forçar text
+        if len(str(value).replace('.', '').replace('-', '')) > 15 or abs(num_val) >= 1e9:
+            return 'large'
+        return 'numeric'
+    
+    def classify_values(self, raw_values: pd.Series, descriptions: pd.Series) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Separa valor/unidade e identifica o tipo de cada linha.
+        
+        Returns:
+            (DataFrame com parameter_value, value_unit, value_type; contadores
+            booleans, status_fields_corrected, units_separated)
+        """
+        values, units = self.split_values_and_units(raw_values)
+        
+        booleans = self.convert_booleans(raw_values)
+        is_bool = booleans.notna()
+        values = values.where(~is_bool, booleans.map(str))
+        
+        status = self.status_field_mask(descriptions) & ~is_bool
+        has_value = ~is_bool & ~status & (values != '')
+        with_unit = has_value & (units != '')
+        plain = has_value & (units == '')
+        
+        kinds = pd.Series('', index=values.index, dtype=object)
+        if plain.any():
+            plain_values = values[plain]
+            kind_by_value = {value: self._numeric_kind(value) for value in plain_values.unique()}
+            kinds.loc[plain] = plain_values.map(kind_by_value)
+        
+        value_type = np.select(
+            [is_bool, status, with_unit, kinds == 'numeric', plain],
+            ['boolean', 'text', 'numeric', 'numeric', 'text'],
+            default='null'
+        )
+        
+        classified = pd.DataFrame({
+            'parameter_value': values,
+            'value_unit': units,
+            'value_type': value_type,
+        }, index=raw_values.index)
+        counters = {
+            'booleans': int(is_bool.sum()),
+            'status_fields_corrected': int(status.sum() + (kinds == 'large').sum()),
+            'units_separated': int(with_unit.sum()),
+        }
+        return classified, counters
     
     def normalize_csv(self, csv_path: Path) -> Tuple[pd.DataFrame, Dict[str, str]]:
         """
@@ -358,8 +507,8 @@ class Normalizer3NF:
         """
         logger.info(f"\n📄 Normalizando: {csv_path.name}")
         
-        # Ler CSV bruto
-        df = pd.read_csv(csv_path, encoding='utf-8')
+        # Ler CSV bruto com tipos explícitos
+        df = read_stage_frame(csv_path, RAW_PARAMS_SCHEMA)
         self.stats['total_rows_input'] += len(df)
         
         # 0. CARREGAR ACTIVE SETUP (códigos com checkbox marcado)
@@ -382,136 +531,67 @@ class Normalizer3NF:
         logger.info(f"   📋 Metadados removidos: {len(metadata_rows)}")
         
         # 3. IDENTIFICAR GRUPOS MULTIPART
-        multipart_groups = self.identify_multipart_groups(df_clean)
-        
-        if multipart_groups:
-            logger.info(f"   🔗 Grupos multipart identificados: {len(multipart_groups)}")
-            for base_name, parts in multipart_groups.items():
-                logger.info(f"      • {base_name}: {len(parts)} parts")
-        
-        # 3. IDENTIFICAR GRUPOS MULTIPART
-        multipart_groups = self.identify_multipart_groups(df_clean)
+        parts = self.multipart_frame(df_clean)
         
-        if multipart_groups:
-            logger.info(f"   🔗 Grupos multipart identificados: {len(multipart_groups)}")
-            for base_name, parts in multipart_groups.items():
-                logger.info(f"      • {base_name}: {len(parts)} parts")
+        if not parts.empty:
+            parts_per_group = parts.groupby('base', sort=False).size()
+            logger.info(f"   🔗 Grupos multipart identificados: {len(parts_per_group)}")
+            for base_name, count in parts_per_group.items():
+                logger.info(f"      • {base_name}: {count} parts")
         
         # 4. CRIAR DATAFRAME NORMALIZADO
-        normalized_rows = []
-        processed_indices = set()
-        
-        # 4a. Processar grupos multipart
-        for base_name, parts in multipart_groups.items():
-            for part_info in parts:
-                # Separar valor e unidade
-                value, unit = self.extract_value_and_unit(part_info['value'])
-                
-                # Verificar se está ativo
-                is_active = part_info['code'] in active_codes
-                if is_active:
-                    self.stats['active_params_marked'] += 1
-                
-                # Identificar tipo
-                bool_value = self.convert_boolean(part_info['value'])
-                if bool_value is not None:
-                    value_type = 'boolean'
-                    value = str(bool_value)
-                elif self.is_status_field(part_info['description']):
-                    # Campo de STATUS: sempre text, mesmo se parecer numérico
-                    value_type = 'text'
-                    self.stats['status_fields_corrected'] += 1
-                elif value and unit:
-                    value_type = 'numeric'
-                    self.stats['units_separated'] += 1
-                elif value:
-                    # Verificar se é valor muito grande (binário/status)
-                    try:
-                        num_val = float(value)
-                        if len(str(value).replace('.', '').replace('-', '')) > 15 or abs(num_val) >= 1e9:
-                            value_type = 'text'
-                            self.stats['status_fields_corrected'] += 1
-                        else:
-                            value_type = 'numeric'
-                    except:
-                        value_type = 'text'
-                else:
-                    value_type = 'null'
-                
-                normalized_rows.append({
-                    'parameter_code': part_info['code'],
-                    'parameter_description': part_info['description'],
-                    'parameter_value': value,
-                    'value_unit': unit,
-                    'value_type': value_type,
-                    'is_active': is_active,
-                    'multipart_base': base_name,
-                    'multipart_part': part_info['part'],
-                    'is_multipart': True
-                })
-                
-                processed_indices.add(part_info['original_idx'])
-                self.stats['multipart_expanded'] += 1
-        
-        # 4b. Processar parâmetros simples (não-multipart)
-        for idx, row in df_clean.iterrows():
-            if idx in processed_indices:
-                continue
-            
-            code = row.get('Code', '')
-            desc = row.get('Description', '')
-            value_raw = row.get('Value', '')
-            
-            # Verificar se está ativo
-            is_active = code in active_codes
-            if is_active:
-                self.stats['active_params_marked'] += 1
-            
-            # Separar valor e unidade
-            value, unit = self.extract_value_and_unit(value_raw)
+        blocks = []
+        
+        # 4a. Grupos multipart (uma linha por part)
+        if not parts.empty:
+            classified, counters = self.classify_values(parts['value'], parts['description'])
+            self.stats['units_separated'] += counters['units_separated']
+            self.stats['status_fields_corrected'] += counters['status_fields_corrected']
+            self.stats['multipart_expanded'] += len(parts)
             
-            # Identificar tipo
-            bool_value = self.convert_boolean(value_raw)
-            if bool_value is not None:
-                value_type = 'boolean'
-                value = str(bool_value)
-                self.stats['booleans_converted'] += 1
-            elif self.is_status_field(desc):
-                # Campo de STATUS: sempre text, mesmo se parecer numérico
-                value_type = 'text'
-                self.stats['status_fields_corrected'] += 1
-            elif value and unit:
-                value_type = 'numeric'
-                self.stats['units_separated'] += 1
-            elif value:
-                # Tentar identificar se é numérico
-                try:
-                    num_val = float(value)
-                    # Se valor tem mais de 15 dígitos ou é maior que 10^9, forçar text
-                    if len(str(value).replace('.', '').replace('-', '')) > 15 or abs(num_val) >= 1e9:
-                        value_type = 'text'
-                        self.stats['status_fields_corrected'] += 1
-                    else:
-                        value_type = 'numeric'
-                except:
-                    value_type = 'text'
-            else:
-                value_type = 'null'
+            blocks.append(pd.DataFrame({
+                'parameter_code': parts['code'],
+                'parameter_description': parts['description'],
+                'parameter_value': classified['parameter_value'],
+                'value_unit': classified['value_unit'],
+                'value_type': classified['value_type'],
+                'is_active': parts['code'].isin(active_codes),
+                'multipart_base': parts['base'],
+                'multipart_part': parts['part'],
+                'is_multipart': True
+            }))
+        
+        # 4b. Parâmetros simples (não-multipart)
+        simple = df_clean[~df_clean.index.isin(parts.index)]
+        if not simple.empty:
+            descriptions = self._column(simple, 'Description', '')
+            classified, counters = self.classify_values(self._column(simple, 'Value', ''), descriptions)
+            self.stats['booleans_converted'] += counters['booleans']
+            self.stats['units_separated'] += counters['units_separated']
+            self.stats['status_fields_corrected'] += counters['status_fields_corrected']
             
-            normalized_rows.append({
-                'parameter_code': code,
-                'parameter_description': desc,
-                'parameter_value': value,
-                'value_unit': unit,
-                'value_type': value_type,
-                'is_active': is_active,
+            blocks.append(pd.DataFrame({
+                'parameter_code': simple['Code'],
+                'parameter_description': descriptions,
+                'parameter_value': classified['parameter_value'],
+                'value_unit': classified['value_unit'],
+                'value_type': classified['value_type'],
+                'is_active': simple['Code'].isin(active_codes),
                 'multipart_base': '',
                 'multipart_part': 0,
                 'is_multipart': False
-            })
+            }))
         
         # Criar DataFrame normalizado
-        df_normalized = pd.DataFrame(normalized_rows)
+        df_normalized = pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame(
+            columns=['parameter_code', 'parameter_description', 'parameter_value', 'value_unit',
+                     'value_type', 'is_active', 'multipart_base', 'multipart_part', 'is_multipart']
+        )
+        self.stats['active_params_marked'] += int(df_normalized['is_active'].sum())
+        
+        # Unidades e tipos têm poucos valores distintos
+        df_normalized['value_unit'] = df_normalized['value_unit'].astype('category')
+        df_normalized['value_type'] = df_normalized['value_type'].astype('category')
         
         # Adicionar metadados do arquivo
         df_normalized['source_file'] = csv_path.stem.replace('_params', '')
@@ -550,15 +630,19 @@ class Normalizer3NF:
         
         return df_normalized, relay_metadata
     
-    def save_normalized(self, df: pd.DataFrame, relay_metadata: Dict[str, str], original_filename: str):
-        """Salva CSV e Excel normalizados"""
+    def save_normalized(self, df: pd.DataFrame, relay_metadata: Dict[str, str], original_filename: str,
+                        parquet: Optional[bool] = None):
+        """Salva CSV (+ Parquet tipado) e, se habilitado, Excel normalizados"""
         base_name = Path(original_filename).stem.replace('_params', '')
         
-        # CSV
+        # CSV + gêmeo Parquet (outputs/norm_parquet) com o esquema da importação
         csv_path = Path('outputs/norm_csv') / f"{base_name}_normalized.csv"
-        csv_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
-        logger.info(f"   💾 CSV: {csv_path.name}")
+        written = write_stage_frame(df, csv_path, NORMALIZED_3NF_SCHEMA, parquet=parquet)
+        for path in written:
+            logger.info(f"   💾 {path.suffix[1:].upper()}: {path.name}")
+        
+        if not self.excel:
+            return
         
         # Excel
         excel_path = Path('outputs/norm_excel') / f"{base_name}_normalized.xlsx"
@@ -606,8 +690,39 @@ class Normalizer3NF:
         
         logger.info(f"   💾 Excel: {excel_path.name}")
     
-    def process_all(self):
-        """Processa todos os CSVs de outputs/csv/"""
+    def process_file(self, csv_file: Path, parquet: Optional[bool] = None) -> bool:
+        """Normaliza e salva um CSV, registrando erros nas estatísticas"""
+        try:
+            df_normalized, relay_metadata = self.normalize_csv(csv_file)
+            self.save_normalized(df_normalized, relay_metadata, csv_file.name, parquet=parquet)
+            self.stats['total_files'] += 1
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Erro ao processar {csv_file.name}: {e}")
+            self.stats['errors'].append({
+                'file': csv_file.name,
+                'error': str(e)
+            })
+            return False
+    
+    def merge_stats(self, other: Dict[str, Any]):
+        """Soma as estatísticas de outro normalizador (processo do pool)"""
+        for key, value in other.items():
+            if key == 'errors':
+                self.stats['errors'].extend(value)
+            else:
+                self.stats[key] += value
+    
+    def process_all(self, workers: int = 1, parquet: Optional[bool] = None):
+        """
+        Processa todos os CSVs de outputs/csv/
+        
+        Args:
+            workers: Número de processos (1 = sequencial)
+            parquet: Gravar também outputs/norm_parquet/*.parquet
+                     (None = quando pyarrow estiver instalado)
+        """
         logger.info("\n" + "="*100)
         logger.info("🚀 NORMALIZAÇÃO PARA 3FN - INICIANDO")
         logger.info("="*100)
@@ -617,6 +732,10 @@ class Normalizer3NF:
             logger.error(f"❌ Diretório não encontrado: {csv_dir}")
             return
         
+        if parquet and not PARQUET_AVAILABLE:
+            logger.error("❌ --parquet requer o pacote pyarrow; gerando apenas CSV/Excel")
+            parquet = False
+        
         csv_files = sorted([f for f in csv_dir.glob('*.csv') if '_active_setup' not in f.name])
         total = len(csv_files)
         
@@ -624,22 +743,25 @@ class Normalizer3NF:
         
         start_time = datetime.now()
         
-        for i, csv_file in enumerate(csv_files, 1):
-            logger.info(f"\n{'─'*100}")
-            logger.info(f"[{i}/{total}] {csv_file.name}")
-            logger.info(f"{'─'*100}")
-            
-            try:
-                df_normalized, relay_metadata = self.normalize_csv(csv_file)
-                self.save_normalized(df_normalized, relay_metadata, csv_file.name)
-                self.stats['total_files'] += 1
+        if workers > 1 and total > 1:
+            logger.info(f"⚙️  Modo paralelo: {workers} processos")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_normalize_file_task, str(csv_file), parquet, self.excel)
+                           for csv_file in csv_files]
+                # Consolidar na ordem dos arquivos (mesmas estatísticas do modo sequencial)
+                for csv_file, future in zip(csv_files, futures):
+                    try:
+                        self.merge_stats(future.result())
+                    except Exception as e:
+                        logger.error(f"❌ Erro ao processar {csv_file.name}: {e}")
+                        self.stats['errors'].append({'file': csv_file.name, 'error': str(e)})
+        else:
+            for i, csv_file in enumerate(csv_files, 1):
+                logger.info(f"\n{'─'*100}")
+                logger.info(f"[{i}/{total}] {csv_file.name}")
+                logger.info(f"{'─'*100}")
                 
-            except Exception as e:
-                logger.error(f"❌ Erro ao processar {csv_file.name}: {e}")
-                self.stats['errors'].append({
-                    'file': csv_file.name,
-                    'error': str(e)
-                })
+                self.process_file(csv_file, parquet=parquet)
         
         # Relatório final
         elapsed = (datetime.now() - start_time).total_seconds()
@@ -677,10 +799,26 @@ class Normalizer3NF:
         logger.info("="*100 + "\n")
 
 
+def _normalize_file_task(csv_path: str, parquet: Optional[bool], excel: bool = True) -> Dict[str, Any]:
+    """Normaliza um CSV em um processo do pool e devolve as estatísticas"""
+    normalizer = Normalizer3NF(excel=excel)
+    normalizer.process_file(Path(csv_path), parquet=parquet)
+    return normalizer.stats
+
+
 def main():
     """Execução principal"""
-    normalizer = Normalizer3NF()
-    normalizer.process_all()
+    parser = argparse.ArgumentParser(description="Normaliza outputs/csv para 3FN (outputs/norm_csv)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de processos (1 = sequencial)")
+    parser.add_argument('--parquet', action=argparse.BooleanOptionalAction, default=None,
+                        help="Grava também outputs/norm_parquet/*.parquet (padrão: se pyarrow estiver instalado)")
+    parser.add_argument('--excel', action=argparse.BooleanOptionalAction, default=True,
+                        help="Grava também outputs/norm_excel/*.xlsx")
+    args = parser.parse_args()
+    
+    normalizer = Normalizer3NF(excel=args.excel)
+    normalizer.process_all(workers=args.workers, parquet=args.parquet)
 
 
 if __name__ == '__main__':
@@ -6,17 +6,21 @@ OBJETIVO: Detectar APENAS checkboxes marcados (☒) via análise de formas geom
 ESTRATÉGIA:
   1. Detectar quadrados pequenos (10-30px) via contornos
   2. Verificar se há pixels escuros cruzados (X) dentro do quadrado
-  3. Extrair texto à direita do checkbox usando Tesseract
+  3. Extrair texto à direita do checkbox usando Tesseract (um lote por página)
 """
 
+import sys
 import cv2
+import fitz
 import numpy as np
-from pdf2image import convert_from_path
 from pathlib import Path
-import pytesseract
 from typing import List, Dict, Tuple
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.batched_ocr import BatchedLabelOCR
+
 # Configuração
 INPUT_PDF_DIR = Path("inputs/pdf")
 OUTPUT_DIR = Path("outputs/checkbox_analysis")
@@ -33,6 +37,10 @@ class PreciseCheckboxDetector:
         """
         self.min_size = min_size
         self.max_size = max_size
+        # Configuração Tesseract: rótulos empilhados (psm 6) + whitelist
+        self.ocr = BatchedLabelOCR(
+            config='--psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789:.-_<>/ '
+        )
         
     def detect_checkboxes_in_image(self, image: np.ndarray) -> List[Dict]:
         """
@@ -84,19 +92,21 @@ class PreciseCheckboxDetector:
             is_checked = self._has_x_mark(checkbox_roi)
             
             if is_checked:
-                # Extrair texto à direita do checkbox
-                text_roi = image[y:y+h, x+w:x+w+300]  # 300px à direita
-                text = self._extract_text_from_roi(text_roi)
-                
                 checkboxes.append({
                     'x': x,
                     'y': y,
                     'width': w,
                     'height': h,
                     'is_checked': True,
-                    'text': text.strip()
+                    'text': ''
                 })
         
+        # Texto à direita de cada checkbox (300px): uma chamada ao Tesseract para a página
+        text_rois = [(cb['x'] + cb['width'], cb['y'], cb['x'] + cb['width'] + 300, cb['y'] + cb['height'])
+                     for cb in checkboxes]
+        for cb, text in zip(checkboxes, self.ocr.read_image_labels(image, text_rois)):
+            cb['text'] = text.strip()
+        
         return checkboxes
     
     def _has_x_mark(self, checkbox_roi: np.ndarray) -> bool:
@@ -125,19 +135,6 @@ class PreciseCheckboxDetector:
         
         # Se mais de 40% das diagonais são escuras → checkbox marcado
         return dark_ratio > 0.4
-    
-    def _extract_text_from_roi(self, roi: np.ndarray) -> str:
-        """Extrai texto de uma região usando Tesseract"""
-        if roi.size == 0:
-            return ""
-        
-        try:
-            # Configuração Tesseract: apenas texto de linha única
-            config = '--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789:.-_<>/ '
-            text = pytesseract.image_to_string(roi, config=config)
-            return text.strip()
-        except Exception:
-            return ""
 
 
 def analyze_single_pdf(pdf_path: Path, max_pages: int = 5) -> pd.DataFrame:
@@ -152,19 +149,19 @@ def analyze_single_pdf(pdf_path: Path, max_pages: int = 5) -> pd.DataFrame:
     print(f"📄 ANALISANDO: {pdf_path.name}")
     print(f"{'='*80}")
     
-    # Converter PDF para imagens
-    print(f"🔄 Convertendo PDF → Imagens (300 DPI)...")
-    images = convert_from_path(str(pdf_path), dpi=300, first_page=1, last_page=max_pages)
-    print(f"   ✅ {len(images)} páginas convertidas")
-    
     detector = PreciseCheckboxDetector(min_size=8, max_size=35)
     all_checkboxes = []
     
-    for page_num, image in enumerate(images, 1):
+    # Rasterizar página a página (300 DPI) - só uma página em memória por vez
+    doc = fitz.open(str(pdf_path))
+    page_count = min(max_pages, len(doc))
+    zoom = fitz.Matrix(300 / 72, 300 / 72)
+    
+    for page_num in range(1, page_count + 1):
         print(f"   Página {page_num}: Detectando checkboxes...")
         
-        # Converter PIL Image → numpy array
-        img_array = np.array(image)
+        pixmap = doc[page_num - 1].get_pixmap(matrix=zoom, alpha=False)
+        img_array = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, 3)
         
         # Detectar checkboxes
         checkboxes = detector.detect_checkboxes_in_image(img_array)
@@ -176,14 +173,16 @@ def analyze_single_pdf(pdf_path: Path, max_pages: int = 5) -> pd.DataFrame:
         all_checkboxes.extend(checkboxes)
         print(f"      ✅ {len(checkboxes)} checkboxes marcados detectados")
     
+    doc.close()
+    
     # Converter para DataFrame
     if not all_checkboxes:
         print("⚠️  Nenhum checkbox marcado detectado!")
         return pd.DataFrame()
     
     df = pd.DataFrame(all_checkboxes)
-    print(f"\n✅ TOTAL: {len(df)} checkboxes marcados em {len(images)} páginas")
-    print(f"   Média: {len(df)/len(images):.1f} checkboxes/página")
+    print(f"\n✅ TOTAL: {len(df)} checkboxes marcados em {page_count} páginas")
+    print(f"   Média: {len(df)/page_count:.1f} checkboxes/página")
     
     return df
 
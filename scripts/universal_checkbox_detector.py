@@ -33,7 +33,6 @@ import argparse
 from pathlib import Path
 import cv2
 import numpy as np
-from PIL import Image
 import fitz
 import pdfplumber
 import re
@@ -43,6 +42,11 @@ import json
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.page_render_cache import (
+    get_page_raster_cache, checkbox_candidate_rects, checkbox_scan_region, touches_candidate
+)
+from src.text_line_clustering import YBandIndex
+
 
 class UniversalCheckboxDetector:
     """
@@ -107,13 +111,15 @@ class UniversalCheckboxDetector:
             'YES', 'NO', 'ON', 'OFF', 'None', 'All'
         }
         
+        blacklist_upper = {b.upper() for b in BLACKLIST}
+        
         parameters = []
         for word in words:
             text = word['text'].strip()
             text_clean = text.rstrip(':')
             
             # CAMADA 2: Filtrar blacklist (case-insensitive)
-            if text_clean.upper() in {b.upper() for b in BLACKLIST}:
+            if text_clean.upper() in blacklist_upper:
                 continue
             
             # CAMADA 1: Match de padrão
@@ -191,17 +197,22 @@ class UniversalCheckboxDetector:
         """
         page_index = page_number - 1
         page = self.doc[page_index]
+        dpi = self.DEFAULT_DPI
+        scale = dpi / 72
+        
+        # 0. Pré-filtro vetorial: páginas sem candidatos não são renderizadas
+        candidates = checkbox_candidate_rects(page)
+        clip = checkbox_scan_region(page, dpi, candidates)
+        if clip is None:
+            if self.debug:
+                print(f"\n⏭️  Página {page_number} sem candidatos a checkbox (pré-filtro vetorial)")
+            return [], scale
         
         # 1. Extrair texto para mascaramento
         text_dict = page.get_text("dict")
         
-        # 2. Renderizar em alta resolução
-        dpi = self.DEFAULT_DPI
-        mat = fitz.Matrix(dpi/72, dpi/72)
-        pixmap = page.get_pixmap(matrix=mat)
-        
-        img = Image.frombytes("RGB", [pixmap.width, pixmap.height], pixmap.samples)
-        img_np = np.array(img)
+        # 2. Renderizar em alta resolução (apenas a faixa com candidatos, via cache)
+        img_np, (offset_x, offset_y) = get_page_raster_cache().render(page, dpi, clip)
         img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
         
         # Guardar imagem colorida para verificação de grayscale
@@ -209,22 +220,21 @@ class UniversalCheckboxDetector:
         
         # 3. Mascarar texto
         img_masked = img_bgr.copy()
-        scale = dpi / 72
         
         masked_blocks = 0
         for block in text_dict["blocks"]:
             if block["type"] == 0:  # Texto
                 bbox = block["bbox"]
-                x0 = int(bbox[0] * scale)
-                y0 = int(bbox[1] * scale)
-                x1 = int(bbox[2] * scale)
-                y1 = int(bbox[3] * scale)
+                x0 = int(bbox[0] * scale) - offset_x
+                y0 = int(bbox[1] * scale) - offset_y
+                x1 = int(bbox[2] * scale) - offset_x
+                y1 = int(bbox[3] * scale) - offset_y
                 cv2.rectangle(img_masked, (x0, y0), (x1, y1), (255, 255, 255), -1)
                 masked_blocks += 1
         
         if self.debug:
             print(f"\n🖼️  Imagem processada:")
-            print(f"   DPI: {dpi} | Resolução: {pixmap.width}x{pixmap.height}")
+            print(f"   DPI: {dpi} | Resolução da faixa: {img_np.shape[1]}x{img_np.shape[0]}")
             print(f"   Blocos de texto mascarados: {masked_blocks}")
         
         # 4. Pré-processar
@@ -307,6 +317,14 @@ class UniversalCheckboxDetector:
             if density < self.DEFAULT_MIN_DENSITY:
                 continue
             
+            # Voltar ao referencial da página inteira
+            x += offset_x
+            y += offset_y
+            
+            # Descartar artefatos da borda da faixa (longe de candidatos)
+            if not page.rotation and not touches_candidate(x, y, w, h, scale, candidates):
+                continue
+            
             checkboxes.append({
                 'x': x, 'y': y, 'w': w, 'h': h,
                 'density': density,
@@ -405,13 +423,15 @@ class UniversalCheckboxDetector:
             print(f"   Y-tolerance adaptativo: {y_tolerance:.1f} pontos")
         
         # Correlacionar cada checkbox com parâmetro mais próximo
+        # (só os parâmetros dentro da tolerância, na ordem original da lista)
+        param_index = YBandIndex(parameters, y_of=lambda p: p['y'])
         correlated = []
         
         for cb in checkboxes:
             closest_param = None
             min_distance = float('inf')
             
-            for param in parameters:
+            for param in param_index.within(cb['y_pdf'], y_tolerance):
                 # Checkbox deve estar ABAIXO ou PRÓXIMO do parâmetro
                 if cb['y_pdf'] >= param['y'] - 5:  # Permite 5pt acima
                     distance = abs(cb['y_pdf'] - param['y'])
@@ -590,16 +610,11 @@ class UniversalCheckboxDetector:
         """
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Renderizar página novamente
+        # Renderizar página inteira (reaproveita o cache de rasters)
         page_index = page_number - 1
         page = self.doc[page_index]
         
-        dpi = self.DEFAULT_DPI
-        mat = fitz.Matrix(dpi/72, dpi/72)
-        pixmap = page.get_pixmap(matrix=mat)
-        
-        img = Image.frombytes("RGB", [pixmap.width, pixmap.height], pixmap.samples)
-        img_np = np.array(img)
+        img_np, _ = get_page_raster_cache().render(page, self.DEFAULT_DPI)
         img_result = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
         
         # Desenhar checkboxes
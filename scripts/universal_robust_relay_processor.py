@@ -8,7 +8,7 @@ de relés de proteção elétrica de QUALQUER fabricante.
 
 **ARQUITETURA UNIVERSAL:**
     Processa automaticamente arquivos em múltiplos formatos:
-        - PDF: Extraído via PyPDF2 + regex patterns
+        - PDF: Extraído via PyMuPDF (1ª página) + regex patterns
         - TXT: Parsing estruturado linha a linha
         - S40/S41/S80: Arquivos proprietários Schneider SEPAM
         - XLSX/CSV: Planilhas e tabelas pré-processadas
@@ -62,13 +62,12 @@ import subprocess
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from universal_format_converter import UniversalFormatConverter  # type: ignore[reportMissingImports]
-
-try:
-    from PyPDF2 import PdfReader
-except ImportError:
-    PdfReader = None
-    logger = logging.getLogger(__name__)
-    logger.warning("⚠️ PyPDF2 não instalado. Instale com: pip install PyPDF2")
+from relay_format_sniffer import (  # type: ignore[reportMissingImports]
+    MANUFACTURER_PATTERNS,
+    UNKNOWN_MANUFACTURER,
+    detect_manufacturer,
+    get_format_sniffer,
+)
 
 # Configuração do logging
 logging.basicConfig(
@@ -162,49 +161,20 @@ class UniversalRobustRelayProcessor:
         self.equipment_tags = set()
         
         # Padrões de identificação de fabricantes (ROBUSTOS E FLEXÍVEIS)
-        self.manufacturer_patterns = {
-            'GE': [
-                r'micom\s+s1\s+agile',
-                r'micom',
-                r'multilin',
-                r'ge\s+grid\s+solutions',
-                r'general\s+electric'
-            ],
-            'SE': [
-                r'easergy\s+studio',
-                r'easergy',
-                r'sepam',
-                r'schneider\s+electric'
-            ],
-            'ABB': [
-                r'abb',
-                r'ref\d{3}',
-                r'ret\d{3}',
-                r'red\d{3}'
-            ],
-            'SEL': [
-                r'sel-\d{3,4}',
-                r'schweitzer\s+engineering'
-            ],
-            'SIEMENS': [
-                r'siprotec',
-                r'siemens'
-            ],
-            'ARTECHE': [
-                r'arteche',
-                r'ekor'
-            ]
-        }
+        # Tabela pré-compilada compartilhada com o detector de formato
+        self.manufacturer_patterns = MANUFACTURER_PATTERNS
+        self.format_sniffer = get_format_sniffer()
     
     def extract_manufacturer_from_pdf(self, pdf_path):
         """
         Extrai fabricante do PDF de forma ROBUSTA e FLEXÍVEL
         
-        Estratégia:
+        Estratégia (relay_format_sniffer, só a 1ª página, memorizado por hash):
         1. Tenta extrair do RODAPÉ (mais confiável)
         2. Fallback para CABEÇALHO
         3. Fallback para CORPO do texto
-        4. Retorna 'UNKNOWN' se não identificar
+        4. Fallback para o fabricante da família detectada (MiCOM → GE, Easergy → SE)
+        5. Retorna 'UNKNOWN' se não identificar
         
         Args:
             pdf_path: Path do arquivo PDF
@@ -212,56 +182,11 @@ class UniversalRobustRelayProcessor:
         Returns:
             str: Código do fabricante ('GE', 'SE', 'ABB', etc.) ou 'UNKNOWN'
         """
-        if not PdfReader:
-            logger.warning(f"⚠️ PyPDF2 não disponível, assumindo SE para {pdf_path.name}")
-            return 'SE'
-            
-        try:
-            reader = PdfReader(str(pdf_path))
-            if not reader.pages:
-                logger.warning(f"⚠️ PDF vazio: {pdf_path.name}")
-                return 'UNKNOWN'
-            
-            # Extrair primeira página
-            first_page = reader.pages[0]
-            text = first_page.extract_text().lower()
-            
-            # Estratégia 1: RODAPÉ (últimas 200 chars)
-            footer_text = text[-200:] if len(text) > 200 else text
-            
-            for manufacturer_code, patterns in self.manufacturer_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, footer_text, re.IGNORECASE):
-                        logger.info(f"✅ Fabricante identificado (rodapé): {manufacturer_code} - {pdf_path.name}")
-                        return manufacturer_code
-            
-            # Estratégia 2: CABEÇALHO (primeiros 500 chars)
-            header_text = text[:500] if len(text) > 500 else text
-            
-            for manufacturer_code, patterns in self.manufacturer_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, header_text, re.IGNORECASE):
-                        logger.info(f"✅ Fabricante identificado (cabeçalho): {manufacturer_code} - {pdf_path.name}")
-                        return manufacturer_code
-            
-            # Estratégia 3: CORPO COMPLETO (último recurso)
-            for manufacturer_code, patterns in self.manufacturer_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        logger.info(f"✅ Fabricante identificado (corpo): {manufacturer_code} - {pdf_path.name}")
-                        return manufacturer_code
-            
-            # Não identificou
-            logger.warning(f"⚠️ Fabricante não identificado em: {pdf_path.name}")
-            return 'UNKNOWN'
-            
-        except Exception as e:
-            logger.error(f"❌ Erro extraindo fabricante de {pdf_path.name}: {e}")
-            return 'UNKNOWN'
+        return self._sniff_manufacturer(pdf_path, 'PDF')
     
     def extract_manufacturer_from_txt(self, txt_path):
         """
-        Extrai fabricante do TXT de forma ROBUSTA
+        Extrai fabricante do TXT de forma ROBUSTA (primeiros KB do arquivo)
         
         Args:
             txt_path: Path do arquivo TXT
@@ -269,23 +194,21 @@ class UniversalRobustRelayProcessor:
         Returns:
             str: Código do fabricante ou 'UNKNOWN'
         """
+        return self._sniff_manufacturer(txt_path, 'TXT')
+    
+    def _sniff_manufacturer(self, file_path, kind):
+        """Fabricante pelo detector compartilhado (arquivo lido uma vez por execução)"""
         try:
-            with open(txt_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read().lower()
-            
-            # Buscar padrões conhecidos
-            for manufacturer_code, patterns in self.manufacturer_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        logger.info(f"✅ Fabricante identificado (TXT): {manufacturer_code} - {txt_path.name}")
-                        return manufacturer_code
-            
-            logger.warning(f"⚠️ Fabricante não identificado em TXT: {txt_path.name}")
-            return 'UNKNOWN'
-            
+            sniff = self.format_sniffer.sniff(file_path)
         except Exception as e:
-            logger.error(f"❌ Erro lendo TXT {txt_path.name}: {e}")
+            logger.error(f"❌ Erro extraindo fabricante de {file_path.name}: {e}")
             return 'UNKNOWN'
+        
+        if sniff.manufacturer == UNKNOWN_MANUFACTURER:
+            logger.warning(f"⚠️ Fabricante não identificado em {kind}: {file_path.name}")
+        else:
+            logger.info(f"✅ Fabricante identificado ({kind}): {sniff.manufacturer} - {file_path.name}")
+        return sniff.manufacturer
     
     def get_manufacturer_for_file(self, original_path):
         """
@@ -308,12 +231,10 @@ class UniversalRobustRelayProcessor:
             return self.extract_manufacturer_from_txt(original_path)
         else:
             # CSV, XLSX, etc. - tentar extrair do nome do arquivo
-            filename = original_path.name.lower()
-            for manufacturer_code, patterns in self.manufacturer_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, filename, re.IGNORECASE):
-                        logger.info(f"✅ Fabricante identificado (filename): {manufacturer_code} - {original_path.name}")
-                        return manufacturer_code
+            manufacturer_code = detect_manufacturer(original_path.name)
+            if manufacturer_code:
+                logger.info(f"✅ Fabricante identificado (filename): {manufacturer_code} - {original_path.name}")
+                return manufacturer_code
             
             return 'UNKNOWN'
         
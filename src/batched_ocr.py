@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batched OCR - Leitura em lote dos rótulos de checkboxes
+=======================================================
+
+Os extratores baseados em OCR chamavam pytesseract.image_to_string uma vez
+por checkbox: cada chamada inicia um processo tesseract (carga do modelo
+de idioma incluída), e convert_from_path(dpi=300) rasterizava o PDF inteiro
+antes de começar.
+
+BatchedLabelOCR lê os rótulos assim:
+
+1. Camada de texto: regiões com texto no PDF são lidas com PyMuPDF
+   (PageWordIndex) - sem rasterizar, sem OCR.
+2. Cache por conteúdo: cada recorte é identificado pelo SHA-1 dos pixels +
+   configuração do tesseract; rótulos repetidos (mesmo texto na mesma
+   fonte) são reconhecidos uma única vez por processo.
+3. Lote por página: os recortes restantes de uma página são empilhados em
+   uma imagem (faixas separadas por espaço em branco) e enviados em UMA
+   chamada image_to_data; as palavras do TSV voltam para os recortes pela
+   coordenada vertical.
+4. Páginas em paralelo: as chamadas ao tesseract (processos externos) rodam
+   em um pool de threads; a rasterização (PyMuPDF, não thread-safe) fica na
+   thread principal e renderiza só a faixa com os recortes pendentes, via
+   cache compartilhado de rasters (page_render_cache).
+
+Sem pytesseract/tesseract instalado, as regiões sem camada de texto voltam
+vazias (com aviso) e a camada de texto continua sendo usada.
+
+Autor: Sistema ProtecAI
+Data: 2025-11-22
+"""
+
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+try:
+    from .page_render_cache import get_page_raster_cache, snap_rect_to_pixels
+    from .page_text_index import PageWordIndex
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from page_render_cache import get_page_raster_cache, snap_rect_to_pixels
+    from page_text_index import PageWordIndex
+
+logger = logging.getLogger(__name__)
+
+# psm 6: bloco uniforme - cada faixa da imagem empilhada vira uma linha
+DEFAULT_CONFIG = "--psm 6"
+
+# Espaço em branco entre faixas e margem da imagem empilhada (pixels)
+BAND_GAP_PX = 24
+BAND_MARGIN_PX = 12
+
+# Altura máxima de uma imagem empilhada (o tesseract degrada muito acima disso)
+MAX_BATCH_HEIGHT_PX = 12000
+
+# Entradas do cache de resultados (texto curto por recorte)
+DEFAULT_CACHE_ENTRIES = 50000
+
+# (x0, y0, x1, y1) em pixels
+PixelBox = Tuple[int, int, int, int]
+
+
+class LabelBox(NamedTuple):
+    """Região de rótulo em uma página (pontos PDF)"""
+    page: int
+    rect: Tuple[float, float, float, float]
+
+
+class OCRResultCache:
+    """Cache LRU de textos reconhecidos, chaveado pelo hash do recorte."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_shared_cache: Optional[OCRResultCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRResultCache:
+    """Retorna o cache de OCR compartilhado pelo processo."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = OCRResultCache()
+        return _shared_cache
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """Converte recorte RGB/RGBA/cinza em uint8 de um canal"""
+    if image.ndim == 2:
+        return np.ascontiguousarray(image, dtype=np.uint8)
+    rgb = image[..., :3].astype(np.uint32)
+    gray = (rgb[..., 0] * 299 + rgb[..., 1] * 587 + rgb[..., 2] * 114) // 1000
+    return gray.astype(np.uint8)
+
+
+def crop_key(crop: np.ndarray, config: str) -> str:
+    """Identificador do recorte: pixels + formato + configuração do tesseract"""
+    digest = hashlib.sha1()
+    digest.update(f"{crop.shape}|{config}".encode())
+    digest.update(np.ascontiguousarray(crop).tobytes())
+    return digest.hexdigest()
+
+
+def stitch_crops(crops: Sequence[np.ndarray], gap: int = BAND_GAP_PX,
+                 margin: int = BAND_MARGIN_PX) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """
+    Empilha recortes em cinza em uma imagem branca, um por faixa.
+
+    Returns:
+        (imagem, [(y0, y1) de cada faixa])
+    """
+    width = max(crop.shape[1] for crop in crops) + 2 * margin
+    height = sum(crop.shape[0] for crop in crops) + gap * (len(crops) - 1) + 2 * margin
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+
+    bands = []
+    y = margin
+    for crop in crops:
+        h, w = crop.shape
+        canvas[y:y + h, margin:margin + w] = crop
+        bands.append((y, y + h))
+        y += h + gap
+    return canvas, bands
+
+
+def split_batches(crops: Sequence[np.ndarray],
+                  max_height: int = MAX_BATCH_HEIGHT_PX) -> List[List[int]]:
+    """Agrupa índices de recortes em lotes que cabem em max_height"""
+    batches: List[List[int]] = []
+    height = 0
+    for i, crop in enumerate(crops):
+        crop_height = crop.shape[0] + BAND_GAP_PX
+        if batches and height + crop_height <= max_height:
+            batches[-1].append(i)
+            height += crop_height
+        else:
+            batches.append([i])
+            height = crop_height + 2 * BAND_MARGIN_PX
+    return batches
+
+
+def assign_words_to_bands(data: Dict[str, list], bands: Sequence[Tuple[int, int]]) -> List[str]:
+    """
+    Distribui as palavras do TSV do tesseract entre as faixas.
+
+    Args:
+        data: Saída de image_to_data(output_type=DICT)
+        bands: Faixas de stitch_crops
+
+    Returns:
+        Texto de cada faixa (palavras na ordem de leitura do tesseract)
+    """
+    starts = [y0 for y0, _ in bands]
+    words: List[List[str]] = [[] for _ in bands]
+
+    for text, top, height, conf in zip(data["text"], data["top"], data["height"], data["conf"]):
+        text = str(text).strip()
+        if not text or float(conf) < 0:
+            continue
+        center = int(top) + int(height) / 2
+        band = bisect_right(starts, center) - 1
+        if band >= 0 and center <= bands[band][1] + BAND_GAP_PX / 2:
+            words[band].append(text)
+
+    return [" ".join(band_words) for band_words in words]
+
+
+def _image_to_data(image: np.ndarray, config: str) -> Dict[str, list]:
+    """Uma chamada ao tesseract com saída TSV"""
+    return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+
+class BatchedLabelOCR:
+    """
+    Leitura de rótulos: camada de texto do PDF, cache e OCR em lote.
+
+    Examples:
+        >>> ocr = BatchedLabelOCR()
+        >>> labels = ocr.read_labels(doc, [LabelBox(0, (80, 290, 300, 302))])
+        >>> texts = ocr.read_image_labels(page_image, [(x0, y0, x1, y1)])
+    """
+
+    def __init__(self, dpi: int = 300, config: str = DEFAULT_CONFIG,
+                 max_workers: Optional[int] = None, cache: Optional[OCRResultCache] = None):
+        """
+        Args:
+            dpi: Resolução de rasterização das regiões sem texto
+            config: Configuração do tesseract (whitelist etc.). O psm deve
+                aceitar várias linhas (3, 4, 6): psm 7/8 leem a imagem
+                empilhada como uma linha só
+            max_workers: Chamadas simultâneas ao tesseract (None = min(4, CPUs))
+            cache: Cache de resultados (None = compartilhado pelo processo)
+        """
+        self.dpi = dpi
+        self.config = config
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.cache = cache if cache is not None else get_ocr_cache()
+
+        # Estatísticas
+        self.text_layer_hits = 0
+        self.cache_hits = 0
+        self.ocr_regions = 0
+        self.tesseract_calls = 0
+        self._warned = False
+        self._stats_lock = threading.Lock()
+
+    def read_labels(self, doc: fitz.Document, boxes: Sequence[LabelBox]) -> List[str]:
+        """
+        Lê os rótulos das regiões do documento.
+
+        Args:
+            doc: Documento PyMuPDF
+            boxes: Regiões (página, retângulo em pontos PDF)
+
+        Returns:
+            Texto de cada região, na ordem de boxes
+        """
+        results = [""] * len(boxes)
+        by_page: Dict[int, List[int]] = {}
+        for i, box in enumerate(boxes):
+            by_page.setdefault(box.page, []).append(i)
+
+        scale = self.dpi / 72
+        pending_pages = []
+        for page_number, indices in sorted(by_page.items()):
+            page = doc[page_number]
+            words = PageWordIndex(page)
+
+            missing = []
+            for i in indices:
+                text = self._text_layer(words, fitz.Rect(boxes[i].rect))
+                if text:
+                    results[i] = text
+                    self.text_layer_hits += 1
+                else:
+                    missing.append(i)
+            if not missing:
+                continue
+
+            # Renderiza só a faixa que contém as regiões sem texto
+            region = fitz.Rect(boxes[missing[0]].rect)
+            for i in missing[1:]:
+                region |= fitz.Rect(boxes[i].rect)
+            region = snap_rect_to_pixels(region & page.rect, self.dpi)
+            if region.is_empty:
+                continue
+            image, (ox, oy) = get_page_raster_cache().render(page, dpi=self.dpi, clip=region)
+
+            crops = []
+            for i in missing:
+                rect = fitz.Rect(boxes[i].rect)
+                x0 = max(int(rect.x0 * scale) - ox, 0)
+                y0 = max(int(rect.y0 * scale) - oy, 0)
+                x1 = min(int(rect.x1 * scale) - ox, image.shape[1])
+                y1 = min(int(rect.y1 * scale) - oy, image.shape[0])
+                crops.append(image[y0:y1, x0:x1])
+            pending_pages.append((missing, crops))
+
+        # Todas as páginas compartilham o mesmo pool de chamadas ao tesseract
+        texts_by_page = self._recognize_pages([crops for _, crops in pending_pages])
+        for (missing, _), texts in zip(pending_pages, texts_by_page):
+            for i, text in zip(missing, texts):
+                results[i] = text
+
+        return results
+
+    def read_image_labels(self, image: np.ndarray, boxes: Sequence[PixelBox]) -> List[str]:
+        """
+        Lê rótulos de uma imagem já rasterizada (páginas escaneadas, PNG).
+
+        Args:
+            image: Imagem da página (cinza, RGB ou RGBA)
+            boxes: Regiões (x0, y0, x1, y1) em pixels; são limitadas à imagem
+
+        Returns:
+            Texto de cada região, na ordem de boxes
+        """
+        height, width = image.shape[:2]
+        crops = []
+        for x0, y0, x1, y1 in boxes:
+            crops.append(image[max(y0, 0):min(y1, height), max(x0, 0):min(x1, width)])
+        return self._recognize_pages([crops])[0]
+
+    @staticmethod
+    def _text_layer(words: PageWordIndex, rect: fitz.Rect) -> str:
+        """Texto da camada do PDF dentro da região ('' se não há)"""
+        found = sorted(words.words_in(rect), key=lambda w: (w[5], w[6], w[7]))
+        return " ".join(w[4] for w in found).strip()
+
+    def _recognize_pages(self, pages: Sequence[Sequence[np.ndarray]]) -> List[List[str]]:
+        """
+        OCR dos recortes de várias páginas: cache primeiro, depois um lote
+        (uma chamada ao tesseract) por página, páginas em paralelo.
+        """
+        results: List[List[str]] = []
+        jobs: List[Tuple[List[str], List[np.ndarray]]] = []
+        waiting: List[Tuple[int, int, str]] = []
+
+        for page_index, crops in enumerate(pages):
+            texts = [""] * len(crops)
+            keys: List[str] = []
+            unique: List[np.ndarray] = []
+            seen = set()
+            for crop_index, crop in enumerate(crops):
+                if crop.size == 0:
+                    continue
+                gray = to_gray(crop)
+                key = crop_key(gray, self.config)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    texts[crop_index] = cached
+                    self.cache_hits += 1
+                    continue
+                waiting.append((page_index, crop_index, key))
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+                    unique.append(gray)
+            results.append(texts)
+
+            if unique:
+                for batch in split_batches(unique):
+                    jobs.append(([keys[i] for i in batch], [unique[i] for i in batch]))
+
+        if not jobs:
+            return results
+
+        recognized: Dict[str, str] = {}
+        if len(jobs) == 1 or self.max_workers == 1:
+            batches = [self._recognize_batch(crops) for _, crops in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                batches = list(pool.map(lambda job: self._recognize_batch(job[1]), jobs))
+
+        for (keys, _), texts in zip(jobs, batches):
+            if texts is None:
+                continue
+            for key, text in zip(keys, texts):
+                recognized[key] = text
+                self.cache.put(key, text)
+            self.ocr_regions += len(keys)
+
+        for page_index, crop_index, key in waiting:
+            results[page_index][crop_index] = recognized.get(key, "")
+
+        return results
+
+    def _recognize_batch(self, crops: Sequence[np.ndarray]) -> Optional[List[str]]:
+        """Uma chamada ao tesseract para o lote (None se o OCR falhou)"""
+        if not TESSERACT_AVAILABLE:
+            self._warn("pytesseract não instalado")
+            return None
+
+        image, bands = stitch_crops(crops)
+        try:
+            data = _image_to_data(image, self.config)
+        except Exception as e:
+            self._warn(str(e))
+            return None
+        with self._stats_lock:
+            self.tesseract_calls += 1
+        return assign_words_to_bands(data, bands)
+
+    def _warn(self, reason: str) -> None:
+        with self._stats_lock:
+            if self._warned:
+                return
+            self._warned = True
+        logger.warning(f"⚠️  OCR indisponível ({reason}): regiões sem camada de texto ficam vazias")
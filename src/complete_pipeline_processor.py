@@ -17,6 +17,12 @@ NOTA: Normalização/atomização (PASSO 2) é feita por script separado
 que lerá outputs/csv/ e gerará outputs/norm_csv/ e outputs/norm_excel/
 em formato 3FN atomizado.
 
+MODO PARALELO (--workers N):
+Arquivos (e, opcionalmente, blocos de páginas de PDFs Easergy grandes) são
+distribuídos em um pool de processos. Cada arquivo continua gerando o seu
+próprio CSV/Excel, então a saída é a mesma do modo sequencial; as
+estatísticas são consolidadas no processo principal, na ordem dos arquivos.
+
 Autor: ProtecAI Team
 Data: 06/11/2025
 Atualizado: 10/11/2025 - Separação clara PASSO 1 (bruto) vs PASSO 2 (normalizado)
@@ -24,17 +30,27 @@ Atualizado: 10/11/2025 - Separação clara PASSO 1 (bruto) vs PASSO 2 (normaliza
 
 import sys
 import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import json
 from datetime import datetime
 
 # Adicionar path do projeto
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.universal_glossary_parser import UniversalGlossaryParser
+from src.glossary_index import load_glossary_index
 from src.intelligent_relay_extractor import IntelligentRelayExtractor
+from src.pipeline_artifact_cache import PipelineArtifactCache, STAGE_EXTRACTION
+from src.page_stream import DEFAULT_MEMORY_LIMIT_MB
+from src.relay_format_sniffer import SniffResult, get_format_sniffer
+from src.stage_frames import (
+    PARQUET_AVAILABLE, RAW_PARAMS_SCHEMA, parquet_path_for, read_stage_frame,
+    stage_output_paths, write_parquet, write_stage_frame,
+)
 import pandas as pd
 
 logging.basicConfig(
@@ -44,6 +60,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Processador de cada worker do pool (criado uma vez por processo)
+_worker_processor = None
+
+
+def _init_worker(project_root: str, memory_limit_mb: Optional[float] = None, excel: bool = True):
+    """Inicializa o processador dentro de um processo do pool"""
+    global _worker_processor
+    _worker_processor = CompletePipelineProcessor(project_root, memory_limit_mb=memory_limit_mb, excel=excel)
+
+
+def _run_file_task(file_type: str, file_path: str, sniff: Optional[SniffResult] = None) -> Dict[str, Any]:
+    """
+    Executa a extração de um arquivo inteiro em um processo do pool
+    
+    `sniff` é a detecção feita no processo principal: registrada no detector
+    do worker para que o arquivo não seja reaberto só para detectar o tipo.
+    """
+    if sniff is not None:
+        get_format_sniffer().remember(file_path, sniff)
+    return _worker_processor.run_file_task(file_type, Path(file_path))
+
+
+def _run_page_task(pdf_path: str, page_numbers: List[int]) -> List[Dict]:
+    """Executa detecção + correlação de um bloco de páginas Easergy"""
+    from src.precise_parameter_extractor import PreciseParameterExtractor
+    return PreciseParameterExtractor().extract_page_results(Path(pdf_path), page_numbers)
+
+
 class CompletePipelineProcessor:
     """
     Processador completo que:
@@ -54,14 +98,26 @@ class CompletePipelineProcessor:
     5. Normaliza e exporta
     """
     
-    def __init__(self, project_root: str):
+    # Versão da lógica de extração. Incrementar ao mudar extratores/detectores:
+    # invalida o cache incremental (--incremental) de todos os arquivos.
+    EXTRACTOR_VERSION = "2025.11.22"
+    
+    def __init__(self, project_root: str, memory_limit_mb: Optional[float] = None,
+                 excel: bool = True):
         """
         Inicializa processador
         
         Args:
             project_root: Raiz do projeto
+            memory_limit_mb: Extração em fluxo de PDFs Easergy/MiCOM (página a
+                             página, CSV gravado incrementalmente) com este teto
+                             de memória. None = extração em memória
+            excel: Gerar também outputs/excel/*.xlsx. O estágio seguinte lê
+                   o CSV/Parquet tipado (stage_frames); o Excel é só exportação
         """
         self.project_root = Path(project_root)
+        self.memory_limit_mb = memory_limit_mb
+        self.excel = excel
         
         # Pastas de entrada
         self.input_pdf_folder = self.project_root / "inputs" / "pdf"
@@ -106,29 +162,17 @@ class CompletePipelineProcessor:
             return False
         
         try:
-            parser = UniversalGlossaryParser(str(self.input_glossario))
-            parameters = parser.parse_all()
+            # Snapshot indexado: o XLSX só é reprocessado quando muda
+            index = load_glossary_index(self.input_glossario)
+            parameters = index.parameters
             
-            # Converter para dicionário indexado
             self.glossario_data = {
                 'parameters': parameters,
-                'by_model': {},
-                'by_code': {}
+                'by_model': index.by_model,
+                'by_code': index.by_code,
+                'index': index
             }
             
-            # Indexar por modelo e código
-            for param in parameters:
-                model = param.modelo
-                code = param.codigo
-                
-                if model not in self.glossario_data['by_model']:
-                    self.glossario_data['by_model'][model] = []
-                self.glossario_data['by_model'][model].append(param)
-                
-                if code not in self.glossario_data['by_code']:
-                    self.glossario_data['by_code'][code] = []
-                self.glossario_data['by_code'][code].append(param)
-            
             logger.info(f"✅ Glossário carregado: {len(parameters)} parâmetros")
             logger.info(f"   • Modelos: {len(self.glossario_data['by_model'])}")
             logger.info(f"   • Códigos únicos: {len(self.glossario_data['by_code'])}")
@@ -200,6 +244,9 @@ class CompletePipelineProcessor:
             relay_type = self.extractor.detect_relay_type(pdf_path)
             logger.info(f"   🔍 Tipo detectado: {relay_type}")
             
+            if self.memory_limit_mb is not None and relay_type in ('easergy', 'micom'):
+                return self._process_pdf_streaming(pdf_path, relay_type)
+            
             # Extrair parâmetros baseado no tipo
             if relay_type == 'easergy':
                 df = self.extractor.extract_from_easergy(pdf_path)
@@ -210,13 +257,7 @@ class CompletePipelineProcessor:
                 df = self.extractor._extract_all_text_parameters(pdf_path, 'unknown')
             
             if df is not None and not df.empty:
-                # Salvar CSV bruto
-                csv_path = self.output_csv / f"{pdf_path.stem}_params.csv"
-                df.to_csv(csv_path, index=False, encoding='utf-8-sig')
-                
-                # Salvar Excel bruto
-                excel_path = self.output_excel / f"{pdf_path.stem}_params.xlsx"
-                df.to_excel(excel_path, index=False, engine='openpyxl')
+                self._save_raw_outputs(df, pdf_path.stem)
                 
                 logger.info(f"   ✅ Extraído: {len(df)} parâmetros")
                 
@@ -233,6 +274,37 @@ class CompletePipelineProcessor:
             logger.error(f"   ❌ Erro: {e}")
             return None
     
+    def _process_pdf_streaming(self, pdf_path: Path, relay_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Extrai um PDF página a página gravando o CSV bruto incrementalmente
+        
+        A memória não cresce com o número de páginas e as primeiras linhas
+        aparecem no CSV antes da última página ser lida. O Excel bruto é
+        gerado no fim, a partir do CSV.
+        """
+        csv_path = self.output_csv / f"{pdf_path.stem}_params.csv"
+        count = self.extractor.stream_to_csv(pdf_path, csv_path, relay_type, self.memory_limit_mb)
+        
+        if count == 0:
+            csv_path.unlink(missing_ok=True)
+            logger.warning(f"   ⚠️  Nenhum parâmetro extraído")
+            return None
+        
+        df = read_stage_frame(csv_path, RAW_PARAMS_SCHEMA)
+        if PARQUET_AVAILABLE:
+            write_parquet(df, parquet_path_for(csv_path), RAW_PARAMS_SCHEMA)
+        if self.excel:
+            excel_path = self.output_excel / f"{pdf_path.stem}_params.xlsx"
+            df.to_excel(excel_path, index=False, engine='openpyxl')
+        
+        logger.info(f"   ✅ Extraído em fluxo: {count} parâmetros")
+        
+        return {
+            'dataframe': df,
+            'relay_type': relay_type,
+            'source': pdf_path.name
+        }
+    
     def process_sepam_file(self, sepam_path: Path) -> Dict[str, Any]:
         """
         Processa um arquivo SEPAM (.S40/.s40)
@@ -250,13 +322,7 @@ class CompletePipelineProcessor:
             df = self.extractor.extract_from_sepam(sepam_path)
             
             if df is not None and not df.empty:
-                # Salvar CSV bruto
-                csv_path = self.output_csv / f"{sepam_path.stem}_params.csv"
-                df.to_csv(csv_path, index=False, encoding='utf-8-sig')
-                
-                # Salvar Excel bruto
-                excel_path = self.output_excel / f"{sepam_path.stem}_params.xlsx"
-                df.to_excel(excel_path, index=False, engine='openpyxl')
+                self._save_raw_outputs(df, sepam_path.stem)
                 
                 logger.info(f"   ✅ Extraído: {len(df)} parâmetros")
                 
@@ -273,6 +339,169 @@ class CompletePipelineProcessor:
             logger.error(f"   ❌ Erro: {e}")
             return None
     
+    def _save_raw_outputs(self, df: pd.DataFrame, stem: str):
+        """
+        Salva as saídas brutas de um arquivo extraído
+        
+        CSV + Parquet tipados (entrada da normalização) e, se habilitado, Excel.
+        
+        Args:
+            df: DataFrame extraído
+            stem: Nome base do arquivo de entrada
+        """
+        # Salvar CSV bruto (+ Parquet com pyarrow)
+        csv_path = self.output_csv / f"{stem}_params.csv"
+        write_stage_frame(df, csv_path, RAW_PARAMS_SCHEMA)
+        
+        # Salvar Excel bruto
+        if self.excel:
+            excel_path = self.output_excel / f"{stem}_params.xlsx"
+            df.to_excel(excel_path, index=False, engine='openpyxl')
+    
+    def run_file_task(self, file_type: str, file_path: Path) -> Dict[str, Any]:
+        """
+        Processa um arquivo e devolve um resumo leve (picklable) com tempo de parede
+        
+        Args:
+            file_type: 'pdf' ou 'sepam'
+            file_path: Caminho do arquivo
+            
+        Returns:
+            Dicionário com file, file_type, success, parameters e seconds
+        """
+        start = time.perf_counter()
+        
+        if file_type == 'pdf':
+            result = self.process_pdf_file(file_path)
+        else:
+            result = self.process_sepam_file(file_path)
+        
+        return {
+            'file': file_path.name,
+            'file_type': file_type,
+            'success': result is not None,
+            'parameters': len(result['dataframe']) if result else 0,
+            'seconds': time.perf_counter() - start
+        }
+    
+    def _page_chunks(self, pdf_path: Path, pages_per_task: int) -> Optional[List[List[int]]]:
+        """
+        Divide um PDF Easergy grande em blocos de páginas
+        
+        Tipo e número de páginas vêm da detecção memorizada (o PDF não é
+        reaberto).
+        
+        Returns:
+            Lista de blocos, ou None se o arquivo deve ser processado inteiro
+        """
+        sniff = get_format_sniffer().sniff(pdf_path)
+        if pages_per_task <= 0 or sniff.relay_type != 'easergy':
+            return None
+        
+        page_count = sniff.page_count
+        if page_count <= pages_per_task:
+            return None
+        
+        return [
+            list(range(start, min(start + pages_per_task, page_count)))
+            for start in range(0, page_count, pages_per_task)
+        ]
+    
+    def _assemble_paged_pdf(self, pdf_path: Path, chunk_results: List[List[Dict]],
+                            seconds: float) -> Dict[str, Any]:
+        """
+        Monta o resultado de um PDF Easergy processado em blocos de páginas
+        
+        Concatena os blocos na ordem das páginas e aplica a mesma consolidação
+        de PreciseParameterExtractor.extract_from_pdf + filtro de ativos.
+        """
+        from src.precise_parameter_extractor import PreciseParameterExtractor
+        
+        start = time.perf_counter()
+        all_results = [row for chunk in chunk_results for row in chunk]
+        df = PreciseParameterExtractor.results_to_dataframe(all_results)
+        df = self.extractor.filter_easergy_active(df)
+        
+        success = df is not None and not df.empty
+        if success:
+            self._save_raw_outputs(df, pdf_path.stem)
+            logger.info(f"   ✅ {pdf_path.name}: {len(df)} parâmetros ({len(chunk_results)} blocos de páginas)")
+        else:
+            logger.warning(f"   ⚠️  {pdf_path.name}: nenhum parâmetro extraído")
+        
+        return {
+            'file': pdf_path.name,
+            'file_type': 'pdf',
+            'success': success,
+            'parameters': len(df) if success else 0,
+            'seconds': seconds + (time.perf_counter() - start)
+        }
+    
+    def _run_tasks_parallel(self, tasks: List[Tuple[str, Path]], workers: int,
+                            pages_per_task: int) -> List[Dict[str, Any]]:
+        """
+        Executa tarefas de extração em um pool de processos
+        
+        Os resultados são devolvidos na MESMA ORDEM de `tasks`, para que as
+        estatísticas consolidadas sejam idênticas às do modo sequencial.
+        
+        Args:
+            tasks: Lista de (file_type, file_path)
+            workers: Número de processos
+            pages_per_task: Páginas por bloco para PDFs Easergy (0 = desativado)
+            
+        Returns:
+            Lista de resumos por arquivo (ver run_file_task)
+        """
+        logger.info(f"⚙️  Modo paralelo: {workers} processos"
+                    + (f", {pages_per_task} páginas por bloco" if pages_per_task > 0 else ""))
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(str(self.project_root), self.memory_limit_mb, self.excel)) as pool:
+            pending = []
+            for file_type, file_path in tasks:
+                sniff = get_format_sniffer().sniff(file_path) if file_type == 'pdf' else None
+                chunks = self._page_chunks(file_path, pages_per_task) if sniff else None
+                
+                if chunks:
+                    futures = [pool.submit(_run_page_task, str(file_path), chunk) for chunk in chunks]
+                    pending.append(('pages', file_path, futures, time.perf_counter()))
+                else:
+                    future = pool.submit(_run_file_task, file_type, str(file_path), sniff)
+                    pending.append(('file', file_path, future, None))
+            
+            results = []
+            for kind, file_path, futures, submitted_at in pending:
+                if kind == 'file':
+                    try:
+                        results.append(futures.result())
+                    except Exception as e:
+                        logger.error(f"   ❌ Erro em {file_path.name}: {e}")
+                        results.append(self._failed_task_result(file_path))
+                    continue
+                
+                try:
+                    chunk_results = [f.result() for f in futures]
+                    seconds = time.perf_counter() - submitted_at
+                    results.append(self._assemble_paged_pdf(file_path, chunk_results, seconds))
+                except Exception as e:
+                    logger.error(f"   ❌ Erro em {file_path.name}: {e}")
+                    results.append(self._failed_task_result(file_path))
+        
+        return results
+    
+    @staticmethod
+    def _failed_task_result(file_path: Path) -> Dict[str, Any]:
+        """Resumo de um arquivo cujo processo do pool falhou"""
+        return {
+            'file': file_path.name,
+            'file_type': 'pdf' if file_path.suffix.lower() == '.pdf' else 'sepam',
+            'success': False,
+            'parameters': 0,
+            'seconds': 0.0
+        }
+    
     def normalize_and_validate(self, extracted_data: Dict[str, Any], 
                               filename: str) -> Dict[str, Any]:
         """
@@ -402,10 +631,24 @@ class CompletePipelineProcessor:
         
         logger.info(f"   📁 Normalizado: {len(df)} parâmetros → norm_csv/ e norm_excel/")
     
-    def process_all(self) -> Dict[str, Any]:
+    def raw_output_paths(self, stem: str) -> List[Path]:
+        """Arquivos brutos obrigatórios (CSV e, se habilitado, Excel) gerados para uma entrada"""
+        excel = [self.output_excel / f"{stem}_params.xlsx"] if self.excel else []
+        return stage_output_paths(self.output_csv / f"{stem}_params.csv") + excel
+    
+    def process_all(self, workers: int = 1, pages_per_task: int = 0,
+                    incremental: bool = False) -> Dict[str, Any]:
         """
         Processa todos os arquivos da pipeline
         
+        Args:
+            workers: Número de processos (1 = sequencial, comportamento original)
+            pages_per_task: No modo paralelo, divide PDFs Easergy com mais páginas
+                            que este valor em blocos processados separadamente
+                            (0 = um arquivo por tarefa)
+            incremental: Pula arquivos cujo conteúdo, versão do extrator e
+                         glossário não mudaram desde a última extração
+        
         Returns:
             Estatísticas do processamento
         """
@@ -417,6 +660,9 @@ class CompletePipelineProcessor:
                 'pdf': {'total': 0, 'success': 0, 'failed': 0},
                 'sepam': {'total': 0, 'success': 0, 'failed': 0}
             },
+            'skipped': 0,
+            'file_timings': [],
+            'workers': max(1, workers),
             'start_time': datetime.now(),
             'end_time': None
         }
@@ -438,33 +684,52 @@ class CompletePipelineProcessor:
         logger.info("🚀 INICIANDO PROCESSAMENTO")
         logger.info("="*80)
         
-        # 3. Processar PDFs
         stats['by_type']['pdf']['total'] = len(files['pdf'])
-        for pdf_file in files['pdf']:
-            result = self.process_pdf_file(pdf_file)
-            if result:
-                stats['by_type']['pdf']['success'] += 1
-                stats['processed'] += 1
-                
-                # NOTA: Normalização/atomização (PASSO 2) será feita por script separado
-                # que lerá outputs/csv/ e gerará outputs/norm_csv/ em 3FN
-            else:
-                stats['by_type']['pdf']['failed'] += 1
-                stats['failed'] += 1
-        
-        # 4. Processar SEPAMs
         stats['by_type']['sepam']['total'] = len(files['sepam'])
-        for sepam_file in files['sepam']:
-            result = self.process_sepam_file(sepam_file)
-            if result:
-                stats['by_type']['sepam']['success'] += 1
+        
+        # 3. Processar PDFs e SEPAMs (nesta ordem)
+        # NOTA: Normalização/atomização (PASSO 2) será feita por script separado
+        # que lerá outputs/csv/ e gerará outputs/norm_csv/ em 3FN
+        tasks = [('pdf', f) for f in files['pdf']] + [('sepam', f) for f in files['sepam']]
+        
+        cache = None
+        if incremental:
+            cache = PipelineArtifactCache(glossary_path=self.input_glossario)
+            pending_tasks = []
+            for file_type, file_path in tasks:
+                if cache.is_fresh(STAGE_EXTRACTION, file_path, self.EXTRACTOR_VERSION):
+                    # Saída anterior continua válida: conta como sucesso
+                    stats['by_type'][file_type]['success'] += 1
+                    stats['processed'] += 1
+                    stats['skipped'] += 1
+                else:
+                    pending_tasks.append((file_type, file_path))
+            logger.info(f"♻️  Incremental: {stats['skipped']} inalterado(s), "
+                        f"{len(pending_tasks)} para extrair")
+            tasks = pending_tasks
+        
+        if workers > 1:
+            results = self._run_tasks_parallel(tasks, workers, pages_per_task)
+        else:
+            results = [self.run_file_task(file_type, file_path) for file_type, file_path in tasks]
+        
+        # 4. Consolidar estatísticas
+        for result in results:
+            type_stats = stats['by_type'][result['file_type']]
+            if result['success']:
+                type_stats['success'] += 1
                 stats['processed'] += 1
-                
-                # NOTA: Normalização/atomização (PASSO 2) será feita por script separado
-                # que lerá outputs/csv/ e gerará outputs/norm_csv/ em 3FN
             else:
-                stats['by_type']['sepam']['failed'] += 1
+                type_stats['failed'] += 1
                 stats['failed'] += 1
+            stats['file_timings'].append(result)
+        
+        if cache is not None:
+            for (file_type, file_path), result in zip(tasks, results):
+                if result['success']:
+                    cache.record(STAGE_EXTRACTION, file_path, self.EXTRACTOR_VERSION,
+                                 outputs=self.raw_output_paths(file_path.stem))
+            cache.save()
         
         stats['end_time'] = datetime.now()
         
@@ -483,6 +748,8 @@ class CompletePipelineProcessor:
         
         logger.info(f"\n📝 Total de Arquivos: {stats['total_files']}")
         logger.info(f"✅ Processados com sucesso: {stats['processed']}")
+        if stats.get('skipped'):
+            logger.info(f"♻️  Inalterados (cache incremental): {stats['skipped']}")
         logger.info(f"❌ Falhas: {stats['failed']}")
         
         logger.info(f"\n📄 PDFs:")
@@ -495,6 +762,16 @@ class CompletePipelineProcessor:
         logger.info(f"   • Sucesso: {stats['by_type']['sepam']['success']}")
         logger.info(f"   • Falhas: {stats['by_type']['sepam']['failed']}")
         
+        if stats.get('file_timings'):
+            slowest = sorted(stats['file_timings'], key=lambda t: t['seconds'], reverse=True)
+            cpu_seconds = sum(t['seconds'] for t in slowest)
+            logger.info(f"\n⏱️  Tempo por arquivo (soma: {cpu_seconds:.2f}s, {stats.get('workers', 1)} processo(s)):")
+            for timing in slowest[:10]:
+                status = "✅" if timing['success'] else "❌"
+                logger.info(f"   {status} {timing['seconds']:7.2f}s  {timing['file']} ({timing['parameters']} parâmetros)")
+            if len(slowest) > 10:
+                logger.info(f"   ... e mais {len(slowest) - 10} arquivo(s)")
+        
         if stats['end_time']:
             duration = stats['end_time'] - stats['start_time']
             logger.info(f"\n⏱️  Tempo total: {duration.total_seconds():.2f}s")
@@ -506,14 +783,34 @@ class CompletePipelineProcessor:
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Extração bruta (PASSO 1) de PDFs e SEPAMs")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de processos (default: 1 = sequencial)")
+    parser.add_argument('--pages-per-task', type=int, default=0,
+                        help="Divide PDFs Easergy grandes em blocos de N páginas (somente com --workers > 1)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Reextrai apenas arquivos alterados desde a última execução")
+    parser.add_argument('--stream', action='store_true',
+                        help="Extrai PDFs página a página gravando o CSV incrementalmente "
+                             "(memória constante; linhas na ordem das páginas)")
+    parser.add_argument('--memory-limit-mb', type=float, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help=f"Teto de memória para rasters/store do MuPDF com --stream "
+                             f"(default: {DEFAULT_MEMORY_LIMIT_MB})")
+    parser.add_argument('--excel', action=argparse.BooleanOptionalAction, default=True,
+                        help="Gera também outputs/excel/*.xlsx (--no-excel: só CSV/Parquet)")
+    args = parser.parse_args()
+    
     # Obter raiz do projeto
     project_root = Path(__file__).parent.parent
     
     # Criar processador
-    processor = CompletePipelineProcessor(str(project_root))
+    processor = CompletePipelineProcessor(str(project_root),
+                                          memory_limit_mb=args.memory_limit_mb if args.stream else None,
+                                          excel=args.excel)
     
     # Processar tudo
-    stats = processor.process_all()
+    stats = processor.process_all(workers=args.workers, pages_per_task=args.pages_per_task,
+                                  incremental=args.incremental)
     
     # Mostrar estatísticas
     processor.print_statistics(stats)
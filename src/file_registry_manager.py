@@ -30,6 +30,26 @@ import logging
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+
+def calculate_file_hash(file_path: Union[str, Path]) -> str:
+    """
+    Calcula hash SHA-256 de um arquivo (leitura em chunks).
+    
+    Args:
+        file_path: Caminho para o arquivo
+        
+    Returns:
+        Hash SHA-256 em hexadecimal
+    """
+    sha256_hash = hashlib.sha256()
+    
+    with open(file_path, "rb") as f:
+        # Ler arquivo em chunks para economizar memória
+        for chunk in iter(lambda: f.read(65536), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
 class FileRegistryManager:
     """Gerenciador de registro de arquivos processados."""
     
@@ -102,14 +122,8 @@ class FileRegistryManager:
         Returns:
             Hash SHA-256 em hexadecimal
         """
-        sha256_hash = hashlib.sha256()
-        
         try:
-            with open(file_path, "rb") as f:
-                # Ler arquivo em chunks para economizar memória
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
+            return calculate_file_hash(file_path)
         except IOError as e:
             logger.error(f"Erro ao calcular hash de {file_path}: {e}")
             raise
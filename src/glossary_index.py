@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Glossary Index - Índice do glossário com snapshot binário
+=========================================================
+
+Cada execução da pipeline reabria o XLSX do glossário, reprocessava todas
+as abas (UniversalGlossaryParser) e montava à mão os dicionários by_model /
+by_code - segundos de openpyxl para um arquivo que muda raramente.
+
+GlossaryIndex guarda os parâmetros do glossário e índices por (modelo,
+código), modelo e código (consultas O(1)). O índice é persistido em um
+snapshot pickle chaveado pelo SHA-256 do workbook e pela versão do parser:
+
+- workbook inalterado → o snapshot é carregado em milissegundos, sem abrir
+  o XLSX;
+- workbook alterado (ou GLOSSARY_INDEX_VERSION incrementada) → o glossário
+  é processado uma vez e o snapshot é regravado (versões antigas removidas).
+
+Snapshot: linhas como tuplas (ordem dos campos de UniversalParameter) +
+posições por (modelo, código). Gravação atômica (arquivo temporário +
+replace); snapshot ilegível é descartado e refeito.
+
+Pickle e não Parquet: o snapshot não é só uma tabela - leva também o
+mapa (modelo, código) → posições, que voltaria a ser montado a cada carga
+a partir de um Parquet; o pickle restaura tudo de uma vez. É um cache
+local gerado pela própria pipeline (nunca trocado entre máquinas).
+
+Uso:
+    python src/glossary_index.py [--glossary inputs/glossario/Dados_Glossario_Micon_Sepam.xlsx] [--rebuild]
+
+Autor: Sistema ProtecAI
+Data: 2025-11-22
+"""
+
+from __future__ import annotations
+import os
+import sys
+import pickle
+import logging
+import tempfile
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.file_registry_manager import calculate_file_hash
+from src.universal_glossary_parser import UniversalGlossaryParser, UniversalParameter
+
+logger = logging.getLogger(__name__)
+
+# Incrementar ao mudar a lógica do UniversalGlossaryParser: invalida os snapshots
+GLOSSARY_INDEX_VERSION = "2025.11.22"
+
+SNAPSHOT_FORMAT = 1
+
+_FIELD_NAMES = tuple(f.name for f in fields(UniversalParameter))
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SNAPSHOT_DIR = PROJECT_ROOT / "outputs" / "glossary_index"
+
+
+class GlossaryIndex:
+    """
+    Parâmetros do glossário indexados por (modelo, código), modelo e código.
+
+    Examples:
+        >>> index = load_glossary_index("inputs/glossario/Dados_Glossario_Micon_Sepam.xlsx")
+        >>> index.lookup("MiCON P143", "0104")
+        [UniversalParameter(codigo='0104', ...)]
+    """
+
+    def __init__(self, parameters: List[UniversalParameter], workbook_hash: str = "",
+                 positions: Optional[Dict[Tuple[str, str], List[int]]] = None):
+        self.parameters = parameters
+        self.workbook_hash = workbook_hash
+
+        if positions is None:
+            positions = {}
+            for position, param in enumerate(parameters):
+                positions.setdefault((param.modelo, param.codigo), []).append(position)
+        self._positions = positions
+
+        self.by_model_code: Dict[Tuple[str, str], List[UniversalParameter]] = {}
+        self.by_model: Dict[str, List[UniversalParameter]] = {}
+        self.by_code: Dict[str, List[UniversalParameter]] = {}
+        for key, key_positions in positions.items():
+            params = [parameters[position] for position in key_positions]
+            model, code = key
+            self.by_model_code[key] = params
+            self.by_model.setdefault(model, []).extend(params)
+            self.by_code.setdefault(code, []).extend(params)
+
+    def __len__(self) -> int:
+        return len(self.parameters)
+
+    def lookup(self, model: str, code: str) -> List[UniversalParameter]:
+        """Parâmetros do código no modelo ([] se não existe)"""
+        return self.by_model_code.get((model, code.strip()), [])
+
+    def for_model(self, model: str) -> List[UniversalParameter]:
+        return self.by_model.get(model, [])
+
+    def for_code(self, code: str) -> List[UniversalParameter]:
+        return self.by_code.get(code.strip(), [])
+
+    @property
+    def models(self) -> List[str]:
+        return sorted(self.by_model)
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Grava o snapshot de forma atômica"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "index_version": GLOSSARY_INDEX_VERSION,
+            "workbook_hash": self.workbook_hash,
+            "fields": _FIELD_NAMES,
+            "rows": [tuple(getattr(param, name) for name in _FIELD_NAMES) for param in self.parameters],
+            "positions": self._positions,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp_", suffix=".pkl")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Union[str, Path], workbook_hash: Optional[str] = None) -> Optional["GlossaryIndex"]:
+        """
+        Carrega o snapshot (None se ausente, ilegível ou de outra versão).
+
+        Args:
+            path: Arquivo do snapshot
+            workbook_hash: Hash esperado do workbook (None = não verificar)
+        """
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️  Snapshot do glossário ilegível ({Path(path).name}): {e}. Reconstruindo.")
+            return None
+
+        if (not isinstance(payload, dict)
+                or payload.get("format") != SNAPSHOT_FORMAT
+                or payload.get("index_version") != GLOSSARY_INDEX_VERSION
+                or tuple(payload.get("fields", ())) != _FIELD_NAMES
+                or (workbook_hash is not None and payload.get("workbook_hash") != workbook_hash)):
+            return None
+
+        parameters = [UniversalParameter(*row) for row in payload["rows"]]
+        return cls(parameters, payload["workbook_hash"], payload["positions"])
+
+
+def snapshot_path(workbook_hash: str, snapshot_dir: Union[str, Path] = DEFAULT_SNAPSHOT_DIR) -> Path:
+    """Arquivo do snapshot para o hash do workbook"""
+    return Path(snapshot_dir) / f"glossary_{workbook_hash[:16]}_{GLOSSARY_INDEX_VERSION}.pkl"
+
+
+def build_glossary_index(workbook_path: Union[str, Path], workbook_hash: str = "") -> GlossaryIndex:
+    """Processa o workbook inteiro (uma abertura do XLSX) e monta o índice"""
+    parser = UniversalGlossaryParser(str(workbook_path))
+    return GlossaryIndex(parser.parse_all(), workbook_hash)
+
+
+def load_glossary_index(workbook_path: Union[str, Path],
+                        snapshot_dir: Union[str, Path] = DEFAULT_SNAPSHOT_DIR,
+                        rebuild: bool = False) -> GlossaryIndex:
+    """
+    Índice do glossário: snapshot quando o workbook não mudou, senão
+    processa o workbook e grava um novo snapshot.
+
+    Args:
+        workbook_path: XLSX do glossário
+        snapshot_dir: Diretório dos snapshots
+        rebuild: Ignorar snapshot existente
+
+    Returns:
+        GlossaryIndex
+    """
+    workbook_hash = calculate_file_hash(workbook_path)
+    path = snapshot_path(workbook_hash, snapshot_dir)
+
+    if not rebuild:
+        index = GlossaryIndex.load(path, workbook_hash)
+        if index is not None:
+            logger.info(f"⚡ Glossário carregado do snapshot: {len(index)} parâmetros ({path.name})")
+            return index
+
+    index = build_glossary_index(workbook_path, workbook_hash)
+    try:
+        index.save(path)
+        for stale in Path(snapshot_dir).glob("glossary_*.pkl"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        logger.info(f"💾 Snapshot do glossário gravado: {path}")
+    except OSError as e:
+        logger.warning(f"⚠️  Snapshot do glossário não gravado: {e}")
+    return index
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Índice do glossário com snapshot binário")
+    parser.add_argument('--glossary', default=str(PROJECT_ROOT / "inputs" / "glossario" / "Dados_Glossario_Micon_Sepam.xlsx"),
+                        help="XLSX do glossário")
+    parser.add_argument('--rebuild', action='store_true', help="Reprocessa o workbook e regrava o snapshot")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    start = time.perf_counter()
+    index = load_glossary_index(args.glossary, rebuild=args.rebuild)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"✅ {len(index)} parâmetros | {len(index.by_model)} modelos | "
+          f"{len(index.by_code)} códigos | {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,24 @@ import cv2
 import numpy as np
 import fitz  # PyMuPDF
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional, Union
 import pandas as pd
 
+try:
+    from .page_render_cache import get_page_raster_cache, checkbox_scan_region
+    from .text_line_clustering import cluster_lines, iter_page_words, YBandIndex
+    from .page_stream import DEFAULT_MEMORY_LIMIT_MB, write_rows_csv
+    from .relay_format_sniffer import get_format_sniffer
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from page_render_cache import get_page_raster_cache, checkbox_scan_region
+    from text_line_clustering import cluster_lines, iter_page_words, YBandIndex
+    from page_stream import DEFAULT_MEMORY_LIMIT_MB, write_rows_csv
+    from relay_format_sniffer import get_format_sniffer
+
+# Colunas dos CSVs brutos de PDFs (Easergy filtrado e MiCOM)
+RAW_PDF_COLUMNS = ['Code', 'Description', 'Value', 'is_active']
+
 class IntelligentRelayExtractor:
     """
     Extrator inteligente que detecta tipo de relé e aplica estratégia adequada
@@ -40,39 +55,13 @@ class IntelligentRelayExtractor:
         """
         Detecta tipo de relé baseado no arquivo
         
+        Usa o detector compartilhado (relay_format_sniffer): 1ª página lida
+        uma única vez por arquivo, resultado memorizado por hash.
+        
         Returns:
-            'easergy', 'micom', ou 'sepam'
+            'easergy', 'micom', 'sepam' ou 'unknown'
         """
-        # SEPAM: arquivos .S40 ou .txt
-
-        if file_path.suffix.lower() in ['.s40', '.txt']:
-            return 'sepam'
-        
-        # PDF: analisar primeiras linhas para identificar
-        if file_path.suffix.lower() == '.pdf':
-            doc = fitz.open(str(file_path))
-            first_page_text = doc[0].get_text()
-            doc.close()
-            
-            # Verificar assinaturas no texto
-            if 'Easergy' in first_page_text or 'Settings File Report' in first_page_text:
-                # Verificar padrão de código
-                if re.search(r'\d{4}:', first_page_text):
-                    return 'easergy'
-            
-            if 'MiCOM' in first_page_text or 'Relatório de ficheiro' in first_page_text:
-                # Verificar padrão hexadecimal
-                if re.search(r'[0-9A-F]{2}\.[0-9A-F]{2}:', first_page_text, re.IGNORECASE):
-                    return 'micom'
-        
-        # Fallback: tentar detectar por nome do arquivo
-        filename = file_path.stem.upper()
-        if 'P122' in filename or 'P220' in filename or 'P922' in filename:
-            return 'easergy'
-        elif 'P143' in filename or 'P241' in filename:
-            return 'micom'
-        
-        return 'unknown'
+        return get_format_sniffer().sniff(file_path).relay_type
     
     def extract_from_easergy(self, pdf_path: Path) -> pd.DataFrame:
         """
@@ -87,6 +76,16 @@ class IntelligentRelayExtractor:
         extractor = PreciseParameterExtractor()
         df = extractor.extract_from_pdf(pdf_path)
         
+        return self.filter_easergy_active(df)
+    
+    @staticmethod
+    def filter_easergy_active(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Mantém apenas parâmetros Easergy ativos (checkbox marcado)
+        
+        Separado de extract_from_easergy para que resultados montados a partir
+        de blocos de páginas (modo paralelo) passem pelo mesmo filtro.
+        """
         # Filtra apenas parâmetros ativos (checkbox marcado) E MANTÉM is_active
         if not df.empty and 'is_active' in df.columns:
             df_active = df[df['is_active'] == True].copy()
@@ -198,39 +197,34 @@ class IntelligentRelayExtractor:
         
         Palavras estão na mesma linha Y mas em posições X diferentes.
         """
-        doc = fitz.open(str(pdf_path))
-        params = []
+        params = [row for page_rows in self.iter_micom_rows(pdf_path) for row in page_rows]
+        
+        df = pd.DataFrame(params)
+        
+        if not df.empty:
+            df = df.drop_duplicates(subset=['Code', 'Description'], keep='first')
+        
+        return df
+    
+    def iter_micom_rows(self, pdf_path: Path,
+                        memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> Iterator[List[Dict]]:
+        """
+        Parâmetros MiCOM página a página (gerador, sem deduplicação)
+        
+        Yields:
+            Linhas da página: Code, Description, Value, is_active (sempre True -
+            MiCOM não usa checkboxes)
+        """
         pattern = re.compile(r'^\d{2}\.\d{2}[A-Z]?:')
         
-        # Processar todas as páginas
-        for page_num in range(len(doc)):
-            page = doc[page_num]
+        # Processar página a página (palavras: x0, y0, x1, y1, text, block, line, word_num)
+        for page_num, words in iter_page_words(pdf_path, memory_limit_mb):
+            page_rows = []
             
-            # Extrair palavras com coordenadas
-            words = page.get_text('words')  # (x0, y0, x1, y1, text, block, line, word_num)
-            
-            # Agrupar palavras por linha Y (±3px de tolerância)
-            lines_dict = {}
-            for word in words:
-                x0, y0, x1, y1, text, block_num, line_num, word_num = word
-                
-                # Encontrar linha existente ou criar nova
-                found_line = None
-                for y_key in lines_dict:
-                    if abs(y_key - y0) < 3:  # Mesma linha
-                        found_line = y_key
-                        break
-                
-                if found_line is None:
-                    found_line = y0
-                    lines_dict[found_line] = []
-                
-                lines_dict[found_line].append((x0, text))
-            
-            # Processar cada linha
-            for y_coord in sorted(lines_dict.keys()):
-                line_words = sorted(lines_dict[y_coord], key=lambda w: w[0])  # Ordenar por X
-                line_text = ' '.join([w[1] for w in line_words])
+            # Agrupar palavras por linha Y (±3px de tolerância) e processar cada linha
+            for y_coord, line_words in cluster_lines(words, tolerance=3):
+                line_words = sorted(line_words, key=lambda w: w[0])  # Ordenar por X
+                line_text = ' '.join([w[4] for w in line_words])
                 
                 # Verificar se linha tem código MiCOM
                 if pattern.match(line_text):
@@ -241,24 +235,69 @@ class IntelligentRelayExtractor:
                         description = parts[1].strip() if len(parts) > 1 else ""
                         value = parts[2].strip() if len(parts) > 2 else ""
                         
-                        params.append({
-                            'Code': code,
-                            'Description': description,
-                            'Value': value
+                        page_rows.append({
+                            'Code': self._clean_value(code),
+                            'Description': self._clean_value(description),
+                            'Value': self._clean_value(value),
+                            'is_active': True
                         })
+            
+            yield page_rows
+    
+    def iter_easergy_rows(self, pdf_path: Path,
+                          memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> Iterator[List[Dict]]:
+        """
+        Parâmetros Easergy ativos página a página (gerador)
         
-        doc.close()
+        Mesmo conteúdo de extract_from_easergy (primeira ocorrência de cada
+        código, apenas checkbox marcado), na ordem das páginas em vez de
+        ordenado por código.
+        """
+        from src.precise_parameter_extractor import PreciseParameterExtractor
         
-        df = pd.DataFrame(params)
+        seen_codes = set()
+        for page_results in PreciseParameterExtractor().iter_page_results(
+                pdf_path, memory_limit_mb=memory_limit_mb):
+            page_rows = []
+            for row in page_results:
+                if row['Code'] in seen_codes:
+                    continue
+                seen_codes.add(row['Code'])
+                if row['is_active'] == True:
+                    page_rows.append({column: row[column] for column in RAW_PDF_COLUMNS})
+            yield page_rows
+    
+    def stream_to_csv(self, pdf_path: Path, csv_path: Union[str, Path], relay_type: Optional[str] = None,
+                      memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> int:
+        """
+        Extrai um PDF Easergy/MiCOM gravando o CSV bruto página a página
         
-        if not df.empty:
-            df = df.replace(['None', 'nan', 'NaN', 'NAN'], '')
-            df = df.fillna('')
-            df = df.drop_duplicates(subset=['Code', 'Description'], keep='first')
-            # MiCOM não usa checkboxes - TODOS são considerados ativos
-            df['is_active'] = True
+        Memória constante no número de páginas: cada página é processada e
+        liberada, e suas linhas vão para o arquivo antes da próxima ser lida.
         
-        return df
+        Args:
+            pdf_path: Caminho do PDF
+            csv_path: CSV de saída (colunas RAW_PDF_COLUMNS)
+            relay_type: 'easergy' ou 'micom' (None = detect_relay_type)
+            memory_limit_mb: Teto de memória entre páginas
+            
+        Returns:
+            Número de parâmetros gravados
+        """
+        relay_type = relay_type or self.detect_relay_type(pdf_path)
+        if relay_type == 'easergy':
+            return write_rows_csv(self.iter_easergy_rows(pdf_path, memory_limit_mb), csv_path, RAW_PDF_COLUMNS)
+        if relay_type == 'micom':
+            return write_rows_csv(self.iter_micom_rows(pdf_path, memory_limit_mb), csv_path, RAW_PDF_COLUMNS,
+                                  dedupe_on=['Code', 'Description'])
+        raise ValueError(f"Extração em fluxo não suportada para o tipo: {relay_type}")
+    
+    @staticmethod
+    def _clean_value(value) -> str:
+        """Mesma limpeza dos DataFrames ('None'/'nan' → '')"""
+        if value is None or value in ('None', 'nan', 'NaN', 'NAN'):
+            return ''
+        return value
     
     def _extract_all_text_parameters(self, pdf_path: Path, relay_type: str) -> pd.DataFrame:
         """
@@ -429,13 +468,12 @@ class IntelligentRelayExtractor:
         for page_num in range(len(doc)):
             page = doc[page_num]
             
-            # Converter página para imagem (para detectar checkboxes)
-            mat = fitz.Matrix(300/72, 300/72)  # 300 DPI
-            pix = page.get_pixmap(matrix=mat)
+            # Pré-filtro vetorial: páginas sem quadrados/imagens não têm checkboxes
+            if checkbox_scan_region(page, 300) is None:
+                continue
             
-            img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
-            if pix.n == 4:
-                img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
+            # Converter página para imagem (300 DPI, cache de rasters compartilhado)
+            img, _ = get_page_raster_cache().render(page, 300)
             
             # Detectar checkboxes marcados
             marked_positions = self._detect_checkboxes(img)
@@ -444,7 +482,8 @@ class IntelligentRelayExtractor:
                 continue
             
             # Extrair palavras com posição (x0, y0, x1, y1, "word", block_no, line_no, word_no)
-            words = page.get_text("words")
+            # Índice por Y: cada checkbox consulta só a sua faixa, não a página inteira
+            words = YBandIndex(page.get_text("words"))
             
             # Para cada checkbox marcado
             for checkbox in marked_positions:
@@ -455,10 +494,7 @@ class IntelligentRelayExtractor:
                 # Converter: checkbox_y * 72/300 = checkbox_y * 0.24
                 checkbox_y_72dpi = checkbox_y * 72 / 300
                 
-                line_words = [
-                    word for word in words 
-                    if abs(word[1] - checkbox_y_72dpi) < 10  # word[1] = y0
-                ]
+                line_words = words.within(checkbox_y_72dpi, 10)  # word[1] = y0
                 
                 if not line_words:
                     continue
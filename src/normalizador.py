@@ -59,14 +59,14 @@ try:
     from .utils.generate_normalized_excel import NormalizedExcelGenerator
     from .utils.generate_docx_documentation import DocxDocumentationGenerator
     from .utils.generate_separated_outputs import SeparatedOutputsGenerator
-    from .utils.code_parser import CodeParser
+    from .utils.code_parser import CodeParser, get_code_parser
 except ImportError:
     # Para execução direta
     sys.path.append(str(Path(__file__).parent))
     from utils.generate_normalized_excel import NormalizedExcelGenerator
     from utils.generate_docx_documentation import DocxDocumentationGenerator
     from utils.generate_separated_outputs import SeparatedOutputsGenerator
-    from utils.code_parser import CodeParser
+    from utils.code_parser import CodeParser, get_code_parser
 
 
 # Configurações padrão
@@ -98,7 +98,7 @@ class ProtecaiNormalizer:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Componentes
-        self.parser = CodeParser()
+        self.parser = get_code_parser()
         self.excel_generator = NormalizedExcelGenerator()
         self.docx_generator = DocxDocumentationGenerator()
         self.separated_generator = SeparatedOutputsGenerator()
@@ -296,7 +296,7 @@ class ProtecaiNormalizer:
         """
         print("[INFO] Testando parser com valores fornecidos...")
         
-        parser = CodeParser()
+        parser = get_code_parser()
         
         for value in test_values:
             print(f"\n--- Testando: '{value}' ---")
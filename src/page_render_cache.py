@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Page Render Cache - Cache de rasterização de páginas + pré-filtro vetorial
+=========================================================================
+
+Rasterizar páginas a 300 DPI é a etapa mais cara da detecção de checkboxes
+(PreciseParameterExtractor, IntelligentRelayExtractor e
+UniversalCheckboxDetector renderizam as mesmas páginas várias vezes).
+
+Este módulo oferece:
+
+1. PageRasterCache: cache LRU limitado por memória, chaveado por
+   (hash do PDF, página, DPI, recorte). Compartilhado no processo via
+   get_page_raster_cache().
+
+2. Pré-filtro vetorial: antes de renderizar, inspeciona desenhos vetoriais
+   (page.get_drawings) e imagens (page.get_image_info) da página. Checkboxes
+   dos PDFs de relés são quadrados vetoriais pequenos ou imagens pequenas;
+   páginas sem nenhum candidato não são renderizadas, e as demais são
+   renderizadas apenas na faixa que contém os candidatos.
+
+As coordenadas de recorte são alinhadas à grade de pixels do DPI usado, de
+modo que os pixels da faixa coincidem com os da página inteira e as
+coordenadas dos checkboxes continuam no referencial da página completa.
+
+Autor: Sistema ProtecAI
+Data: 2025-11-18
+"""
+
+from __future__ import annotations
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+try:
+    from .file_registry_manager import calculate_file_hash
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from file_registry_manager import calculate_file_hash
+
+logger = logging.getLogger(__name__)
+
+# Orçamento padrão de memória do cache (bytes) - ~5 páginas A4 a 300 DPI
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Limites (em pontos PDF, 72 DPI) para um elemento vetorial ser candidato a
+# checkbox. O detector raster aceita 10-40px a 300 DPI (2.4-9.6pt); a folga
+# cobre espessura de traço e variações de DPI.
+CANDIDATE_MIN_SIZE_PT = 2.0
+CANDIDATE_MAX_SIZE_PT = 15.0
+
+# Margem em torno dos candidatos (pt). Maior que o maior checkbox aceito
+# (40px = 9.6pt) + vizinhança do threshold adaptativo (bloco 11px).
+SCAN_MARGIN_PT = 12.0
+
+
+class PageRasterCache:
+    """Cache LRU de páginas rasterizadas, limitado por bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes: Memória máxima ocupada pelos rasters armazenados
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[np.ndarray, Tuple[int, int]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Hash de documentos: {caminho: (size, mtime_ns, hash)}
+        self._doc_keys: Dict[str, Tuple[int, int, str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def current_bytes(self) -> int:
+        """Memória ocupada atualmente pelos rasters."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def document_key(self, doc: fitz.Document) -> Optional[str]:
+        """
+        Identificador de conteúdo do documento (SHA-256 do arquivo).
+
+        O hash é memorizado por (tamanho, mtime), então cada PDF é lido
+        uma única vez por processo.
+
+        Returns:
+            Hash do arquivo, ou None para documentos sem arquivo em disco
+        """
+        name = doc.name
+        if not name or not os.path.isfile(name):
+            return None
+
+        stat = os.stat(name)
+        memo = self._doc_keys.get(name)
+        if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+
+        file_hash = calculate_file_hash(Path(name))
+        self._doc_keys[name] = (stat.st_size, stat.st_mtime_ns, file_hash)
+        return file_hash
+
+    def render(self, page: fitz.Page, dpi: int = 300,
+               clip: Optional[fitz.Rect] = None) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Renderiza a página (ou o recorte) reutilizando o raster em cache.
+
+        Args:
+            page: Página PyMuPDF
+            dpi: Resolução de renderização
+            clip: Recorte em pontos PDF (None = página inteira)
+
+        Returns:
+            (imagem RGB somente leitura HxWx3, (x, y) da origem do recorte
+            em pixels no referencial da página inteira)
+        """
+        doc_key = self.document_key(page.parent)
+        clip_key = tuple(round(v, 3) for v in clip) if clip is not None else None
+        key = (doc_key, page.number, dpi, clip_key)
+
+        if doc_key is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+
+        mat = fitz.Matrix(dpi / 72, dpi / 72)
+        pixmap = page.get_pixmap(matrix=mat, clip=clip, alpha=False)
+        image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(
+            pixmap.height, pixmap.width, pixmap.n
+        )
+        image.flags.writeable = False
+        entry = (image, (pixmap.x, pixmap.y))
+
+        if doc_key is None:
+            return entry
+
+        with self._lock:
+            self.misses += 1
+            if image.nbytes <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += image.nbytes
+                while self._bytes > self.max_bytes:
+                    _, (evicted, _) = self._entries.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+
+        return entry
+
+    def trim(self, max_bytes: int) -> None:
+        """Remove os rasters menos usados até ocupar no máximo max_bytes."""
+        with self._lock:
+            while self._entries and self._bytes > max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Esvazia o cache."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_shared_cache: Optional[PageRasterCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_page_raster_cache() -> PageRasterCache:
+    """Retorna o cache de rasters compartilhado pelo processo."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = PageRasterCache()
+        return _shared_cache
+
+
+def checkbox_candidate_rects(page: fitz.Page) -> List[fitz.Rect]:
+    """
+    Localiza elementos que podem ser checkboxes usando apenas a camada
+    vetorial da página (sem rasterizar).
+
+    Candidatos:
+    - Quadrados/retângulos vetoriais pequenos (caminhos inteiros ou itens
+      're'/'qu' de caminhos maiores)
+    - Imagens embutidas de qualquer tamanho acima do mínimo (ícones de
+      checkbox, capturas de tela, páginas escaneadas)
+
+    Args:
+        page: Página PyMuPDF
+
+    Returns:
+        Lista de retângulos candidatos (pontos PDF)
+    """
+    def is_small(rect: fitz.Rect) -> bool:
+        return (CANDIDATE_MIN_SIZE_PT <= rect.width <= CANDIDATE_MAX_SIZE_PT and
+                CANDIDATE_MIN_SIZE_PT <= rect.height <= CANDIDATE_MAX_SIZE_PT)
+
+    candidates = []
+
+    for drawing in page.get_drawings():
+        rect = fitz.Rect(drawing["rect"])
+        if is_small(rect):
+            candidates.append(rect)
+            continue
+
+        # Caminhos grandes podem agrupar vários quadrados pequenos
+        for item in drawing["items"]:
+            if item[0] == "re":
+                item_rect = fitz.Rect(item[1])
+            elif item[0] == "qu":
+                item_rect = item[1].rect
+            else:
+                continue
+            if is_small(item_rect):
+                candidates.append(item_rect)
+
+    candidates.extend(embedded_image_rects(page))
+
+    return candidates
+
+
+def embedded_image_rects(page: fitz.Page) -> List[fitz.Rect]:
+    """
+    Retângulos das imagens embutidas na página (acima do tamanho mínimo).
+
+    Única parte da página que exige rasterização quando os checkboxes são
+    lidos diretamente da camada vetorial.
+    """
+    rects = []
+    for info in page.get_image_info():
+        rect = fitz.Rect(info["bbox"])
+        if rect.width >= CANDIDATE_MIN_SIZE_PT and rect.height >= CANDIDATE_MIN_SIZE_PT:
+            rects.append(rect)
+    return rects
+
+
+def snap_rect_to_pixels(rect: fitz.Rect, dpi: int) -> fitz.Rect:
+    """
+    Expande o retângulo para bordas inteiras na grade de pixels do DPI.
+
+    Garante que o recorte renderizado tenha os mesmos pixels da página
+    inteira (sem deslocamento de sub-pixel).
+    """
+    scale = dpi / 72
+    return fitz.Rect(
+        math.floor(rect.x0 * scale) / scale,
+        math.floor(rect.y0 * scale) / scale,
+        math.ceil(rect.x1 * scale) / scale,
+        math.ceil(rect.y1 * scale) / scale,
+    )
+
+
+def checkbox_scan_region(page: fitz.Page, dpi: int = 300,
+                         candidates: Optional[List[fitz.Rect]] = None) -> Optional[fitz.Rect]:
+    """
+    Define a faixa da página que precisa ser rasterizada para achar checkboxes.
+
+    Args:
+        page: Página PyMuPDF
+        dpi: Resolução de renderização (para alinhar à grade de pixels)
+        candidates: Resultado de checkbox_candidate_rects (recalcula se None)
+
+    Returns:
+        Retângulo (pontos PDF) a renderizar, ou None se a página não tem
+        nenhum candidato a checkbox
+    """
+    # Páginas rotacionadas: recorte e coordenadas de texto usam referenciais
+    # diferentes, então renderiza a página inteira
+    if page.rotation:
+        return snap_rect_to_pixels(page.rect, dpi)
+
+    if candidates is None:
+        candidates = checkbox_candidate_rects(page)
+
+    if not candidates:
+        return None
+
+    region = fitz.Rect(candidates[0])
+    for rect in candidates[1:]:
+        region |= rect
+
+    region = fitz.Rect(region.x0 - SCAN_MARGIN_PT, region.y0 - SCAN_MARGIN_PT,
+                       region.x1 + SCAN_MARGIN_PT, region.y1 + SCAN_MARGIN_PT)
+    region &= page.rect
+
+    if region.is_empty:
+        return None
+
+    return snap_rect_to_pixels(region, dpi)
+
+
+def touches_candidate(x: int, y: int, w: int, h: int, scale: float,
+                      candidates: List[fitz.Rect], tolerance_pt: float = 1.0) -> bool:
+    """
+    Verifica se um contorno (pixels, referencial da página inteira) toca
+    algum candidato vetorial. Descarta artefatos nas bordas da faixa.
+    """
+    box = fitz.Rect(x / scale - tolerance_pt, y / scale - tolerance_pt,
+                    (x + w) / scale + tolerance_pt, (y + h) / scale + tolerance_pt)
+    return any(box.intersects(rect) for rect in candidates)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Page Stream - Processamento de PDFs página a página com memória limitada
+========================================================================
+
+Os extratores abriam o documento, percorriam todas as páginas acumulando
+listas de parâmetros e só no fim montavam o DataFrame / gravavam o CSV.
+Em relatórios MiCOM de centenas de páginas a memória crescia com o número
+de páginas: rasters no cache compartilhado, store interno do MuPDF (fontes,
+imagens decodificadas) e as próprias listas de linhas.
+
+Este módulo oferece as peças de um pipeline por gerador
+(renderizar → detectar → correlacionar → emitir linhas):
+
+- iter_pdf_pages: gera uma página por vez e, entre páginas, aplica o teto
+  de memória (memory_limit_mb) ao cache de rasters compartilhado e ao store
+  do MuPDF. O documento é fechado ao fim da iteração, mesmo se o consumidor
+  parar antes.
+- IncrementalCSVWriter: grava as linhas no CSV à medida que chegam
+  (cabeçalho uma vez, flush por lote, duplicatas descartadas guardando só
+  as chaves). Os primeiros resultados aparecem no arquivo antes da última
+  página ser lida; em caso de erro o arquivo parcial é removido.
+
+Autor: Sistema ProtecAI
+Data: 2025-11-22
+"""
+
+from __future__ import annotations
+import csv
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import fitz  # PyMuPDF
+
+try:
+    from .page_render_cache import get_page_raster_cache
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from page_render_cache import get_page_raster_cache
+
+logger = logging.getLogger(__name__)
+
+# Teto padrão para caches que crescem com as páginas lidas (MB)
+DEFAULT_MEMORY_LIMIT_MB = 256
+
+
+def mupdf_store_size() -> int:
+    """Bytes no store do MuPDF (atributo até o PyMuPDF 1.23, método nas versões novas)"""
+    size = fitz.TOOLS.store_size
+    return size() if callable(size) else size
+
+
+def apply_memory_limit(memory_limit_mb: float) -> None:
+    """
+    Reduz os caches de página ao teto: rasters compartilhados (LRU) e store
+    do MuPDF (esvaziado quando passa do teto).
+    """
+    limit = int(memory_limit_mb * 1024 * 1024)
+    get_page_raster_cache().trim(limit)
+    if mupdf_store_size() > limit:
+        fitz.TOOLS.store_shrink(100)
+
+
+def iter_pdf_pages(pdf_path: Union[str, Path],
+                   page_numbers: Optional[Iterable[int]] = None,
+                   memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> Iterator[fitz.Page]:
+    """
+    Páginas do PDF, uma por vez, com teto de memória entre páginas.
+
+    Args:
+        pdf_path: Caminho do PDF
+        page_numbers: Índices (0-based) das páginas. None = todas
+        memory_limit_mb: Teto para rasters em cache + store do MuPDF
+
+    Yields:
+        fitz.Page (válida até a próxima iteração)
+    """
+    doc = fitz.open(str(pdf_path))
+    try:
+        if page_numbers is None:
+            page_numbers = range(len(doc))
+        for page_num in page_numbers:
+            page = doc[page_num]
+            yield page
+            del page
+            apply_memory_limit(memory_limit_mb)
+    finally:
+        doc.close()
+
+
+class IncrementalCSVWriter:
+    """
+    CSV gravado linha a linha, com deduplicação por chave.
+
+    Examples:
+        >>> with IncrementalCSVWriter(csv_path, ['Code', 'Description', 'Value'],
+        ...                           dedupe_on=['Code']) as writer:
+        ...     for rows in page_rows:
+        ...         writer.write_rows(rows)
+    """
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str],
+                 dedupe_on: Optional[Sequence[str]] = None, encoding: str = 'utf-8-sig'):
+        """
+        Args:
+            path: Arquivo CSV de saída (sobrescrito)
+            columns: Colunas, na ordem do arquivo (chaves extras são ignoradas)
+            dedupe_on: Colunas da chave de duplicata (mantém a primeira). None = sem deduplicação
+            encoding: Codificação (utf-8-sig, como os CSVs brutos da pipeline)
+        """
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.dedupe_on = list(dedupe_on) if dedupe_on else None
+        self.encoding = encoding
+        self.rows_written = 0
+        self._seen = set()
+        self._file = None
+        self._writer = None
+
+    def __enter__(self) -> "IncrementalCSVWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', newline='', encoding=self.encoding)
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+        self._writer.writeheader()
+        self._file.flush()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._file.close()
+        if exc_type is not None:
+            # Arquivo parcial não pode ser confundido com uma extração completa
+            self.path.unlink(missing_ok=True)
+
+    def is_duplicate(self, row: Dict[str, Any]) -> bool:
+        """Registra a chave da linha; True se já foi vista"""
+        if self.dedupe_on is None:
+            return False
+        key = tuple(row.get(column) for column in self.dedupe_on)
+        if key in self._seen:
+            return True
+        self._seen.add(key)
+        return False
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Grava um lote (tipicamente uma página) e faz flush; devolve linhas gravadas"""
+        written = 0
+        for row in rows:
+            if self.is_duplicate(row):
+                continue
+            self._writer.writerow(row)
+            written += 1
+        self._file.flush()
+        self.rows_written += written
+        return written
+
+
+def write_rows_csv(batches: Iterable[List[Dict[str, Any]]], path: Union[str, Path],
+                   columns: Sequence[str], dedupe_on: Optional[Sequence[str]] = None) -> int:
+    """
+    Consome um gerador de lotes de linhas gravando o CSV incrementalmente.
+
+    Returns:
+        Total de linhas gravadas
+    """
+    with IncrementalCSVWriter(path, columns, dedupe_on) as writer:
+        for rows in batches:
+            writer.write_rows(rows)
+    return writer.rows_written
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Page Text Index - Consultas de texto por região sem reinterpretar a página
+=========================================================================
+
+page.get_text("words", clip=rect) reinterpreta todo o conteúdo da página
+(content stream, fontes) a cada chamada. Na correlação checkbox ↔ texto
+isso acontece para cada checkbox marcado, e páginas densas (matriz de LEDs)
+têm centenas deles.
+
+PageWordIndex grava a página UMA vez em uma display list do MuPDF e, para
+cada retângulo, reexecuta apenas os nós que cruzam o retângulo (a display
+list descarta os demais pela caixa de cada nó) em um TextPage com o mesmo
+mediabox e as mesmas flags de get_text("words", clip=rect). Como o
+dispositivo de texto é o mesmo, o resultado é idêntico - inclusive o
+truncamento de palavras que cruzam a borda ("PROTECTION" → "ROTECTION").
+
+Autor: Sistema ProtecAI
+Data: 2025-11-18
+"""
+
+from __future__ import annotations
+import logging
+from typing import List, Tuple
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+# (x0, y0, x1, y1, "word", block_no, line_no, word_no)
+WordTuple = Tuple[float, float, float, float, str, int, int, int]
+
+# Flags padrão de page.get_text("words")
+WORDS_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+
+
+class PageWordIndex:
+    """Texto de uma página gravado uma vez para consultas por retângulo."""
+
+    def __init__(self, page: fitz.Page):
+        """
+        Grava a página em uma display list.
+
+        Args:
+            page: Página PyMuPDF
+        """
+        self.page = page
+        self.queries = 0
+
+        # get_textpage zera a rotação antes de extrair; a display list não,
+        # então páginas rotacionadas usam a extração original
+        self._display_list = page.get_displaylist() if not page.rotation else None
+
+    def words_in(self, rect: fitz.Rect) -> List[WordTuple]:
+        """
+        Equivalente a page.get_text("words", clip=rect).
+
+        Args:
+            rect: Retângulo de busca (pontos PDF)
+
+        Returns:
+            Palavras (ou trechos de palavras) que tocam o retângulo
+        """
+        self.queries += 1
+
+        if self._display_list is None:
+            return self.page.get_text("words", clip=rect)
+
+        textpage = fitz.TextPage(rect)
+        device = fitz.Device(textpage, WORDS_FLAGS)
+        self._display_list.run(device, fitz.Identity, rect)
+        del device  # Fecha o dispositivo antes de ler o TextPage
+
+        return textpage.extractWORDS()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline Artifact Cache - Cache incremental por estágio da pipeline
+===================================================================
+
+Permite que cada estágio da pipeline (extração, normalização, importação)
+pule entradas que não mudaram desde a última execução.
+
+Chave de cada entrada: (hash do arquivo de entrada, versão do estágio,
+hash do glossário). Como a saída de um estágio é a entrada do próximo,
+uma mudança em um PDF propaga naturalmente: a extração regrava o CSV,
+o hash do CSV muda e a normalização/importação daquele arquivo é refeita.
+Arquivos cuja saída ficou byte a byte igual não disparam os estágios
+seguintes.
+
+Para não recalcular SHA-256 de centenas de arquivos a cada noite, o hash
+armazenado é reutilizado quando tamanho e mtime do arquivo não mudaram
+(mesma heurística de ferramentas de build); qualquer divergência força o
+recálculo do hash.
+
+Registro persistido em JSON: inputs/registry/pipeline_cache.json
+
+Autor: Sistema ProtecAI
+Data: 2025-11-18
+"""
+
+from __future__ import annotations
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.file_registry_manager import calculate_file_hash
+
+logger = logging.getLogger(__name__)
+
+# Estágios conhecidos da pipeline
+STAGE_EXTRACTION = "extraction"
+STAGE_NORMALIZATION = "normalization"
+STAGE_IMPORT = "import"
+
+CACHE_FORMAT_VERSION = "1.0"
+
+
+class PipelineArtifactCache:
+    """Cache de artefatos por estágio, chaveado por hash de conteúdo."""
+
+    def __init__(self, registry_path: Optional[Path] = None,
+                 glossary_path: Optional[Path] = None):
+        """
+        Inicializa o cache.
+
+        Args:
+            registry_path: Caminho do JSON de registro.
+                          Se None, usa inputs/registry/pipeline_cache.json
+            glossary_path: Glossário de referência. Se None, usa
+                          inputs/glossario/Dados_Glossario_Micon_Sepam.xlsx
+        """
+        project_root = Path(__file__).resolve().parents[1]  # src/ -> project_root/
+
+        if registry_path is None:
+            registry_path = project_root / "inputs" / "registry" / "pipeline_cache.json"
+        if glossary_path is None:
+            glossary_path = project_root / "inputs" / "glossario" / "Dados_Glossario_Micon_Sepam.xlsx"
+
+        self.registry_path = Path(registry_path)
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        self.glossary_path = Path(glossary_path)
+
+        self.registry: Dict[str, Dict[str, Dict[str, Any]]] = self._load_registry()
+        self._dirty = False
+        self._glossary_hash: Optional[str] = None
+
+        # Hashes calculados nesta execução: {caminho_absoluto: (size, mtime_ns, hash)}
+        self._hash_memo: Dict[str, tuple] = {}
+
+    def _load_registry(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Carrega registro existente do arquivo JSON."""
+        if not self.registry_path.exists():
+            return {}
+
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Erro ao carregar cache da pipeline: {e}. Criando novo cache.")
+            return {}
+
+        if data.get("cache_version") != CACHE_FORMAT_VERSION:
+            logger.info("Formato do cache da pipeline mudou. Reconstruindo.")
+            return {}
+
+        return data.get("stages", {})
+
+    def save(self) -> None:
+        """Salva registro no arquivo JSON (somente se houve mudanças)."""
+        if not self._dirty:
+            return
+
+        tmp_path = self.registry_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"cache_version": CACHE_FORMAT_VERSION, "stages": self.registry},
+                      f, indent=2, ensure_ascii=False, default=str)
+        tmp_path.replace(self.registry_path)
+        self._dirty = False
+
+        logger.debug(f"Cache da pipeline salvo: {self.registry_path}")
+
+    @property
+    def glossary_hash(self) -> str:
+        """Hash do glossário de referência ('' se ausente)."""
+        if self._glossary_hash is None:
+            self._glossary_hash = (self.file_hash(self.glossary_path)
+                                   if self.glossary_path.exists() else "")
+        return self._glossary_hash
+
+    def file_hash(self, file_path: Union[str, Path]) -> str:
+        """
+        Retorna SHA-256 do arquivo, reaproveitando o valor armazenado quando
+        tamanho e mtime não mudaram.
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        file_path = Path(file_path)
+        key = str(file_path.resolve())
+        stat = file_path.stat()
+
+        memo = self._hash_memo.get(key)
+        if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+
+        # Reaproveitar hash de qualquer estágio que registrou este arquivo
+        file_hash = None
+        for entries in self.registry.values():
+            entry = entries.get(key)
+            if (entry and entry.get("input_size") == stat.st_size
+                    and entry.get("input_mtime_ns") == stat.st_mtime_ns):
+                file_hash = entry["input_hash"]
+                break
+
+        if file_hash is None:
+            file_hash = calculate_file_hash(file_path)
+
+        self._hash_memo[key] = (stat.st_size, stat.st_mtime_ns, file_hash)
+        return file_hash
+
+    def is_fresh(self, stage: str, input_path: Union[str, Path], stage_version: str) -> bool:
+        """
+        Verifica se a entrada pode ser pulada no estágio.
+
+        Fresca quando: mesmo hash de entrada, mesma versão do estágio, mesmo
+        glossário e todos os arquivos de saída registrados ainda existem.
+
+        Args:
+            stage: Nome do estágio (STAGE_*)
+            input_path: Arquivo de entrada do estágio
+            stage_version: Versão do código do estágio
+
+        Returns:
+            True se não é necessário reprocessar
+        """
+        input_path = Path(input_path)
+        entry = self.registry.get(stage, {}).get(str(input_path.resolve()))
+
+        if not entry or not input_path.exists():
+            return False
+
+        if entry.get("stage_version") != stage_version:
+            return False
+
+        if entry.get("glossary_hash") != self.glossary_hash:
+            return False
+
+        if entry.get("input_hash") != self.file_hash(input_path):
+            return False
+
+        return all(Path(output).exists() for output in entry.get("outputs", []))
+
+    def record(self, stage: str, input_path: Union[str, Path], stage_version: str,
+               outputs: Optional[List[Union[str, Path]]] = None) -> None:
+        """
+        Registra que a entrada foi processada com sucesso no estágio.
+
+        Args:
+            stage: Nome do estágio (STAGE_*)
+            input_path: Arquivo de entrada do estágio
+            stage_version: Versão do código do estágio
+            outputs: Arquivos gerados (devem existir para a entrada ser fresca)
+        """
+        input_path = Path(input_path)
+        stat = input_path.stat()
+
+        self.registry.setdefault(stage, {})[str(input_path.resolve())] = {
+            "file_name": input_path.name,
+            "input_hash": self.file_hash(input_path),
+            "input_size": stat.st_size,
+            "input_mtime_ns": stat.st_mtime_ns,
+            "stage_version": stage_version,
+            "glossary_hash": self.glossary_hash,
+            "outputs": [str(Path(output).resolve()) for output in (outputs or [])],
+            "built_at": datetime.now().isoformat()
+        }
+        self._dirty = True
+
+    def invalidate(self, stage: Optional[str] = None) -> None:
+        """
+        Remove entradas do cache.
+
+        Args:
+            stage: Estágio a invalidar. Se None, invalida todos.
+        """
+        if stage is None:
+            self.registry = {}
+        else:
+            self.registry.pop(stage, None)
+        self._dirty = True
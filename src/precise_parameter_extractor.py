@@ -19,14 +19,32 @@ RESULTADO ESPERADO:
 """
 
 import re
+import math
+from bisect import bisect_left, bisect_right
 import cv2
 import numpy as np
 import fitz  # PyMuPDF
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 import pandas as pd
 from dataclasses import dataclass
 
+try:
+    from .page_render_cache import (
+        get_page_raster_cache, checkbox_candidate_rects, checkbox_scan_region, touches_candidate,
+        embedded_image_rects
+    )
+    from .page_text_index import PageWordIndex
+    from .page_stream import DEFAULT_MEMORY_LIMIT_MB, iter_pdf_pages
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from page_render_cache import (
+        get_page_raster_cache, checkbox_candidate_rects, checkbox_scan_region, touches_candidate,
+        embedded_image_rects
+    )
+    from page_text_index import PageWordIndex
+    from page_stream import DEFAULT_MEMORY_LIMIT_MB, iter_pdf_pages
+
 @dataclass
 class ParameterLine:
     """Representa uma linha de parâmetro extraída"""
@@ -71,9 +89,25 @@ class PreciseParameterExtractor:
     # Tolerância para correlação Y (pixels)
     Y_TOLERANCE = 25  # ±25 pixels de tolerância (ajustado após debug: menor distância real = 19.7px)
     
-    def __init__(self):
-        """Inicializa extrator"""
-        pass
+    # Detecção vetorial: quadrados desenhados como caminhos (Easergy Studio)
+    # Tamanho em pontos PDF (72 DPI); filtros finais em pixels são os mesmos do raster
+    VECTOR_SQUARE_MAX_PT = 12.0
+    VECTOR_MAX_STROKE_CHROMA = 0.16  # ~saturação 40/255 (checkbox P&B)
+    
+    CHECKBOX_DETECTORS = ("raster", "vector")
+    
+    def __init__(self, checkbox_detector: str = "raster"):
+        """
+        Inicializa extrator
+        
+        Args:
+            checkbox_detector: "raster" (renderização + contornos, padrão) ou
+                              "vector" (quadrados lidos de page.get_drawings(),
+                              raster apenas para imagens/páginas escaneadas)
+        """
+        if checkbox_detector not in self.CHECKBOX_DETECTORS:
+            raise ValueError(f"Detector de checkbox inválido: {checkbox_detector}")
+        self.checkbox_detector = checkbox_detector
     
     def enhance_pdf_quality(self, image: np.ndarray) -> np.ndarray:
         """
@@ -107,7 +141,13 @@ class PreciseParameterExtractor:
         
         return enhanced
     
-    def detect_checkboxes(self, page: fitz.Page, dpi: int = 300) -> List[Checkbox]:
+    def detect_checkboxes(
+        self,
+        page: fitz.Page,
+        dpi: int = 300,
+        prefilter: bool = True,
+        candidates: Optional[List[fitz.Rect]] = None
+    ) -> List[Checkbox]:
         """
         ETAPA 2: Detecta checkboxes usando método VALIDADO (universal_checkbox_detector.py)
         
@@ -119,29 +159,42 @@ class PreciseParameterExtractor:
         5. Calcular densidade do interior (shrink)
         6. Filtrar por geometria e densidade mínima
         
+        PRÉ-FILTRO VETORIAL (prefilter=True):
+        Checkboxes são quadrados vetoriais ou imagens pequenas. Páginas sem
+        nenhum candidato não são renderizadas; as demais são renderizadas
+        apenas na faixa que contém os candidatos (via cache compartilhado).
+        Coordenadas retornadas continuam no referencial da página inteira.
+        
         Args:
             page: Página PyMuPDF para processar
             dpi: Resolução de renderização (default: 300)
+            prefilter: Usar pré-filtro vetorial (False = página inteira)
+            candidates: Regiões candidatas já conhecidas (None = calcula todas)
             
         Returns:
             Lista de checkboxes detectados com status (marcado/vazio)
         """
+        # 0. Pré-filtro vetorial: faixa da página que contém candidatos
+        clip = None
+        if prefilter:
+            if candidates is None:
+                candidates = checkbox_candidate_rects(page)
+            clip = checkbox_scan_region(page, dpi, candidates)
+            if clip is None:
+                return []  # Nenhum candidato a checkbox nesta página
+            if page.rotation:
+                candidates = None  # Candidatos e contornos em referenciais diferentes
+        else:
+            candidates = None
+        
         # 1. Extrair texto para mascaramento
         text_dict = page.get_text("dict")
         
-        # 2. Renderizar em alta resolução
-        mat = fitz.Matrix(dpi/72, dpi/72)
-        pixmap = page.get_pixmap(matrix=mat)
-        
-        # Converter pixmap para numpy array
-        img_np = np.frombuffer(pixmap.samples, dtype=np.uint8)
-        img_np = img_np.reshape(pixmap.height, pixmap.width, pixmap.n)
+        # 2. Renderizar em alta resolução (cache LRU compartilhado)
+        img_np, (offset_x, offset_y) = get_page_raster_cache().render(page, dpi, clip)
         
         # Converter para BGR
-        if pixmap.n == 4:  # RGBA
-            img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGBA2BGR)
-        else:  # RGB
-            img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
+        img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
         
         # Guardar imagem colorida para filtro HSV
         img_color = img_bgr.copy()
@@ -153,10 +206,10 @@ class PreciseParameterExtractor:
         for block in text_dict["blocks"]:
             if block["type"] == 0:  # Bloco de texto
                 bbox = block["bbox"]
-                x0 = int(bbox[0] * scale)
-                y0 = int(bbox[1] * scale)
-                x1 = int(bbox[2] * scale)
-                y1 = int(bbox[3] * scale)
+                x0 = int(bbox[0] * scale) - offset_x
+                y0 = int(bbox[1] * scale) - offset_y
+                x1 = int(bbox[2] * scale) - offset_x
+                y1 = int(bbox[3] * scale) - offset_y
                 # Pintar de branco (mascara o texto)
                 cv2.rectangle(img_masked, (x0, y0), (x1, y1), (255, 255, 255), -1)
         
@@ -231,6 +284,14 @@ class PreciseParameterExtractor:
             # Determinar se está marcado (threshold calibrado: 31.6%)
             is_marked = density > 0.316
             
+            # Voltar ao referencial da página inteira
+            x += offset_x
+            y += offset_y
+            
+            # Descartar artefatos da borda da faixa (longe de candidatos)
+            if candidates is not None and not touches_candidate(x, y, w, h, scale, candidates):
+                continue
+            
             checkboxes.append(Checkbox(
                 x=x, y=y, width=w, height=h,
                 is_marked=is_marked,
@@ -239,6 +300,171 @@ class PreciseParameterExtractor:
         
         return checkboxes
     
+    def detect_checkboxes_vector(
+        self,
+        page: fitz.Page,
+        dpi: int = 300,
+        raster_fallback: bool = True
+    ) -> List[Checkbox]:
+        """
+        ETAPA 2 (alternativa): Detecta checkboxes direto da camada vetorial
+        
+        Easergy Studio desenha cada checkbox como um quadrado ('re') com traço
+        P&B; a marcação (X) são traços/preenchimentos contidos no quadrado.
+        Nenhum bitmap é gerado para esses checkboxes.
+        
+        ESTRATÉGIA:
+        1. page.get_cdrawings(): separar quadrados candidatos e marcas pequenas
+        2. Associar marcas aos quadrados (busca binária por Y)
+        3. Densidade = tinta estimada das marcas / área interior do quadrado
+        4. Fallback raster apenas na faixa das imagens embutidas (ícones de
+           checkbox em bitmap, páginas escaneadas)
+        
+        Coordenadas retornadas em pixels do DPI informado (mesmo referencial
+        de detect_checkboxes), então a correlação não muda.
+        
+        Args:
+            page: Página PyMuPDF para processar
+            dpi: Resolução de referência das coordenadas (default: 300)
+            raster_fallback: Rodar detector raster sobre imagens embutidas
+            
+        Returns:
+            Lista de checkboxes detectados com status (marcado/vazio)
+        """
+        scale = dpi / 72
+        max_size = self.VECTOR_SQUARE_MAX_PT
+        squares = {}  # {rect arredondado: [rect, largura do traço, tinta]}
+        marks = []    # (rect, tinta em pt²)
+        
+        # get_cdrawings: mesmos caminhos de get_drawings, sem conversão para
+        # objetos Point/Rect (2-3x mais rápido). Preenchimento e traço de um
+        # mesmo caminho chegam como entradas separadas ('f' e 's').
+        for path in page.get_cdrawings():
+            x0, y0, x1, y1 = path["rect"]
+            if x1 - x0 > max_size or y1 - y0 > max_size:
+                continue  # Linhas de tabela, molduras, logotipos
+            
+            if self._is_vector_checkbox_square(path):
+                # Quadrado com preenchimento escuro ('fs') = marcado
+                key = (round(x0, 1), round(y0, 1), round(x1, 1), round(y1, 1))
+                fill_ink = self._vector_ink(path, stroke=False)
+                squares.setdefault(key, [fitz.Rect(x0, y0, x1, y1), path.get("width") or 0.0, fill_ink])
+            else:
+                ink = self._vector_ink(path)
+                if ink > 0:
+                    marks.append((fitz.Rect(x0, y0, x1, y1), ink))
+        
+        # Marcas por quadrado (quadrados ordenados por Y para busca binária)
+        squares = sorted(squares.values(), key=lambda item: (item[0].y0, item[0].x0))
+        square_y0 = [item[0].y0 for item in squares]
+        marked_by_square = [item[2] > 0 for item in squares]
+        
+        for mark_rect, ink in marks:
+            lo = bisect_left(square_y0, mark_rect.y0 - max_size)
+            hi = bisect_right(square_y0, mark_rect.y0 + max_size)
+            for idx in range(lo, hi):
+                rect, line_width, _ = squares[idx]
+                bounds = fitz.Rect(rect.x0 - line_width, rect.y0 - line_width,
+                                   rect.x1 + line_width, rect.y1 + line_width)
+                if bounds.contains(mark_rect):
+                    marked_by_square[idx] = True
+                    squares[idx][2] += ink
+                    break
+        
+        checkboxes = []
+        for idx, (rect, line_width, ink) in enumerate(squares):
+            # Caixa externa do traço, arredondada para fora como no raster
+            x = math.floor((rect.x0 - line_width / 2) * scale)
+            y = math.floor((rect.y0 - line_width / 2) * scale)
+            w = math.ceil((rect.x1 + line_width / 2) * scale) - x
+            h = math.ceil((rect.y1 + line_width / 2) * scale) - y
+            
+            # Mesmos filtros geométricos do detector raster
+            if not (self.CHECKBOX_MIN_SIZE < w < self.CHECKBOX_MAX_SIZE and
+                    self.CHECKBOX_MIN_SIZE < h < self.CHECKBOX_MAX_SIZE):
+                continue
+            if not (self.CHECKBOX_ASPECT_RATIO_MIN < w / float(h) < self.CHECKBOX_ASPECT_RATIO_MAX):
+                continue
+            
+            interior = max((rect.width - line_width) * (rect.height - line_width), 1e-6)
+            density = min(1.0, ink / interior)
+            
+            checkboxes.append(Checkbox(
+                x=x, y=y, width=w, height=h,
+                is_marked=marked_by_square[idx],
+                density=density
+            ))
+        
+        # Fallback raster: somente imagens embutidas (bitmaps não têm vetores)
+        if raster_fallback:
+            image_rects = embedded_image_rects(page)
+            if image_rects:
+                vector_boxes = [fitz.Rect(cb.x, cb.y, cb.x + cb.width, cb.y + cb.height)
+                                for cb in checkboxes]
+                for cb in self.detect_checkboxes(page, dpi, candidates=image_rects):
+                    box = fitz.Rect(cb.x, cb.y, cb.x + cb.width, cb.y + cb.height)
+                    if not any(box.intersects(vb) for vb in vector_boxes):
+                        checkboxes.append(cb)
+        
+        return checkboxes
+    
+    def _is_vector_checkbox_square(self, path: Dict) -> bool:
+        """Quadrado com traço P&B formado por um único retângulo/quadrilátero"""
+        items = path["items"]
+        if len(items) != 1 or items[0][0] not in ("re", "qu"):
+            return False
+        
+        if "s" not in path["type"]:
+            return False  # Apenas preenchido: marca, não moldura
+        
+        color = path.get("color") or (0.0, 0.0, 0.0)
+        if max(color) - min(color) > self.VECTOR_MAX_STROKE_CHROMA:
+            return False  # Ícone colorido
+        
+        x0, y0, x1, y1 = path["rect"]
+        if y1 - y0 <= 0:
+            return False
+        return self.CHECKBOX_ASPECT_RATIO_MIN < (x1 - x0) / (y1 - y0) < self.CHECKBOX_ASPECT_RATIO_MAX
+    
+    @staticmethod
+    def _vector_ink(path: Dict, stroke: bool = True) -> float:
+        """
+        Estimativa de tinta (pt²) de um caminho: traços × largura + preenchimentos
+        
+        Cores claras (fundo branco, grade cinza-clara) não contam como tinta.
+        """
+        def is_dark(color) -> bool:
+            return color is not None and sum(color) / max(len(color), 1) < 0.5
+        
+        ink = 0.0
+        
+        if stroke and "s" in path["type"] and is_dark(path.get("color")):
+            width = path.get("width") or 0.0
+            for item in path["items"]:
+                if item[0] == "l":
+                    ink += math.dist(item[1], item[2]) * width
+                elif item[0] == "c":
+                    ink += math.dist(item[1], item[4]) * width  # Corda da curva
+                elif item[0] == "re":
+                    x0, y0, x1, y1 = item[1]
+                    ink += 2 * (abs(x1 - x0) + abs(y1 - y0)) * width
+                elif item[0] == "qu":
+                    ul, ur, ll, lr = item[1]
+                    ink += (math.dist(ul, ur) + math.dist(ur, lr) +
+                            math.dist(lr, ll) + math.dist(ll, ul)) * width
+        
+        if "f" in path["type"] and is_dark(path.get("fill")):
+            x0, y0, x1, y1 = path["rect"]
+            ink += (x1 - x0) * (y1 - y0)
+        
+        return ink
+    
+    def _detect_page_checkboxes(self, page: fitz.Page, dpi: int = 300) -> List[Checkbox]:
+        """Detecta checkboxes com o detector configurado no extrator"""
+        if self.checkbox_detector == "vector":
+            return self.detect_checkboxes_vector(page, dpi)
+        return self.detect_checkboxes(page, dpi)
+    
     def extract_parameter_lines(self, page: fitz.Page) -> List[ParameterLine]:
         """
         ETAPA 3: Extrai TODAS as linhas de parâmetros (regex linha por linha)
@@ -299,7 +525,8 @@ class PreciseParameterExtractor:
         self,
         page: fitz.Page,
         checkbox: Checkbox,
-        dpi_scale: float = 300/72
+        dpi_scale: float = 300/72,
+        word_index: Optional[PageWordIndex] = None
     ) -> str:
         """
         Extrai texto que está À DIREITA de um checkbox marcado
@@ -310,6 +537,7 @@ class PreciseParameterExtractor:
             page: Página do PDF
             checkbox: Checkbox detectado
             dpi_scale: Fator de conversão DPI (300/72)
+            word_index: Índice de texto da página (evita reinterpretar a página)
             
         Returns:
             Texto encontrado à direita do checkbox
@@ -330,7 +558,10 @@ class PreciseParameterExtractor:
         )
         
         # Extrair texto nesta região
-        words = page.get_text("words", clip=search_rect)
+        if word_index is not None:
+            words = word_index.words_in(search_rect)
+        else:
+            words = page.get_text("words", clip=search_rect)
         
         if not words:
             return ""
@@ -378,7 +609,8 @@ class PreciseParameterExtractor:
         checkboxes: List[Checkbox], 
         lines: List[ParameterLine],
         page: fitz.Page,
-        dpi_scale: float = 300/72
+        dpi_scale: float = 300/72,
+        word_index: Optional[PageWordIndex] = None
     ) -> List[Dict]:
         """
         ETAPA 4: Correlaciona checkboxes com linhas de parâmetros (LÓGICA HIERÁRQUICA)
@@ -390,11 +622,20 @@ class PreciseParameterExtractor:
            - Se QUALQUER checkbox marcado está abaixo → parâmetro-pai é ATIVO
            - NOVO: Extrair TODOS os valores dos checkboxes marcados e concatenar
         
+        VARREDURA ORDENADA (O((L+C) log(L+C))):
+        Checkboxes e linhas são ordenados por Y uma vez; cada consulta (mais
+        próximo, janela de sublinhas, linha-pai) é uma busca binária sobre as
+        MESMAS diferenças em ponto flutuante da comparação direta, então
+        empates e limites reproduzem exatamente a varredura linha × checkbox.
+        O texto de cada checkbox marcado é extraído uma única vez por página
+        (PageWordIndex).
+        
         Args:
             checkboxes: Lista de checkboxes detectados (coordenadas em DPI 300)
             lines: Lista de linhas de parâmetros (coordenadas em DPI 72)
             page: Página do PDF (para extração de texto)
             dpi_scale: Fator de conversão (300/72 = 4.166)
+            word_index: Índice de texto da página (criado sob demanda se None)
             
         Returns:
             Lista de dicts com code, description, value, is_active
@@ -402,41 +643,69 @@ class PreciseParameterExtractor:
         results = []
         matched_checkboxes = set()  # Rastrear checkboxes já usados
         
+        # Checkboxes ordenados por Y (DPI 72); empate → ordem original
+        checkbox_ys = [checkbox.y / dpi_scale for checkbox in checkboxes]
+        order = sorted(range(len(checkboxes)), key=lambda i: (checkbox_ys[i], i))
+        sorted_ys = [checkbox_ys[i] for i in order]
+        marked_positions = [pos for pos, i in enumerate(order) if checkboxes[i].is_marked]
+        covered = [0] * (len(order) + 1)  # Diferenças: janelas de sublinhas
+        
+        # Texto de cada checkbox marcado: extraído uma vez, sob demanda
+        texts: Dict[int, str] = {}
+        
+        def checkbox_text(i: int) -> str:
+            nonlocal word_index
+            if i not in texts:
+                if word_index is None:
+                    word_index = PageWordIndex(page)
+                texts[i] = self.extract_text_near_checkbox(page, checkboxes[i], dpi_scale, word_index)
+            return texts[i]
+        
         # ETAPA 1: Correlação DIRETA + HIERÁRQUICA
         for line in lines:
             line_y = line.y_coordinate  # Já está em DPI 72
             
-            matched_checkbox = None
-            min_distance = float('inf')
+            def offset(checkbox_y, line_y=line_y):
+                return checkbox_y - line_y
             
-            for checkbox in checkboxes:
-                checkbox_y_72 = checkbox.y / dpi_scale
-                distance = abs(checkbox_y_72 - line_y)
-                
-                # Correlação direta: checkbox na mesma altura
-                if distance < self.Y_TOLERANCE and distance < min_distance:
-                    matched_checkbox = checkbox
-                    min_distance = distance
+            # Correlação direta: checkbox mais próximo (±25px); empate → ordem original
+            matched_checkbox = None
+            matched_index = None
+            split = bisect_left(sorted_ys, 0.0, key=offset)
+            nearest = [pos for pos in (split - 1, split) if 0 <= pos < len(order)]
+            if nearest:
+                min_distance = min(abs(sorted_ys[pos] - line_y) for pos in nearest)
+                if min_distance < self.Y_TOLERANCE:
+                    tied = []
+                    pos = split - 1
+                    while pos >= 0 and abs(sorted_ys[pos] - line_y) == min_distance:
+                        tied.append(order[pos])
+                        pos -= 1
+                    pos = split
+                    while pos < len(order) and abs(sorted_ys[pos] - line_y) == min_distance:
+                        tied.append(order[pos])
+                        pos += 1
+                    matched_index = min(tied)
+                    matched_checkbox = checkboxes[matched_index]
             
             # Verificar se há checkboxes marcados ABAIXO (sublinhas)
-            # Buscar até 100px abaixo (cobre grupo de checkboxes)
+            # Buscar até 100px abaixo (cobre grupo de checkboxes): 5 < dist < 100
+            lo = bisect_right(sorted_ys, 5, key=offset)
+            hi = bisect_left(sorted_ys, 100, key=offset)
+            
             has_marked_children = False
             child_values = []  # Valores extraídos dos checkboxes filhos
             
-            for checkbox in checkboxes:
-                checkbox_y_72 = checkbox.y / dpi_scale
-                distance_below = checkbox_y_72 - line_y
+            if lo < hi:
+                covered[lo] += 1
+                covered[hi] -= 1
                 
-                # Checkbox está ABAIXO do parâmetro (sublinhas)
-                if 5 < distance_below < 100:  # Entre 5px e 100px abaixo
-                    matched_checkboxes.add(id(checkbox))
-                    
-                    if checkbox.is_marked:
-                        has_marked_children = True
-                        # Extrair texto do checkbox marcado
-                        texto = self.extract_text_near_checkbox(page, checkbox, dpi_scale)
-                        if texto:
-                            child_values.append(texto)
+                for pos in marked_positions[bisect_left(marked_positions, lo):bisect_left(marked_positions, hi)]:
+                    has_marked_children = True
+                    # Extrair texto do checkbox marcado
+                    texto = checkbox_text(order[pos])
+                    if texto:
+                        child_values.append(texto)
             
             # Determinar is_active
             # ATIVO se: checkbox direto marcado OU tem checkboxes marcados nas sublinhas
@@ -452,9 +721,9 @@ class PreciseParameterExtractor:
                 # Concatenar valores dos checkboxes filhos
                 value = ", ".join(sorted(child_values))  # Ordenar para consistência
             elif matched_checkbox and matched_checkbox.is_marked and not line.value:
-                checkbox_text = self.extract_text_near_checkbox(page, matched_checkbox, dpi_scale)
-                if checkbox_text:
-                    value = checkbox_text
+                checkbox_text_value = checkbox_text(matched_index)
+                if checkbox_text_value:
+                    value = checkbox_text_value
                     matched_checkboxes.add(id(matched_checkbox))
             
             results.append({
@@ -467,29 +736,45 @@ class PreciseParameterExtractor:
                 'checkbox_density': matched_checkbox.density if matched_checkbox else 0.0
             })
         
+        # Checkboxes cobertos por alguma janela de sublinhas
+        depth = 0
+        for pos, i in enumerate(order):
+            depth += covered[pos]
+            if depth > 0:
+                matched_checkboxes.add(id(checkboxes[i]))
+        
+        # Linhas ordenadas por Y para achar a linha-pai (mais próxima ACIMA)
+        line_order = sorted(range(len(lines)), key=lambda j: (lines[j].y_coordinate, j))
+        sorted_line_ys = [lines[j].y_coordinate for j in line_order]
+        
         # ETAPA 2: Checkboxes órfãos (não associados a nenhuma linha)
         # Criar entradas individuais para checkboxes marcados sem linha-pai clara
-        for checkbox in checkboxes:
+        for i, checkbox in enumerate(checkboxes):
             if checkbox.is_marked and id(checkbox) not in matched_checkboxes:
-                checkbox_text = self.extract_text_near_checkbox(page, checkbox, dpi_scale)
-                if checkbox_text:
-                    # Tentar achar a linha "pai" mais próxima ACIMA
+                checkbox_text_value = checkbox_text(i)
+                if checkbox_text_value:
+                    # Tentar achar a linha "pai" mais próxima ACIMA (dentro de 100px)
                     parent_line = None
-                    checkbox_y_72 = checkbox.y / dpi_scale
-                    min_distance_above = float('inf')
+                    checkbox_y_72 = checkbox_ys[i]
                     
-                    for line in lines:
-                        distance_above = checkbox_y_72 - line.y_coordinate
-                        # Linha está ACIMA do checkbox (dentro de 100px)
-                        if 0 < distance_above < 100 and distance_above < min_distance_above:
-                            parent_line = line
-                            min_distance_above = distance_above
+                    # Linhas com distance_above > 0 ficam antes de 'split'
+                    split = bisect_left(sorted_line_ys, 0.0,
+                                        key=lambda line_y: -(checkbox_y_72 - line_y))
+                    if split > 0:
+                        min_distance_above = checkbox_y_72 - sorted_line_ys[split - 1]
+                        if min_distance_above < 100:
+                            tied = []
+                            pos = split - 1
+                            while pos >= 0 and checkbox_y_72 - sorted_line_ys[pos] == min_distance_above:
+                                tied.append(line_order[pos])
+                                pos -= 1
+                            parent_line = lines[min(tied)]
                     
                     if parent_line:
                         results.append({
                             'Code': parent_line.code,
-                            'Description': f"{parent_line.description} → {checkbox_text}",
-                            'Value': checkbox_text,
+                            'Description': f"{parent_line.description} → {checkbox_text_value}",
+                            'Value': checkbox_text_value,
                             'is_active': True,
                             'confidence': 0.95,
                             'y_coordinate': checkbox_y_72,
@@ -498,44 +783,69 @@ class PreciseParameterExtractor:
         
         return results
     
-    def extract_from_pdf(self, pdf_path: Path) -> pd.DataFrame:
+    def iter_page_results(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None,
+        memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB
+    ) -> Iterator[List[Dict]]:
         """
-        PIPELINE COMPLETO: Extrai parâmetros de PDF Easergy com checkboxes
+        Detecção + correlação página a página (gerador)
         
-        Pipeline:
-        1. Abrir PDF e processar cada página
-        2. Melhorar qualidade da imagem (enhance_pdf_quality)
-        3. Detectar checkboxes (detect_checkboxes)
-        4. Extrair linhas de parâmetros (extract_parameter_lines)
-        5. Correlacionar checkboxes com linhas (correlate_checkboxes_with_lines)
-        6. Consolidar resultados em DataFrame
+        Cada página é renderizada, processada e liberada antes da próxima;
+        rasters em cache e store do MuPDF ficam abaixo de memory_limit_mb.
         
         Args:
             pdf_path: Caminho do arquivo PDF
+            page_numbers: Índices (0-based) das páginas. None = todas
+            memory_limit_mb: Teto de memória entre páginas
             
-        Returns:
-            DataFrame com colunas: Code, Description, Value, is_active, confidence
+        Yields:
+            Lista de dicts por parâmetro da página (ver correlate_checkboxes_with_lines)
         """
-        doc = fitz.open(pdf_path)
-        all_results = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
+        for page in iter_pdf_pages(pdf_path, page_numbers, memory_limit_mb):
             # ETAPA 1: Detectar checkboxes (usa mascaramento de texto interno)
-            checkboxes = self.detect_checkboxes(page, dpi=300)
+            checkboxes = self._detect_page_checkboxes(page, dpi=300)
             
             # ETAPA 2: Extrair linhas de parâmetros
             lines = self.extract_parameter_lines(page)
             
             # ETAPA 3: Correlacionar checkboxes com linhas (passar dpi_scale!)
-            page_results = self.correlate_checkboxes_with_lines(checkboxes, lines, page, dpi_scale=300/72)
-            
-            all_results.extend(page_results)
+            yield self.correlate_checkboxes_with_lines(checkboxes, lines, page, dpi_scale=300/72)
+    
+    def extract_page_results(
+        self,
+        pdf_path: Path,
+        page_numbers: Optional[List[int]] = None
+    ) -> List[Dict]:
+        """
+        Executa detecção + correlação em um subconjunto de páginas do PDF
+        
+        Usado pelo modo paralelo da pipeline para distribuir páginas de PDFs
+        grandes entre processos. Os resultados são retornados na ordem das
+        páginas, então concatenar os blocos reproduz exatamente a varredura
+        sequencial.
         
-        doc.close()
+        Args:
+            pdf_path: Caminho do arquivo PDF
+            page_numbers: Índices (0-based) das páginas. None = todas
+            
+        Returns:
+            Lista de dicts por parâmetro (ver correlate_checkboxes_with_lines)
+        """
+        return [row for page_results in self.iter_page_results(pdf_path, page_numbers) for row in page_results]
+    
+    @staticmethod
+    def results_to_dataframe(all_results: List[Dict]) -> pd.DataFrame:
+        """
+        Consolida resultados de páginas em DataFrame (dedup por código + ordenação)
         
-        # Converter para DataFrame
+        Args:
+            all_results: Resultados concatenados na ordem das páginas
+            
+        Returns:
+            DataFrame com colunas: Code, Description, Value, is_active, confidence
+        """
         df = pd.DataFrame(all_results)
         
         # Remover duplicatas (mesmo código)
@@ -544,6 +854,27 @@ class PreciseParameterExtractor:
             df = df.sort_values('Code').reset_index(drop=True)
         
         return df
+    
+    def extract_from_pdf(self, pdf_path: Path) -> pd.DataFrame:
+        """
+        PIPELINE COMPLETO: Extrai parâmetros de PDF Easergy com checkboxes
+        
+        Pipeline:
+        1. Abrir PDF e processar cada página
+        2. Melhorar qualidade da imagem (enhance_pdf_quality)
+        3. Detectar checkboxes (detect_checkboxes)
+        4. Extrair linhas de parâmetros (extract_parameter_lines)
+        5. Correlacionar checkboxes com linhas (correlate_checkboxes_with_lines)
+        6. Consolidar resultados em DataFrame
+        
+        Args:
+            pdf_path: Caminho do arquivo PDF
+            
+        Returns:
+            DataFrame com colunas: Code, Description, Value, is_active, confidence
+        """
+        all_results = self.extract_page_results(pdf_path)
+        return self.results_to_dataframe(all_results)
 
 def main():
     """Teste do extrator preciso"""
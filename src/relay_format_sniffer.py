@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Relay Format Sniffer - Detecção única de formato, modelo e fabricante
+=====================================================================
+
+Cada estágio detectava o tipo do relé por conta própria:
+IntelligentRelayExtractor.detect_relay_type (abre o PDF e lê a página 1),
+UniversalSetupDetector.detect_relay_type (nome do CSV),
+UniversalRobustRelayProcessor.extract_manufacturer_from_pdf (abre o PDF de
+novo via PyPDF2) e import_normalized_data_to_db (abre primeira e última
+página). O mesmo arquivo era aberto várias vezes por execução, e cada
+detector tinha a sua lista de regex.
+
+Este módulo concentra a detecção:
+
+- Tabelas de padrões pré-compiladas: modelos a partir de
+  inputs/glossario/relay_models_config.json (chaves MICON_P122_52,
+  SEPAM_S40, ...), assinaturas de conteúdo Easergy/MiCOM e padrões de
+  fabricante.
+- Leitura mínima: só o texto da primeira página (PDF, uma abertura) ou os
+  primeiros SNIFF_BYTES do arquivo (.S40/.txt).
+- Memorização por hash do conteúdo (SHA-256, memorizado por tamanho/mtime):
+  a segunda consulta do mesmo arquivo não toca o disco.
+- SniffResult (picklable) reaproveitado por todos os estágios e repassado
+  aos processos do pool via FormatSniffer.remember().
+
+Autor: Sistema ProtecAI
+Data: 2025-11-22
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+import fitz  # PyMuPDF
+
+try:
+    from .file_registry_manager import calculate_file_hash
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from file_registry_manager import calculate_file_hash
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_MODELS_CONFIG = PROJECT_ROOT / "inputs" / "glossario" / "relay_models_config.json"
+
+# Bytes lidos de arquivos de texto (.S40/.txt)
+SNIFF_BYTES = 4096
+
+# Extensões tratadas como SEPAM (formato INI)
+SEPAM_SUFFIXES = ('.s40', '.txt')
+
+# Família pelo método de detecção do relay_models_config.json
+FAMILY_BY_DETECTION_METHOD = {
+    'checkbox': 'easergy',
+    'function_field': 'micom',
+    'activite_field': 'sepam',
+}
+
+# Exceções ao método de detecção: P241 está como 'checkbox' no config,
+# mas os relatórios são MiCOM (códigos hexadecimais 0C.1E)
+FAMILY_OVERRIDES = {
+    'P241': 'micom',
+}
+
+# Assinaturas de conteúdo da primeira página: (família, marcadores, padrão de código)
+CONTENT_SIGNATURES: List[Tuple[str, Tuple[str, ...], Pattern]] = [
+    ('easergy', ('Easergy', 'Settings File Report'), re.compile(r'\d{4}:')),
+    ('micom', ('MiCOM', 'Relatório de ficheiro'), re.compile(r'[0-9A-F]{2}\.[0-9A-F]{2}:', re.IGNORECASE)),
+]
+
+# Padrões de identificação de fabricantes (ordem = prioridade)
+MANUFACTURER_PATTERNS: Dict[str, List[Pattern]] = {
+    code: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for code, patterns in {
+        'GE': [
+            r'micom\s+s1\s+agile',
+            r'micom',
+            r'multilin',
+            r'ge\s+grid\s+solutions',
+            r'general\s+electric'
+        ],
+        'SE': [
+            r'easergy\s+studio',
+            r'easergy',
+            r'sepam',
+            r'schneider\s+electric'
+        ],
+        'ABB': [
+            r'abb',
+            r'ref\d{3}',
+            r'ret\d{3}',
+            r'red\d{3}'
+        ],
+        'SEL': [
+            r'sel-\d{3,4}',
+            r'schweitzer\s+engineering'
+        ],
+        'SIEMENS': [
+            r'siprotec',
+            r'siemens'
+        ],
+        'ARTECHE': [
+            r'arteche',
+            r'ekor'
+        ]
+    }.items()
+}
+
+# Fabricante implícito na família, quando o texto não cita nenhum
+FAMILY_MANUFACTURER = {
+    'easergy': 'SE',
+    'micom': 'GE',
+    'sepam': 'SE',
+}
+
+UNKNOWN = 'unknown'
+UNKNOWN_MANUFACTURER = 'UNKNOWN'
+
+
+class ModelPattern(NamedTuple):
+    """Padrão pré-compilado de um modelo do relay_models_config.json"""
+    config_key: str      # MICON_P122_52
+    model: str           # P122
+    family: str          # easergy | micom | sepam
+    pattern: Pattern     # P122[\s_-]*52 (variante) ou P122 (modelo)
+    specific: bool       # True = casa a variante completa da chave
+
+
+class SniffResult(NamedTuple):
+    """Formato, modelo e fabricante de um arquivo de relé"""
+    relay_type: str                 # easergy | micom | sepam | unknown
+    model: Optional[str]            # P122, P143, S40, ...
+    config_key: Optional[str]       # chave do relay_models_config.json (None se ambígua)
+    manufacturer: str               # GE, SE, ABB, ... ou UNKNOWN
+    detected_by: str                # content | filename | suffix | none
+    file_hash: Optional[str]        # SHA-256 do arquivo (None = só nome)
+    page_count: int                 # páginas do PDF (0 para texto)
+    head_text: str                  # texto da 1ª página / primeiros bytes
+
+
+def _model_token(config_key: str) -> Tuple[str, List[str]]:
+    """MICON_P122_52 → ('P122', ['52']); SEPAM_S40 → ('S40', [])"""
+    parts = config_key.split('_')[1:] or [config_key]
+    return parts[0].upper(), parts[1:]
+
+
+def _token_regex(tokens: List[str]) -> str:
+    """Tokens separados por espaço, '_' ou '-' e sem dígitos colados nas pontas"""
+    body = r'[\s_\-]*'.join(re.escape(token) for token in tokens)
+    return rf'(?<![0-9A-Z]){body}(?![0-9])'
+
+
+def load_model_patterns(config_path: Optional[Path] = None) -> List[ModelPattern]:
+    """
+    Compila os padrões de modelo a partir do relay_models_config.json.
+
+    Variantes (MICON_P122_52) vêm antes do modelo genérico (P122), para que
+    a chave mais específica seja a escolhida.
+
+    Returns:
+        Lista de ModelPattern (vazia se o config não existir)
+    """
+    config_path = Path(config_path or DEFAULT_MODELS_CONFIG)
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            models = json.load(f).get('models', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️  Config de modelos indisponível ({config_path.name}): {e}")
+        return []
+
+    specific, generic = [], {}
+    for config_key, spec in models.items():
+        model, variant = _model_token(config_key)
+        family = FAMILY_OVERRIDES.get(model) or FAMILY_BY_DETECTION_METHOD.get(
+            spec.get('detection_method'), UNKNOWN)
+        if variant:
+            specific.append(ModelPattern(config_key, model, family,
+                                         re.compile(_token_regex([model] + variant), re.IGNORECASE), True))
+        generic.setdefault(model, ModelPattern(config_key, model, family,
+                                               re.compile(_token_regex([model]), re.IGNORECASE), False))
+
+    return specific + list(generic.values())
+
+
+def match_model(text: str, patterns: List[ModelPattern]) -> Optional[ModelPattern]:
+    """
+    Primeiro padrão de modelo presente no texto.
+
+    Se só o modelo genérico casar e houver várias variantes no config
+    (P122_52/204/205), a chave devolvida é None — o modelo é conhecido, a
+    variante não.
+    """
+    for entry in patterns:
+        if not entry.pattern.search(text):
+            continue
+        if entry.specific:
+            return entry
+        variants = sum(1 for other in patterns if other.model == entry.model and other.specific)
+        return entry._replace(config_key=None) if variants > 1 else entry
+    return None
+
+
+def detect_manufacturer(text: str) -> Optional[str]:
+    """
+    Código do fabricante citado no texto.
+
+    Estratégia (como no processador robusto): rodapé (últimos 200 chars),
+    depois cabeçalho (primeiros 500), depois o texto inteiro.
+    """
+    for region in (text[-200:], text[:500], text):
+        for code, patterns in MANUFACTURER_PATTERNS.items():
+            if any(pattern.search(region) for pattern in patterns):
+                return code
+    return None
+
+
+def detect_content_family(text: str) -> Optional[str]:
+    """Família pelas assinaturas da primeira página de um relatório PDF"""
+    for family, markers, code_pattern in CONTENT_SIGNATURES:
+        if any(marker in text for marker in markers) and code_pattern.search(text):
+            return family
+    return None
+
+
+class _HeadScan(NamedTuple):
+    """Parte do resultado que depende só do conteúdo (memorizada por hash)"""
+    family: Optional[str]
+    model: Optional[ModelPattern]
+    manufacturer: Optional[str]
+    page_count: int
+    head_text: str
+
+
+class FormatSniffer:
+    """
+    Detector único de formato/modelo/fabricante, memorizado por hash.
+
+    Examples:
+        >>> sniff = get_format_sniffer().sniff(Path("inputs/pdf/P143_204.pdf"))
+        >>> sniff.relay_type, sniff.model, sniff.manufacturer
+        ('micom', 'P143', 'GE')
+    """
+
+    def __init__(self, config_path: Optional[Path] = None):
+        """
+        Args:
+            config_path: relay_models_config.json (None = inputs/glossario)
+        """
+        self.model_patterns = load_model_patterns(config_path)
+        self._hash_memo: Dict[str, Tuple[int, int, str]] = {}
+        self._scans: Dict[str, _HeadScan] = {}
+        self._results: Dict[Tuple[str, str], SniffResult] = {}
+        self._lock = threading.Lock()
+        self.opens = 0
+
+    def file_hash(self, file_path: Path) -> str:
+        """SHA-256 do arquivo, memorizado por (tamanho, mtime)"""
+        key = str(file_path.resolve())
+        stat = os.stat(key)
+        memo = self._hash_memo.get(key)
+        if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+        file_hash = calculate_file_hash(file_path)
+        self._hash_memo[key] = (stat.st_size, stat.st_mtime_ns, file_hash)
+        return file_hash
+
+    def _read_head(self, file_path: Path) -> Tuple[str, int]:
+        """Texto da 1ª página (PDF) ou primeiros SNIFF_BYTES; devolve (texto, páginas)"""
+        self.opens += 1
+        if file_path.suffix.lower() == '.pdf':
+            with fitz.open(str(file_path)) as doc:
+                page_count = len(doc)
+                return (doc[0].get_text() if page_count else ''), page_count
+
+        with open(file_path, 'rb') as f:
+            return f.read(SNIFF_BYTES).decode('latin-1'), 0
+
+    def _scan(self, file_path: Path) -> _HeadScan:
+        try:
+            text, page_count = self._read_head(file_path)
+        except Exception as e:
+            logger.warning(f"⚠️  Não foi possível ler {file_path.name}: {e}")
+            text, page_count = '', 0
+
+        family = detect_content_family(text) if file_path.suffix.lower() == '.pdf' else None
+        return _HeadScan(family, match_model(text, self.model_patterns),
+                         detect_manufacturer(text), page_count, text)
+
+    def sniff(self, file_path: Union[str, Path]) -> SniffResult:
+        """
+        Detecta formato, modelo e fabricante de um arquivo.
+
+        Ordem (a mesma dos detectores antigos): assinaturas do conteúdo da
+        1ª página, extensão .S40/.txt (SEPAM), modelo no nome do arquivo,
+        modelo citado no conteúdo.
+
+        Args:
+            file_path: PDF, .S40 ou .txt
+
+        Returns:
+            SniffResult (relay_type 'unknown' quando nada casar)
+        """
+        file_path = Path(file_path)
+        if not file_path.is_file():
+            return self.sniff_filename(file_path.name)
+
+        file_hash = self.file_hash(file_path)
+        key = (file_hash, file_path.name)
+        with self._lock:
+            result = self._results.get(key)
+            scan = self._scans.get(file_hash)
+        if result is not None:
+            return result
+
+        if scan is None:
+            scan = self._scan(file_path)
+        result = self._resolve(file_path.name, scan, file_hash)
+        with self._lock:
+            self._scans[file_hash] = scan
+            self._results[key] = result
+        return result
+
+    def _resolve(self, filename: str, scan: _HeadScan, file_hash: Optional[str]) -> SniffResult:
+        """Combina o conteúdo memorizado com o nome (barato, refeito a cada chamada)"""
+        by_name = match_model(filename, self.model_patterns)
+        model = by_name or scan.model
+
+        if scan.family:
+            relay_type, detected_by = scan.family, 'content'
+        elif filename.lower().endswith(SEPAM_SUFFIXES):
+            relay_type, detected_by = 'sepam', 'suffix'
+        elif by_name:
+            relay_type, detected_by = by_name.family, 'filename'
+        elif scan.model:
+            relay_type, detected_by = scan.model.family, 'content'
+        else:
+            relay_type, detected_by = UNKNOWN, 'none'
+
+        manufacturer = (scan.manufacturer
+                        or detect_manufacturer(filename)
+                        or FAMILY_MANUFACTURER.get(relay_type, UNKNOWN_MANUFACTURER))
+
+        return SniffResult(
+            relay_type=relay_type,
+            model=model.model if model else None,
+            config_key=model.config_key if model else None,
+            manufacturer=manufacturer,
+            detected_by=detected_by,
+            file_hash=file_hash,
+            page_count=scan.page_count,
+            head_text=scan.head_text,
+        )
+
+    def sniff_filename(self, filename: str) -> SniffResult:
+        """Detecção só pelo nome (CSVs intermediários, arquivos ausentes)"""
+        return self._resolve(filename, _HeadScan(None, None, None, 0, ''), None)
+
+    def remember(self, file_path: Union[str, Path], result: SniffResult) -> None:
+        """
+        Registra um resultado obtido em outro processo (pool), evitando
+        reabrir o arquivo no worker.
+        """
+        if result.file_hash is None:
+            return
+        file_path = Path(file_path)
+        stat = os.stat(file_path)
+        with self._lock:
+            self._hash_memo[str(file_path.resolve())] = (stat.st_size, stat.st_mtime_ns, result.file_hash)
+            self._results[(result.file_hash, file_path.name)] = result
+
+    def clear(self) -> None:
+        """Esvazia a memória de resultados"""
+        with self._lock:
+            self._hash_memo.clear()
+            self._scans.clear()
+            self._results.clear()
+
+
+_sniffer: Optional[FormatSniffer] = None
+_sniffer_lock = threading.Lock()
+
+
+def get_format_sniffer() -> FormatSniffer:
+    """Detector compartilhado no processo"""
+    global _sniffer
+    with _sniffer_lock:
+        if _sniffer is None:
+            _sniffer = FormatSniffer()
+        return _sniffer
+
+
+def sniff_file(file_path: Union[str, Path]) -> SniffResult:
+    """Atalho para get_format_sniffer().sniff()"""
+    return get_format_sniffer().sniff(file_path)
+
+
+@lru_cache(maxsize=4096)
+def sniff_filename(filename: str) -> SniffResult:
+    """Atalho memorizado para get_format_sniffer().sniff_filename()"""
+    return get_format_sniffer().sniff_filename(filename)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Relay Settings Bulk Loader - Carga em massa de protec_ai.relay_settings
+======================================================================
+
+A importação linha a linha (df.iterrows + get_or_create_unit por linha +
+execute_batch) faz um SELECT por unidade e várias idas e voltas ao banco
+por arquivo. Aqui:
+
+1. prepare_settings_frame monta as colunas de relay_settings com operações
+   por coluna do pandas; a classificação de função/categoria é calculada
+   uma vez por código distinto e as unidades vêm de um dicionário
+   pré-carregado.
+2. SettingsCopyWriter envia as linhas por COPY FROM STDIN (formato CSV)
+   para uma tabela temporária de staging com os tipos de relay_settings e
+   move tudo com um único INSERT ... SELECT, dentro da transação do
+   arquivo (o chamador faz o commit).
+
+As linhas são serializadas sob demanda (CopyRowStream), então o CSV do
+arquivo nunca é montado inteiro em memória.
+
+Autor: Sistema ProtecAI
+Data: 2025-11-18
+"""
+
+from __future__ import annotations
+import logging
+import math
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Ordem das colunas no COPY e no INSERT (igual ao INSERT linha a linha)
+SETTINGS_COLUMNS = (
+    'equipment_id', 'function_id', 'parameter_name', 'parameter_code',
+    'set_value', 'set_value_text', 'unit_id', 'is_active', 'is_multipart',
+    'multipart_base', 'multipart_part', 'value_type', 'category',
+)
+
+# Colunas inteiras: o pandas pode promovê-las a float quando há ausentes
+INTEGER_COLUMNS = frozenset({'equipment_id', 'function_id', 'unit_id', 'multipart_part'})
+
+STAGING_TABLE = 'relay_settings_stage'
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """Coluna do DataFrame ou série constante (equivale a row.get(name, default))"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def unit_symbols(df: pd.DataFrame) -> List:
+    """
+    Símbolos de unidade distintos usados no DataFrame.
+
+    Returns:
+        Símbolos não vazios, na ordem de primeira ocorrência
+    """
+    if 'value_unit' not in df.columns:
+        return []
+    symbols = df['value_unit'].dropna()
+    return [symbol for symbol in symbols.unique() if symbol]
+
+
+def prepare_settings_frame(
+    df: pd.DataFrame,
+    equipment_id: int,
+    unit_ids: Dict,
+    function_map: Dict[str, int],
+    classify: Callable[[str, str], Tuple[Optional[str], str]],
+    model_type: str = 'MICON'
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Monta as linhas de relay_settings de um CSV normalizado.
+
+    Mesmas regras da importação linha a linha, coluna a coluna.
+
+    Args:
+        df: DataFrame do CSV normalizado
+        equipment_id: ID do equipamento
+        unit_ids: Mapa unit_symbol → unit_id (já contendo as unidades do df)
+        function_map: Mapa function_code → function_id
+        classify: get_function_code_and_category(param_code, model_type)
+        model_type: Tipo de modelo repassado a classify
+
+    Returns:
+        (DataFrame com SETTINGS_COLUMNS, contadores {'function_mappings',
+        'category_classifications'})
+    """
+    param_code = _column(df, 'parameter_code', '')
+    param_value = _column(df, 'parameter_value', '')
+    value_type = _column(df, 'value_type', 'text')
+    is_active = _column(df, 'is_active', False).map(bool)
+    is_multipart = _column(df, 'is_multipart', False).map(bool)
+
+    # Unidade: dicionário pré-carregado em vez de um SELECT por linha
+    if 'value_unit' in df.columns:
+        unit_id = df['value_unit'].map(lambda symbol: unit_ids.get(symbol) if symbol else None)
+        unit_id = unit_id.where(df['value_unit'].notna(), None)
+    else:
+        unit_id = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    # Função/categoria: uma classificação por código distinto
+    classified = {}
+
+    def _classify(code):
+        if code not in classified:
+            classified[code] = classify(code, model_type)
+        return classified[code]
+
+    has_code = param_code.map(bool)
+    function_code = pd.Series([None] * len(df), index=df.index, dtype=object)
+    category = pd.Series(['other'] * len(df), index=df.index, dtype=object)
+    if has_code.any():
+        pairs = param_code[has_code].map(_classify)
+        function_code[has_code] = pairs.map(lambda pair: pair[0])
+        category[has_code] = pairs.map(lambda pair: pair[1])
+    function_id = function_code.map(lambda code: function_map.get(code) if code else None)
+
+    # Valores: texto sempre que presente, numérico só para value_type 'numeric'
+    value_present = param_value.notna()
+    set_value_text = param_value.map(str).where(value_present, None)
+    set_value = param_value.map(_to_float).where(value_type == 'numeric', None)
+
+    multipart_base = _column(df, 'multipart_base', None).where(is_multipart, None)
+    multipart_part = pd.Series([0] * len(df), index=df.index, dtype=object)
+    if is_multipart.any():
+        multipart_part[is_multipart] = _column(df, 'multipart_part', 0)[is_multipart].map(int)
+
+    settings = pd.DataFrame({
+        'equipment_id': equipment_id,
+        'function_id': function_id,
+        'parameter_name': _column(df, 'parameter_description', ''),
+        'parameter_code': param_code,
+        'set_value': set_value,
+        'set_value_text': set_value_text,
+        'unit_id': unit_id,
+        'is_active': is_active,
+        'is_multipart': is_multipart,
+        'multipart_base': multipart_base,
+        'multipart_part': multipart_part,
+        'value_type': value_type,
+        'category': category,
+    }, index=df.index, columns=list(SETTINGS_COLUMNS))
+
+    counters = {
+        'function_mappings': int(function_id.notna().sum()),
+        'category_classifications': int(has_code.sum()),
+    }
+    return settings, counters
+
+
+def copy_field(value) -> str:
+    """
+    Valor no formato CSV do COPY: NULL = campo vazio sem aspas, texto
+    sempre entre aspas (assim "" continua sendo string vazia).
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ''  # NaN do pandas = ausente
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return repr(value)
+    text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def settings_rows(settings: pd.DataFrame) -> Iterator[tuple]:
+    """Linhas do DataFrame como tuplas de tipos Python, na ordem de SETTINGS_COLUMNS"""
+    integer_positions = [i for i, name in enumerate(SETTINGS_COLUMNS) if name in INTEGER_COLUMNS]
+
+    for row in settings.itertuples(index=False, name=None):
+        row = [value.item() if hasattr(value, 'item') else value for value in row]  # numpy → Python
+        for i in integer_positions:
+            value = row[i]
+            row[i] = None if value is None or pd.isna(value) else int(value)
+        yield tuple(row)
+
+
+def iter_copy_lines(rows: Iterable[Sequence]) -> Iterator[str]:
+    """Uma linha CSV do COPY por registro"""
+    for row in rows:
+        yield ','.join(copy_field(value) for value in row) + '\n'
+
+
+class CopyRowStream:
+    """Objeto arquivo (read) que serializa as linhas sob demanda para copy_expert."""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ''
+        self.rows = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+            self.rows += 1
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+class SettingsCopyWriter:
+    """COPY de relay_settings via tabela temporária de staging."""
+
+    def __init__(self, cursor):
+        """
+        Args:
+            cursor: Cursor psycopg2 (transação controlada pelo chamador)
+        """
+        self.cursor = cursor
+        self._columns = ', '.join(SETTINGS_COLUMNS)
+
+    def _ensure_staging_table(self):
+        # Mesmos tipos de relay_settings, sem constraints nem defaults
+        self.cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE}
+            AS SELECT {self._columns} FROM protec_ai.relay_settings
+            WITH NO DATA
+        """)
+
+    def write(self, settings: pd.DataFrame) -> int:
+        """
+        Carrega as linhas em protec_ai.relay_settings (sem commit).
+
+        Args:
+            settings: DataFrame de prepare_settings_frame
+
+        Returns:
+            Número de linhas inseridas
+        """
+        if settings.empty:
+            return 0
+
+        self._ensure_staging_table()
+        self.cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+        stream = CopyRowStream(iter_copy_lines(settings_rows(settings)))
+        self.cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({self._columns}) FROM STDIN WITH (FORMAT csv)",
+            stream
+        )
+
+        self.cursor.execute(f"""
+            INSERT INTO protec_ai.relay_settings ({self._columns})
+            SELECT {self._columns} FROM {STAGING_TABLE}
+        """)
+        inserted = self.cursor.rowcount
+
+        logger.debug(f"COPY relay_settings: {stream.rows} linhas enviadas, {inserted} inseridas")
+        return inserted
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Relay Settings Stats - Resumo materializado de protec_ai.relay_settings
+======================================================================
+
+Os endpoints de estatísticas (metadados de relatórios, /database/statistics,
+/reports/statistics) faziam vários COUNT(*)/COUNT(DISTINCT) sobre
+relay_settings (~200 mil linhas) a cada carga de dashboard.
+
+protec_ai.relay_settings_summary guarda as mesmas contagens agrupadas por
+(equipment_id, function_id) - algumas centenas de linhas. Os totais do
+sistema são somas sobre o resumo.
+
+Atualização incremental: quem grava settings de um equipamento (importação,
+CRUD) chama refresh_equipment_summary na MESMA transação; só as linhas do
+resumo daquele equipamento são recalculadas (índice por equipment_id).
+ensure_summary_table cria e popula o resumo na primeira vez; rebuild_summary
+refaz tudo (após scripts de manutenção que alteram relay_settings em massa).
+
+As funções recebem um cursor DB-API (psycopg2): scripts usam o cursor da
+própria conexão; a API, o da conexão da Session
+(session.connection().connection.cursor()).
+
+Uso:
+    python src/relay_settings_stats.py --rebuild
+
+Autor: Sistema ProtecAI
+Data: 2025-11-21
+"""
+
+import logging
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TABLE = "protec_ai.relay_settings_summary"
+
+# Mesmas contagens dos endpoints de estatísticas (inclui settings com deleted_at)
+_AGGREGATE_SELECT = """
+    SELECT equipment_id,
+           function_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE is_active),
+           COUNT(*) FILTER (WHERE is_multipart),
+           COUNT(*) FILTER (WHERE value_type = 'numeric'),
+           COUNT(*) FILTER (WHERE value_type = 'boolean'),
+           COUNT(*) FILTER (WHERE value_type = 'text')
+    FROM protec_ai.relay_settings
+"""
+
+_SUMMARY_COLUMNS = """equipment_id, function_id, total_settings, active_settings, multipart_settings,
+    numeric_settings, boolean_settings, text_settings"""
+
+# Cria e popula na primeira execução; o lock serializa chamadas concorrentes
+ENSURE_SUMMARY_SQL = f"""
+DO $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('{SUMMARY_TABLE}'));
+    IF to_regclass('{SUMMARY_TABLE}') IS NULL THEN
+        CREATE TABLE {SUMMARY_TABLE} (
+            equipment_id INTEGER,
+            function_id INTEGER,
+            total_settings INTEGER NOT NULL,
+            active_settings INTEGER NOT NULL,
+            multipart_settings INTEGER NOT NULL,
+            numeric_settings INTEGER NOT NULL,
+            boolean_settings INTEGER NOT NULL,
+            text_settings INTEGER NOT NULL,
+            refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE INDEX idx_relay_settings_summary_equipment ON {SUMMARY_TABLE} (equipment_id);
+        INSERT INTO {SUMMARY_TABLE} ({_SUMMARY_COLUMNS})
+        {_AGGREGATE_SELECT}
+        GROUP BY equipment_id, function_id;
+    END IF;
+END $$
+"""
+
+REFRESH_EQUIPMENT_SQL = f"""
+DELETE FROM {SUMMARY_TABLE} WHERE equipment_id = ANY(%(equipment_ids)s);
+INSERT INTO {SUMMARY_TABLE} ({_SUMMARY_COLUMNS})
+{_AGGREGATE_SELECT}
+WHERE equipment_id = ANY(%(equipment_ids)s)
+GROUP BY equipment_id, function_id;
+"""
+
+REBUILD_SQL = f"""
+TRUNCATE {SUMMARY_TABLE};
+INSERT INTO {SUMMARY_TABLE} ({_SUMMARY_COLUMNS})
+{_AGGREGATE_SELECT}
+GROUP BY equipment_id, function_id;
+"""
+
+
+def ensure_summary_table(cursor) -> None:
+    """Cria (e popula) o resumo se ainda não existe (sem commit)"""
+    cursor.execute(ENSURE_SUMMARY_SQL)
+
+
+def refresh_equipment_summary(cursor, equipment_ids: Iterable[int]) -> None:
+    """
+    Recalcula as linhas do resumo dos equipamentos (sem commit).
+
+    Deve rodar na transação que alterou os settings, depois das escritas:
+    leitores nunca veem o resumo divergente de relay_settings.
+    """
+    ids = sorted({int(equipment_id) for equipment_id in equipment_ids if equipment_id is not None})
+    if ids:
+        cursor.execute(REFRESH_EQUIPMENT_SQL, {"equipment_ids": ids})
+
+
+def rebuild_summary(cursor) -> None:
+    """Recalcula o resumo inteiro (sem commit)"""
+    ensure_summary_table(cursor)
+    cursor.execute(REBUILD_SQL)
+
+
+def main():
+    import os
+    import argparse
+    import psycopg2
+
+    parser = argparse.ArgumentParser(description="Resumo de protec_ai.relay_settings")
+    parser.add_argument('--rebuild', action='store_true', help="Recalcula o resumo inteiro")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    conn = psycopg2.connect(
+        host=os.getenv('POSTGRES_SERVER', 'localhost'),
+        port=int(os.getenv('POSTGRES_PORT', '5432')),
+        dbname=os.getenv('POSTGRES_DB', 'protecai_db'),
+        user=os.getenv('POSTGRES_USER', 'protecai'),
+        password=os.getenv('POSTGRES_PASSWORD', 'protecai'),
+    )
+    try:
+        with conn.cursor() as cursor:
+            if args.rebuild:
+                rebuild_summary(cursor)
+            else:
+                ensure_summary_table(cursor)
+            cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(total_settings), 0) FROM {SUMMARY_TABLE}")
+            rows, settings = cursor.fetchone()
+        conn.commit()
+        logger.info(f"✅ {SUMMARY_TABLE}: {rows} linhas, {settings} settings")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single File Ingestion - Ingestão em processo de UM arquivo de relé
+==================================================================
+
+Caminho usado por /api/v1/imports/upload: o arquivo enviado passa pelos
+mesmos estágios da pipeline noturna, mas em processo e só para ele:
+
+1. extract    - CompletePipelineProcessor.run_file_task → outputs/csv/{stem}_params.csv
+2. normalize  - CSVNormalizer → outputs/norm_csv/{stem}_params.csv
+3. detect     - detect_active_functions (funções ANSI ativas do relé)
+4. load       - NormalizedDataImporter.process_file_bulk (settings do
+                equipamento substituídos em uma transação) +
+                replace_relay_functions (active_protection_functions do relé)
+
+Antes, a API executava pipeline_completo.py, detect_active_functions.py e
+import_active_functions_to_db.py como subprocessos: cada um reimportava
+pandas/cv2/fitz e reprocessava o diretório de entrada inteiro.
+
+O extrator (IntelligentRelayExtractor) é criado uma vez por processo
+(get_ingestion); ingest_file é o ponto de entrada do pool de processos da
+API (api.core.concurrency.run_in_process). Os estágios consultam o
+PipelineArtifactCache: arquivos inalterados pulam extração, normalização e
+carga dos settings, e registram o resultado para a execução noturna
+incremental.
+
+Autor: Sistema ProtecAI
+Data: 2025-11-20
+"""
+
+import sys
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from src.pipeline_artifact_cache import (
+    PipelineArtifactCache, STAGE_EXTRACTION, STAGE_NORMALIZATION, STAGE_IMPORT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Extensão → tipo de arquivo do CompletePipelineProcessor
+FILE_TYPES = {'.pdf': 'pdf', '.s40': 'sepam', '.txt': 'sepam'}
+
+
+class IngestionError(Exception):
+    """Falha em um estágio da ingestão"""
+
+
+class SingleFileIngestion:
+    """
+    Extrai, normaliza, detecta funções ativas e importa UM arquivo.
+
+    Examples:
+        >>> ingestion = SingleFileIngestion()
+        >>> report = ingestion.ingest(Path("uploads/imports/P122_52.pdf"))
+        >>> report["stage_timings"]
+        {'extract': 2.41, 'normalize': 0.08, 'detect': 0.01, 'load': 0.12}
+    """
+
+    def __init__(self, project_root: Union[str, Path] = PROJECT_ROOT,
+                 registry_path: Optional[Path] = None):
+        """
+        Args:
+            project_root: Raiz do projeto (inputs/ e outputs/ do extrator)
+            registry_path: JSON do PipelineArtifactCache (None = padrão do cache)
+        """
+        # Importações pesadas (cv2, fitz, psycopg2) só no processo que ingere
+        from src.complete_pipeline_processor import CompletePipelineProcessor
+        from normalize_extracted_csvs import CSVNormalizer
+        from detect_active_functions import detect_active_functions
+        from import_normalized_data_to_db import NormalizedDataImporter
+        from import_active_functions_to_db import (
+            create_active_functions_table, load_relay_models_config, replace_relay_functions,
+        )
+
+        self.processor = CompletePipelineProcessor(str(project_root))
+        self.registry_path = registry_path
+        self.normalizer_class = CSVNormalizer
+        self.importer_class = NormalizedDataImporter
+        self.detect_active_functions = detect_active_functions
+        self.create_active_functions_table = create_active_functions_table
+        self.replace_relay_functions = replace_relay_functions
+        _, self.function_descriptions = load_relay_models_config()
+        self._functions_table_ready = False
+
+    @staticmethod
+    def file_type(file_path: Path) -> Optional[str]:
+        """'pdf', 'sepam' ou None (formato não suportado)"""
+        return FILE_TYPES.get(file_path.suffix.lower())
+
+    def ingest(self, file_path: Union[str, Path], force: bool = False) -> Dict[str, Any]:
+        """
+        Executa os quatro estágios para `file_path`.
+
+        Args:
+            file_path: Arquivo do relé (.pdf, .S40, .txt)
+            force: Reprocessa mesmo que o cache indique que nada mudou
+
+        Returns:
+            Relatório com status, estágios (status + segundos de cada um),
+            stage_timings e total_seconds
+        """
+        file_path = Path(file_path)
+        report: Dict[str, Any] = {
+            "file": file_path.name,
+            "file_type": self.file_type(file_path),
+            "success": False,
+            "status": "failed",
+            "stages": {},
+        }
+        started = time.perf_counter()
+        cache = None
+
+        try:
+            if report["file_type"] is None:
+                raise IngestionError(f"Formato não suportado: {file_path.suffix or file_path.name}")
+            if not file_path.exists():
+                raise IngestionError(f"Arquivo não encontrado: {file_path}")
+
+            cache = PipelineArtifactCache(registry_path=self.registry_path,
+                                          glossary_path=self.processor.input_glossario)
+            raw_csv = self._extract(report, file_path, cache, force)
+            norm_csv = self._normalize(report, raw_csv, cache, force)
+            detection = self._detect(report, file_path)
+            self._load(report, file_path, norm_csv, detection, cache, force)
+
+            stages = report["stages"]
+            unchanged = (stages["extract"]["status"] == "skipped"
+                         and stages["normalize"]["status"] == "skipped"
+                         and stages["load"].get("settings") == "skipped")
+            report["success"] = True
+            report["status"] = "unchanged" if unchanged else "imported"
+        except Exception as e:
+            report["error"] = str(e)
+            logger.error(f"❌ Ingestão de {file_path.name} falhou: {e}")
+
+        if cache is not None:
+            # Estágios concluídos continuam válidos mesmo se um posterior falhou
+            self._save_cache(cache)
+        report["stage_timings"] = {name: stage["seconds"] for name, stage in report["stages"].items()}
+        report["total_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"📥 {file_path.name}: {report['status']} em {report['total_seconds']:.2f}s "
+                    f"({', '.join(f'{k} {v:.2f}s' for k, v in report['stage_timings'].items())})")
+        return report
+
+    @contextmanager
+    def _stage(self, report: Dict[str, Any], name: str) -> Iterator[Dict[str, Any]]:
+        """Cronometra um estágio; exceções marcam o estágio como failed"""
+        stage: Dict[str, Any] = {"status": "completed"}
+        report["stages"][name] = stage
+        start = time.perf_counter()
+        try:
+            yield stage
+        except Exception as e:
+            stage.update(status="failed", error=str(e))
+            report["failed_stage"] = name
+            raise
+        finally:
+            stage["seconds"] = round(time.perf_counter() - start, 3)
+
+    def _extract(self, report: Dict[str, Any], file_path: Path,
+                 cache: PipelineArtifactCache, force: bool) -> Path:
+        with self._stage(report, "extract") as stage:
+            version = self.processor.EXTRACTOR_VERSION
+            outputs = self.processor.raw_output_paths(file_path.stem)
+            if not force and cache.is_fresh(STAGE_EXTRACTION, file_path, version):
+                stage["status"] = "skipped"
+                return outputs[0]
+
+            task = self.processor.run_file_task(report["file_type"], file_path)
+            if not task["success"]:
+                raise IngestionError("Nenhum parâmetro extraído")
+            stage["parameters"] = task["parameters"]
+            cache.record(STAGE_EXTRACTION, file_path, version, outputs=outputs)
+            return outputs[0]
+
+    def _normalize(self, report: Dict[str, Any], raw_csv: Path,
+                   cache: PipelineArtifactCache, force: bool) -> Path:
+        with self._stage(report, "normalize") as stage:
+            normalizer = self.normalizer_class()
+            version = normalizer.NORMALIZER_VERSION
+            outputs = normalizer.normalized_output_paths(raw_csv.name)
+            if not force and cache.is_fresh(STAGE_NORMALIZATION, raw_csv, version):
+                stage["status"] = "skipped"
+                return outputs[0]
+
+            df = normalizer.normalize_csv(raw_csv)
+            normalizer.save_normalized(df, raw_csv.name)
+            stage["parameters"] = len(df)
+            cache.record(STAGE_NORMALIZATION, raw_csv, version, outputs=outputs)
+            return outputs[0]
+
+    def _detect(self, report: Dict[str, Any], file_path: Path) -> Dict[str, Any]:
+        with self._stage(report, "detect") as stage:
+            detection = self.detect_active_functions(file_path)
+            stage.update(model=detection.get("model"), active_functions=detection.get("active_functions", []))
+            if not detection.get("success"):
+                # Como na pipeline completa: sem detecção, os settings são importados mesmo assim
+                stage.update(status="not_detected", error=detection.get("error"))
+            return detection
+
+    def _load(self, report: Dict[str, Any], file_path: Path, norm_csv: Path,
+              detection: Dict[str, Any], cache: PipelineArtifactCache, force: bool) -> None:
+        with self._stage(report, "load") as stage:
+            importer = self.importer_class(incremental=True, bulk=True)
+            if not importer.connect():
+                raise IngestionError("Falha ao conectar ao PostgreSQL")
+            try:
+                version = importer.IMPORTER_VERSION
+                if not force and cache.is_fresh(STAGE_IMPORT, norm_csv, version):
+                    stage["settings"] = "skipped"
+                else:
+                    if not importer.process_file_bulk(norm_csv):
+                        raise IngestionError(importer.stats["errors"][-1])
+                    cache.record(STAGE_IMPORT, norm_csv, version)
+                    stage["settings"] = "replaced"
+                    stage["settings_inserted"] = importer.stats["settings_inserted"]
+                    stage["equipment_created"] = importer.stats["equipments_inserted"] > 0
+
+                if detection.get("success"):
+                    if not self._functions_table_ready:
+                        self._functions_table_ready = self.create_active_functions_table(importer.conn)
+                    stage["active_functions"] = self.replace_relay_functions(
+                        importer.conn, detection, str(file_path), self.function_descriptions
+                    )
+            finally:
+                importer.close()
+
+    @staticmethod
+    def _save_cache(cache: PipelineArtifactCache) -> None:
+        try:
+            cache.save()
+        except OSError as e:
+            # inputs/ pode estar montado somente leitura (container da API)
+            logger.warning(f"⚠️  Cache da pipeline não salvo: {e}")
+
+
+# Instância do processo (o extrator é caro de criar)
+_ingestion: Optional[SingleFileIngestion] = None
+
+
+def get_ingestion() -> SingleFileIngestion:
+    """Instância compartilhada pelo processo"""
+    global _ingestion
+    if _ingestion is None:
+        _ingestion = SingleFileIngestion()
+    return _ingestion
+
+
+def ingest_file(file_path: str, force: bool = False) -> Dict[str, Any]:
+    """Ponto de entrada do pool de processos (um arquivo por tarefa)"""
+    return get_ingestion().ingest(Path(file_path), force=force)
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Ingestão de um arquivo de relé (extract → load)")
+    parser.add_argument('file', type=Path, help="Arquivo do relé (.pdf, .S40, .txt)")
+    parser.add_argument('--force', action='store_true', help="Ignora o cache da pipeline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    report = ingest_file(str(args.file), force=args.force)
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    return 0 if report["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stage Frames - Formato intermediário tipado entre os estágios da pipeline
+=========================================================================
+
+Extração, normalização e importação trocavam dados por CSV texto, e cada
+estágio relia o CSV do anterior com a inferência de tipos do pandas:
+códigos como 0104 viravam o inteiro 104 (e deixavam de casar com os
+códigos ativos), valores como "None"/"NA" viravam ausentes e colunas
+booleanas com lacunas viravam object.
+
+Este módulo define o contrato entre os estágios:
+
+- Esquemas explícitos (RAW_PARAMS_SCHEMA, NORMALIZED_3NF_SCHEMA): cada
+  coluna é 'string', 'bool' ou 'int'; colunas extras (metadados do relé)
+  são 'string'. Texto vazio = ausente.
+- write_stage_frame: grava o CSV (cópia portável, lida por scripts
+  legados) e, com pyarrow instalado, o gêmeo Parquet com o esquema Arrow
+  correspondente (outputs/csv → outputs/parquet, outputs/norm_csv →
+  outputs/norm_parquet).
+- read_stage_frame: o estágio seguinte lê o Parquet quando ele existe e
+  não é mais antigo que o CSV; senão lê o CSV sem inferência (dtype=str) e
+  aplica o esquema. Nos dois casos o DataFrame resultante é o mesmo.
+
+Sem pyarrow tudo continua funcionando só com CSV tipado.
+
+Autor: Sistema ProtecAI
+Data: 2025-11-22
+"""
+
+from __future__ import annotations
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Esquema: coluna → tipo lógico ('string', 'bool' ou 'int')
+FrameSchema = Dict[str, str]
+
+# CSV bruto da extração (outputs/csv/*_params.csv)
+RAW_PARAMS_SCHEMA: FrameSchema = {
+    'Code': 'string',
+    'Description': 'string',
+    'Value': 'string',
+    'is_active': 'bool',
+}
+
+# CSV normalizado em 3FN (outputs/norm_csv/*_normalized.csv), entrada da importação
+NORMALIZED_3NF_SCHEMA: FrameSchema = {
+    'parameter_code': 'string',
+    'parameter_description': 'string',
+    'parameter_value': 'string',
+    'value_unit': 'string',
+    'value_type': 'string',
+    'is_active': 'bool',
+    'is_multipart': 'bool',
+    'multipart_base': 'string',
+    'multipart_part': 'int',
+    'source_file': 'string',
+    'extraction_date': 'string',
+}
+
+# Diretório do CSV → diretório do gêmeo Parquet
+PARQUET_DIRS = {
+    'csv': 'parquet',
+    'norm_csv': 'norm_parquet',
+}
+
+TRUE_STRINGS = frozenset({'true', '1', 'yes', 'sim'})
+
+
+def parquet_path_for(csv_path: Union[str, Path]) -> Path:
+    """outputs/csv/x.csv → outputs/parquet/x.parquet (outros diretórios: ao lado do CSV)"""
+    csv_path = Path(csv_path)
+    parent = csv_path.parent
+    if parent.name in PARQUET_DIRS:
+        parent = parent.parent / PARQUET_DIRS[parent.name]
+    return parent / f"{csv_path.stem}.parquet"
+
+
+def _column_kind(schema: FrameSchema, column: str) -> str:
+    return schema.get(column, 'string')
+
+
+def _to_bool(value) -> bool:
+    if value is None or value is pd.NA:
+        return False
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, float) and np.isnan(value):
+        return False
+    return str(value).strip().lower() in TRUE_STRINGS
+
+
+def _to_text(value):
+    if isinstance(value, str):
+        return value if value != '' else np.nan
+    return np.nan if pd.isna(value) else str(value)
+
+
+def _to_string(values: pd.Series) -> pd.Series:
+    """Texto (object) com NaN para ausentes e para texto vazio"""
+    return values.astype(object).map(_to_text).astype(object)
+
+
+def conform_frame(df: pd.DataFrame, schema: FrameSchema) -> pd.DataFrame:
+    """
+    Aplica o esquema às colunas presentes (colunas ausentes não são criadas).
+
+    - 'string': object com str; vazio/ausente = NaN
+    - 'bool': bool (ausente = False; aceita True/False, 'True', '1', 'yes')
+    - 'int': Int64 (inteiro com ausentes)
+
+    Returns:
+        Novo DataFrame, mesma ordem de colunas
+    """
+    out = df.copy()
+    for column in out.columns:
+        kind = _column_kind(schema, column)
+        if kind == 'bool':
+            out[column] = out[column].map(_to_bool).astype(bool)
+        elif kind == 'int':
+            out[column] = pd.to_numeric(out[column], errors='coerce').round().astype('Int64')
+        else:
+            out[column] = _to_string(out[column])
+    return out
+
+
+def arrow_schema(df: pd.DataFrame, schema: FrameSchema):
+    """Esquema Arrow das colunas do DataFrame (requer pyarrow)"""
+    types = {'string': pa.string(), 'bool': pa.bool_(), 'int': pa.int64()}
+    return pa.schema([(column, types[_column_kind(schema, column)]) for column in df.columns])
+
+
+def write_stage_frame(df: pd.DataFrame, csv_path: Union[str, Path], schema: FrameSchema,
+                      parquet: Optional[bool] = None, encoding: str = 'utf-8-sig') -> List[Path]:
+    """
+    Grava a saída de um estágio: CSV + gêmeo Parquet tipado.
+
+    Args:
+        df: DataFrame do estágio
+        csv_path: Caminho do CSV (o Parquet vai para parquet_path_for(csv_path))
+        schema: Esquema das colunas conhecidas
+        parquet: Gravar o Parquet. None = quando pyarrow estiver instalado
+        encoding: Codificação do CSV
+
+    Returns:
+        Arquivos gravados (CSV primeiro)
+    """
+    csv_path = Path(csv_path)
+    frame = conform_frame(df, schema)
+
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    frame.to_csv(csv_path, index=False, encoding=encoding)
+    written = [csv_path]
+
+    if parquet is None:
+        parquet = PARQUET_AVAILABLE
+    if parquet:
+        written.append(write_parquet(frame, parquet_path_for(csv_path), schema))
+    return written
+
+
+def write_parquet(df: pd.DataFrame, parquet_path: Union[str, Path], schema: FrameSchema) -> Path:
+    """Grava o DataFrame (já conformado) em Parquet com esquema explícito"""
+    parquet_path = Path(parquet_path)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    frame = df.astype({column: object for column in df.columns
+                       if _column_kind(schema, column) == 'string'})
+    frame = frame.where(frame.notna(), None)
+    table = pa.Table.from_pandas(frame, schema=arrow_schema(frame, schema), preserve_index=False)
+    pq.write_table(table, parquet_path)
+    return parquet_path
+
+
+def read_stage_frame(csv_path: Union[str, Path], schema: FrameSchema,
+                     encoding: str = 'utf-8-sig') -> pd.DataFrame:
+    """
+    Lê a saída do estágio anterior com tipos explícitos.
+
+    Prefere o gêmeo Parquet quando ele existe e não é mais antigo que o
+    CSV (um CSV editado à mão depois da extração continua valendo).
+
+    Args:
+        csv_path: CSV do estágio anterior
+        schema: Esquema das colunas conhecidas
+        encoding: Codificação do CSV (utf-8-sig também lê UTF-8 sem BOM)
+
+    Returns:
+        DataFrame conformado ao esquema
+    """
+    csv_path = Path(csv_path)
+    parquet_path = parquet_path_for(csv_path)
+
+    if PARQUET_AVAILABLE and parquet_path.exists() and (
+            not csv_path.exists() or parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns):
+        return conform_frame(pd.read_parquet(parquet_path), schema)
+
+    # Sem inferência: só o texto vazio é ausente ("None", "NA", "0104" ficam como texto)
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[''], encoding=encoding)
+    return conform_frame(df, schema)
+
+
+def stage_output_paths(csv_path: Union[str, Path]) -> List[Path]:
+    """
+    Arquivos obrigatórios que write_stage_frame gera para `csv_path` (para o
+    cache incremental).
+
+    O gêmeo Parquet fica de fora: é só um atalho de leitura (read_stage_frame
+    volta ao CSV sem ele), então a validade do cache não depende de pyarrow
+    estar instalado.
+    """
+    return [Path(csv_path)]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Text Line Clustering - Agrupamento de palavras em linhas por coordenada Y
+========================================================================
+
+Os extratores agrupavam palavras em linhas comparando cada palavra com
+TODAS as linhas já criadas (±3 pt), e a correlação checkbox ↔ texto
+varria todas as palavras da página para cada checkbox. Em relatórios
+MiCOM longos (P143/P241, centenas de páginas densas) isso é quadrático em
+palavras por página.
+
+Este módulo concentra essas operações com custo O(n log n):
+
+- cluster_lines: mesma regra gulosa dos extratores (cada palavra, na ordem
+  da página, entra na PRIMEIRA linha criada cuja âncora - y0 da palavra que
+  a criou - está a menos de `tolerance`), mas localizando as âncoras
+  candidatas por busca binária. Como duas âncoras nunca ficam a menos de
+  `tolerance` uma da outra, no máximo duas são candidatas. Ordenar por y0
+  antes de agrupar mudaria quais palavras ancoram cada linha, então a
+  ordem da página é mantida.
+- YBandIndex: itens ordenados por Y para consultas de faixa (|y - alvo| <
+  tolerância), devolvidos na ordem original da lista.
+- iter_page_words: itera as palavras página a página, sem manter o
+  documento inteiro em memória (teto de memória de page_stream).
+
+Autor: Sistema ProtecAI
+Data: 2025-11-18
+"""
+
+from __future__ import annotations
+import logging
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+from typing import Callable, Generic, Iterator, List, Sequence, Tuple, TypeVar, Union
+
+try:
+    from .page_stream import DEFAULT_MEMORY_LIMIT_MB, iter_pdf_pages
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from page_stream import DEFAULT_MEMORY_LIMIT_MB, iter_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# (x0, y0, x1, y1, "word", block_no, line_no, word_no)
+WordTuple = Tuple[float, float, float, float, str, int, int, int]
+
+# Tolerância vertical padrão para "mesma linha" (pontos PDF)
+LINE_TOLERANCE = 3.0
+
+
+def _word_y0(word: WordTuple) -> float:
+    return word[1]
+
+
+def cluster_lines(items: Sequence[T], tolerance: float = LINE_TOLERANCE,
+                  y_of: Callable[[T], float] = _word_y0) -> List[Tuple[float, List[T]]]:
+    """
+    Agrupa itens em linhas pela coordenada Y.
+
+    Equivalente ao laço:
+
+        for item in items:
+            chave = primeira chave (ordem de criação) com abs(chave - y) < tolerance
+            senão cria chave = y
+
+    Args:
+        items: Palavras (ou qualquer item com Y) na ordem da página
+        tolerance: Distância máxima (exclusiva) até a âncora da linha
+        y_of: Função que devolve o Y do item (padrão: y0 de get_text("words"))
+
+    Returns:
+        Lista de (âncora Y, itens da linha na ordem original), ordenada por âncora
+    """
+    anchors: List[float] = []   # Âncoras ordenadas por Y
+    created: dict = {}          # âncora → ordem de criação
+    lines: dict = {}            # âncora → itens
+
+    for item in items:
+        y = y_of(item)
+        found = None
+
+        # Âncoras dentro da tolerância formam um trecho contíguo ao redor de y
+        pos = bisect_left(anchors, y)
+        for index in (pos - 2, pos - 1, pos, pos + 1):
+            if 0 <= index < len(anchors) and abs(anchors[index] - y) < tolerance:
+                anchor = anchors[index]
+                if found is None or created[anchor] < created[found]:
+                    found = anchor
+
+        if found is None:
+            found = y
+            created[found] = len(created)
+            lines[found] = []
+            insort(anchors, found)
+
+        lines[found].append(item)
+
+    return [(anchor, lines[anchor]) for anchor in anchors]
+
+
+class YBandIndex(Generic[T]):
+    """Itens ordenados por Y para consultas de faixa vertical."""
+
+    def __init__(self, items: Sequence[T], y_of: Callable[[T], float] = _word_y0):
+        """
+        Args:
+            items: Itens a indexar (a ordem original é preservada nas consultas)
+            y_of: Função que devolve o Y do item
+        """
+        self.items = list(items)
+        self._order = sorted(range(len(self.items)), key=lambda i: y_of(self.items[i]))
+        self._ys = [y_of(self.items[i]) for i in self._order]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def within(self, y: float, tolerance: float) -> List[T]:
+        """
+        Itens com abs(y_item - y) < tolerance.
+
+        Args:
+            y: Coordenada Y alvo
+            tolerance: Distância máxima (exclusiva)
+
+        Returns:
+            Itens na mesma ordem em que aparecem na lista original
+        """
+        start = bisect_left(self._ys, y - tolerance)
+        end = bisect_right(self._ys, y + tolerance)
+        indices = sorted(self._order[k] for k in range(start, end)
+                         if abs(self._ys[k] - y) < tolerance)
+        return [self.items[i] for i in indices]
+
+
+def iter_page_words(pdf_path: Union[str, Path],
+                    memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> Iterator[Tuple[int, List[WordTuple]]]:
+    """
+    Palavras de cada página, uma página por vez.
+
+    Args:
+        pdf_path: Caminho do PDF
+        memory_limit_mb: Teto de memória entre páginas (ver page_stream)
+
+    Yields:
+        (índice da página 0-based, palavras de page.get_text("words"))
+    """
+    for page in iter_pdf_pages(pdf_path, memory_limit_mb=memory_limit_mb):
+        yield page.number, page.get_text("words")
@@ -22,7 +22,7 @@ import pandas as pd
 import re
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import logging
@@ -143,13 +143,8 @@ class UniversalGlossaryParser:
         Returns:
             Lista de parâmetros da aba
         """
-        # Carregar dados
-        df = pd.read_excel(
-            self.excel_path,
-            sheet_name=sheet_name,
-            header=None,
-            dtype=str
-        )
+        # Carregar dados do workbook já aberto (sem reprocessar o XLSX por aba)
+        df = self.workbook.parse(sheet_name, header=None, dtype=str)
         
         # Detectar fabricante/modelo
         fabricante, modelo, tipo_rele = self._detect_relay_info(df)
@@ -160,8 +155,8 @@ class UniversalGlossaryParser:
         current_group = None
         current_warning = None
         
-        # Processar linha por linha
-        for idx, row in df.iterrows():
+        # Processar linha por linha (tuplas: sem criar uma Series por linha)
+        for idx, *row in df.itertuples(name=None):
             # Detectar seção (célula amarela)
             section_info = self._detect_section(row, idx)
             if section_info:
@@ -247,7 +242,7 @@ class UniversalGlossaryParser:
         
         return fabricante, modelo, tipo_rele
     
-    def _detect_section(self, row: pd.Series, idx: int) -> Optional[Dict[str, str]]:
+    def _detect_section(self, row: Sequence[Any], idx: int) -> Optional[Dict[str, str]]:
         """
         Detecta se linha contém marcador de seção (célula amarela)
         
@@ -282,7 +277,7 @@ class UniversalGlossaryParser:
         
         return None
     
-    def _detect_warning(self, row: pd.Series) -> Optional[str]:
+    def _detect_warning(self, row: Sequence[Any]) -> Optional[str]:
         """
         Detecta se linha contém aviso importante
         
@@ -307,7 +302,7 @@ class UniversalGlossaryParser:
     
     def _extract_parameters_from_row(
         self,
-        row: pd.Series,
+        row: Sequence[Any],
         idx: int,
         fabricante: str,
         modelo: str,
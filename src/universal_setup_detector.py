@@ -34,6 +34,12 @@ import sys
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
 
+try:
+    from .relay_format_sniffer import sniff_filename
+except ImportError:
+    # Para execução direta (src/ no sys.path)
+    from relay_format_sniffer import sniff_filename
+
 # Tentar importar UniversalCheckboxDetector
 try:
     from universal_checkbox_detector import UniversalCheckboxDetector
@@ -110,16 +116,14 @@ class UniversalSetupDetector:
             RelayType identificado
         """
         try:
-            # 1. DETECÇÃO POR FILENAME (mais confiável)
+            # 1. DETECÇÃO POR FILENAME (mais confiável) - tabela de modelos compartilhada
             filename_lower = csv_path.name.lower()
+            sniff = sniff_filename(csv_path.name)
             
-            if any(model in filename_lower for model in ['p122', 'p220', 'p922']):
-                logger.info(f"  🔍 Tipo detectado por filename: easergy")
-                return RelayType.EASERGY
-            elif any(model in filename_lower for model in ['p143', 'p241']):
-                logger.info(f"  🔍 Tipo detectado por filename: micom")
-                return RelayType.MICOM
-            elif 'sepam' in filename_lower or filename_lower.endswith('.s40') or any(x in filename_lower for x in ['00-mf', '_2016-', '_2024-']):
+            if sniff.relay_type != 'unknown':
+                logger.info(f"  🔍 Tipo detectado por filename: {sniff.relay_type}")
+                return RelayType(sniff.relay_type)
+            elif 'sepam' in filename_lower or any(x in filename_lower for x in ['00-mf', '_2016-', '_2024-']):
                 logger.info(f"  🔍 Tipo detectado por filename: sepam")
                 return RelayType.SEPAM
             
@@ -8,17 +8,30 @@ Este módulo detecta e segmenta padrões típicos encontrados em sistemas de pro
 - Referências de planta (204-MF-02_rev.0)
 - Códigos de proteção estruturados
 
+Desempenho: os padrões são combinados em uma única regex de alternância
+(na mesma ordem de especificidade), que identifica o padrão em uma passada
+e despacha para o construtor de tokens correspondente. parse_value memoiza
+o resultado por valor (LRU) - exportações de relés repetem muito os mesmos
+valores - e parse_code/parse_codes_batch usam um parser compartilhado pelo
+processo (get_code_parser).
+
 Autor: Sistema ProtecAI
 Data: 2025-10-03
 """
 
 from __future__ import annotations
 import re
+import threading
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple, Union
+from functools import lru_cache
+from typing import Callable, List, Dict, Iterable, Optional, Tuple, Union
 from enum import Enum
 
 
+# Capacidade padrão do memo de parse_value (valores distintos)
+PARSE_CACHE_SIZE = 65536
+
+
 class TokenType(Enum):
     """Tipos de tokens identificados no parsing."""
     ANSI_CODE = "ansi_code"
@@ -47,7 +60,12 @@ class ParsedToken:
 
 @dataclass
 class ParseResult:
-    """Resultado completo do parsing de um valor."""
+    """
+    Resultado completo do parsing de um valor.
+
+    Resultados de parse_value são memoizados e compartilhados entre
+    chamadas com o mesmo valor: trate-os como somente leitura.
+    """
     original_value: str
     tokens: List[ParsedToken]
     is_atomic: bool  # True se o valor é atômico (não precisa normalização)
@@ -57,9 +75,14 @@ class ParseResult:
 class CodeParser:
     """Parser principal para códigos multivalorados."""
     
-    def __init__(self):
+    def __init__(self, cache_size: Optional[int] = PARSE_CACHE_SIZE):
+        """
+        Args:
+            cache_size: Capacidade do memo LRU de parse_value (None = ilimitado)
+        """
         self._setup_mappings()
         self._setup_patterns()
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse_clean_value)
     
     def _setup_mappings(self):
         """Configura dicionários de mapeamento de códigos conhecidos."""
@@ -166,6 +189,49 @@ class CodeParser:
         self.pattern_voltage = re.compile(
             r'^(\d+(?:\.\d+)?)k?V$', re.IGNORECASE
         )
+        
+        # Segmentação e classificação do parser genérico
+        self.pattern_generic_split = re.compile(r'[-_./ \\]')
+        self.pattern_generic_abbrev = re.compile(r'^[A-Z]+$')
+        
+        # Padrões em ordem de especificidade (o primeiro que casa vence)
+        self._pattern_table: List[Tuple[str, re.Pattern, Callable]] = [
+            ("ansi_full", self.pattern_ansi_full, self._build_ansi_full),
+            ("schneider_model", self.pattern_schneider_model, self._build_schneider_model),
+            ("plant_reference", self.pattern_plant_ref, self._build_plant_reference),
+            ("simple_model", self.pattern_simple_model, self._build_simple_model),
+            ("frequency", self.pattern_frequency, self._build_frequency),
+            ("voltage", self.pattern_voltage, self._build_voltage),
+            ("ansi_simple", self.pattern_ansi_simple, self._build_ansi_simple),
+        ]
+        self._compile_combined_pattern()
+    
+    def _compile_combined_pattern(self):
+        """
+        Combina os padrões em ^(?:(?P<p1>...)|(?P<p2>...)|...)$.
+        
+        A alternância é tentada da esquerda para a direita, então o grupo
+        nomeado que casa é o mesmo padrão que a tentativa sequencial
+        encontraria. Cada padrão mantém suas flags via grupo (?i:...).
+        """
+        alternatives = []
+        self._dispatch: Dict[str, Tuple[int, int, Callable]] = {}
+        group_offset = 0
+        
+        for name, pattern, builder in self._pattern_table:
+            body = pattern.pattern
+            assert body.startswith('^') and body.endswith('$'), name
+            body = body[1:-1]
+            if pattern.flags & re.IGNORECASE:
+                body = f"(?i:{body})"
+            alternatives.append(f"(?P<{name}>{body})")
+            
+            # Grupos internos vêm logo após o grupo nomeado
+            start = group_offset + 1
+            self._dispatch[name] = (start, start + pattern.groups, builder)
+            group_offset = start + pattern.groups
+        
+        self.pattern_combined = re.compile('^(?:' + '|'.join(alternatives) + ')$')
     
     def parse_value(self, value: str) -> ParseResult:
         """
@@ -185,25 +251,23 @@ class CodeParser:
                 pattern_detected="empty_or_invalid"
             )
         
-        clean_value = value.strip()
-        
-        # Tentar diferentes padrões em ordem de especificidade
-        patterns = [
-            (self._parse_ansi_full, "ansi_full"),
-            (self._parse_schneider_model, "schneider_model"),
-            (self._parse_plant_reference, "plant_reference"),
-            (self._parse_simple_model, "simple_model"),
-            (self._parse_frequency, "frequency"),
-            (self._parse_voltage, "voltage"),
-            (self._parse_ansi_simple, "ansi_simple"),
-            (self._parse_generic_tokens, "generic_tokens")
-        ]
-        
-        for parser_func, pattern_name in patterns:
-            result = parser_func(clean_value)
-            if result and result.tokens:
-                result.pattern_detected = pattern_name
-                return result
+        return self._parse_cached(value.strip())
+    
+    def _parse_clean_value(self, clean_value: str) -> ParseResult:
+        """Parsing de um valor já limpo (memoizado por parse_value)."""
+        # Uma passada pela regex combinada identifica o padrão específico
+        match = self.pattern_combined.match(clean_value)
+        if match:
+            pattern_name = match.lastgroup
+            start, end, builder = self._dispatch[pattern_name]
+            result = builder(clean_value, match.groups()[start:end])
+            result.pattern_detected = pattern_name
+            return result
+        
+        result = self._parse_generic_tokens(clean_value)
+        if result and result.tokens:
+            result.pattern_detected = "generic_tokens"
+            return result
         
         # Se nenhum padrão foi reconhecido, considerar atômico
         return ParseResult(
@@ -213,13 +277,44 @@ class CodeParser:
             pattern_detected="atomic"
         )
     
+    def parse_values(self, values: Iterable[str]) -> List[ParseResult]:
+        """
+        Parsing em lote: cada valor distinto é analisado uma única vez.
+        
+        Args:
+            values: Valores a analisar (na ordem desejada no resultado)
+            
+        Returns:
+            Um ParseResult por valor de entrada, na mesma ordem
+        """
+        unique: Dict[str, ParseResult] = {}
+        results = []
+        for value in values:
+            if not isinstance(value, str):  # Inválido: resultado vazio, sem memo
+                results.append(self.parse_value(value))
+                continue
+            result = unique.get(value)
+            if result is None:
+                result = unique[value] = self.parse_value(value)
+            results.append(result)
+        return results
+    
+    def cache_info(self):
+        """Estatísticas do memo de parse_value (hits, misses, maxsize, currsize)."""
+        return self._parse_cached.cache_info()
+    
+    def clear_cache(self):
+        """Esvazia o memo de parse_value."""
+        self._parse_cached.cache_clear()
+    
     def _parse_ansi_full(self, value: str) -> Optional[ParseResult]:
         """Parse padrão ANSI completo: 52-MP-20"""
         match = self.pattern_ansi_full.match(value)
-        if not match:
-            return None
-        
-        ansi_code, protection, sequence = match.groups()
+        return self._build_ansi_full(value, match.groups()) if match else None
+    
+    def _build_ansi_full(self, value: str, groups: Tuple) -> ParseResult:
+        """Tokens do padrão ANSI completo"""
+        ansi_code, protection, sequence = groups
         tokens = []
         
         # Token ANSI
@@ -261,10 +356,11 @@ class CodeParser:
     def _parse_schneider_model(self, value: str) -> Optional[ParseResult]:
         """Parse model number Schneider: P241311B2M0600J"""
         match = self.pattern_schneider_model.match(value)
-        if not match:
-            return None
-        
-        prefix, series, model, variant, config, code, suffix = match.groups()
+        return self._build_schneider_model(value, match.groups()) if match else None
+    
+    def _build_schneider_model(self, value: str, groups: Tuple) -> ParseResult:
+        """Tokens do model number Schneider"""
+        prefix, series, model, variant, config, code, suffix = groups
         tokens = []
         
         # Prefixo (P)
@@ -340,10 +436,11 @@ class CodeParser:
     def _parse_plant_reference(self, value: str) -> Optional[ParseResult]:
         """Parse referência de planta: 204-MF-02_rev.0"""
         match = self.pattern_plant_ref.match(value)
-        if not match:
-            return None
-        
-        area, unit, number, revision = match.groups()
+        return self._build_plant_reference(value, match.groups()) if match else None
+    
+    def _build_plant_reference(self, value: str, groups: Tuple) -> ParseResult:
+        """Tokens da referência de planta"""
+        area, unit, number, revision = groups
         tokens = []
         
         # Área/tag
@@ -393,10 +490,11 @@ class CodeParser:
     def _parse_simple_model(self, value: str) -> Optional[ParseResult]:
         """Parse model simples: P220-2, M220"""
         match = self.pattern_simple_model.match(value)
-        if not match:
-            return None
-        
-        prefix, base, variant = match.groups()
+        return self._build_simple_model(value, match.groups()) if match else None
+    
+    def _build_simple_model(self, value: str, groups: Tuple) -> ParseResult:
+        """Tokens do model simples"""
+        prefix, base, variant = groups
         tokens = []
         
         # Prefixo
@@ -438,10 +536,11 @@ class CodeParser:
     def _parse_frequency(self, value: str) -> Optional[ParseResult]:
         """Parse frequência: 60Hz, 50Hz"""
         match = self.pattern_frequency.match(value)
-        if not match:
-            return None
-        
-        freq_value = match.group(1)
+        return self._build_frequency(value, match.groups()) if match else None
+    
+    def _build_frequency(self, value: str, groups: Tuple) -> ParseResult:
+        """Token de frequência"""
+        freq_value = groups[0]
         tokens = [ParsedToken(
             value=freq_value,
             token_type=TokenType.FREQUENCY,
@@ -460,10 +559,11 @@ class CodeParser:
     def _parse_voltage(self, value: str) -> Optional[ParseResult]:
         """Parse tensão: 13.8kV, 230V"""
         match = self.pattern_voltage.match(value)
-        if not match:
-            return None
-        
-        voltage_value = match.group(1)
+        return self._build_voltage(value, match.groups()) if match else None
+    
+    def _build_voltage(self, value: str, groups: Tuple) -> ParseResult:
+        """Token de tensão"""
+        voltage_value = groups[0]
         is_kv = 'k' in value.lower()
         
         tokens = [ParsedToken(
@@ -484,10 +584,11 @@ class CodeParser:
     def _parse_ansi_simple(self, value: str) -> Optional[ParseResult]:
         """Parse código ANSI simples: 52, 67N"""
         match = self.pattern_ansi_simple.match(value)
-        if not match:
-            return None
-        
-        ansi_code = match.group(1)
+        return self._build_ansi_simple(value, match.groups()) if match else None
+    
+    def _build_ansi_simple(self, value: str, groups: Tuple) -> ParseResult:
+        """Token do código ANSI simples"""
+        ansi_code = groups[0]
         meaning = self.ansi_codes.get(ansi_code.upper(), f"Código ANSI {ansi_code} (não mapeado)")
         
         tokens = [ParsedToken(
@@ -515,8 +616,7 @@ class CodeParser:
             return None
         
         # Segmentar por separadores comuns
-        import re
-        tokens_raw = re.split(r'[-_./ \\]', value)
+        tokens_raw = self.pattern_generic_split.split(value)
         tokens_raw = [t.strip() for t in tokens_raw if t.strip()]
         
         if len(tokens_raw) <= 1:
@@ -542,7 +642,7 @@ class CodeParser:
                 token_type = TokenType.SEQUENCE_NUMBER
                 meaning = f"Número sequencial: {token_val}"
                 confidence = 0.6
-            elif re.match(r'^[A-Z]+$', token_val) and len(token_val) <= 4:
+            elif self.pattern_generic_abbrev.match(token_val) and len(token_val) <= 4:
                 meaning = f"Código/abreviação: {token_val}"
                 confidence = 0.5
             
@@ -562,15 +662,27 @@ class CodeParser:
         )
 
 
+# Parser compartilhado pelo processo (mapeamentos, regex e memo construídos uma vez)
+_shared_parser: Optional[CodeParser] = None
+_shared_lock = threading.Lock()
+
+
+def get_code_parser() -> CodeParser:
+    """Retorna o CodeParser compartilhado pelo processo."""
+    global _shared_parser
+    with _shared_lock:
+        if _shared_parser is None:
+            _shared_parser = CodeParser()
+        return _shared_parser
+
+
 # Função de conveniência para uso simples
 def parse_code(value: str) -> ParseResult:
     """Função de conveniência para fazer parsing de um código."""
-    parser = CodeParser()
-    return parser.parse_value(value)
+    return get_code_parser().parse_value(value)
 
 
 # Função para parsing em lote
 def parse_codes_batch(values: List[str]) -> List[ParseResult]:
-    """Faz parsing de uma lista de valores."""
-    parser = CodeParser()
-    return [parser.parse_value(v) for v in values]
\ No newline at end of file
+    """Faz parsing de uma lista de valores (valores repetidos analisados uma vez)."""
+    return get_code_parser().parse_values(values)
@@ -36,11 +36,11 @@ from datetime import datetime
 
 # Importar o parser de códigos
 try:
-    from .code_parser import CodeParser, ParseResult, ParsedToken, TokenType
+    from .code_parser import CodeParser, get_code_parser, ParseResult, ParsedToken, TokenType
 except ImportError:
     # Para execução direta
     sys.path.append(str(Path(__file__).parent))
-    from code_parser import CodeParser, ParseResult, ParsedToken, TokenType
+    from code_parser import CodeParser, get_code_parser, ParseResult, ParsedToken, TokenType
 
 
 # Configurações de diretórios
@@ -57,7 +57,7 @@ class NormalizedExcelGenerator:
     """Gerador de Excel normalizado para códigos multivalorados."""
     
     def __init__(self):
-        self.parser = CodeParser()
+        self.parser = get_code_parser()
         self.normalized_rows: List[Dict[str, Any]] = []
         self.max_tokens = 0  # Controla o número máximo de tokens encontrados
         self.stats = {
@@ -27,10 +27,10 @@ from datetime import datetime
 
 # Importar o parser de códigos
 try:
-    from .code_parser import CodeParser, ParseResult
+    from .code_parser import CodeParser, get_code_parser, ParseResult
 except ImportError:
     sys.path.append(str(Path(__file__).parent))
-    from code_parser import CodeParser, ParseResult
+    from code_parser import CodeParser, get_code_parser, ParseResult
 
 
 # Configurações de diretórios
@@ -49,7 +49,7 @@ class SeparatedOutputsGenerator:
     """Gerador de saídas normalizadas separadas por arquivo."""
     
     def __init__(self):
-        self.parser = CodeParser()
+        self.parser = get_code_parser()
         self.processed_files: List[Dict[str, Any]] = []
         self.global_stats = {
             'files_processed': 0,
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - CONCORRÊNCIA DA API DURANTE EXPORTAÇÕES
+Dispara N exportações de relatório em paralelo (/api/v1/reports/export/{fmt})
+e, ao mesmo tempo, mede a latência de requisições leves (GET /, uma a cada
+5 ms, medidas a partir do horário agendado) no mesmo worker. Com o event
+loop bloqueado por consultas síncronas ou geração de PDF, o p99 das
+requisições leves sobe para o tempo de uma exportação.
+
+Modos:
+- em processo (padrão): app ASGI via httpx, com equipamentos sintéticos no
+  lugar de ReportService.get_filtered_equipments (geração de PDF/XLSX real,
+  sem banco de dados)
+- --base-url http://host:porta: servidor em execução, com PostgreSQL real
+
+Uso:
+    python tests/benchmarks/benchmark_api_concurrency.py [--format pdf] [--exports 8]
+        [--probes 200] [--rows 300] [--base-url URL]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def synthetic_equipments(rows: int) -> list:
+    """Equipamentos no formato de get_filtered_equipments"""
+    return [
+        {
+            "id": n,
+            "tag_reference": f"52-MP-{n:03d}",
+            "serial_number": f"SN{n:06d}",
+            "substation": f"SE-{n % 7:02d}",
+            "bay": f"BAY-{n % 13:02d}",
+            "status": "ACTIVE",
+            "description": f"Alimentador {n}",
+            "model": {"name": "P220", "code": "P220", "voltage_class": "13.8kV", "technology": "digital"},
+            "manufacturer": {"name": "Schneider Electric", "country": "França"},
+            "created_at": None,
+        }
+        for n in range(rows)
+    ]
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _timed_get(client: httpx.AsyncClient, url: str, latencies: list, scheduled: float = None):
+    """GET medido a partir do horário agendado (inclui a espera por um loop bloqueado)"""
+    start = time.perf_counter() if scheduled is None else scheduled
+    response = await client.get(url)
+    latencies.append((time.perf_counter() - start) * 1000)
+    return response.status_code
+
+
+async def run_load(client: httpx.AsyncClient, fmt: str, exports: int, probes: int,
+                   interval: float = 0.005) -> dict:
+    """Exportações paralelas + sondas em intervalos fixos (carga em malha aberta)"""
+    export_latencies, probe_latencies = [], []
+    start = time.perf_counter()
+
+    async def probe(index: int):
+        scheduled = start + index * interval
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        await _timed_get(client, "/", probe_latencies, scheduled)
+
+    async def probe_loop():
+        await asyncio.gather(*[probe(i) for i in range(probes)])
+
+    results = await asyncio.gather(
+        *[_timed_get(client, f"/api/v1/reports/export/{fmt}", export_latencies) for _ in range(exports)],
+        probe_loop(),
+    )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_ms": elapsed * 1000,
+        "export_status": sorted(set(results[:-1])),
+        "export_p50": percentile(export_latencies, 50),
+        "export_p99": percentile(export_latencies, 99),
+        "probe_p50": percentile(probe_latencies, 50),
+        "probe_p99": percentile(probe_latencies, 99),
+        "probe_max": max(probe_latencies) if probe_latencies else 0.0,
+    }
+
+
+async def main_async(args):
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=300)
+        source = args.base_url
+    else:
+        from api.main import app
+        from api.services.report_service import ReportService
+
+        equipments = synthetic_equipments(args.rows)
+
+        async def fake_filtered_equipments(self, **filters):
+            return equipments
+
+        ReportService.get_filtered_equipments = fake_filtered_equipments
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300)
+        source = f"em processo ({args.rows} equipamentos sintéticos)"
+
+    async with client:
+        await _timed_get(client, f"/api/v1/reports/export/{args.format}", [])  # Aquecimento
+
+        print("=" * 80)
+        print("⏱️  BENCHMARK: LATÊNCIA DA API DURANTE EXPORTAÇÕES PARALELAS")
+        print("=" * 80)
+        print(f"🎯 Alvo: {source}")
+        print(f"📄 {args.exports} exportações {args.format.upper()} em paralelo + {args.probes} sondas GET /")
+
+        result = await run_load(client, args.format, args.exports, args.probes)
+
+    print(f"{'Métrica':<28} {'ms':>10}")
+    print(f"{'Tempo total':<28} {result['elapsed_ms']:>10.1f}")
+    print(f"{'Exportação p50':<28} {result['export_p50']:>10.1f}")
+    print(f"{'Exportação p99':<28} {result['export_p99']:>10.1f}")
+    print(f"{'Sonda GET / p50':<28} {result['probe_p50']:>10.1f}")
+    print(f"{'Sonda GET / p99':<28} {result['probe_p99']:>10.1f}")
+    print(f"{'Sonda GET / máx':<28} {result['probe_max']:>10.1f}")
+    print(f"📡 Status das exportações: {result['export_status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência da API durante exportações")
+    parser.add_argument('--format', default='pdf', choices=['csv', 'xlsx', 'pdf'], help="Formato exportado")
+    parser.add_argument('--exports', type=int, default=8, help="Exportações simultâneas")
+    parser.add_argument('--probes', type=int, default=200, help="Requisições leves durante a carga")
+    parser.add_argument('--rows', type=int, default=300, help="Equipamentos sintéticos (modo em processo)")
+    parser.add_argument('--base-url', help="Servidor em execução (ex: http://localhost:8000)")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
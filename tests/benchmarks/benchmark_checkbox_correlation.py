@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - CORRELAÇÃO CHECKBOX ↔ LINHA DE PARÂMETRO
+Compara a varredura ordenada de
+PreciseParameterExtractor.correlate_checkboxes_with_lines com a versão
+anterior (laço linha × checkbox + get_text recortado por checkbox) em
+páginas sintéticas de matriz de LEDs, onde L×C cresce rápido, e confere
+que as duas produzem exatamente o mesmo resultado.
+
+Uso:
+    python tests/benchmarks/benchmark_checkbox_correlation.py [--rows 100 200 400]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import fitz
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.precise_parameter_extractor import PreciseParameterExtractor, Checkbox, ParameterLine
+
+DPI_SCALE = 300 / 72
+ROW_HEIGHT = 9.36  # Espaçamento de linhas dos PDFs Easergy (pt)
+COLUMNS = (100, 220, 340, 460)
+LABELS = ("tI>", "tI>>", "tI>>>", "Trip", "Brkn Cond.", "tIe>", "Alarm", "Them")
+
+
+class LegacyCorrelationExtractor(PreciseParameterExtractor):
+    """Correlação anterior (O(L×C) + get_text recortado por checkbox) - referência"""
+
+    def correlate_checkboxes_with_lines(self, checkboxes, lines, page, dpi_scale=300/72,
+                                        word_index=None) -> List[Dict]:
+        results = []
+        matched_checkboxes = set()
+
+        for line in lines:
+            line_y = line.y_coordinate
+            matched_checkbox = None
+            min_distance = float('inf')
+
+            for checkbox in checkboxes:
+                distance = abs(checkbox.y / dpi_scale - line_y)
+                if distance < self.Y_TOLERANCE and distance < min_distance:
+                    matched_checkbox = checkbox
+                    min_distance = distance
+
+            has_marked_children = False
+            child_values = []
+            for checkbox in checkboxes:
+                distance_below = checkbox.y / dpi_scale - line_y
+                if 5 < distance_below < 100:
+                    matched_checkboxes.add(id(checkbox))
+                    if checkbox.is_marked:
+                        has_marked_children = True
+                        texto = self.extract_text_near_checkbox(page, checkbox, dpi_scale)
+                        if texto:
+                            child_values.append(texto)
+
+            is_active = (matched_checkbox is not None and matched_checkbox.is_marked) or has_marked_children
+            value = line.value
+            if child_values:
+                value = ", ".join(sorted(child_values))
+            elif matched_checkbox and matched_checkbox.is_marked and not line.value:
+                checkbox_text = self.extract_text_near_checkbox(page, matched_checkbox, dpi_scale)
+                if checkbox_text:
+                    value = checkbox_text
+                    matched_checkboxes.add(id(matched_checkbox))
+
+            results.append({
+                'Code': line.code, 'Description': line.description, 'Value': value,
+                'is_active': is_active, 'confidence': line.confidence,
+                'y_coordinate': line.y_coordinate,
+                'checkbox_density': matched_checkbox.density if matched_checkbox else 0.0
+            })
+
+        for checkbox in checkboxes:
+            if checkbox.is_marked and id(checkbox) not in matched_checkboxes:
+                checkbox_text = self.extract_text_near_checkbox(page, checkbox, dpi_scale)
+                if checkbox_text:
+                    parent_line = None
+                    checkbox_y_72 = checkbox.y / dpi_scale
+                    min_distance_above = float('inf')
+                    for line in lines:
+                        distance_above = checkbox_y_72 - line.y_coordinate
+                        if 0 < distance_above < 100 and distance_above < min_distance_above:
+                            parent_line = line
+                            min_distance_above = distance_above
+                    if parent_line:
+                        results.append({
+                            'Code': parent_line.code,
+                            'Description': f"{parent_line.description} → {checkbox_text}",
+                            'Value': checkbox_text, 'is_active': True, 'confidence': 0.95,
+                            'y_coordinate': checkbox_y_72, 'checkbox_density': checkbox.density
+                        })
+
+        return results
+
+
+def build_led_matrix_page(doc: fitz.Document, rows: int, seed: int = 7):
+    """
+    Página sintética de matriz de LEDs: a cada 4 linhas um parâmetro
+    "01xx: LED n:", nas demais checkboxes (4 colunas) com rótulos de função.
+
+    Returns:
+        (página, checkboxes, linhas de parâmetro)
+    """
+    rng = random.Random(seed)
+    page = doc.new_page(width=600, height=rows * ROW_HEIGHT + 80)
+    checkboxes, lines = [], []
+
+    for row in range(rows):
+        y = 40 + row * ROW_HEIGHT
+        if row % 4 == 0:
+            code = f"{0x100 + row // 4:04X}"
+            page.insert_text((60, y + 7), f"{code}: LED {row // 4}:", fontsize=7)
+            lines.append(ParameterLine(code=code, description=f"LED {row // 4}", value="",
+                                       y_coordinate=y, x_start=60, confidence=0.9))
+            continue
+
+        for x in COLUMNS:
+            page.insert_text((x + 10, y + 7), rng.choice(LABELS), fontsize=7)
+            checkboxes.append(Checkbox(
+                x=int(x * DPI_SCALE), y=int(y * DPI_SCALE), width=30, height=30,
+                is_marked=rng.random() < 0.25, density=0.0
+            ))
+
+    return page, checkboxes, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark correlação checkbox ↔ linha")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 200, 400],
+                        help="Linhas da matriz sintética")
+    args = parser.parse_args()
+
+    current = PreciseParameterExtractor()
+    legacy = LegacyCorrelationExtractor()
+
+    print("=" * 80)
+    print("⏱️  BENCHMARK: CORRELAÇÃO CHECKBOX ↔ LINHA (matriz de LEDs sintética)")
+    print("=" * 80)
+    print(f"{'Linhas':>7} {'L':>5} {'C':>6} {'L×C':>9} {'Anterior ms':>12} {'Varredura ms':>13} {'Ganho':>7}  Resultado")
+
+    for rows in args.rows:
+        doc = fitz.open()
+        page, checkboxes, lines = build_led_matrix_page(doc, rows)
+
+        start = time.perf_counter()
+        expected = legacy.correlate_checkboxes_with_lines(checkboxes, lines, page)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        result = current.correlate_checkboxes_with_lines(checkboxes, lines, page)
+        current_ms = (time.perf_counter() - start) * 1000
+
+        status = "✅ idêntico" if result == expected else "❌ DIVERGENTE"
+        print(f"{rows:>7} {len(lines):>5} {len(checkboxes):>6} {len(lines) * len(checkboxes):>9} "
+              f"{legacy_ms:>12.1f} {current_ms:>13.1f} {legacy_ms / current_ms:>6.1f}x  {status}")
+        doc.close()
+
+
+if __name__ == "__main__":
+    main()
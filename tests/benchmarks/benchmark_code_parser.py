@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - CODE PARSER
+Mede o parsing de todos os valores dos CSVs de outputs/csv:
+- parse_code anterior: um CodeParser novo por chamada + padrões tentados em
+  sequência (até 8 regex por valor)
+- regex combinada sem memo (CodeParser(cache_size=0))
+- parse_codes_batch: parser compartilhado + deduplicação + memo LRU
+
+Também confere que os três caminhos produzem os mesmos ParseResult.
+
+Uso:
+    python tests/benchmarks/benchmark_code_parser.py [--repeat N] [diretório ou csv ...]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.code_parser import CodeParser, ParseResult, parse_codes_batch, get_code_parser
+
+CSV_DIR = PROJECT_ROOT / "outputs" / "csv"
+
+
+class SequentialCodeParser(CodeParser):
+    """parse_value anterior: cada padrão tentado em ordem, sem memo"""
+
+    def parse_value(self, value):
+        if not isinstance(value, str) or not value.strip():
+            return ParseResult(original_value=value, tokens=[], is_atomic=True,
+                               pattern_detected="empty_or_invalid")
+
+        clean_value = value.strip()
+        patterns = [
+            (self._parse_ansi_full, "ansi_full"),
+            (self._parse_schneider_model, "schneider_model"),
+            (self._parse_plant_reference, "plant_reference"),
+            (self._parse_simple_model, "simple_model"),
+            (self._parse_frequency, "frequency"),
+            (self._parse_voltage, "voltage"),
+            (self._parse_ansi_simple, "ansi_simple"),
+            (self._parse_generic_tokens, "generic_tokens"),
+        ]
+        for parser_func, pattern_name in patterns:
+            result = parser_func(clean_value)
+            if result and result.tokens:
+                result.pattern_detected = pattern_name
+                return result
+
+        return ParseResult(original_value=clean_value, tokens=[], is_atomic=True,
+                           pattern_detected="atomic")
+
+
+def load_values(paths) -> tuple:
+    """(arquivos CSV, todas as células como texto)"""
+    csv_files = []
+    for path in paths:
+        csv_files.extend(sorted(path.glob("*.csv")) if path.is_dir() else [path])
+
+    values = []
+    for csv_file in csv_files:
+        df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+        for column in df.columns:
+            values.extend(df[column].tolist())
+    return csv_files, values
+
+
+def _timed(func, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do CodeParser")
+    parser.add_argument('paths', nargs='*', type=Path, help="Diretórios/CSVs (padrão: outputs/csv)")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições (melhor tempo)")
+    args = parser.parse_args()
+
+    csv_files, values = load_values(args.paths or [CSV_DIR])
+    if not values:
+        print(f"❌ Nenhum valor encontrado em {', '.join(str(p) for p in args.paths or [CSV_DIR])}")
+        return
+
+    def legacy():
+        return [SequentialCodeParser().parse_value(value) for value in values]
+
+    def combined():
+        uncached = CodeParser(cache_size=0)
+        return [uncached.parse_value(value) for value in values]
+
+    def batch():
+        get_code_parser().clear_cache()  # Memo frio a cada repetição
+        return parse_codes_batch(values)
+
+    print("=" * 80)
+    print("⏱️  BENCHMARK: CODE PARSER")
+    print("=" * 80)
+    print(f"📁 Arquivos: {len(csv_files)}   Valores: {len(values)}   Distintos: {len(set(values))}")
+    print(f"{'Caminho':<36} {'Tempo (ms)':>11} {'µs/valor':>10} {'Ganho':>8}")
+
+    reference = None
+    baseline = None
+    identical = True
+    for label, func in [("parse_code anterior (sequencial)", legacy),
+                        ("regex combinada, sem memo", combined),
+                        ("parse_codes_batch (memo + dedup)", batch)]:
+        elapsed, results = _timed(func, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<36} {elapsed * 1000:>11.1f} {elapsed / len(values) * 1e6:>10.2f} "
+              f"{baseline / elapsed:>7.1f}x")
+
+        if reference is None:
+            reference = results
+        elif results != reference:
+            identical = False
+            print("   ❌ Resultados divergem do parser sequencial")
+
+    if identical:
+        print("\n✅ Resultados idênticos ao parser sequencial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - EXTRAÇÃO MiCOM EM MEMÓRIA vs. EM FLUXO (PÁGINA A PÁGINA)
+Gera relatórios MiCOM sintéticos (P143, linhas densas por página) e mede,
+em um processo novo por execução:
+
+- pico de RSS (ru_maxrss do processo filho)
+- tempo até a primeira linha gravada no CSV
+- tempo total
+
+Modo "memória": extract_from_micom + DataFrame.to_csv (CSV só no fim).
+Modo "fluxo": IntelligentRelayExtractor.stream_to_csv (CSV página a página,
+teto de memória entre páginas). Com o fluxo o pico de RSS não cresce com o
+número de páginas.
+
+Uso:
+    python tests/benchmarks/benchmark_page_stream.py [--pages 50 300] [--lines 60]
+        [--memory-limit-mb 64]
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def build_micom_pdf(path: Path, pages: int, lines: int) -> None:
+    """Relatório MiCOM sintético: `lines` parâmetros por página"""
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        for line in range(lines):
+            code = f"{page_num % 100:02d}.{line:02X}"
+            page.insert_text((40, 40 + line * 12), f"{code}: Setting {page_num}-{line}: {line * 0.5:.2f} A",
+                             fontsize=8)
+    doc.save(str(path))
+    doc.close()
+
+
+def run_child(mode: str, pdf_path: Path, csv_path: Path, memory_limit_mb: float) -> dict:
+    """Executado no processo filho: extrai e devolve tempos"""
+    from src.intelligent_relay_extractor import IntelligentRelayExtractor, RAW_PDF_COLUMNS
+    from src.page_stream import IncrementalCSVWriter
+
+    extractor = IntelligentRelayExtractor()
+    start = time.perf_counter()
+    first_row = None
+
+    if mode == "memory":
+        df = extractor.extract_from_micom(pdf_path)
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        first_row = time.perf_counter() - start
+        rows = len(df)
+    else:
+        with IncrementalCSVWriter(csv_path, RAW_PDF_COLUMNS, dedupe_on=['Code', 'Description']) as writer:
+            for page_rows in extractor.iter_micom_rows(pdf_path, memory_limit_mb):
+                if writer.write_rows(page_rows) and first_row is None:
+                    first_row = time.perf_counter() - start
+        rows = writer.rows_written
+
+    return {
+        "rows": rows,
+        "first_row_s": first_row or 0.0,
+        "total_s": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def measure(mode: str, pdf_path: Path, memory_limit_mb: float) -> dict:
+    csv_path = pdf_path.with_suffix(f".{mode}.csv")
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode, str(pdf_path), str(csv_path), str(memory_limit_mb)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extração MiCOM em memória vs. em fluxo")
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 300])
+    parser.add_argument('--lines', type=int, default=60, help="Parâmetros por página")
+    parser.add_argument('--memory-limit-mb', type=float, default=64)
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, pdf_path, csv_path, limit = args.child
+        print(json.dumps(run_child(mode, Path(pdf_path), Path(csv_path), float(limit))))
+        return
+
+    print("=" * 88)
+    print("📄 EXTRAÇÃO MiCOM: EM MEMÓRIA vs. EM FLUXO")
+    print("=" * 88)
+    print(f"{'Páginas':>8} {'Modo':>8} {'Linhas':>8} {'1ª linha':>10} {'Total':>9} {'Pico RSS':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = Path(tmp) / f"P143_{pages}p.pdf"
+            build_micom_pdf(pdf_path, pages, args.lines)
+            for mode in ("memory", "stream"):
+                result = measure(mode, pdf_path, args.memory_limit_mb)
+                print(f"{pages:>8} {mode:>8} {result['rows']:>8} {result['first_row_s']:>9.2f}s "
+                      f"{result['total_s']:>8.2f}s {result['peak_rss_mb']:>8.1f}MB")
+
+    print("=" * 88)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - VARREDURA DE SELETIVIDADE
+Planta sintética com S estudos radiais de N relés (mesmo gerador do
+benchmark de coordenação TCC), F níveis de falta por local:
+- cálculo escalar ponto a ponto de um estudo (amostra de pares, extrapolado)
+- SelectivitySweepEngine, um estudo
+- planta inteira em sequência
+- planta inteira em paralelo (um estudo por processo, como batch/analyze-studies)
+
+Uso:
+    python tests/benchmarks/benchmark_selectivity_sweep.py [--studies 12] [--relays 500]
+        [--fault-levels 2000] [--workers 4] [--legacy-pairs 100]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from api.services.selectivity_sweep_engine import SelectivitySweepEngine, backup_pairs, sweep_study
+from api.services.tcc_coordination_engine import fault_current_grid, settings_arrays
+from benchmark_tcc_coordination import synthetic_study, scalar_pair_cti
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da varredura de seletividade")
+    parser.add_argument('--studies', type=int, default=12, help="Estudos na planta")
+    parser.add_argument('--relays', type=int, default=500, help="Relés por estudo")
+    parser.add_argument('--fault-levels', type=int, default=2000, help="Níveis de falta por local")
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help="Processos no modo lote")
+    parser.add_argument('--legacy-pairs', type=int, default=100, help="Pares medidos no cálculo escalar")
+    args = parser.parse_args()
+
+    config = {"fault_levels": args.fault_levels}
+    engine = SelectivitySweepEngine.from_config(config)
+    plant = [synthetic_study(args.relays, seed=seed) for seed in range(args.studies)]
+
+    study = plant[0]
+    backups, primaries, _ = backup_pairs(study)
+    grid = fault_current_grid(settings_arrays(study)["pickup"], args.fault_levels).tolist()
+    sample = random.Random(1).sample(list(zip(backups.tolist(), primaries.tolist())),
+                                     min(args.legacy_pairs, len(backups)))
+
+    print("=" * 80)
+    print("⏱️  BENCHMARK: VARREDURA DE SELETIVIDADE")
+    print("=" * 80)
+    print(f"🏭 Estudos: {args.studies} × {args.relays} relés   Pares (retaguarda, primário) por estudo: "
+          f"{len(backups)}   Níveis de falta: {args.fault_levels}   CPUs: {os.cpu_count()}")
+    print(f"{'Caminho':<44} {'Tempo (s)':>10}")
+
+    start = time.perf_counter()
+    for u, d in sample:
+        scalar_pair_cti(study[u], study[d], grid)
+    legacy_study = (time.perf_counter() - start) / len(sample) * len(backups)
+    print(f"{'escalar, 1 estudo (extrapolado)':<44} {legacy_study:>10.2f}")
+    print(f"{'escalar, planta (extrapolado)':<44} {legacy_study * args.studies:>10.2f}")
+
+    start = time.perf_counter()
+    single = engine.analyze(study)
+    print(f"{'SelectivitySweepEngine, 1 estudo':<44} {time.perf_counter() - start:>10.2f}")
+
+    start = time.perf_counter()
+    sequential = [sweep_study(relays, config) for relays in plant]
+    print(f"{'planta em sequência':<44} {time.perf_counter() - start:>10.2f}")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        parallel = list(pool.map(sweep_study, plant, [config] * len(plant)))
+    print(f"{f'planta em paralelo ({args.workers} processos)':<44} {time.perf_counter() - start:>10.2f}")
+
+    violations = sum(len(result["violations"]) for result in parallel)
+    identical = [r["results"] for r in sequential] == [r["results"] for r in parallel]
+    print(f"\n⚠️  Violações na planta: {violations}   (1º estudo: {len(single['violations'])})")
+    print("✅ Paralelo idêntico ao sequencial" if identical else "❌ Paralelo diverge do sequencial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - COORDENAÇÃO TCC
+Estudo sintético radial (barra principal → alimentadores → barras de
+carga) com N relés, comparando:
+- laço por par anterior: todos os pares i < j, curvas avaliadas em Python
+  ponto a ponto da grade (amostra de pares, tempo extrapolado)
+- motor NumPy sem poda (todos os pares)
+- motor NumPy com poda por topologia (padrão do EtapService)
+
+Também confere que o CTI do motor é igual ao do cálculo escalar nos pares
+adjacentes.
+
+Uso:
+    python tests/benchmarks/benchmark_tcc_coordination.py [--relays 500] [--grid-points 200]
+        [--legacy-pairs 2000] [--repeat 3]
+"""
+
+import sys
+import math
+import time
+import random
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.services.tcc_coordination_engine import (
+    RelaySetting, TCCCoordinationEngine, settings_arrays, fault_current_grid, adjacent_pairs,
+)
+
+CURVES = ["IEC_SI", "IEC_VI", "IEC_EI", "IEEE_MI", "IEEE_VI", "IEEE_EI"]
+
+
+def synthetic_study(relays: int, seed: int = 7) -> list:
+    """Barra principal com alimentadores; cada alimentador alimenta uma barra com entrada + 9 saídas"""
+    rng = random.Random(seed)
+    study = [RelaySetting("INC-B00", pickup=4000, time_dial=0.6, curve="IEC_SI", bus="B00", bay="INC")]
+    bus = 0
+    while len(study) < relays:
+        bus += 1
+        feeder = f"AL-B00-{bus:03d}"
+        study.append(RelaySetting(feeder, pickup=rng.uniform(800, 1200), time_dial=rng.uniform(0.3, 0.5),
+                                  curve=rng.choice(CURVES), bus="B00", bay=f"AL{bus}",
+                                  instantaneous_pickup=rng.uniform(8000, 12000), instantaneous_delay=0.1))
+        study.append(RelaySetting(f"INC-B{bus:03d}", pickup=rng.uniform(700, 1000), time_dial=rng.uniform(0.2, 0.4),
+                                  curve=rng.choice(CURVES), bus=f"B{bus:03d}", bay="INC", upstream=feeder))
+        for n in range(9):
+            study.append(RelaySetting(f"AL-B{bus:03d}-{n}", pickup=rng.uniform(50, 300),
+                                      time_dial=rng.uniform(0.05, 0.3), curve=rng.choice(CURVES),
+                                      bus=f"B{bus:03d}", bay=f"AL{n}",
+                                      instantaneous_pickup=rng.uniform(2000, 5000)))
+    return study[:relays]
+
+
+def scalar_trip_time(relay: RelaySetting, current: float) -> float:
+    """Curva avaliada ponto a ponto (referência)"""
+    a, b, p = relay.curve_constants
+    multiple = current / relay.pickup
+    time_value = math.inf
+    if multiple > 1.0:
+        time_value = relay.time_dial * (a / (multiple ** p - 1.0) + b)
+        time_value = max(time_value, relay.minimum_time)
+        if relay.maximum_time is not None:
+            time_value = min(time_value, relay.maximum_time)
+    if relay.instantaneous_pickup is not None and current >= relay.instantaneous_pickup:
+        time_value = min(time_value, relay.instantaneous_delay)
+    return time_value
+
+
+def scalar_pair_cti(upstream: RelaySetting, downstream: RelaySetting, grid) -> float:
+    """Menor t_upstream − t_downstream onde o relé a jusante atua"""
+    worst = math.inf
+    for current in grid:
+        t_down = scalar_trip_time(downstream, current)
+        if math.isfinite(t_down):
+            worst = min(worst, scalar_trip_time(upstream, current) - t_down)
+    return worst
+
+
+def _timed(func, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de coordenação TCC")
+    parser.add_argument('--relays', type=int, default=500, help="Relés no estudo sintético")
+    parser.add_argument('--grid-points', type=int, default=200, help="Pontos da grade de correntes")
+    parser.add_argument('--legacy-pairs', type=int, default=2000, help="Pares medidos no laço escalar")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições (melhor tempo)")
+    args = parser.parse_args()
+
+    relays = synthetic_study(args.relays)
+    engine = TCCCoordinationEngine(grid_points=args.grid_points)
+    grid = fault_current_grid(settings_arrays(relays)["pickup"], args.grid_points).tolist()
+    total_pairs = len(relays) * (len(relays) - 1) // 2
+
+    all_pairs = [(i, j) for i in range(len(relays)) for j in range(i + 1, len(relays))]
+    sample = random.Random(1).sample(all_pairs, min(args.legacy_pairs, total_pairs))
+
+    def legacy():
+        return [scalar_pair_cti(relays[i], relays[j], grid) for i, j in sample]
+
+    def vectorized_all_pairs():
+        unlinked = [RelaySetting(r.name, r.pickup, r.time_dial, r.curve,
+                                 instantaneous_pickup=r.instantaneous_pickup,
+                                 instantaneous_delay=r.instantaneous_delay) for r in relays]
+        return engine.analyze(unlinked)
+
+    print("=" * 80)
+    print("⏱️  BENCHMARK: COORDENAÇÃO TCC")
+    print("=" * 80)
+    print(f"📁 Relés: {len(relays)}   Pares possíveis: {total_pairs}   Grade: {args.grid_points} correntes")
+    print(f"{'Caminho':<40} {'Pares':>8} {'Tempo (ms)':>12} {'Ganho':>8}")
+
+    legacy_elapsed, _ = _timed(legacy, 1)
+    legacy_total = legacy_elapsed / len(sample) * total_pairs
+    print(f"{'laço por par anterior (extrapolado)':<40} {total_pairs:>8} {legacy_total * 1000:>12.1f} {'1.0x':>8}")
+
+    for label, func in [("NumPy, todos os pares", vectorized_all_pairs),
+                        ("NumPy, poda por topologia", lambda: engine.analyze(relays))]:
+        elapsed, analysis = _timed(func, args.repeat)
+        print(f"{label:<40} {analysis['total_pairs_analyzed']:>8} {elapsed * 1000:>12.1f} "
+              f"{legacy_total / elapsed:>7.0f}x")
+
+    analysis = engine.analyze(relays)
+    upstream, downstream, _ = adjacent_pairs(relays)
+    expected = np.array([scalar_pair_cti(relays[u], relays[d], grid) for u, d in zip(upstream, downstream)])
+    got = np.array([r["coordination_time_interval"] if r["coordination_time_interval"] is not None else math.inf
+                    for r in analysis["results"]])
+    finite = np.isfinite(expected)
+    identical = (np.array_equal(finite, np.isfinite(got))
+                 and np.allclose(got[finite], expected[finite], atol=1e-4))
+
+    print(f"\n⚠️  Violações (CTI < {engine.required_margin}s): {len(analysis['violations'])} "
+          f"de {analysis['total_pairs_analyzed']} pares adjacentes")
+    print("✅ CTI idêntico ao cálculo escalar" if identical else "❌ CTI diverge do cálculo escalar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK - BUSCAS ILIKE E TYPEAHEAD COM ÍNDICES TRIGRAMA (pg_trgm)
+Cria um schema isolado no PostgreSQL local com uma frota sintética
+(padrão: 100 mil relés, 5 ajustes e 3 funções ativas por relé), mede as
+consultas com curinga inicial usadas pela API antes e depois de aplicar
+docs/sql/migration_trigram_search_2025-11-22.sql (com o schema trocado) e
+remove o schema ao final.
+
+Consultas medidas:
+- filtro de equipamentos por tag / barra / subestação (get_filtered_equipments)
+- relay_file ILIKE (GET /relays/{relay_id}/active-functions)
+- typeahead unificado (GET /api/v1/search/typeahead), mesmo SQL da API
+
+Requer PostgreSQL acessível (settings.DATABASE_URL ou --database-url) e
+permissão para CREATE EXTENSION pg_trgm / CREATE SCHEMA.
+
+Uso:
+    python tests/benchmarks/benchmark_trigram_search.py [--relays 100000]
+        [--settings-per-relay 5] [--repeat 5] [--schema bench_trigram_search]
+        [--database-url URL] [--keep]
+"""
+
+import re
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.core.config import settings
+from api.services.search_service import SEARCH_SOURCES, build_typeahead_sql, like_escape
+
+MIGRATION = PROJECT_ROOT / "docs" / "sql" / "migration_trigram_search_2025-11-22.sql"
+
+SCHEMA_DDL = """
+CREATE TABLE {schema}.fabricantes (id SERIAL PRIMARY KEY, nome_completo VARCHAR(100));
+CREATE TABLE {schema}.manufacturers (id SERIAL PRIMARY KEY, name VARCHAR(100));
+CREATE TABLE {schema}.relay_models (
+    id SERIAL PRIMARY KEY, model_name VARCHAR(100), manufacturer_id INTEGER);
+CREATE TABLE {schema}.relay_equipment (
+    id SERIAL PRIMARY KEY, equipment_tag VARCHAR(50), relay_model_id INTEGER,
+    substation_name VARCHAR(100), barra_nome VARCHAR(50), status VARCHAR(20));
+CREATE TABLE {schema}.relay_settings (
+    id SERIAL PRIMARY KEY, equipment_id INTEGER, parameter_code VARCHAR(50));
+CREATE TABLE {schema}.active_protection_functions (
+    id SERIAL PRIMARY KEY, relay_file VARCHAR(255), relay_model VARCHAR(100),
+    function_code VARCHAR(50))
+"""
+
+SEED_SQL = """
+INSERT INTO {schema}.fabricantes (nome_completo)
+SELECT unnest(ARRAY['Schneider Electric', 'General Electric', 'Siemens', 'ABB',
+                    'Schweitzer Engineering Laboratories', 'Areva', 'Alstom', 'Pextron']);
+INSERT INTO {schema}.manufacturers (name) SELECT nome_completo FROM {schema}.fabricantes;
+INSERT INTO {schema}.relay_models (model_name, manufacturer_id)
+SELECT (ARRAY['MiCOM P', 'SEPAM S', 'SEL-', 'REF', 'Multilin F', 'URP'])[1 + g % 6] || (100 + g),
+       1 + g % 8
+FROM generate_series(1, 60) AS g;
+INSERT INTO {schema}.relay_equipment (equipment_tag, relay_model_id, substation_name, barra_nome, status)
+SELECT lpad((g % 100)::text, 2, '0') || '-' || (ARRAY['MF', 'MP', 'MK', 'TF'])[1 + g % 4]
+           || '-' || lpad(g::text, 6, '0'),
+       1 + g % 60,
+       'SE-' || (ARRAY['NORTE', 'SUL', 'LESTE', 'OESTE', 'CENTRO'])[1 + g % 5] || '-' || (g % 300),
+       'Z' || (g % 2000),
+       (ARRAY['ACTIVE', 'ACTIVE', 'ACTIVE', 'MAINTENANCE'])[1 + g % 4]
+FROM generate_series(1, :relays) AS g;
+INSERT INTO {schema}.relay_settings (equipment_id, parameter_code)
+SELECT 1 + g % :relays, (ARRAY['I', 'IN', 'V', 'F', 'T', 'K'])[1 + g % 6] || lpad((g % 997)::text, 3, '0')
+FROM generate_series(1, :relays * :settings_per_relay) AS g;
+INSERT INTO {schema}.active_protection_functions (relay_file, relay_model, function_code)
+SELECT re.equipment_tag || '.pdf', rm.model_name, fn
+FROM {schema}.relay_equipment re
+JOIN {schema}.relay_models rm ON rm.id = re.relay_model_id
+CROSS JOIN unnest(ARRAY['50', '51', '67']) AS fn;
+ANALYZE {schema}.relay_equipment;
+ANALYZE {schema}.relay_settings;
+ANALYZE {schema}.active_protection_functions
+"""
+
+# (nome, SQL, termo) - {schema} substituído; :pattern = '%termo%'
+QUERIES = [
+    ("tag ILIKE", "SELECT id FROM {schema}.relay_equipment WHERE equipment_tag ILIKE :pattern", "MF-01234"),
+    ("barra ILIKE", "SELECT id FROM {schema}.relay_equipment WHERE barra_nome ILIKE :pattern", "Z1234"),
+    ("subestação ILIKE", "SELECT id FROM {schema}.relay_equipment WHERE substation_name ILIKE :pattern",
+     "LESTE-27"),
+    ("relay_file ILIKE",
+     "SELECT id FROM {schema}.active_protection_functions WHERE relay_file ILIKE :pattern", "MK-004567"),
+    ("parameter_code ILIKE",
+     "SELECT DISTINCT parameter_code FROM {schema}.relay_settings WHERE parameter_code ILIKE :pattern", "IN42"),
+]
+
+TYPEAHEAD_TERMS = ["MF-0123", "P12", "sepam", "Z199"]
+
+
+def split_statements(sql: str) -> list:
+    """Comandos do arquivo de migration (sem comentários)"""
+    body = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+    return [statement.strip() for statement in body.split(";") if statement.strip()]
+
+
+def migration_statements(schema: str) -> list:
+    """Migration trigrama apontando para o schema do benchmark"""
+    sql = re.sub(r"\bprotec_ai\.", f"{schema}.", MIGRATION.read_text(encoding="utf-8"))
+    return split_statements(sql)
+
+
+def timed(conn, sql: str, params: dict, repeat: int) -> tuple:
+    """Mediana (ms) de `repeat` execuções e número de linhas"""
+    timings, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(conn.execute(text(sql), params).fetchall())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def measure(conn, schema: str, repeat: int) -> dict:
+    """Tempos de todas as consultas do benchmark"""
+    results = {}
+    for name, sql, term in QUERIES:
+        results[name] = timed(conn, sql.format(schema=schema), {"pattern": f"%{like_escape(term)}%"}, repeat)
+
+    typeahead_sql = build_typeahead_sql(list(SEARCH_SOURCES), trigram=True, schema=schema)
+    for term in TYPEAHEAD_TERMS:
+        escaped = like_escape(term)
+        results[f"typeahead '{term}'"] = timed(conn, typeahead_sql, {
+            "q": term, "pattern": f"%{escaped}%", "prefix": f"{escaped}%", "per_kind": 10, "limit": 10,
+        }, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de buscas ILIKE/typeahead com pg_trgm")
+    parser.add_argument("--relays", type=int, default=100_000, help="Relés sintéticos")
+    parser.add_argument("--settings-per-relay", type=int, default=5, help="Ajustes por relé")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por consulta (mediana)")
+    parser.add_argument("--schema", default="bench_trigram_search", help="Schema temporário")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="URL do PostgreSQL")
+    parser.add_argument("--keep", action="store_true", help="Não remover o schema ao final")
+    args = parser.parse_args()
+
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", args.schema):
+        parser.error("--schema deve ser um identificador simples (minúsculas, dígitos, _)")
+
+    engine = create_engine(args.database_url, isolation_level="AUTOCOMMIT")
+    schema = args.schema
+
+    print("=" * 78)
+    print("🔎 BENCHMARK - ÍNDICES TRIGRAMA (pg_trgm)")
+    print("=" * 78)
+    print(f"Relés: {args.relays:,} | Ajustes: {args.relays * args.settings_per_relay:,} | "
+          f"Funções ativas: {args.relays * 3:,} | Repetições: {args.repeat}")
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for statement in split_statements(SCHEMA_DDL.format(schema=schema)):
+                conn.execute(text(statement))
+
+            start = time.perf_counter()
+            for statement in split_statements(SEED_SQL.format(schema=schema)):
+                conn.execute(text(statement), {"relays": args.relays,
+                                               "settings_per_relay": args.settings_per_relay})
+            print(f"🌱 Frota sintética criada em {time.perf_counter() - start:.1f}s")
+
+            before = measure(conn, schema, args.repeat)
+
+            start = time.perf_counter()
+            for statement in migration_statements(schema):
+                conn.execute(text(statement))
+            print(f"🏗️  Migration trigrama aplicada em {time.perf_counter() - start:.1f}s")
+
+            after = measure(conn, schema, args.repeat)
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+    print()
+    print(f"{'Consulta':<28} {'Linhas':>8} {'Sem índice':>12} {'Com GIN':>10} {'Speedup':>9}")
+    print("-" * 78)
+    for name, (ms_before, rows) in before.items():
+        ms_after, _ = after[name]
+        speedup = ms_before / ms_after if ms_after else float("inf")
+        print(f"{name:<28} {rows:>8} {ms_before:>10.1f}ms {ms_after:>8.1f}ms {speedup:>8.1f}x")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
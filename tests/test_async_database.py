@@ -0,0 +1,139 @@
+"""
+Testes da camada assíncrona de banco e execução fora do event loop
+(api/core/database.py, api/core/concurrency.py).
+Sem PostgreSQL: o engine síncrono é substituído por um dublê cuja conexão
+bloqueia a thread, e o teste verifica que o event loop continua livre.
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import api.core.database as database
+from api.core.database import async_database_url, get_async_db, run_read
+from api.core.concurrency import blocking, cpu_bound, shutdown_render_pool
+from api.services.report_service import ReportService
+
+
+class _SlowConnection:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __enter__(self):
+        time.sleep(self.delay)  # Consulta psycopg2 bloqueante
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _SlowEngine:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def connect(self):
+        return _SlowConnection(self.delay)
+
+
+class _FakeAsyncSession:
+    def __init__(self):
+        self.calls = 0
+
+    async def run_sync(self, work):
+        self.calls += 1
+        return work("conexão-async")
+
+
+class _Renderer:
+    @cpu_bound
+    def render(self, rows, suffix=""):
+        return f"{len(rows)} linhas{suffix}"
+
+
+async def _ticks_during(coro, interval=0.01):
+    """Executa `coro` contando quantas vezes um ticker conseguiu rodar"""
+    ticks = 0
+    done = False
+
+    async def ticker():
+        nonlocal ticks
+        while not done:
+            await asyncio.sleep(interval)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        result = await coro
+    finally:
+        done = True
+        await task
+    return result, ticks
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert async_database_url("postgresql+psycopg2://u@h/db") == "postgresql+asyncpg://u@h/db"
+
+
+def test_run_read_uses_async_session_when_given():
+    session = _FakeAsyncSession()
+    result = asyncio.run(run_read(lambda conn: f"lido via {conn}", session))
+    assert result == "lido via conexão-async" and session.calls == 1
+
+
+def test_run_read_fallback_does_not_block_event_loop(monkeypatch):
+    monkeypatch.setattr(database, "engine", _SlowEngine(0.3))
+    result, ticks = asyncio.run(_ticks_during(run_read(lambda conn: "ok")))
+    assert result == "ok"
+    assert ticks >= 10  # Bloqueando o loop, o ticker rodaria no máximo uma vez
+
+
+def test_blocking_decorator_keeps_loop_responsive():
+    @blocking
+    def slow(value):
+        time.sleep(0.3)
+        return value * 2
+
+    result, ticks = asyncio.run(_ticks_during(slow(21)))
+    assert result == 42 and ticks >= 10
+
+
+def test_get_async_db_without_driver_yields_none(monkeypatch):
+    monkeypatch.setattr(database, "ASYNC_DB_AVAILABLE", False)
+
+    async def first():
+        generator = get_async_db()
+        session = await generator.__anext__()
+        await generator.aclose()
+        return session
+
+    assert asyncio.run(first()) is None
+
+
+def test_cpu_bound_runs_in_process_pool():
+    try:
+        result = asyncio.run(_Renderer().render([1, 2, 3], suffix="!"))
+    finally:
+        shutdown_render_pool()
+    assert result == "3 linhas!"
+
+
+def test_report_exports_remain_awaitable():
+    service = ReportService(None)
+    equipments = [{
+        "id": 1, "tag_reference": "52-MP-001", "serial_number": "SN000001", "substation": "SE-01",
+        "bay": "BAY-01", "status": "ACTIVE", "description": "Alimentador 1",
+        "model": {"name": "P220", "code": "P220", "voltage_class": "13.8kV", "technology": "digital"},
+        "manufacturer": {"name": "Schneider Electric", "country": "França"}, "created_at": None,
+    }]
+    csv_content = asyncio.run(service.export_to_csv(equipments))
+    assert "52-MP-001" in csv_content
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
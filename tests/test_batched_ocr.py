@@ -0,0 +1,133 @@
+"""
+Testes do OCR em lote dos rótulos (src/batched_ocr.py).
+O tesseract é substituído por um reconhecedor falso que lê o tom de cinza
+de cada faixa da imagem empilhada: valida o mapeamento TSV → recortes, uma
+chamada por página, o cache por hash do recorte e o uso da camada de texto.
+"""
+
+import sys
+from pathlib import Path
+
+import fitz
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import batched_ocr
+from src.batched_ocr import (
+    BatchedLabelOCR,
+    LabelBox,
+    OCRResultCache,
+    split_batches,
+    stitch_crops,
+)
+
+
+class FakeTesseract:
+    """Devolve uma palavra 'tom<N>' por faixa escura, no formato de image_to_data"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, image, config):
+        self.calls += 1
+        data = {"text": [], "top": [], "height": [], "conf": []}
+        dark = np.where(image.min(axis=1) < 255)[0]
+        if dark.size == 0:
+            return data
+        runs = np.split(dark, np.where(np.diff(dark) > 1)[0] + 1)
+        for run in runs:
+            tone = int(image[run[0]].min())
+            data["text"] += ["", f"tom{tone}"]
+            data["top"] += [0, int(run[0])]
+            data["height"] += [image.shape[0], len(run)]
+            data["conf"] += [-1, 95]
+        return data
+
+
+@pytest.fixture
+def tesseract(monkeypatch):
+    fake = FakeTesseract()
+    monkeypatch.setattr(batched_ocr, "_image_to_data", fake)
+    monkeypatch.setattr(batched_ocr, "TESSERACT_AVAILABLE", True)
+    return fake
+
+
+def crop(tone, height=20, width=60):
+    return np.full((height, width), tone, dtype=np.uint8)
+
+
+def test_stitch_keeps_bands_separated():
+    image, bands = stitch_crops([crop(10, 20, 40), crop(20, 35, 90)])
+
+    assert image.shape == (20 + 35 + batched_ocr.BAND_GAP_PX + 2 * batched_ocr.BAND_MARGIN_PX,
+                           90 + 2 * batched_ocr.BAND_MARGIN_PX)
+    (a0, a1), (b0, b1) = bands
+    assert (image[a0:a1] == 255).sum() > 0 and image[a0:a1].min() == 10
+    assert image[a1:b0].min() == 255 and image[b0:b1].min() == 20
+
+
+def test_split_batches_respects_height():
+    crops = [crop(0, height=100)] * 5
+    batches = split_batches(crops, max_height=300)
+    assert [i for batch in batches for i in batch] == list(range(5))
+    assert all(len(batch) <= 2 for batch in batches)
+
+
+def test_page_labels_in_one_call_and_cached(tesseract):
+    ocr = BatchedLabelOCR(cache=OCRResultCache())
+    page = np.full((200, 400, 3), 255, dtype=np.uint8)
+    page[10:30, 100:200] = 40
+    page[60:75, 100:180] = 80
+    page[120:140, 100:200] = 40  # mesmo rótulo do primeiro
+    boxes = [(90, 5, 250, 35), (90, 55, 250, 80), (90, 115, 250, 145)]
+
+    assert ocr.read_image_labels(page, boxes) == ["tom40", "tom80", "tom40"]
+    # Recortes idênticos viram uma única faixa, uma chamada por página
+    assert tesseract.calls == 1 and ocr.ocr_regions == 2
+
+    assert ocr.read_image_labels(page, boxes[:2]) == ["tom40", "tom80"]
+    assert tesseract.calls == 1 and ocr.cache_hits == 2
+
+
+def test_ocr_failure_returns_empty(monkeypatch):
+    def broken(image, config):
+        raise RuntimeError("tesseract is not installed")
+
+    monkeypatch.setattr(batched_ocr, "_image_to_data", broken)
+    monkeypatch.setattr(batched_ocr, "TESSERACT_AVAILABLE", True)
+    ocr = BatchedLabelOCR(cache=OCRResultCache())
+    page = np.zeros((50, 50), dtype=np.uint8)
+
+    assert ocr.read_image_labels(page, [(0, 0, 20, 20), (30, 30, 40, 40)]) == ["", ""]
+    assert len(ocr.cache) == 0
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    """Página 1 com texto; páginas 2 e 3 com rótulos apenas como desenho (sem texto)"""
+    doc = fitz.open()
+    text_page = doc.new_page()
+    text_page.insert_text((100, 100), "Trip Command")
+    for tone in (0.2, 0.5):
+        page = doc.new_page()
+        page.draw_rect(fitz.Rect(100, 90, 160, 100), color=None, fill=(tone, tone, tone))
+    path = tmp_path / "scanned.pdf"
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_read_labels_prefers_text_layer(tesseract, scanned_pdf):
+    ocr = BatchedLabelOCR(dpi=72, cache=OCRResultCache(), max_workers=2)
+    rect = (95, 85, 200, 105)
+
+    with fitz.open(str(scanned_pdf)) as doc:
+        labels = ocr.read_labels(doc, [LabelBox(2, rect), LabelBox(0, rect), LabelBox(1, rect)])
+
+    assert labels[1] == "Trip Command"
+    assert labels[0].startswith("tom") and labels[2].startswith("tom") and labels[0] != labels[2]
+    assert ocr.text_layer_hits == 1
+    # Uma chamada por página sem texto, nenhuma para a página com texto
+    assert tesseract.calls == 2
@@ -0,0 +1,65 @@
+"""
+Testes da correlação checkbox ↔ linha por varredura ordenada
+(PreciseParameterExtractor.correlate_checkboxes_with_lines) e do índice de
+texto por página (src/page_text_index.py).
+A versão anterior (laço L×C) de tests/benchmarks serve de referência.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+from src.precise_parameter_extractor import PreciseParameterExtractor, Checkbox
+from src.page_text_index import PageWordIndex
+from benchmark_checkbox_correlation import LegacyCorrelationExtractor, build_led_matrix_page
+
+EASERGY_PDF = Path(__file__).parent.parent / "inputs" / "teste" / "tela3.pdf"
+
+
+def test_sweep_matches_legacy_on_led_matrix():
+    doc = fitz.open()
+    page, checkboxes, lines = build_led_matrix_page(doc, rows=60)
+
+    expected = LegacyCorrelationExtractor().correlate_checkboxes_with_lines(checkboxes, lines, page)
+    assert PreciseParameterExtractor().correlate_checkboxes_with_lines(checkboxes, lines, page) == expected
+    assert any(result['is_active'] for result in expected)
+    doc.close()
+
+
+def test_sweep_matches_legacy_with_ties_and_shuffled_input():
+    """Empates em Y, duplicatas e ordem aleatória seguem a regra 'primeiro da lista'"""
+    rng = random.Random(3)
+    doc = fitz.open()
+    page, base_checkboxes, lines = build_led_matrix_page(doc, rows=24)
+    legacy = LegacyCorrelationExtractor()
+    current = PreciseParameterExtractor()
+
+    for _ in range(25):
+        checkboxes = [Checkbox(x=cb.x, y=cb.y + rng.choice([0, 0, 4, -4, 60]), width=30, height=30,
+                               is_marked=rng.random() < 0.4, density=rng.random())
+                      for cb in base_checkboxes]
+        checkboxes += rng.sample(checkboxes, 5)  # Mesmo objeto duas vezes
+        rng.shuffle(checkboxes)
+
+        assert (current.correlate_checkboxes_with_lines(checkboxes, lines, page) ==
+                legacy.correlate_checkboxes_with_lines(checkboxes, lines, page))
+    doc.close()
+
+
+@pytest.mark.skipif(not EASERGY_PDF.exists(), reason="PDFs de teste não disponíveis")
+def test_word_index_matches_clipped_get_text():
+    """Inclusive palavras truncadas na borda do recorte"""
+    doc = fitz.open(str(EASERGY_PDF))
+    page = doc[1]
+    index = PageWordIndex(page)
+
+    for word in page.get_text("words")[::5]:
+        rect = fitz.Rect(word[0] + 2, word[1] - 3, word[2] + 40, word[3] + 2)
+        assert index.words_in(rect) == page.get_text("words", clip=rect)
+    doc.close()
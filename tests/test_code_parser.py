@@ -0,0 +1,54 @@
+"""
+Testes do CodeParser (src/utils/code_parser.py): regex combinada, memo de
+parse_value e parse_codes_batch. O parser sequencial anterior
+(tests/benchmarks) serve de referência.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+from src.utils.code_parser import CodeParser, get_code_parser, parse_code, parse_codes_batch
+from benchmark_code_parser import SequentialCodeParser
+
+SAMPLES = ['52-MP-20', '67n-ef-01', 'P241311B2M0600J', 'P220-2', 'M220', '204-MF-02_rev.0',
+           '204-MF-02', '60Hz', '60hz', '13.8kV', '230v', '52', '67N', '67n', 'ab-cd/52',
+           ' 52 ', 'DMT', '0.10In', '', '   ', None, 3.5]
+
+
+def _random_values(rng, count):
+    alphabet = '0123456789NnPpMmEeFfHhZzKkVv-_./ AB'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 14))) for _ in range(count)]
+
+
+def test_combined_pattern_matches_sequential_parsers():
+    legacy = SequentialCodeParser()
+    parser = CodeParser()
+    for value in SAMPLES + _random_values(random.Random(7), 5000):
+        assert parser.parse_value(value) == legacy.parse_value(value), value
+
+
+def test_parse_value_is_memoized_by_clean_value():
+    parser = CodeParser(cache_size=16)
+    first = parser.parse_value('52-MP-20')
+    assert parser.parse_value(' 52-MP-20 ') is first
+    assert parser.cache_info().hits == 1
+
+    parser.clear_cache()
+    assert parser.cache_info().currsize == 0
+
+
+def test_batch_dedupes_and_keeps_order():
+    values = ['60Hz', 'P220-2', '60Hz', None, '', '60Hz', 'P220-2']
+    results = parse_codes_batch(values)
+
+    assert [r.pattern_detected for r in results] == [
+        'frequency', 'simple_model', 'frequency', 'empty_or_invalid', 'empty_or_invalid',
+        'frequency', 'simple_model',
+    ]
+    assert results[0] is results[2] is results[5]
+    assert parse_code('60Hz') is results[0]
+    assert get_code_parser() is get_code_parser()
@@ -0,0 +1,90 @@
+"""
+Testes do índice do glossário (src/glossary_index.py): processamento do
+workbook em uma passada, snapshot chaveado pelo hash do workbook e
+consultas por (modelo, código).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import glossary_index
+from src.glossary_index import GlossaryIndex, load_glossary_index, snapshot_path
+from src.file_registry_manager import calculate_file_hash
+
+
+def write_glossary(path: Path, frequency: str = "60Hz"):
+    """Glossário mínimo: uma aba MiCOM e uma SEPAM"""
+    workbook = Workbook()
+    micon = workbook.active
+    micon.title = "P143"
+    micon.append(["Schneider MiCON P143 Multifunção"])
+    micon.append(["SYSTEM DATA"])
+    micon.append([f"0104: Frequency {frequency}", "0105: Language English"])
+    micon.append(["Group 1 Protection"])
+    micon.append(["0201: I>1 Function DT"])
+
+    sepam = workbook.create_sheet("S40")
+    sepam.append(["Schneider SEPAM S40"])
+    sepam.append(["i_nominal: 600"])
+    workbook.save(path)
+
+
+@pytest.fixture
+def glossary(tmp_path):
+    path = tmp_path / "glossario.xlsx"
+    write_glossary(path)
+    return path
+
+
+def test_build_indexes_by_model_and_code(glossary, tmp_path):
+    index = load_glossary_index(glossary, snapshot_dir=tmp_path / "snap")
+
+    assert len(index) == 4
+    assert index.models == ["MiCON P143", "SEPAM S40"]
+    [frequency] = index.lookup("MiCON P143", "0104")
+    assert frequency.aba_origem == "P143" and (frequency.linha_origem, frequency.coluna_origem) == (2, 0)
+    assert index.lookup("MiCON P143", "0201")[0].grupo == "G1"
+    assert [p.codigo for p in index.for_model("SEPAM S40")] == ["i_nominal"]
+    assert index.lookup("SEPAM S40", "0104") == []
+
+
+def test_snapshot_reused_without_parsing(glossary, tmp_path, monkeypatch):
+    first = load_glossary_index(glossary, snapshot_dir=tmp_path / "snap")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook reprocessado com snapshot válido")
+
+    monkeypatch.setattr(glossary_index, "build_glossary_index", fail)
+    second = load_glossary_index(glossary, snapshot_dir=tmp_path / "snap")
+
+    assert [p.to_dict() for p in second.parameters] == [p.to_dict() for p in first.parameters]
+    assert second.lookup("MiCON P143", "0105")[0].nome == first.lookup("MiCON P143", "0105")[0].nome
+
+
+def test_changed_workbook_rebuilds_and_drops_stale_snapshot(glossary, tmp_path):
+    snap = tmp_path / "snap"
+    load_glossary_index(glossary, snapshot_dir=snap)
+    old_snapshot = snapshot_path(calculate_file_hash(glossary), snap)
+
+    write_glossary(glossary, frequency="50Hz")
+    index = load_glossary_index(glossary, snapshot_dir=snap)
+
+    assert index.lookup("MiCON P143", "0104")[0].nome == "Frequency 50Hz"
+    assert not old_snapshot.exists()
+    assert [p.name for p in snap.glob("glossary_*.pkl")] == [snapshot_path(index.workbook_hash, snap).name]
+
+
+def test_corrupt_or_foreign_snapshot_is_ignored(glossary, tmp_path):
+    snap = tmp_path / "snap"
+    path = snapshot_path(calculate_file_hash(glossary), snap)
+    snap.mkdir()
+    path.write_bytes(b"not a pickle")
+
+    assert GlossaryIndex.load(path) is None
+    assert len(load_glossary_index(glossary, snapshot_dir=snap)) == 4
+    assert GlossaryIndex.load(path, workbook_hash="outro") is None
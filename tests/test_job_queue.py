@@ -0,0 +1,172 @@
+"""
+Testes da fila de jobs (api/core/job_queue.py, api/core/job_worker.py) e
+dos handlers (api/services/background_jobs.py) sem PostgreSQL: a fila é
+substituída por um registro das chamadas do worker.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.core.job_queue import JOB_HANDLERS, Job, JobHandler, PermanentJobError
+from api.core.job_worker import execute_job, handler_limits
+import api.services.background_jobs as background_jobs
+import api.services.ml_integration_service as ml_integration
+from api.services.ml_integration_service import MLIntegrationService
+
+
+class RecordingQueue:
+    """Registra complete/fail como o JobQueue faria no banco"""
+
+    def __init__(self):
+        self.completed, self.failures = [], []
+
+    def complete(self, job_id, worker_id, result=None):
+        self.completed.append((job_id, result))
+
+    def fail(self, job, worker_id, error, retry=True):
+        self.failures.append((job.id, error, retry))
+        return "pending" if retry and job.attempts < job.max_attempts else "failed"
+
+
+def _context(cancelled=False):
+    return SimpleNamespace(worker_id="host:1-0", is_cancelled=lambda: cancelled)
+
+
+def _register(monkeypatch, kind, func):
+    monkeypatch.setitem(JOB_HANDLERS, kind, JobHandler(kind, func))
+
+
+def test_execute_job_completes_with_handler_result(monkeypatch):
+    async def handler(payload, context):
+        return {"doubled": payload["value"] * 2}
+
+    _register(monkeypatch, "test_ok", handler)
+    queue = RecordingQueue()
+    status = execute_job(Job(1, "test_ok", {"value": 21}, 1, 3), queue, _context())
+    assert status == "completed" and queue.completed == [(1, {"doubled": 42})]
+
+
+def test_execute_job_retries_then_fails_on_last_attempt(monkeypatch):
+    async def handler(payload, context):
+        raise RuntimeError("pipeline indisponível")
+
+    _register(monkeypatch, "test_retry", handler)
+    queue = RecordingQueue()
+    assert execute_job(Job(2, "test_retry", {}, 1, 3), queue, _context()) == "pending"
+    assert execute_job(Job(2, "test_retry", {}, 3, 3), queue, _context()) == "failed"
+    assert queue.failures[0] == (2, "RuntimeError: pipeline indisponível", True)
+    assert not queue.completed
+
+
+def test_permanent_error_and_unknown_kind_are_not_retried(monkeypatch):
+    async def handler(payload, context):
+        raise PermanentJobError("import inexistente")
+
+    _register(monkeypatch, "test_permanent", handler)
+    queue = RecordingQueue()
+    assert execute_job(Job(3, "test_permanent", {}, 1, 3), queue, _context()) == "failed"
+    assert execute_job(Job(4, "tipo_desconhecido", {}, 1, 3), queue, _context()) == "failed"
+    assert [retry for _, _, retry in queue.failures] == [False, False]
+
+
+def test_cancelled_job_is_not_marked_completed(monkeypatch):
+    async def handler(payload, context):
+        return {"ok": True}
+
+    _register(monkeypatch, "test_cancel", handler)
+    queue = RecordingQueue()
+    assert execute_job(Job(5, "test_cancel", {}, 1, 3), queue, _context(cancelled=True)) == "cancelled"
+    assert not queue.completed
+
+
+def test_handler_limits_defaults_and_overrides():
+    limits = handler_limits(["ml_analysis", "import_reprocess", "ml_bulk_upload"], {"ml_analysis": 4})
+    assert limits == {"ml_analysis": 4, "import_reprocess": 1, "ml_bulk_upload": 2}
+
+
+def test_reprocess_handler_maps_failures(monkeypatch):
+    results = iter([
+        {"status": "failed", "error": "Import_id X não encontrado", "retryable": False},
+        {"status": "failed", "error": "Falha na execução do pipeline", "details": "timeout"},
+        {"status": "completed", "new_import_id": "reprocess_X"},
+    ])
+
+    async def fake_reprocess(self, import_id, options, progress=None):
+        progress(50.0, "pipeline")
+        return next(results)
+
+    monkeypatch.setattr(background_jobs.ImportService, "__init__", lambda self, db=None: None)
+    monkeypatch.setattr(background_jobs.ImportService, "reprocess_import", fake_reprocess)
+    progress = []
+    context = SimpleNamespace(progress=lambda pct, msg=None: progress.append(pct))
+    payload = {"import_id": "X"}
+
+    with pytest.raises(PermanentJobError):
+        asyncio.run(background_jobs.reprocess_import(payload, context))
+    with pytest.raises(RuntimeError, match="timeout"):
+        asyncio.run(background_jobs.reprocess_import(payload, context))
+    assert asyncio.run(background_jobs.reprocess_import(payload, context))["new_import_id"] == "reprocess_X"
+    assert progress == [50.0, 50.0, 50.0]
+
+
+def test_bulk_data_is_read_in_chunks_with_progress(monkeypatch, tmp_path):
+    monkeypatch.setattr(ml_integration, "BULK_CSV_CHUNK_ROWS", 100)
+    csv_path = tmp_path / "bulk.csv"
+    frame = pd.DataFrame({"equipment_tag": [f"REL-{i % 7}" for i in range(450)],
+                          "pickup": [None if i % 50 == 0 else i for i in range(450)]})
+    frame.to_csv(csv_path, index=False)
+
+    service = MLIntegrationService.__new__(MLIntegrationService)
+    service.db = MagicMock()
+    progress = []
+    summary = asyncio.run(service.process_bulk_data("up1", str(csv_path),
+                                                    progress=lambda pct, msg=None: progress.append(pct)))
+
+    assert (summary["total_records"], summary["total_parameters"], summary["total_devices"]) == (450, 2, 7)
+    assert summary["missing_values_count"] == 9
+    assert len(progress) == 5 and progress == sorted(progress)
+    snapshot = service.db.add.call_args[0][0]
+    assert snapshot.data_structure == {"columns": ["equipment_tag", "pickup"]}
+
+
+def test_bulk_data_missing_file_is_permanent():
+    service = MLIntegrationService.__new__(MLIntegrationService)
+    service.db = MagicMock()
+    with pytest.raises(PermanentJobError):
+        asyncio.run(service.process_bulk_data("up2", "/nao/existe.csv"))
+
+
+def test_ensure_job_table_runs_ddl_and_closes_session(monkeypatch):
+    import api.core.database as database
+    from api.core.job_queue import ensure_job_table
+
+    db = MagicMock()
+    monkeypatch.setattr(database, "SessionLocal", lambda: db)
+    ensure_job_table()
+
+    statements = [str(call.args[0]) for call in db.execute.call_args_list]
+    assert any("CREATE TABLE IF NOT EXISTS protec_ai.background_jobs" in s for s in statements)
+    db.commit.assert_called_once()
+    db.close.assert_called_once()
+
+
+def test_api_startup_creates_job_table(monkeypatch):
+    import api.core.job_queue as job_queue
+    from api.main import startup_event
+
+    calls = []
+    monkeypatch.setattr(job_queue, "ensure_job_table", lambda: calls.append("ddl"))
+    asyncio.run(startup_event())
+    assert calls == ["ddl"]
+
+    # Banco indisponível não derruba a inicialização
+    monkeypatch.setattr(job_queue, "ensure_job_table", MagicMock(side_effect=RuntimeError("db down")))
+    asyncio.run(startup_event())
@@ -0,0 +1,147 @@
+"""
+Testes da paginação por cursor (api/core/pagination.py) e da listagem
+unificada de equipamentos (UnifiedEquipmentService._load_unified_equipment).
+O PostgreSQL é substituído por uma conexão falsa que aplica
+`id > :after_id ORDER BY id LIMIT/OFFSET` sobre listas em memória.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.core.pagination import decode_cursor, cursor_int, encode_cursor
+from api.services import unified_equipment_service
+from api.services.unified_equipment_service import UnifiedEquipmentService
+
+
+def structured_row(row_id):
+    return SimpleNamespace(
+        id=row_id, equipment_tag=f"REL-{row_id}", serial_number=None, substation_name="SE-1",
+        barra_nome="52-MF-01", status="ACTIVE", position_description=None, model_name="P122",
+        series="P122", model_type="digital", family="", manufacturer_name="Schneider Electric",
+        manufacturer_country="FR", created_at=None,
+    )
+
+
+def extracted_row(row_id):
+    return SimpleNamespace(
+        id=row_id, codigo_campo="0104", valor_original="MiCOM P122", unidade="N/A",
+        manufacturer_name="Schneider Electric", manufacturer_country="FR",
+        nome_arquivo="P122.pdf", data_criacao=None,
+    )
+
+
+class FakeConnection:
+    """Responde às consultas paginadas de cada fonte e conta as linhas lidas"""
+
+    def __init__(self, structured_ids, extracted_ids):
+        self.rows = {
+            "structured": [structured_row(i) for i in structured_ids],
+            "extracted": [extracted_row(i) for i in extracted_ids],
+        }
+        self.rows_read = 0
+
+    def execute(self, statement, params):
+        source = "structured" if "relay_equipment re" in str(statement) else "extracted"
+        rows = [row for row in self.rows[source] if row.id > params["after_id"]]
+        rows = rows[params["offset"]:params["offset"] + params["limit"]]
+        self.rows_read += len(rows)
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+def source_rows(conn, sql, params=None):
+    return len(conn.rows["structured" if "relay_equipment re" in sql else "extracted"])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(unified_equipment_service, "estimate_count", source_rows)
+    monkeypatch.setattr(unified_equipment_service, "exact_count", source_rows)
+    return UnifiedEquipmentService(db=None)
+
+
+def walk(service, conn, size, **filters):
+    """Percorre todas as páginas seguindo next_cursor"""
+    pages, cursor = [], None
+    while True:
+        source, after_id = "structured", 0
+        if cursor:
+            position = decode_cursor(cursor)
+            source, after_id = position["source"], position["id"]
+        page = service._load_unified_equipment(conn, "", None, size, source=source, after_id=after_id, **filters)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_roundtrip_and_invalid():
+    cursor = encode_cursor(source="extracted", id=42)
+    assert decode_cursor(cursor) == {"source": "extracted", "id": 42}
+    assert decode_cursor(None) == {}
+
+    for bad in ("not-a-cursor!", encode_cursor(id="42")):
+        with pytest.raises(HTTPException) as exc:
+            cursor_int(decode_cursor(bad), "id")
+        assert exc.value.status_code == 400
+
+
+def test_cursor_walk_crosses_sources_without_gaps(service):
+    conn = FakeConnection(structured_ids=[3, 5, 8, 13, 21], extracted_ids=[2, 4, 6, 7])
+    pages = walk(service, conn, size=2)
+
+    ids = [item["id"] for page in pages for item in page["data"]]
+    assert ids == [f"protec_ai_{i}" for i in (3, 5, 8, 13, 21, 2, 4, 6, 7)]
+    assert [item["data_completeness"] for item in pages[2]["data"]] == ["structured", "extracted"]
+    assert all(page["total"] == 9 for page in pages)
+    assert len(pages) == 5
+
+
+def test_page_cost_independent_of_position(service):
+    conn = FakeConnection(structured_ids=range(1, 1001), extracted_ids=[])
+    deep_cursor = decode_cursor(encode_cursor(source="structured", id=900))
+
+    page = service._load_unified_equipment(conn, "", None, 10, source=deep_cursor["source"],
+                                           after_id=deep_cursor["id"])
+    assert [item["id"] for item in page["data"]][0] == "protec_ai_901"
+    # Só a página (+1 linha de verificação) é lida
+    assert conn.rows_read == 11
+
+
+def test_offset_mode_skips_into_second_source(service):
+    conn = FakeConnection(structured_ids=[1, 2, 3], extracted_ids=[10, 11, 12])
+    page = service._load_unified_equipment(conn, "", None, 2, offset=4)
+
+    assert [item["id"] for item in page["data"]] == ["protec_ai_11", "protec_ai_12"]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.parametrize("estimate_error", [-2, 3])
+def test_offset_boundary_uses_exact_count(service, monkeypatch, estimate_error):
+    # Estimativa do planner errada: só o total reportado pode refletir isso
+    monkeypatch.setattr(unified_equipment_service, "estimate_count",
+                        lambda conn, sql, params: source_rows(conn, sql) + estimate_error)
+    conn = FakeConnection(structured_ids=[1, 2, 3, 4, 5], extracted_ids=[10, 11, 12, 13])
+
+    ids = []
+    for page_number in range(5):
+        page = service._load_unified_equipment(conn, "", None, 2, offset=page_number * 2)
+        ids.extend(item["id"] for item in page["data"])
+    assert ids == [f"protec_ai_{i}" for i in (1, 2, 3, 4, 5, 10, 11, 12, 13)]
+    assert page["total"] == 9 + 2 * estimate_error
+
+
+def test_status_filter_selects_sources(service):
+    extracted_only = service._unified_source_queries("", "extracted")
+    assert list(extracted_only) == ["extracted"]
+
+    active_only = service._unified_source_queries("ABB", "active")
+    assert list(active_only) == ["structured"]
+    sql, params = active_only["structured"]
+    assert "UPPER(re.status) = UPPER(:status)" in sql
+    assert params == {"manufacturer_pattern": "%ABB%", "status": "active"}
@@ -0,0 +1,89 @@
+"""
+Testes do motor por coluna do normalizador 3FN (scripts/normalize_to_3nf.py).
+Os métodos escalares (extract_value_and_unit, convert_boolean,
+is_status_field) definem as regras e servem de referência.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from normalize_to_3nf import Normalizer3NF
+
+VALUES = ['60Hz', '60 hz', '1.5s', '0.10In', '50 Ω', '50 ω', '4.20 mA', '25°C', '100%', '200',
+          'DMT', 'Yes', 'no', 'Não', '1', '0', 'true', 'tU<', '-5.2kV', '+3.14°', '13800kV',
+          '5 MVA', '3 xyz', '7Ohm', '7 OHM', '12345678901234567', '2e9', 'nan', '', None, '  ',
+          '1.', '0.5μs', '10 us', '5 KA', 'abc def', '1 (2/3)', '5 ſ', '3 K']
+
+
+def test_split_values_and_units_matches_scalar_rule():
+    normalizer = Normalizer3NF()
+    raw = pd.Series(VALUES, dtype=object)
+    values, units = normalizer.split_values_and_units(raw)
+
+    for value, got_value, got_unit in zip(VALUES, values, units):
+        expected = normalizer.extract_value_and_unit(value) if value is not None else ('', '')
+        assert (got_value, got_unit) == expected, value
+
+
+def test_convert_booleans_and_status_mask_match_scalar_rules():
+    normalizer = Normalizer3NF()
+    raw = pd.Series(VALUES, dtype=object)
+    booleans = normalizer.convert_booleans(raw)
+
+    for value, got in zip(VALUES, booleans):
+        expected = normalizer.convert_boolean(value) if value is not None else None
+        assert (None if pd.isna(got) else got) == expected, value
+
+    descriptions = pd.Series(['Relay O/P Status', 'Opto I/P', 'Frequency', 'Test Pattern', None])
+    assert normalizer.status_field_mask(descriptions).tolist() == [
+        normalizer.is_status_field('Relay O/P Status'), normalizer.is_status_field('Opto I/P'),
+        normalizer.is_status_field('Frequency'), normalizer.is_status_field('Test Pattern'), False,
+    ]
+
+
+def test_multipart_frame_groups_in_first_seen_order():
+    df = pd.DataFrame({
+        'Code': ['0150', '0151', '0152', '0153', '0154'],
+        'Description': ['LED 5 part 2', 'Input 1 (1/2)', 'LED 5 part 1: tU<', 'Frequency', 'Input 1 (2/2)'],
+        'Value': ['x', 'a', '', '60Hz', 'b'],
+    })
+    normalizer = Normalizer3NF()
+    parts = normalizer.multipart_frame(df)
+
+    assert parts['base'].tolist() == ['LED 5', 'LED 5', 'Input 1', 'Input 1']
+    assert parts['part'].tolist() == [1, 2, 1, 2]
+    assert parts['value'].tolist() == ['tU<', 'x', 'a', 'b']
+    assert list(normalizer.identify_multipart_groups(df)) == ['LED 5', 'Input 1']
+
+
+def test_process_all_parallel_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    csv_dir = tmp_path / 'outputs' / 'csv'
+    csv_dir.mkdir(parents=True)
+    for n in range(3):
+        pd.DataFrame({
+            'Code': ['Page', '0104', '0150', '0151', f'02{n:02d}'],
+            'Description': ['1', 'Frequency', 'LED 5 part 1', 'LED 5 part 2', 'Relay O/P Status'],
+            'Value': ['1', '60Hz', 'Yes', 'No', '101010'],
+        }).to_csv(csv_dir / f'relay{n}_params.csv', index=False)
+    pd.DataFrame({'Code': ['0104'], 'is_active': [True]}).to_csv(csv_dir / 'relay0_active_setup.csv', index=False)
+
+    report = tmp_path / 'outputs' / 'logs' / 'normalization_3nf_report.json'
+    results = []
+    for workers in (1, 2):
+        Normalizer3NF().process_all(workers=workers)
+        outputs = sorted((tmp_path / 'outputs' / 'norm_csv').glob('*.csv'))
+        frames = [pd.read_csv(path).drop(columns='extraction_date') for path in outputs]
+        results.append((json.loads(report.read_text(encoding='utf-8')), frames))
+
+    (seq_stats, seq_frames), (par_stats, par_frames) = results
+    assert seq_stats == par_stats and seq_stats['total_files'] == 3
+    assert len(seq_frames) == len(par_frames) == 3
+    for seq, par in zip(seq_frames, par_frames):
+        pd.testing.assert_frame_equal(seq, par)
@@ -0,0 +1,80 @@
+"""
+Testes do cache de rasterização e do pré-filtro vetorial
+(src/page_render_cache.py).
+Valida limite de memória do LRU, páginas sem candidatos e equivalência da
+detecção por faixa com a detecção na página inteira.
+"""
+
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.page_render_cache import (
+    PageRasterCache,
+    checkbox_candidate_rects,
+    checkbox_scan_region,
+)
+from src.precise_parameter_extractor import PreciseParameterExtractor
+
+EASERGY_PDF = Path(__file__).parent.parent / "inputs" / "teste" / "tela3.pdf"
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """PDF com uma página só de texto e uma página com checkbox vetorial"""
+    doc = fitz.open()
+    text_page = doc.new_page()
+    text_page.insert_text((72, 72), "0104: Frequency: 60Hz")
+    box_page = doc.new_page()
+    box_page.insert_text((90, 300), "0123: CT Primary: 1")
+    box_page.draw_rect(fitz.Rect(72, 292, 79.2, 299.2), color=(0, 0, 0), width=0.5)
+    path = tmp_path / "sample.pdf"
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_cache_hits_and_memory_bound(sample_pdf):
+    doc = fitz.open(str(sample_pdf))
+    one_page = PageRasterCache().render(doc[0], dpi=72)[0].nbytes
+
+    cache = PageRasterCache(max_bytes=int(one_page * 1.5))
+    first, origin = cache.render(doc[0], dpi=72)
+    again, _ = cache.render(doc[0], dpi=72)
+    assert again is first and origin == (0, 0)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Segunda página expulsa a primeira (orçamento de ~1 página)
+    cache.render(doc[1], dpi=72)
+    assert len(cache) == 1
+    assert cache.current_bytes <= cache.max_bytes
+    cache.render(doc[0], dpi=72)
+    assert cache.misses == 3
+    doc.close()
+
+
+def test_scan_region_skips_pages_without_candidates(sample_pdf):
+    doc = fitz.open(str(sample_pdf))
+    assert checkbox_candidate_rects(doc[0]) == []
+    assert checkbox_scan_region(doc[0]) is None
+
+    region = checkbox_scan_region(doc[1])
+    assert region is not None
+    assert region.contains(fitz.Rect(72, 292, 79.2, 299.2))
+    assert region.width < doc[1].rect.width / 2
+    doc.close()
+
+
+@pytest.mark.skipif(not EASERGY_PDF.exists(), reason="PDFs de teste não disponíveis")
+def test_prefilter_matches_full_page_detection():
+    """Detecção na faixa vetorial é idêntica à detecção na página inteira"""
+    extractor = PreciseParameterExtractor()
+    doc = fitz.open(str(EASERGY_PDF))
+    for page in doc:
+        assert (extractor.detect_checkboxes(page) ==
+                extractor.detect_checkboxes(page, prefilter=False))
+    doc.close()
@@ -0,0 +1,134 @@
+"""
+Testes do processamento página a página (src/page_stream.py) e da
+extração MiCOM em fluxo (IntelligentRelayExtractor.stream_to_csv).
+Valida gravação incremental do CSV, teto de memória do cache de rasters e
+equivalência com a extração em memória.
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+import fitz
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.intelligent_relay_extractor import IntelligentRelayExtractor
+from src import page_stream
+from src.page_render_cache import get_page_raster_cache
+from src.page_stream import IncrementalCSVWriter, iter_pdf_pages
+
+
+@pytest.fixture
+def micom_pdf(tmp_path):
+    """Relatório MiCOM de 6 páginas, com um parâmetro repetido em todas"""
+    doc = fitz.open()
+    for page_num in range(6):
+        page = doc.new_page()
+        page.insert_text((72, 72), "00.01: Language: English")
+        page.insert_text((72, 100), f"0{page_num}.10: Setting {page_num}: {page_num * 10} A")
+        page.insert_text((72, 128), f"0{page_num}.11: Flag {page_num}: None")
+    path = tmp_path / "P143_MICOM.pdf"
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def read_csv_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def test_writer_flushes_each_batch_and_dedupes(tmp_path):
+    path = tmp_path / "out.csv"
+    with IncrementalCSVWriter(path, ['Code', 'Value'], dedupe_on=['Code']) as writer:
+        assert writer.write_rows([{'Code': '0104', 'Value': '60Hz', 'extra': 1}]) == 1
+        # Visível no arquivo antes do fim da extração
+        assert read_csv_rows(path) == [{'Code': '0104', 'Value': '60Hz'}]
+        assert writer.write_rows([{'Code': '0104', 'Value': '50Hz'}, {'Code': '0105', 'Value': 'x'}]) == 1
+
+    assert [row['Code'] for row in read_csv_rows(path)] == ['0104', '0105']
+    assert writer.rows_written == 2
+
+
+def test_writer_removes_partial_file_on_error(tmp_path):
+    path = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        with IncrementalCSVWriter(path, ['Code']) as writer:
+            writer.write_rows([{'Code': '0104'}])
+            raise RuntimeError("falha na página 3")
+    assert not path.exists()
+
+
+def test_pages_streamed_with_raster_ceiling(micom_pdf, monkeypatch):
+    cache = get_page_raster_cache()
+    cache.clear()
+    one_page = None
+
+    for page in iter_pdf_pages(micom_pdf, memory_limit_mb=0):
+        image, _ = cache.render(page, dpi=72)
+        one_page = image.nbytes
+    # Teto zero: nenhum raster retido entre páginas
+    assert one_page and cache.current_bytes == 0
+
+    opened = []
+    real_open = fitz.open
+
+    def tracking_open(*args, **kwargs):
+        opened.append(real_open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(page_stream.fitz, "open", tracking_open)
+    pages = iter_pdf_pages(micom_pdf)
+    next(pages)
+    pages.close()  # consumidor parou antes do fim
+    assert opened[0].is_closed
+
+
+@pytest.mark.parametrize("as_method", [False, True])
+def test_mupdf_store_shrunk_above_ceiling(monkeypatch, as_method):
+    class FakeTools:
+        def __init__(self, size):
+            self._size = size
+            self.shrunk = []
+
+        @property
+        def store_size(self):
+            # PyMuPDF 1.23 expõe atributo; versões novas, método
+            return (lambda: self._size) if as_method else self._size
+
+        def store_shrink(self, percent):
+            self.shrunk.append(percent)
+
+    tools = FakeTools(2 * 1024 * 1024)
+    monkeypatch.setattr(page_stream.fitz, "TOOLS", tools)
+    assert page_stream.mupdf_store_size() == 2 * 1024 * 1024
+
+    page_stream.apply_memory_limit(4)
+    assert tools.shrunk == []
+    page_stream.apply_memory_limit(1)
+    assert tools.shrunk == [100]
+
+
+def test_micom_stream_matches_in_memory_extraction(micom_pdf, tmp_path):
+    extractor = IntelligentRelayExtractor()
+    csv_path = tmp_path / "P143_params.csv"
+
+    count = extractor.stream_to_csv(micom_pdf, csv_path)
+
+    expected = extractor.extract_from_micom(micom_pdf)
+    streamed = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    assert count == len(expected) == 13
+    assert streamed['Code'].tolist() == expected['Code'].tolist()
+    assert streamed['Value'].tolist() == expected['Value'].astype(str).tolist()
+    assert set(streamed['is_active']) == {'True'}
+    assert streamed.loc[streamed['Code'] == '00.11', 'Value'].item() == ''
+
+
+def test_micom_rows_emitted_per_page(micom_pdf):
+    pages = IntelligentRelayExtractor().iter_micom_rows(micom_pdf)
+    first_page = next(pages)
+    assert [row['Code'] for row in first_page] == ['00.01', '00.10', '00.11']
+    pages.close()
@@ -0,0 +1,53 @@
+"""
+Testes do modo paralelo do CompletePipelineProcessor (--workers N).
+Valida que a extração em pool de processos (inclusive com PDFs divididos em
+blocos de páginas) gera os mesmos CSVs que o modo sequencial.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.complete_pipeline_processor import CompletePipelineProcessor
+
+TESTE_DIR = Path(__file__).parent.parent / "inputs" / "teste"
+EASERGY_PDF = TESTE_DIR / "tela3.pdf"
+MICOM_PDF = TESTE_DIR / "tela1.pdf"
+
+
+@pytest.mark.skipif(not EASERGY_PDF.exists(), reason="PDFs de teste não disponíveis")
+def test_parallel_outputs_match_sequential(tmp_path):
+    """CSVs do modo paralelo são idênticos byte a byte aos do modo sequencial"""
+    tasks = [('pdf', EASERGY_PDF), ('pdf', MICOM_PDF)]
+
+    sequential = CompletePipelineProcessor(str(tmp_path / "seq"))
+    seq_results = [sequential.run_file_task(file_type, path) for file_type, path in tasks]
+
+    parallel = CompletePipelineProcessor(str(tmp_path / "par"))
+    par_results = parallel._run_tasks_parallel(tasks, workers=2, pages_per_task=3)
+
+    assert [r['file'] for r in par_results] == [r['file'] for r in seq_results]
+    assert [r['parameters'] for r in par_results] == [r['parameters'] for r in seq_results]
+    assert all(r['seconds'] >= 0 for r in par_results)
+
+    for path in (EASERGY_PDF, MICOM_PDF):
+        name = f"{path.stem}_params.csv"
+        seq_csv = (tmp_path / "seq" / "outputs" / "csv" / name).read_bytes()
+        par_csv = (tmp_path / "par" / "outputs" / "csv" / name).read_bytes()
+        assert seq_csv == par_csv
+
+
+@pytest.mark.skipif(not EASERGY_PDF.exists(), reason="PDFs de teste não disponíveis")
+def test_page_chunks_only_for_large_easergy(tmp_path):
+    """Apenas PDFs Easergy maiores que o bloco são divididos"""
+    processor = CompletePipelineProcessor(str(tmp_path))
+
+    chunks = processor._page_chunks(EASERGY_PDF, pages_per_task=4)
+    assert chunks == [[0, 1, 2, 3], [4, 5, 6, 7], [8]]
+
+    assert processor._page_chunks(EASERGY_PDF, pages_per_task=0) is None
+    assert processor._page_chunks(EASERGY_PDF, pages_per_task=50) is None
+    assert processor._page_chunks(MICOM_PDF, pages_per_task=2) is None
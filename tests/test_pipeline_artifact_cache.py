@@ -0,0 +1,102 @@
+"""
+Testes do cache incremental da pipeline (src/pipeline_artifact_cache.py).
+Valida chave (hash de entrada, versão do estágio, hash do glossário) e
+propagação de mudanças entre estágios.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pipeline_artifact_cache import (
+    PipelineArtifactCache,
+    STAGE_EXTRACTION,
+    STAGE_NORMALIZATION,
+)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Entrada, saída e glossário temporários"""
+    source = tmp_path / "relay.pdf"
+    source.write_bytes(b"%PDF conteudo original")
+    output = tmp_path / "relay_params.csv"
+    output.write_text("Code,Value\n0104,60Hz\n")
+    glossary = tmp_path / "glossario.xlsx"
+    glossary.write_bytes(b"glossario v1")
+    return {
+        'source': source,
+        'output': output,
+        'glossary': glossary,
+        'registry': tmp_path / "pipeline_cache.json",
+    }
+
+
+def _cache(ws):
+    return PipelineArtifactCache(registry_path=ws['registry'], glossary_path=ws['glossary'])
+
+
+def test_unrecorded_input_is_not_fresh(workspace):
+    cache = _cache(workspace)
+    assert not cache.is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+
+
+def test_recorded_input_is_fresh_across_runs(workspace):
+    cache = _cache(workspace)
+    cache.record(STAGE_EXTRACTION, workspace['source'], "1", outputs=[workspace['output']])
+    cache.save()
+
+    reloaded = _cache(workspace)
+    assert reloaded.is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+    # Estágios são independentes
+    assert not reloaded.is_fresh(STAGE_NORMALIZATION, workspace['source'], "1")
+
+
+def test_content_change_invalidates(workspace):
+    cache = _cache(workspace)
+    cache.record(STAGE_EXTRACTION, workspace['source'], "1", outputs=[workspace['output']])
+    cache.save()
+
+    workspace['source'].write_bytes(b"%PDF conteudo editado")
+    assert not _cache(workspace).is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+
+
+def test_touch_without_content_change_stays_fresh(workspace):
+    cache = _cache(workspace)
+    cache.record(STAGE_EXTRACTION, workspace['source'], "1", outputs=[workspace['output']])
+    cache.save()
+
+    stat = workspace['source'].stat()
+    os.utime(workspace['source'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _cache(workspace).is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+
+
+def test_version_glossary_and_missing_output_invalidate(workspace):
+    cache = _cache(workspace)
+    cache.record(STAGE_EXTRACTION, workspace['source'], "1", outputs=[workspace['output']])
+    cache.save()
+
+    assert not _cache(workspace).is_fresh(STAGE_EXTRACTION, workspace['source'], "2")
+
+    workspace['glossary'].write_bytes(b"glossario v2")
+    assert not _cache(workspace).is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+
+    workspace['glossary'].write_bytes(b"glossario v1")
+    assert _cache(workspace).is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+
+    workspace['output'].unlink()
+    assert not _cache(workspace).is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+
+
+def test_invalidate_stage(workspace):
+    cache = _cache(workspace)
+    cache.record(STAGE_EXTRACTION, workspace['source'], "1")
+    cache.record(STAGE_NORMALIZATION, workspace['output'], "1")
+    cache.invalidate(STAGE_EXTRACTION)
+
+    assert not cache.is_fresh(STAGE_EXTRACTION, workspace['source'], "1")
+    assert cache.is_fresh(STAGE_NORMALIZATION, workspace['output'], "1")
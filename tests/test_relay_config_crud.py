@@ -30,6 +30,8 @@ Usage:
 """
 
 import pytest
+from decimal import Decimal
+from types import SimpleNamespace
 from fastapi import HTTPException
 from api.schemas.relay_config_schemas import (
     RelaySettingCreate,
@@ -38,6 +40,7 @@ from api.schemas.relay_config_schemas import (
     BulkUpdateItem,
     SettingCategory
 )
+from api.services.relay_config_crud_service import RelayConfigCRUDService, bulk_update_values
 
 
 class TestCreateSetting:
@@ -259,6 +262,101 @@ class TestBulkUpdate:
             )
 
 
+class FakeSession:
+    """Sessão falsa: responde ao SELECT ... ANY(:setting_ids) e ao UPDATE em lote"""
+    
+    def __init__(self, rows):
+        self.rows = {row.id: row for row in rows}
+        self.statements = []
+        self.committed = False
+        self.rolled_back = False
+    
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if "FOR UPDATE" in sql:
+            found = [self.rows[i] for i in params["setting_ids"] if i in self.rows]
+        else:
+            found = [SimpleNamespace(id=params[key]) for key in params if key.startswith("id_")]
+        return SimpleNamespace(fetchall=lambda: found)
+    
+    def commit(self):
+        self.committed = True
+    
+    def rollback(self):
+        self.rolled_back = True
+
+
+def setting_row(setting_id, min_limit=None, max_limit=None, equipment_id=1):
+    return SimpleNamespace(id=setting_id, equipment_id=equipment_id, min_limit=min_limit, max_limit=max_limit)
+
+
+class TestBulkUpdateSetBased:
+    """Bulk update baseado em conjunto: 1 SELECT + 1 UPDATE por lote"""
+    
+    def test_two_statements_regardless_of_batch_size(self):
+        """Lote de 100 itens deve custar um SELECT e um UPDATE"""
+        db = FakeSession([setting_row(i, Decimal("0"), Decimal("1000")) for i in range(1, 101)])
+        request = BulkUpdateRequest(
+            updates=[BulkUpdateItem(setting_id=i, set_value=float(i)) for i in range(1, 101)],
+            modified_by="eng.silva"
+        )
+        
+        result = RelayConfigCRUDService(db).bulk_update_settings(request)
+        
+        assert result.success is True
+        assert result.updated_count == 100
+        assert result.updated_ids == list(range(1, 101))
+        assert len(db.statements) == 2
+        update_sql, params = db.statements[1]
+        assert "FROM (VALUES" in update_sql and "modified_by = COALESCE" in update_sql
+        assert params["modified_by"] == "eng.silva"
+        assert db.committed is True
+    
+    def test_limit_violation_rolls_back_without_update(self):
+        """Um valor fora do limite deve reverter o lote inteiro, sem UPDATE"""
+        db = FakeSession([setting_row(10, max_limit=Decimal("5")), setting_row(11)])
+        request = BulkUpdateRequest(updates=[
+            BulkUpdateItem(setting_id=10, set_value=7.5),
+            BulkUpdateItem(setting_id=11, set_value=1.0),
+            BulkUpdateItem(setting_id=99, is_enabled=False),
+        ])
+        
+        result = RelayConfigCRUDService(db).bulk_update_settings(request)
+        
+        assert result.success is False
+        assert result.updated_count == 0
+        assert result.failed_count == 3
+        assert [error["setting_id"] for error in result.errors] == [10, 99]
+        assert "acima do limite máximo 5" in result.errors[0]["error"]
+        assert len(db.statements) == 1
+        assert db.rolled_back is True and db.committed is False
+    
+    def test_repeated_setting_rejected(self):
+        """O mesmo setting_id duas vezes no lote deve ser rejeitado"""
+        db = FakeSession([setting_row(10)])
+        request = BulkUpdateRequest(updates=[
+            BulkUpdateItem(setting_id=10, set_value=1.0),
+            BulkUpdateItem(setting_id=10, set_value=2.0),
+        ])
+        
+        result = RelayConfigCRUDService(db).bulk_update_settings(request)
+        
+        assert result.success is False
+        assert result.errors == [{"setting_id": 10, "error": "Configuração repetida no lote"}]
+    
+    def test_values_rows_are_typed(self):
+        """Cada linha do VALUES deve ter CAST (NULL na primeira linha não vira text)"""
+        sql, params = bulk_update_values([
+            BulkUpdateItem(setting_id=10, is_enabled=False),
+            BulkUpdateItem(setting_id=11, set_value=2.5, notes="Ajustado"),
+        ])
+        
+        assert sql.count("CAST(:set_value_") == 2
+        assert params["set_value_0"] is None
+        assert params["notes_1"] == "Ajustado"
+
+
 class TestValidationEdgeCases:
     """Testes de casos extremos e validações"""
     
@@ -0,0 +1,109 @@
+"""
+Testes do detector único de formato/modelo/fabricante (src/relay_format_sniffer.py).
+Valida as tabelas geradas do relay_models_config.json, a detecção pelo
+conteúdo da 1ª página e pelo nome, e a memorização por hash (uma abertura
+por arquivo, inclusive entre processos via remember()).
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import relay_format_sniffer
+from src.relay_format_sniffer import FormatSniffer, detect_manufacturer
+
+
+@pytest.fixture
+def sniffer():
+    return FormatSniffer()
+
+
+def build_pdf(path, first_page, pages=3):
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        for line, text in enumerate(first_page if page_num == 0 else [f"Página {page_num}"]):
+            page.insert_text((72, 72 + line * 14), text)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def micom_pdf(tmp_path):
+    return build_pdf(tmp_path / "relatorio_01.pdf",
+                     ["MiCOM S1 Agile - Relatório de ficheiro", "00.01: Language: English"])
+
+
+def test_model_patterns_from_config(sniffer):
+    assert sniffer.sniff_filename("P122_52-MF-2B1.pdf")[:3] == ('easergy', 'P122', 'MICON_P122_52')
+    # Modelo conhecido, variante não: chave ambígua
+    assert sniffer.sniff_filename("P122-MF-2B1_params.csv")[:3] == ('easergy', 'P122', None)
+    assert sniffer.sniff_filename("p241_norm.csv")[:2] == ('micom', 'P241')
+    assert sniffer.sniff_filename("00-MF-12_2016-03-31.S40").relay_type == 'sepam'
+    assert sniffer.sniff_filename("P1220.pdf").relay_type == 'unknown'
+
+
+def test_content_beats_filename(sniffer, micom_pdf, tmp_path):
+    result = sniffer.sniff(micom_pdf)
+    assert (result.relay_type, result.manufacturer, result.detected_by) == ('micom', 'GE', 'content')
+    assert result.page_count == 3 and "00.01" in result.head_text
+
+    easergy = build_pdf(tmp_path / "P143_renomeado.pdf",
+                        ["Easergy Studio - Settings File Report", "0104: Frequency: 60 Hz"])
+    result = sniffer.sniff(easergy)
+    assert (result.relay_type, result.model, result.manufacturer) == ('easergy', 'P143', 'SE')
+
+
+def test_sepam_reads_only_first_kb(sniffer, tmp_path):
+    s40 = tmp_path / "00-MF-12.S40"
+    s40.write_bytes(b"[Sepam_Caracteristiques]\nactivite_1=1\n" + b"x" * 100000 + b"siemens")
+
+    result = sniffer.sniff(s40)
+    assert (result.relay_type, result.manufacturer) == ('sepam', 'SE')
+    assert len(result.head_text) == relay_format_sniffer.SNIFF_BYTES
+
+
+def test_one_open_per_content(sniffer, micom_pdf, monkeypatch):
+    opened = []
+    real_open = fitz.open
+
+    def tracking_open(*args, **kwargs):
+        if args:
+            opened.append(args[0])
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(relay_format_sniffer.fitz, "open", tracking_open)
+
+    first = sniffer.sniff(micom_pdf)
+    assert sniffer.sniff(micom_pdf) is first
+    # Mesmo conteúdo com outro nome: reaproveita a leitura, refaz só o nome
+    copy = micom_pdf.with_name("P241_copia.pdf")
+    copy.write_bytes(micom_pdf.read_bytes())
+    assert sniffer.sniff(copy).model == 'P241'
+    assert len(opened) == 1
+
+    # Conteúdo alterado: hash novo, nova leitura
+    build_pdf(micom_pdf, ["Documento sem assinatura"])
+    assert sniffer.sniff(micom_pdf).relay_type == 'unknown'
+    assert len(opened) == 2
+
+
+def test_remember_avoids_reopen_in_worker(micom_pdf, monkeypatch):
+    result = pickle.loads(pickle.dumps(FormatSniffer().sniff(micom_pdf)))
+
+    worker = FormatSniffer()
+    worker.remember(micom_pdf, result)
+    monkeypatch.setattr(relay_format_sniffer.fitz, "open", None)
+    assert worker.sniff(micom_pdf) == result and worker.opens == 0
+
+
+def test_manufacturer_footer_first():
+    text = "Relatório Schneider Electric\n" + "-" * 600 + "\nGenerated by MiCOM S1 Agile"
+    assert detect_manufacturer(text) == 'GE'
+    assert detect_manufacturer("sem fabricante") is None
@@ -0,0 +1,120 @@
+"""
+Testes da carga em massa de relay_settings (src/relay_settings_bulk_loader.py).
+Compara a montagem por coluna com a regra linha a linha de
+NormalizedDataImporter.import_settings_batch e valida o CSV do COPY.
+"""
+
+import csv
+import io
+import math
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from src.relay_settings_bulk_loader import (
+    SETTINGS_COLUMNS, prepare_settings_frame, settings_rows, unit_symbols,
+    iter_copy_lines, CopyRowStream, copy_field,
+)
+from map_parameters_to_functions import get_function_code_and_category
+
+FUNCTION_MAP = {'50': 1, '51': 2, '27': 3}
+UNIT_IDS = {'A': 10, 'ms': 11, 'Hz': 12}
+
+
+def _legacy_rows(equipment_id, df, model_type='MICON'):
+    """Laço de import_settings_batch, com get_or_create_unit → dicionário"""
+    rows = []
+    for _, row in df.iterrows():
+        unit_id = None
+        if 'value_unit' in row and pd.notna(row['value_unit']):
+            unit_id = UNIT_IDS.get(row['value_unit']) if row['value_unit'] else None
+
+        param_code = row.get('parameter_code', '')
+        param_value = row.get('parameter_value', '')
+        value_type = row.get('value_type', 'text')
+        is_active = bool(row.get('is_active', False))
+        is_multipart = bool(row.get('is_multipart', False))
+        multipart_base = row.get('multipart_base', None) if is_multipart else None
+        multipart_part = int(row.get('multipart_part', 0)) if is_multipart else 0
+
+        function_id = None
+        category = 'other'
+        if param_code:
+            function_code, category = get_function_code_and_category(param_code, model_type)
+            if function_code and function_code in FUNCTION_MAP:
+                function_id = FUNCTION_MAP[function_code]
+
+        set_value = None
+        set_value_text = str(param_value) if pd.notna(param_value) else None
+        if value_type == 'numeric':
+            try:
+                set_value = float(param_value)
+            except Exception:
+                pass
+
+        rows.append((equipment_id, function_id, row.get('parameter_description', ''), param_code,
+                     set_value, set_value_text, unit_id, is_active, is_multipart,
+                     multipart_base, multipart_part, value_type, category))
+    return rows
+
+
+def _normalize(rows):
+    """NaN (ausente) e None viram NULL no COPY"""
+    return [tuple(None if isinstance(v, float) and math.isnan(v) else v for v in row) for row in rows]
+
+
+def _sample_df():
+    return pd.DataFrame({
+        'parameter_code': ['0201', '0210', 'i_nominal', '0A05', 'FUNC', '0201'],
+        'parameter_description': ['I>', 'tI>', None, 'Freq "nominal"', 'vazio', 'I> repetido'],
+        'parameter_value': [1.5, 'abc', None, 60, '', '2e3'],
+        'value_type': ['numeric', 'numeric', 'text', 'numeric', 'text', 'numeric'],
+        'value_unit': ['A', 'ms', None, 'Hz', '', 'A'],
+        'is_active': [True, False, True, True, False, 1],
+        'is_multipart': [False, True, False, True, False, False],
+        'multipart_base': [None, '0210', None, '0A05', None, None],
+        'multipart_part': [0, 2, 0, 1, 0, 0],
+    })
+
+
+def test_prepare_matches_row_by_row_import():
+    df = pd.read_csv(io.StringIO(_sample_df().to_csv(index=False)))
+    settings, counters = prepare_settings_frame(df, 7, UNIT_IDS, FUNCTION_MAP, get_function_code_and_category)
+
+    assert list(settings.columns) == list(SETTINGS_COLUMNS)
+    assert _normalize(settings_rows(settings)) == _normalize(_legacy_rows(7, df))
+    assert counters['category_classifications'] == 6
+
+
+def test_prepare_without_optional_columns():
+    df = pd.DataFrame({'parameter_code': ['0201', '0301'], 'parameter_value': ['1', 'x']})
+    settings, _ = prepare_settings_frame(df, 3, {}, FUNCTION_MAP, get_function_code_and_category)
+    assert _normalize(settings_rows(settings)) == _normalize(_legacy_rows(3, df))
+    assert unit_symbols(df) == []
+
+
+def test_unit_symbols_skips_empty_and_missing():
+    assert unit_symbols(_sample_df()) == ['A', 'ms', 'Hz']
+
+
+def test_copy_csv_round_trip_and_streaming():
+    rows = [(1, None, 'texto, "aspas"', '', 2.5, 'linha\nquebrada', None, True, False, None, 0, 'text', 'other')] * 500
+    stream = CopyRowStream(iter_copy_lines(rows))
+
+    chunks = []
+    while True:
+        chunk = stream.read(8192)
+        if not chunk:
+            break
+        assert len(chunk) <= 8192
+        chunks.append(chunk)
+
+    assert stream.rows == 500
+    parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert parsed[0] == ['1', '', 'texto, "aspas"', '', '2.5', 'linha\nquebrada', '', 't', 'f', '', '0', 'text', 'other']
+    # String vazia vai entre aspas (NULL é campo vazio sem aspas)
+    assert copy_field('') == '""' and copy_field(None) == '' and copy_field(float('nan')) == ''
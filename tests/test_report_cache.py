@@ -0,0 +1,132 @@
+"""
+Testes do cache de relatórios renderizados (api/services/report_cache.py):
+versões por equipamento, remoção LRU por tamanho, invalidação e o caminho
+acerto/falha de RelayConfigReportService.get_cached_report (PostgreSQL e
+renderização substituídos por funções falsas).
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services import relay_config_report_service
+from api.services.relay_config_report_service import RelayConfigReportService
+from api.services.report_cache import ReportCache, report_version
+
+
+def age(path: Path, seconds: float):
+    """Recua o mtime (ordem do LRU) sem depender de sleep"""
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_new_version_replaces_previous(tmp_path):
+    cache = ReportCache(tmp_path, max_bytes=10_000)
+    cache.put(7, "pdf", False, "v1", b"old")
+    cache.put(7, "pdf", True, "v1", b"all")
+    cache.put(7, "pdf", False, "v2", b"new")
+
+    assert cache.open(7, "pdf", False, "v1") is None
+    with cache.open(7, "pdf", False, "v2") as handle:
+        assert handle.read() == b"new"
+    # Variante include_disabled não é afetada
+    assert cache.contains(7, "pdf", True, "v1")
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = ReportCache(tmp_path, max_bytes=250)
+    first = cache.put(1, "xlsx", False, "v", b"a" * 100)
+    second = cache.put(2, "xlsx", False, "v", b"b" * 100)
+    age(first, 20)
+    age(second, 10)
+    cache.open(1, "xlsx", False, "v").close()  # acerto renova o equipamento 1
+
+    cache.put(3, "xlsx", False, "v", b"c" * 100)
+
+    assert cache.contains(1, "xlsx", False, "v")
+    assert not cache.contains(2, "xlsx", False, "v")
+    assert cache.stats()["bytes"] == 200
+
+
+def test_invalidate_only_matching_equipment(tmp_path):
+    cache = ReportCache(tmp_path, max_bytes=10_000)
+    for fmt in ("csv", "pdf"):
+        cache.put(1, fmt, False, "v", b"x")
+    cache.put(12, "pdf", False, "v", b"x")
+
+    assert cache.invalidate([1]) == 2
+    assert cache.contains(12, "pdf", False, "v")
+    assert cache.invalidate([99]) == 0
+
+
+def test_open_handle_survives_concurrent_removal(tmp_path):
+    cache = ReportCache(tmp_path, max_bytes=10_000)
+    cache.put(5, "pdf", False, "v", b"%PDF-1.4 relay sheet")
+
+    handle = cache.open(5, "pdf", False, "v")
+    cache.invalidate([5])
+    with handle:
+        assert handle.read() == b"%PDF-1.4 relay sheet"
+
+
+def test_version_changes_with_settings():
+    base = report_version("2025-11-22 10:00:00", 32, "2025-11-01")
+    assert report_version("2025-11-22 10:00:00", 32, "2025-11-01") == base
+    assert report_version("2025-11-22 10:05:00", 32, "2025-11-01") != base
+    assert report_version("2025-11-22 10:00:00", 31, "2025-11-01") != base
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(relay_config_report_service, "REPORT_CACHE", ReportCache(tmp_path, 10_000))
+    service = RelayConfigReportService(db=None)
+    state = {"version": {"equipment_tag": "52-MF-02A", "version": "v1"}, "renders": 0}
+
+    def render(equipment_id, format, include_disabled):
+        state["renders"] += 1
+        return {"data": "TAG,VALOR\n52-MF-02A,0.63\n" if format == "csv" else b"%PDF", "format": format}
+
+    monkeypatch.setattr(service, "get_report_version", lambda equipment_id: state["version"])
+    monkeypatch.setattr(service, "generate_configuration_report", render)
+    return SimpleNamespace(service=service, state=state)
+
+
+def test_cached_report_miss_then_hit(service):
+    miss = service.service.get_cached_report(1, "CSV")
+    assert miss["cached"] is False and miss["data"] == b"TAG,VALOR\n52-MF-02A,0.63\n"
+    assert miss["filename"].startswith("CONFIG_52-MF-02A_") and miss["filename"].endswith(".csv")
+
+    hit = service.service.get_cached_report(1, "csv")
+    with hit["data"] as handle:
+        assert handle.read() == miss["data"]
+    assert hit["cached"] is True
+    assert service.state["renders"] == 1
+
+    # Ajustes alterados: nova versão, nova renderização
+    service.state["version"] = {"equipment_tag": "52-MF-02A", "version": "v2"}
+    assert service.service.get_cached_report(1, "csv")["cached"] is False
+    assert service.state["renders"] == 2
+
+
+def test_prerender_skips_current_reports(service):
+    assert service.service.prerender_reports(1, ["pdf", "xlsx"]) == 2
+    assert service.service.prerender_reports(1, ["pdf", "xlsx"]) == 0
+    assert service.state["renders"] == 2
+
+
+def test_cached_report_errors(service):
+    with pytest.raises(HTTPException) as exc:
+        service.service.get_cached_report(1, "json")
+    assert exc.value.status_code == 400
+
+    service.state["version"] = None
+    with pytest.raises(HTTPException) as exc:
+        service.service.get_cached_report(1, "pdf")
+    assert exc.value.status_code == 404
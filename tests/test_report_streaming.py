@@ -0,0 +1,105 @@
+"""
+Testes da exportação em streaming (api/services/report_streaming.py):
+CSV em blocos por lote, XLSX em modo constant_memory com os tipos vindos do
+PostgreSQL, resposta em blocos com remoção do arquivo temporário e erro de
+consulta antes do primeiro byte.
+"""
+
+import sys
+import asyncio
+from decimal import Decimal
+from datetime import datetime, timezone
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services.report_streaming import (
+    export_response, iter_csv, iter_csv_rows, start_stream, write_xlsx,
+)
+
+
+def batches(count, size):
+    for start in range(0, count, size):
+        yield [
+            {"equipment_tag": f"REL-{i}", "set_value": Decimal("1.5"), "unit_symbol": None}
+            for i in range(start, min(start + size, count))
+        ]
+
+
+def test_csv_one_chunk_per_batch():
+    chunks = list(iter_csv(batches(5, 2)))
+
+    assert len(chunks) == 3
+    text = b"".join(chunks).decode()
+    assert text.splitlines()[0] == "equipment_tag,set_value,unit_symbol"
+    assert text.splitlines()[1:] == [f"REL-{i},1.5," for i in range(5)]
+
+
+def test_csv_empty_result_has_empty_body():
+    assert list(iter_csv(iter([[]]))) == []
+
+
+def test_csv_rows_chunking_keeps_header_once():
+    chunks = list(iter_csv_rows(["a", "b"], ([i, i * 2] for i in range(5)), chunk_rows=2))
+
+    assert len(chunks) == 3
+    assert b"".join(chunks).decode().splitlines() == ["a,b", "0,0", "1,2", "2,4", "3,6", "4,8"]
+
+
+def test_xlsx_constant_memory_writes_all_rows(tmp_path):
+    path = tmp_path / "setpoints.xlsx"
+
+    def rows():
+        yield [{"tag": "REL-1", "value": Decimal("2.5"), "active": True,
+                "updated": datetime(2025, 11, 21, 10, 0, tzinfo=timezone.utc), "unit": None}]
+        yield [{"tag": "REL-2", "value": 7, "active": False, "updated": None, "unit": "A"}]
+
+    written = write_xlsx(path, rows(), "Setpoints Críticos", headers=["TAG", "Valor", "Unidade"],
+                         columns=["tag", "value", "unit"], header_color="#CC0066")
+
+    assert written == 2
+    sheet = openpyxl.load_workbook(path).active
+    assert sheet.title == "Setpoints Críticos"
+    assert [list(row) for row in sheet.iter_rows(values_only=True)] == [
+        ["TAG", "Valor", "Unidade"], ["REL-1", 2.5, None], ["REL-2", 7, "A"],
+    ]
+
+
+def test_xlsx_headers_from_first_row(tmp_path):
+    path = tmp_path / "coordenacao.xlsx"
+    write_xlsx(path, batches(3, 2), "Coordenação")
+
+    rows = list(openpyxl.load_workbook(path).active.iter_rows(values_only=True))
+    assert rows[0] == ("equipment_tag", "set_value", "unit_symbol")
+    assert len(rows) == 4
+
+
+def test_file_response_streams_and_removes_temp_file(tmp_path):
+    path = tmp_path / "export.xlsx"
+    path.write_bytes(b"x" * 200_000)
+    response = export_response(path, "xlsx", "REL.xlsx")
+
+    async def consume():
+        body = [chunk async for chunk in response.body_iterator]
+        await response.background()
+        return body
+
+    body = asyncio.run(consume())
+    assert len(body) > 1 and sum(map(len, body)) == 200_000
+    assert response.headers["content-disposition"] == "attachment; filename=REL.xlsx"
+    assert not path.exists()
+
+
+def test_start_stream_raises_before_response():
+    def failing():
+        raise RuntimeError("relation does not exist")
+        yield b""
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(start_stream(failing()))
+
+    chunks = asyncio.run(start_stream(iter([b"a", b"b"])))
+    assert list(chunks) == [b"a", b"b"]
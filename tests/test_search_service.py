@@ -0,0 +1,109 @@
+"""
+Testes da busca typeahead (api/services/search_service.py): montagem do SQL
+com e sem pg_trgm, escape de curingas do LIKE, validação dos tipos e
+conversão das linhas. O PostgreSQL é substituído por uma conexão falsa.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services import search_service
+from api.services.search_service import SearchService, build_typeahead_sql, like_escape
+
+
+class FakeConnection:
+    """Responde à detecção do pg_trgm e guarda a consulta de typeahead"""
+
+    def __init__(self, trigram, rows=()):
+        self.trigram = trigram
+        self.rows = list(rows)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_extension" in sql:
+            return SimpleNamespace(scalar=lambda: self.trigram)
+        self.statements.append((sql, params))
+        return SimpleNamespace(fetchall=lambda: self.rows)
+
+
+@pytest.fixture(autouse=True)
+def reset_detection(monkeypatch):
+    monkeypatch.setattr(search_service, "_trigram_available", None)
+
+
+@pytest.fixture
+def run_typeahead(monkeypatch):
+    """Executa SearchService.typeahead sobre a conexão falsa"""
+    def run(conn, q, **kwargs):
+        async def fake_run_read(work, async_db=None):
+            return work(conn)
+
+        monkeypatch.setattr(search_service, "run_read", fake_run_read)
+        return asyncio.run(SearchService(db=None).typeahead(q, **kwargs))
+
+    return run
+
+
+def test_trigram_sql_uses_similarity_per_kind():
+    sql = build_typeahead_sql(["tag", "barra"], trigram=True, schema="bench")
+
+    assert sql.count("UNION ALL") == 1
+    assert "FROM bench.relay_equipment src" in sql
+    assert ":q <% src.equipment_tag" in sql and "word_similarity(:q, src.barra_nome)" in sql
+    # Barras são agregadas (sem id de registro)
+    assert "GROUP BY src.barra_nome\n" in sql
+    assert sql.rstrip().endswith("LIMIT :limit")
+
+
+def test_ilike_sql_without_trigram_operators():
+    sql = build_typeahead_sql(["model", "parameter"], trigram=False)
+
+    assert "<%" not in sql and "word_similarity" not in sql
+    assert "src.model_name ILIKE :pattern" in sql
+    assert "FROM protec_ai.relay_settings src" in sql
+
+
+def test_like_wildcards_escaped():
+    assert like_escape("50_1%") == "50\\_1\\%"
+    assert like_escape("a\\b") == "a\\\\b"
+
+
+def test_typeahead_params_and_rows(run_typeahead):
+    rows = [SimpleNamespace(kind="tag", value="52-MF-01A", ref_id=7, occurrences=1,
+                            score=0.8333, prefix_match=True)]
+    conn = FakeConnection(trigram=True, rows=rows)
+
+    result = run_typeahead(conn, " 52-MF_ ", limit=5, kinds=["tag"])
+
+    assert result["mode"] == "trigram" and result["query"] == "52-MF_"
+    assert result["results"] == [{"kind": "tag", "value": "52-MF-01A", "ref_id": 7, "occurrences": 1,
+                                  "score": 0.833, "prefix_match": True}]
+    _, params = conn.statements[0]
+    assert params == {"q": "52-MF_", "pattern": "%52-MF\\_%", "prefix": "52-MF\\_%",
+                      "per_kind": 5, "limit": 5}
+
+
+def test_typeahead_falls_back_to_ilike(run_typeahead):
+    conn = FakeConnection(trigram=False)
+
+    result = run_typeahead(conn, "P12")
+
+    assert result["mode"] == "ilike" and result["results"] == []
+    sql, _ = conn.statements[0]
+    assert "<%" not in sql
+    assert sql.count("UNION ALL") == len(search_service.SEARCH_SOURCES) - 1
+
+
+@pytest.mark.parametrize("q, kinds", [("a", None), ("P122", ["tag", "relay"])])
+def test_typeahead_rejects_invalid_input(run_typeahead, q, kinds):
+    with pytest.raises(HTTPException) as exc:
+        run_typeahead(FakeConnection(trigram=True), q, kinds=kinds)
+    assert exc.value.status_code == 400
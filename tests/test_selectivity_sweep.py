@@ -0,0 +1,177 @@
+"""
+Testes da varredura de seletividade (api/services/selectivity_sweep_engine.py)
+e da leitura de ajustes de relay_settings (apply_settings_rows).
+"""
+
+import sys
+import math
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.core.concurrency import run_in_process, shutdown_render_pool
+from api.services.selectivity_sweep_engine import SelectivitySweepEngine, backup_pairs, sweep_study
+from api.services.tcc_coordination_engine import (
+    RelaySetting, apply_settings_rows, settings_arrays, trip_time_matrix,
+)
+
+
+def _radial_feeder():
+    """Fonte → barra B1 (entrada + 2 alimentadores) → barra B2 (entrada + 1 alimentador)"""
+    return [
+        RelaySetting("INC-B1", pickup=1000, time_dial=0.4, curve="IEC_SI", bus="B1", bay="Entrada"),
+        RelaySetting("AL-1", pickup=200, time_dial=0.1, curve="IEC_SI", bus="B1", bay="AL1"),
+        RelaySetting("AL-2", pickup=300, time_dial=0.2, curve="IEC_SI", bus="B1", bay="AL2"),
+        RelaySetting("INC-B2", pickup=250, time_dial=0.15, curve="IEC_SI", bus="B2", bay="INC",
+                     upstream="AL-2"),
+        RelaySetting("AL-3", pickup=50, time_dial=0.05, curve="IEC_SI", bus="B2", bay="AL3"),
+    ]
+
+
+def test_backup_pairs_walks_every_upstream_relay():
+    relays = _radial_feeder()
+    backups, primaries, levels = backup_pairs(relays)
+    pairs = {(relays[b].name, relays[p].name, int(l)) for b, p, l in zip(backups, primaries, levels)}
+    assert pairs == {
+        ("INC-B1", "AL-1", 1), ("INC-B1", "AL-2", 1), ("AL-2", "INC-B2", 1), ("INC-B1", "INC-B2", 2),
+        ("INC-B2", "AL-3", 1), ("AL-2", "AL-3", 2), ("INC-B1", "AL-3", 3),
+    }
+
+    backups, _, levels = backup_pairs(relays, backup_levels=1)
+    assert len(backups) == 4 and set(levels.tolist()) == {1}
+
+
+def test_sweep_margins_match_scalar_reference():
+    relays = _radial_feeder()
+    engine = SelectivitySweepEngine(selectivity_margin=0.2, fault_levels=300)
+    analysis = engine.analyze(relays)
+    grid = np.geomspace(50 * 1.01, 1000 * 20.0, 300)
+    times = trip_time_matrix(settings_arrays(relays), grid)
+    index = {relay.name: k for k, relay in enumerate(relays)}
+
+    assert analysis["pairs_analyzed"] == 7 and analysis["fault_levels"] == 300
+    for result in analysis["results"]:
+        up, down = times[index[result["backup_device"]]], times[index[result["primary_device"]]]
+        expected = min(u - d for u, d in zip(up, down) if math.isfinite(d))
+        assert result["selectivity_margin"] == pytest.approx(expected, abs=1e-4)
+        assert result["is_selective"] == (expected >= 0.2)
+
+
+def test_iter_violations_streams_same_violations_as_analyze(monkeypatch):
+    import api.services.selectivity_sweep_engine as sweep
+    monkeypatch.setattr(sweep, "SWEEP_BLOCK_CELLS", 600)  # força vários blocos
+
+    relays = _radial_feeder()
+    relays[1].time_dial = 0.5  # AL-1 mais lento que a entrada
+    engine = SelectivitySweepEngine(selectivity_margin=0.2, fault_levels=200)
+    events = list(engine.iter_violations(relays))
+    analysis = engine.analyze(relays)
+
+    assert events[0]["type"] == "start" and events[-1]["type"] == "summary"
+    streamed = [(e["backup_device"], e["primary_device"]) for e in events if e["type"] == "violation"]
+    assert streamed == [(v["backup_device"], v["primary_device"]) for v in analysis["violations"]]
+    assert ("INC-B1", "AL-1") in streamed
+    assert events[-1]["violations"] == len(streamed) and events[-1]["pairs_analyzed"] == 7
+    assert analysis["overall_status"] == events[-1]["overall_status"] == "violations_found"
+
+
+def test_too_few_relays_yields_empty_summary():
+    events = list(SelectivitySweepEngine().iter_violations([RelaySetting("A", pickup=100),
+                                                             RelaySetting("B", pickup=None)]))
+    assert events[0]["skipped_devices"] == ["B"]
+    assert events[-1]["pairs_analyzed"] == 0 and events[-1]["overall_status"] == "selective"
+
+
+def test_apply_settings_rows_micom_per_unit_stages():
+    rows = [
+        {"parameter_name": "Phase CT Primary", "set_value": 400, "unit_of_measure": "A"},
+        {"parameter_name": "I>1 Function", "set_value_text": "IEC V Inverse"},
+        {"parameter_name": "I>1 Current Set", "set_value": 1.2, "unit_of_measure": "In"},
+        {"parameter_name": "I>1 TMS", "set_value": 0.15},
+        {"parameter_name": "I>2 Current Set", "set_value": 10, "unit_of_measure": "In"},
+        {"parameter_name": "I>2 Time Delay", "set_value": 0.05, "unit_of_measure": "s"},
+        {"parameter_name": "I>3 Function", "set_value_text": "Disabled"},
+        {"parameter_name": "IN>1 Current", "set_value": 0.1, "unit_of_measure": "In"},
+    ]
+    setting = apply_settings_rows(RelaySetting("P143", pickup=999, curve="IEC_SI"), rows)
+    assert setting.pickup == pytest.approx(480.0)
+    assert (setting.curve, setting.time_dial) == ("IEC_VI", 0.15)
+    assert setting.instantaneous_pickup == pytest.approx(4000.0)
+    assert setting.instantaneous_delay == pytest.approx(0.05)
+
+
+def test_apply_settings_rows_definite_time_stage():
+    rows = [
+        {"parameter_name": "I>", "function_code": "51", "set_value": 300, "unit_of_measure": "A"},
+        {"parameter_name": "tI>", "function_code": "51", "set_value": 0.4, "unit_of_measure": "s"},
+        {"parameter_name": "I>>", "function_code": "50", "set_value": 2500, "unit_of_measure": "A"},
+        {"parameter_name": "Ie>", "function_code": "51N", "set_value": 20, "unit_of_measure": "A"},
+    ]
+    setting = apply_settings_rows(RelaySetting("SEPAM", pickup=None), rows)
+    assert (setting.pickup, setting.curve, setting.time_dial) == (300.0, "DT", 0.4)
+    assert (setting.instantaneous_pickup, setting.instantaneous_delay) == (2500.0, 0.0)
+
+
+def test_sweep_study_runs_in_process_pool():
+    relays = _radial_feeder()
+    try:
+        result = asyncio.run(run_in_process(sweep_study, relays, {"fault_levels": 100}))
+    finally:
+        shutdown_render_pool()
+    assert result == sweep_study(relays, {"fault_levels": 100})
+    assert result["engine"] == "numpy_selectivity_sweep" and result["pairs_analyzed"] == 7
+
+
+def test_adapter_fallback_gets_study_devices(monkeypatch):
+    """Sem ajustes no estudo, o adapter recebe a configuração padrão com os dispositivos"""
+    from types import SimpleNamespace
+    import api.services.etap_native_service as native
+    from api.services.etap_native_service import EtapNativeService
+
+    received = []
+
+    class FakeAdapter:
+        async def connect(self):
+            pass
+
+        async def disconnect(self):
+            pass
+
+        async def run_selectivity_analysis(self, config):
+            received.append(config)
+            return SimpleNamespace(status="completed", result_data={})
+
+    async def fake_mock_adapter():
+        return FakeAdapter()
+
+    async def get_study_by_id(study_id):
+        configs = [SimpleNamespace(tag_reference="52-MF-01"), SimpleNamespace(tag_reference="52-MF-02")]
+        return SimpleNamespace(equipment_configurations=configs)
+
+    async def no_relays(study_id, config):
+        return []
+
+    async def finish(study_id, operation_id, start_time, operation_result, use_native):
+        return {"success": True}
+
+    service = EtapNativeService.__new__(EtapNativeService)
+    service.logger = native.logger
+    service.native_mode = False
+    service.fallback_enabled = True
+    service.etap_service = SimpleNamespace(get_study_by_id=get_study_by_id)
+    service.adapter_manager = SimpleNamespace(get_current_adapter=lambda: FakeAdapter())
+    service._try_load_analysis_relays = no_relays
+    service._finish_selectivity_analysis = finish
+    monkeypatch.setattr(native, "create_mock_simulator_adapter", fake_mock_adapter)
+
+    assert asyncio.run(service.run_selectivity_analysis_native("7"))["success"]
+    assert received[0]["devices"] == ["52-MF-01", "52-MF-02"]
+    assert received[0]["selectivity_margin"] == 0.2
+
+    # Configuração explícita segue intacta
+    asyncio.run(service.run_selectivity_analysis_native("7", {"study_id": "7", "devices": ["X"]}))
+    assert received[1] == {"study_id": "7", "devices": ["X"]}
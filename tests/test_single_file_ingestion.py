@@ -0,0 +1,160 @@
+"""
+Testes da ingestão de arquivo único (src/single_file_ingestion.py).
+Estágios externos (extrator, normalizador, PostgreSQL) são substituídos por
+dublês; valida a ordem dos estágios, os tempos reportados, o uso do cache
+da pipeline e o relatório de falha.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.single_file_ingestion import SingleFileIngestion
+
+
+class FakeNormalizer:
+    NORMALIZER_VERSION = "test"
+    output_dir = None
+
+    def normalized_output_paths(self, original_filename):
+        stem = Path(original_filename).stem
+        return [self.output_dir / f"{stem}.csv", self.output_dir / f"{stem}.xlsx"]
+
+    def normalize_csv(self, csv_path):
+        return pd.read_csv(csv_path)
+
+    def save_normalized(self, df, original_filename):
+        for path in self.normalized_output_paths(original_filename):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(path, index=False)
+
+
+class FakeImporter:
+    IMPORTER_VERSION = "test"
+    connected = True
+    imported = []
+
+    def __init__(self, incremental=False, bulk=True):
+        assert incremental and bulk
+        self.conn = object()
+        self.stats = {'settings_inserted': 0, 'equipments_inserted': 0, 'errors': []}
+
+    def connect(self):
+        return self.connected
+
+    def process_file_bulk(self, csv_path):
+        self.imported.append(csv_path.name)
+        self.stats['settings_inserted'] = len(pd.read_csv(csv_path))
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def ingestion(tmp_path):
+    ingestion = SingleFileIngestion(tmp_path, registry_path=tmp_path / "pipeline_cache.json")
+    processor = ingestion.processor
+
+    def run_file_task(file_type, file_path):
+        csv_path, *extra_outputs = processor.raw_output_paths(file_path.stem)
+        csv_path.write_text("Code,Description,Value\n0104,Frequency,60Hz\n0120,I>,1.2\n")
+        for path in extra_outputs:
+            path.write_bytes(b"xlsx")
+        return {'file': file_path.name, 'file_type': file_type, 'success': True, 'parameters': 2}
+
+    processor.run_file_task = run_file_task
+    FakeNormalizer.output_dir = tmp_path / "outputs" / "norm_csv"
+    FakeImporter.connected = True
+    FakeImporter.imported = []
+    ingestion.normalizer_class = FakeNormalizer
+    ingestion.importer_class = FakeImporter
+    ingestion.detect_active_functions = lambda path: {
+        'relay_file': path.name, 'model': 'MICON_P122_52', 'detection_method': 'checkbox',
+        'active_functions': ['50', '51'], 'success': True,
+    }
+    ingestion.create_active_functions_table = lambda conn: True
+    ingestion.replaced = []
+    ingestion.replace_relay_functions = (
+        lambda conn, detection, source, descriptions: ingestion.replaced.append(detection['relay_file'])
+        or len(detection['active_functions'])
+    )
+
+    relay = tmp_path / "P122_52.pdf"
+    relay.write_bytes(b"%PDF relay")
+    ingestion.relay = relay
+    return ingestion
+
+
+def test_ingest_runs_all_stages_with_timings(ingestion):
+    report = ingestion.ingest(ingestion.relay)
+
+    assert report['success'] and report['status'] == "imported"
+    assert list(report['stages']) == ["extract", "normalize", "detect", "load"]
+    assert set(report['stage_timings']) == set(report['stages'])
+    assert all(seconds >= 0 for seconds in report['stage_timings'].values())
+    assert report['stages']['extract']['parameters'] == 2
+    assert report['stages']['load']['settings_inserted'] == 2
+    assert report['stages']['load']['active_functions'] == 2
+    # Só o arquivo enviado é importado
+    assert FakeImporter.imported == ["P122_52_params.csv"]
+    assert ingestion.replaced == ["P122_52.pdf"]
+
+
+def test_unchanged_file_skips_stages_unless_forced(ingestion):
+    ingestion.ingest(ingestion.relay)
+
+    again = ingestion.ingest(ingestion.relay)
+    assert again['status'] == "unchanged"
+    assert again['stages']['extract']['status'] == "skipped"
+    assert again['stages']['normalize']['status'] == "skipped"
+    assert again['stages']['load']['settings'] == "skipped"
+    assert FakeImporter.imported == ["P122_52_params.csv"]
+
+    forced = ingestion.ingest(ingestion.relay, force=True)
+    assert forced['status'] == "imported"
+    assert FakeImporter.imported == ["P122_52_params.csv"] * 2
+
+
+def test_load_failure_reports_stage_and_keeps_extraction(ingestion):
+    FakeImporter.connected = False
+    report = ingestion.ingest(ingestion.relay)
+
+    assert not report['success']
+    assert report['failed_stage'] == "load"
+    assert report['stages']['load']['status'] == "failed"
+    assert "load" in report['stage_timings']
+
+    # Extração e normalização continuam válidas no cache
+    FakeImporter.connected = True
+    retry = ingestion.ingest(ingestion.relay)
+    assert retry['success']
+    assert retry['stages']['extract']['status'] == "skipped"
+    assert retry['stages']['load']['settings'] == "replaced"
+
+
+def test_detection_failure_still_loads_settings(ingestion):
+    ingestion.detect_active_functions = lambda path: {
+        'relay_file': path.name, 'model': None, 'active_functions': [],
+        'success': False, 'error': 'Modelo não identificado',
+    }
+    report = ingestion.ingest(ingestion.relay)
+
+    assert report['success']
+    assert report['stages']['detect']['status'] == "not_detected"
+    assert 'active_functions' not in report['stages']['load']
+    assert ingestion.replaced == []
+
+
+def test_unsupported_format(ingestion, tmp_path):
+    sheet = tmp_path / "relay.xlsx"
+    sheet.write_bytes(b"xlsx")
+    report = ingestion.ingest(sheet)
+
+    assert not report['success']
+    assert "Formato não suportado" in report['error']
+    assert report['stages'] == {}
@@ -0,0 +1,110 @@
+"""
+Testes do cache de snapshots (api/core/snapshot_cache.py): TTL, cálculo
+único por chave com requisições concorrentes, ETag estável quando os dados
+não mudam, 304 com If-None-Match e invalidação.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+from fastapi import Request
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.core.snapshot_cache import SnapshotCache, snapshot_response
+
+
+class CountingLoader:
+    """Loader assíncrono que conta chamadas e devolve `self.value`"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return dict(self.value, timestamp=f"t{self.calls}")
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/statistics", "headers": headers})
+
+
+def test_ttl_serves_cached_snapshot():
+    cache = SnapshotCache(ttl_seconds=60)
+    loader = CountingLoader({"total": 10})
+
+    async def scenario():
+        first = await cache.get("stats", loader)
+        second = await cache.get("stats", loader)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert first is second
+    assert first.value["total"] == 10
+
+
+def test_concurrent_requests_load_once():
+    cache = SnapshotCache(ttl_seconds=60)
+    loader = CountingLoader({"total": 10})
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("stats", loader) for _ in range(5)))
+
+    snapshots = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert len({id(snapshot) for snapshot in snapshots}) == 1
+
+
+def test_etag_stable_when_only_timestamp_changes():
+    cache = SnapshotCache(ttl_seconds=0)
+    loader = CountingLoader({"total": 10})
+
+    async def scenario():
+        first_etag = (await cache.get("stats", loader)).etag
+        unchanged_etag = (await cache.get("stats", loader)).etag
+        loader.value = {"total": 11}
+        changed = await cache.get("stats", loader)
+        return first_etag, unchanged_etag, changed
+
+    first_etag, unchanged_etag, changed = asyncio.run(scenario())
+    assert loader.calls == 3
+    assert first_etag == unchanged_etag
+    assert changed.etag != first_etag
+    assert changed.value["total"] == 11
+
+
+def test_invalidate_forces_reload():
+    cache = SnapshotCache(ttl_seconds=60)
+    loader = CountingLoader({"total": 10})
+
+    async def scenario():
+        await cache.get("stats", loader)
+        await cache.get("other", loader)
+        cache.invalidate("stats")
+        await cache.get("stats", loader)
+        await cache.get("other", loader)
+        cache.invalidate()
+        await cache.get("other", loader)
+
+    asyncio.run(scenario())
+    assert loader.calls == 4
+
+
+def test_response_headers_and_not_modified():
+    cache = SnapshotCache(ttl_seconds=30)
+    snapshot = asyncio.run(cache.get("stats", CountingLoader({"total": 10})))
+
+    response = snapshot_response(make_request(), snapshot)
+    assert response.status_code == 200
+    assert response.headers["etag"] == snapshot.etag
+    assert response.headers["cache-control"].startswith("private, max-age=")
+    assert b'"total": 10' in response.body
+
+    assert snapshot_response(make_request(snapshot.etag), snapshot).status_code == 304
+    assert snapshot_response(make_request(f'"old", W/{snapshot.etag}'), snapshot).status_code == 304
+    assert snapshot_response(make_request('"old"'), snapshot).status_code == 200
@@ -0,0 +1,119 @@
+"""
+Testes do formato intermediário tipado entre estágios (src/stage_frames.py).
+Valida que códigos com zero à esquerda e valores como "None"/"NA" atravessam
+CSV/Parquet como texto, a conformação de booleanos/inteiros e o uso pelos
+estágios (saídas brutas sem Excel, códigos ativos no normalizador 3FN).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from src.complete_pipeline_processor import CompletePipelineProcessor
+from src.stage_frames import (
+    NORMALIZED_3NF_SCHEMA, PARQUET_AVAILABLE, RAW_PARAMS_SCHEMA, conform_frame,
+    parquet_path_for, read_stage_frame, stage_output_paths, write_stage_frame,
+)
+from normalize_to_3nf import Normalizer3NF
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame({
+        'Code': ['0104', '0081', '010A', 'Page'],
+        'Description': ['Frequency', 'Serial', 'Reference', '1'],
+        'Value': ['60Hz', '00123', 'NA', 'None'],
+        'is_active': [True, False, 'True', None],
+    })
+
+
+def test_csv_round_trip_keeps_text(raw_frame, tmp_path):
+    csv_path = tmp_path / 'csv' / 'P122_params.csv'
+    assert write_stage_frame(raw_frame, csv_path, RAW_PARAMS_SCHEMA, parquet=False) == [csv_path]
+
+    df = read_stage_frame(csv_path, RAW_PARAMS_SCHEMA)
+    assert df['Code'].tolist() == ['0104', '0081', '010A', 'Page']
+    assert df['Value'].tolist() == ['60Hz', '00123', 'NA', 'None']
+    assert df['is_active'].dtype == bool and df['is_active'].tolist() == [True, False, True, False]
+    # Mesmo resultado que conformar o DataFrame original
+    pd.testing.assert_frame_equal(df, conform_frame(raw_frame, RAW_PARAMS_SCHEMA))
+
+
+def test_conform_normalized_columns():
+    df = conform_frame(pd.DataFrame({
+        'parameter_code': ['0150', None],
+        'parameter_value': [1.5, ''],
+        'is_multipart': ['True', 'False'],
+        'multipart_part': ['2', ''],
+        'code_0081': [12345, 678],
+    }), NORMALIZED_3NF_SCHEMA)
+
+    assert df['parameter_code'].tolist()[0] == '0150' and pd.isna(df['parameter_code'][1])
+    assert df['parameter_value'][0] == '1.5' and pd.isna(df['parameter_value'][1])
+    assert df['is_multipart'].tolist() == [True, False]
+    assert str(df['multipart_part'].dtype) == 'Int64' and df['multipart_part'][0] == 2
+    # Colunas fora do esquema são texto
+    assert df['code_0081'][0] == '12345'
+
+
+def test_parquet_twin_paths(tmp_path):
+    assert parquet_path_for(tmp_path / 'csv' / 'a_params.csv') == tmp_path / 'parquet' / 'a_params.parquet'
+    assert parquet_path_for(tmp_path / 'norm_csv' / 'a.csv') == tmp_path / 'norm_parquet' / 'a.parquet'
+    assert parquet_path_for(tmp_path / 'a.csv') == tmp_path / 'a.parquet'
+    # O gêmeo Parquet é opcional: não entra nas saídas exigidas pelo cache
+    assert stage_output_paths(tmp_path / 'csv' / 'a_params.csv') == [tmp_path / 'csv' / 'a_params.csv']
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow não instalado")
+def test_parquet_preferred_when_not_older(raw_frame, tmp_path):
+    csv_path = tmp_path / 'csv' / 'P122_params.csv'
+    written = write_stage_frame(raw_frame, csv_path, RAW_PARAMS_SCHEMA)
+    assert written == [csv_path, tmp_path / 'parquet' / 'P122_params.parquet']
+    expected = read_stage_frame(csv_path, RAW_PARAMS_SCHEMA)
+
+    # CSV adulterado sem tocar no mtime: o Parquet é quem vale
+    stat = csv_path.stat()
+    csv_path.write_text("Code,Description,Value,is_active\n9999,x,y,True\n", encoding='utf-8')
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    pd.testing.assert_frame_equal(read_stage_frame(csv_path, RAW_PARAMS_SCHEMA), expected)
+
+    # CSV editado depois: volta a valer o CSV
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert read_stage_frame(csv_path, RAW_PARAMS_SCHEMA)['Code'].tolist() == ['9999']
+
+
+def test_raw_outputs_without_excel(raw_frame, tmp_path):
+    processor = CompletePipelineProcessor(str(tmp_path), excel=False)
+    processor._save_raw_outputs(raw_frame, 'P122')
+
+    paths = processor.raw_output_paths('P122')
+    assert paths == [processor.output_csv / 'P122_params.csv']
+    assert all(path.exists() for path in paths)
+    assert not any(path.suffix == '.xlsx' for path in paths)
+    assert not list(processor.output_excel.glob('*.xlsx'))
+
+
+def test_active_codes_keep_leading_zeros(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    csv_dir = tmp_path / 'outputs' / 'csv'
+    csv_dir.mkdir(parents=True)
+    pd.DataFrame({
+        'Code': ['0104', '0105', '0081'],
+        'Description': ['Frequency', 'Language', 'Serial Number'],
+        'Value': ['60Hz', 'None', '00123'],
+    }).to_csv(csv_dir / 'relay_params.csv', index=False)
+    pd.DataFrame({'Code': ['0104', '0105'], 'is_active': [True, False]}).to_csv(
+        csv_dir / 'relay_active_setup.csv', index=False)
+
+    normalizer = Normalizer3NF(excel=False)
+    df, metadata = normalizer.normalize_csv(csv_dir / 'relay_params.csv')
+
+    assert metadata.get('serial_number') == '00123'
+    assert df.set_index('parameter_code')['is_active'].to_dict() == {'0104': True, '0105': False}
+    assert df.loc[df['parameter_code'] == '0105', 'parameter_value'].item() == 'None'
@@ -0,0 +1,126 @@
+"""
+Testes do motor de coordenação TCC (api/services/tcc_coordination_engine.py).
+Tempos de referência das curvas IEC 60255-151 / IEEE C37.112 e CTI
+comparado ao cálculo escalar ponto a ponto.
+"""
+
+import sys
+import math
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services.tcc_coordination_engine import (
+    RelaySetting, TCCCoordinationEngine, resolve_curve, relay_setting_from_config,
+    relay_setting_from_dict, settings_arrays, trip_time_matrix, adjacent_pairs,
+)
+
+
+def _trip_time(relay, current):
+    return float(trip_time_matrix(settings_arrays([relay]), np.array([current]))[0, 0])
+
+
+@pytest.mark.parametrize("curve, expected", [
+    ("IEC_SI", 2.9706),   # 0.14 / (10^0.02 − 1)
+    ("IEC_VI", 1.5),      # 13.5 / 9
+    ("IEC_EI", 0.8081),   # 80 / 99
+    ("IEEE_VI", 0.6891),  # 19.61 / 99 + 0.491
+    ("DT", 1.0),
+])
+def test_curve_times_at_ten_times_pickup(curve, expected):
+    relay = RelaySetting("R", pickup=100, time_dial=1.0, curve=curve)
+    assert _trip_time(relay, 1000) == pytest.approx(expected, abs=1e-4)
+
+
+def test_no_trip_below_pickup_and_instantaneous_element():
+    relay = RelaySetting("R", pickup=100, time_dial=0.5, curve="IEC_SI",
+                         instantaneous_pickup=2000, instantaneous_delay=0.05, minimum_time=0.2)
+    assert math.isinf(_trip_time(relay, 100))
+    assert _trip_time(relay, 1000) == pytest.approx(0.5 * 2.9706, abs=1e-3)
+    assert _trip_time(relay, 2500) == pytest.approx(0.05)
+
+
+def test_resolve_curve_names():
+    assert resolve_curve("IEC Very Inverse") == "IEC_VI"
+    assert resolve_curve("IEEE EI") == "IEEE_EI"
+    assert resolve_curve("VI", standard="ieee") == "IEEE_VI"
+    assert resolve_curve("DMT") == "DT"
+    assert resolve_curve(None) == resolve_curve("desconhecida") == "IEC_SI"
+
+
+def test_adjacent_pairs_prunes_by_bus_and_links():
+    relays = [
+        RelaySetting("INC-B1", pickup=1000, bus="B1", bay="Entrada"),
+        RelaySetting("AL-1", pickup=200, bus="B1", bay="AL1"),
+        RelaySetting("AL-2", pickup=300, bus="B1", bay="AL2"),
+        RelaySetting("INC-B2", pickup=250, bus="B2", bay="INC", upstream="AL-2"),
+        RelaySetting("AL-3", pickup=50, bus="B2", bay="AL3"),
+    ]
+    upstream, downstream, topology = adjacent_pairs(relays)
+    pairs = {(relays[u].name, relays[d].name) for u, d in zip(upstream, downstream)}
+    assert topology == "topology"
+    assert pairs == {("INC-B1", "AL-1"), ("INC-B1", "AL-2"), ("AL-2", "INC-B2"), ("INC-B2", "AL-3")}
+
+
+def test_analyze_matches_scalar_cti_and_flags_violations():
+    relays = [
+        RelaySetting("INC", pickup=800, time_dial=0.3, curve="IEC_SI", bus="B1", bay="INC"),
+        RelaySetting("AL-OK", pickup=200, time_dial=0.1, curve="IEC_SI", bus="B1", bay="AL1"),
+        RelaySetting("AL-LENTO", pickup=300, time_dial=0.5, curve="IEC_SI", bus="B1", bay="AL2",
+                     instantaneous_pickup=3000, instantaneous_delay=0.05),
+    ]
+    engine = TCCCoordinationEngine(required_margin=0.3, grid_points=100)
+    analysis = engine.analyze(relays)
+    results = {r["downstream_device"]: r for r in analysis["results"]}
+
+    for relay in relays[1:]:
+        grid = np.geomspace(200 * 1.01, 800 * 20.0, 100)
+        times_up = [_trip_time(relays[0], i) for i in grid]
+        times_down = [_trip_time(relay, i) for i in grid]
+        expected = min(u - d for u, d in zip(times_up, times_down) if math.isfinite(d))
+        assert results[relay.name]["coordination_time_interval"] == pytest.approx(expected, abs=1e-4)
+
+    assert results["AL-OK"]["is_coordinated"] and not results["AL-LENTO"]["is_coordinated"]
+    assert [v["downstream_device"] for v in analysis["violations"]] == ["AL-LENTO"]
+    assert analysis["total_pairs_analyzed"] == 2 and analysis["pairs_pruned"] == 1
+
+
+def test_relay_without_pickup_is_skipped():
+    analysis = TCCCoordinationEngine().analyze([RelaySetting("A", pickup=100), RelaySetting("B", pickup=None)])
+    assert analysis["skipped_devices"] == ["B"] and analysis["results"] == []
+
+
+def test_settings_from_config_prefers_protection_curves():
+    config = SimpleNamespace(
+        id=7, device_name="52-AL-01", etap_device_id="ETAP-7", bus_name="B1", bay_position="AL1",
+        upstream_device=None, downstream_device=None,
+        protection_config={"pickup_current": "1.5A", "time_dial": "0.5", "curve": "VI"},
+    )
+    from_dict = relay_setting_from_config(config, [], standard="iec")
+    assert (from_dict.pickup, from_dict.time_dial, from_dict.curve) == (1.5, 0.5, "IEC_VI")
+
+    curves = [
+        SimpleNamespace(function_code="51N", pickup_current=40.0, time_dial=0.2, curve_multiplier=None,
+                        curve_name="IEC SI", curve_equation="IEC", curve_parameters={}, minimum_time=None,
+                        maximum_time=None),
+        SimpleNamespace(function_code="51", pickup_current=400.0, time_dial=0.3, curve_multiplier=None,
+                        curve_name="Extremely Inverse", curve_equation="IEEE", curve_parameters={},
+                        minimum_time=None, maximum_time=None),
+        SimpleNamespace(function_code="50", pickup_current=6000.0, time_dial=None, curve_multiplier=None,
+                        curve_name="DT", curve_equation=None, curve_parameters={"delay": 0.08},
+                        minimum_time=None, maximum_time=None),
+    ]
+    setting = relay_setting_from_config(config, curves, standard="ieee")
+    assert (setting.pickup, setting.time_dial, setting.curve) == (400.0, 0.3, "IEEE_EI")
+    assert (setting.instantaneous_pickup, setting.instantaneous_delay) == (6000.0, 0.08)
+    assert setting.aliases == ("ETAP-7", "7")
+
+
+def test_custom_curve_constants_from_dict():
+    setting = relay_setting_from_dict({"name": "R", "pickup": 100,
+                                       "curve_parameters": {"k": 0.14, "alpha": 0.02}})
+    assert setting.curve_constants == (0.14, 0.0, 0.02)
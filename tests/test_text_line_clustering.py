@@ -0,0 +1,85 @@
+"""
+Testes do agrupamento de palavras em linhas (src/text_line_clustering.py).
+A regra gulosa anterior (cada palavra comparada com todas as linhas já
+criadas) é reproduzida aqui como referência.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import fitz
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.text_line_clustering import cluster_lines, YBandIndex, iter_page_words
+from src.intelligent_relay_extractor import IntelligentRelayExtractor
+
+
+def _legacy_lines(words, tolerance=3):
+    lines_dict = {}
+    for word in words:
+        found_line = None
+        for y_key in lines_dict:
+            if abs(y_key - word[1]) < tolerance:
+                found_line = y_key
+                break
+        if found_line is None:
+            found_line = word[1]
+            lines_dict[found_line] = []
+        lines_dict[found_line].append(word)
+    return [(y, lines_dict[y]) for y in sorted(lines_dict)]
+
+
+def _random_words(rng, count):
+    words = []
+    for n in range(count):
+        y0 = rng.choice([rng.uniform(0, 800), round(rng.uniform(0, 800)), 100.0, 102.5, 97.5])
+        words.append((rng.uniform(0, 500), y0, 0.0, y0 + 8, f"w{n}", 0, 0, n))
+    return words
+
+
+def test_cluster_lines_matches_legacy_greedy_rule():
+    rng = random.Random(11)
+    for _ in range(200):
+        words = _random_words(rng, rng.randint(0, 120))
+        assert cluster_lines(words) == _legacy_lines(words)
+
+
+def test_cluster_lines_keeps_page_order_anchors():
+    """A primeira palavra ancora a linha, mesmo que ordenar por y0 agrupasse diferente"""
+    words = [(0, 12.5, 0, 0, "a", 0, 0, 0), (0, 10.0, 0, 0, "b", 0, 0, 1), (0, 7.5, 0, 0, "c", 0, 0, 2)]
+    assert [(y, [w[4] for w in line]) for y, line in cluster_lines(words)] == [(7.5, ["c"]), (12.5, ["a", "b"])]
+
+
+def test_y_band_index_matches_linear_filter():
+    rng = random.Random(5)
+    words = _random_words(rng, 300)
+    index = YBandIndex(words)
+    for _ in range(100):
+        y = rng.uniform(-20, 820)
+        assert index.within(y, 10) == [w for w in words if abs(w[1] - y) < 10]
+
+
+def test_micom_layout_extraction(tmp_path):
+    pdf_path = tmp_path / "micom.pdf"
+    doc = fitz.open()
+    for page_no in range(2):
+        page = doc.new_page()
+        y = 60
+        for row in range(30):
+            page.insert_text((40, y), f"{page_no:02d}.{row:02d}:", fontsize=8)
+            page.insert_text((90, y + 0.8), f"Setting {row}:", fontsize=8)
+            page.insert_text((250, y - 0.6), f"{row * 10} ms", fontsize=8)
+            y += 12
+    doc.save(str(pdf_path))
+    doc.close()
+
+    pages = [(page_num, len(words)) for page_num, words in iter_page_words(pdf_path)]
+    assert [page_num for page_num, _ in pages] == [0, 1]
+
+    df = IntelligentRelayExtractor()._extract_micom_with_layout(pdf_path)
+    assert len(df) == 60
+    first = df.iloc[0]
+    assert (first['Code'], first['Description'], first['Value']) == ("00.00", "Setting 0", "0 ms")
+    assert df['is_active'].all()
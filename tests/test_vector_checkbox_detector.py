@@ -0,0 +1,80 @@
+"""
+Testes do detector vetorial de checkboxes
+(PreciseParameterExtractor.detect_checkboxes_vector).
+Valida leitura de quadrados/marcas de page.get_cdrawings() sem rasterização
+e concordância com o detector raster nos PDFs de teste.
+"""
+
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.precise_parameter_extractor import PreciseParameterExtractor
+from src.page_render_cache import get_page_raster_cache
+
+EASERGY_PDF = Path(__file__).parent.parent / "inputs" / "teste" / "tela3.pdf"
+
+
+def _square(y):
+    return fitz.Rect(100, y, 107.2, y + 7.2)
+
+
+@pytest.fixture
+def vector_page():
+    """Página com quadrados vazio, marcado (X), preenchido, fundo branco e colorido"""
+    doc = fitz.open()
+    page = doc.new_page()
+
+    page.draw_rect(_square(100), color=(0, 0, 0), width=0.72)
+
+    marked = _square(120)
+    page.draw_rect(marked, color=(0, 0, 0), width=0.72)
+    page.draw_line(marked.tl, marked.br, color=(0, 0, 0), width=0.72)
+    page.draw_line(marked.tr, marked.bl, color=(0, 0, 0), width=0.72)
+
+    page.draw_rect(_square(140), color=(0, 0, 0), fill=(0, 0, 0), width=0.72)
+    page.draw_rect(_square(160), color=(0, 0, 0), fill=(1, 1, 1), width=0.72)
+    page.draw_rect(_square(180), color=(1, 0.8, 0), width=0.72)
+
+    yield page
+    doc.close()
+
+
+def test_vector_squares_and_marks(vector_page):
+    extractor = PreciseParameterExtractor(checkbox_detector="vector")
+    cache = get_page_raster_cache()
+    misses_before = cache.misses
+
+    checkboxes = sorted(extractor.detect_checkboxes_vector(vector_page), key=lambda cb: cb.y)
+
+    assert [cb.is_marked for cb in checkboxes] == [False, True, True, False]
+    assert checkboxes[1].density > 0.3
+    assert checkboxes[2].density == 1.0
+    # Coordenadas em pixels de 300 DPI, como o detector raster
+    assert checkboxes[0].y == int((100 - 0.36) * 300 / 72)
+    assert all(25 < cb.width < 35 for cb in checkboxes)
+    # Nenhuma página renderizada (sem imagens embutidas)
+    assert cache.misses == misses_before
+
+
+def test_invalid_detector_name():
+    with pytest.raises(ValueError):
+        PreciseParameterExtractor(checkbox_detector="ocr")
+
+
+@pytest.mark.skipif(not EASERGY_PDF.exists(), reason="PDFs de teste não disponíveis")
+def test_vector_matches_raster_geometry_and_status():
+    """Mesma geometria e status marcado do detector raster em todas as páginas"""
+    extractor = PreciseParameterExtractor()
+    doc = fitz.open(str(EASERGY_PDF))
+    for page in doc:
+        raster = {(cb.x, cb.y, cb.width, cb.height, bool(cb.is_marked))
+                  for cb in extractor.detect_checkboxes(page)}
+        vector = {(cb.x, cb.y, cb.width, cb.height, bool(cb.is_marked))
+                  for cb in extractor.detect_checkboxes_vector(page)}
+        assert vector == raster
+    doc.close()